@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0003_add_daily_rollups"
+down_revision = "0002_add_order_intents"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "position_daily",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("symbol", sa.String(), nullable=False),
+        sa.Column("con_id", sa.Integer(), nullable=False),
+        sa.Column("sec_type", sa.String(), nullable=True),
+        sa.Column("expiry", sa.String(), nullable=True),
+        sa.Column("strike", sa.Float(), nullable=True),
+        sa.Column("right", sa.String(), nullable=True),
+        sa.Column("currency", sa.String(), nullable=True),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.Column("min_position", sa.Float(), nullable=True),
+        sa.Column("max_position", sa.Float(), nullable=True),
+        sa.Column("last_position", sa.Float(), nullable=True),
+        sa.Column("last_avg_cost", sa.Float(), nullable=True),
+        sa.Column("last_market_price", sa.Float(), nullable=True),
+        sa.Column("last_market_value", sa.Float(), nullable=True),
+        sa.Column("last_unrealized_pnl", sa.Float(), nullable=True),
+        sa.Column("last_realized_pnl", sa.Float(), nullable=True),
+        sa.UniqueConstraint("day", "symbol", "con_id", name="uniq_position_daily"),
+    )
+    op.create_table(
+        "account_daily",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False, unique=True),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.Column("net_liquidation_open", sa.Float(), nullable=True),
+        sa.Column("net_liquidation_high", sa.Float(), nullable=True),
+        sa.Column("net_liquidation_low", sa.Float(), nullable=True),
+        sa.Column("net_liquidation_close", sa.Float(), nullable=True),
+        sa.Column("last_summary_json", sa.Text(), nullable=False),
+    )
+    op.create_table(
+        "event_daily",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("symbol", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.UniqueConstraint("day", "event_type", "symbol", name="uniq_event_daily"),
+    )
+    op.create_table(
+        "order_status_daily",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("perm_id", sa.Integer(), nullable=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("last_filled", sa.Float(), nullable=True),
+        sa.Column("last_remaining", sa.Float(), nullable=True),
+        sa.Column("last_avg_fill_price", sa.Float(), nullable=True),
+        sa.UniqueConstraint(
+            "day", "order_id", "status", name="uniq_order_status_daily"
+        ),
+    )
+    for table in (
+        "events",
+        "account_snapshots",
+        "position_snapshots",
+        "order_statuses",
+    ):
+        op.create_index(f"ix_{table}_created_at", table, ["created_at"])
+
+
+def downgrade() -> None:
+    for table in (
+        "events",
+        "account_snapshots",
+        "position_snapshots",
+        "order_statuses",
+    ):
+        op.drop_index(f"ix_{table}_created_at", table_name=table)
+    op.drop_table("order_status_daily")
+    op.drop_table("event_daily")
+    op.drop_table("account_daily")
+    op.drop_table("position_daily")
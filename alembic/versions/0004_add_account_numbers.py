@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0004_add_account_numbers"
+down_revision = "0003_add_daily_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("runs") as batch:
+        batch.add_column(sa.Column("account_number", sa.String(), nullable=True))
+    with op.batch_alter_table("executions") as batch:
+        batch.add_column(sa.Column("account_number", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("executions") as batch:
+        batch.drop_column("account_number")
+    with op.batch_alter_table("runs") as batch:
+        batch.drop_column("account_number")
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0005_add_regime_windows"
+down_revision = "0004_add_account_numbers"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "regime_windows",
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("last_date", sa.Date(), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("regime_windows")
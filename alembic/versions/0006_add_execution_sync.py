@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0006_add_execution_sync"
+down_revision = "0005_add_regime_windows"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "execution_sync",
+        sa.Column("account_number", sa.String(), primary_key=True),
+        sa.Column("last_execution_time", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_executions_symbol_execution_time",
+        "executions",
+        ["symbol", "execution_time"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_executions_symbol_execution_time", table_name="executions")
+    op.drop_table("execution_sync")
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0007_add_market_data_cache"
+down_revision = "0006_add_execution_sync"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "market_data_cache",
+        sa.Column("namespace", sa.String(), primary_key=True),
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("market_data_cache")
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0008_add_run_checkpoints"
+down_revision = "0007_add_market_data_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "run_checkpoints",
+        sa.Column("run_id", sa.Integer(), sa.ForeignKey("runs.id"), primary_key=True),
+        sa.Column("kind", sa.String(), primary_key=True),
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("run_checkpoints")
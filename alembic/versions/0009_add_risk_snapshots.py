@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0009_add_risk_snapshots"
+down_revision = "0008_add_run_checkpoints"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "risk_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("run_id", sa.Integer(), sa.ForeignKey("runs.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("symbol", sa.String(), nullable=True),
+        sa.Column("delta", sa.Float(), nullable=False),
+        sa.Column("dollar_delta", sa.Float(), nullable=False),
+        sa.Column("beta_weighted_delta", sa.Float(), nullable=False),
+        sa.Column("gamma", sa.Float(), nullable=False),
+        sa.Column("theta", sa.Float(), nullable=False),
+        sa.Column("option_lines", sa.Integer(), nullable=False),
+        sa.Column("missing_greeks", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_risk_snapshots_run_id", "risk_snapshots", ["run_id"])
+    op.create_index("ix_risk_snapshots_created_at", "risk_snapshots", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_risk_snapshots_created_at", table_name="risk_snapshots")
+    op.drop_index("ix_risk_snapshots_run_id", table_name="risk_snapshots")
+    op.drop_table("risk_snapshots")
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0010_add_snapshot_log"
+down_revision = "0009_add_risk_snapshots"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("position_snapshots") as batch:
+        batch.add_column(
+            sa.Column(
+                "removed", sa.Boolean(), nullable=False, server_default=sa.false()
+            )
+        )
+    op.create_table(
+        "snapshot_log",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("run_id", sa.Integer(), sa.ForeignKey("runs.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("base", sa.Boolean(), nullable=False),
+        sa.Column("rows", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_snapshot_log_created_at", "snapshot_log", ["created_at"])
+    op.create_index("ix_snapshot_log_kind_run", "snapshot_log", ["kind", "run_id"])
+    op.create_index("ix_position_snapshots_run_id", "position_snapshots", ["run_id"])
+    # Every snapshot written so far was complete, so each one is a base.
+    op.execute(
+        "INSERT INTO snapshot_log (run_id, created_at, kind, base, rows) "
+        "SELECT run_id, MIN(created_at), 'positions', 1, COUNT(*) "
+        "FROM position_snapshots GROUP BY run_id"
+    )
+    op.execute(
+        "INSERT INTO snapshot_log (run_id, created_at, kind, base, rows) "
+        "SELECT run_id, created_at, 'account', 1, 1 FROM account_snapshots"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_position_snapshots_run_id", table_name="position_snapshots")
+    op.drop_index("ix_snapshot_log_kind_run", table_name="snapshot_log")
+    op.drop_index("ix_snapshot_log_created_at", table_name="snapshot_log")
+    op.drop_table("snapshot_log")
+    with op.batch_alter_table("position_snapshots") as batch:
+        batch.drop_column("removed")
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0011_add_report_tables"
+down_revision = "0010_add_snapshot_log"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_daily",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("account_number", sa.String(), nullable=False),
+        sa.Column("symbol", sa.String(), nullable=False),
+        sa.Column("stage", sa.String(), nullable=False),
+        sa.Column("sec_type", sa.String(), nullable=False),
+        sa.Column("intents", sa.Integer(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.Column("fills", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Float(), nullable=False),
+        sa.Column("buy_value", sa.Float(), nullable=False),
+        sa.Column("sell_value", sa.Float(), nullable=False),
+        sa.Column("slippage", sa.Float(), nullable=False),
+        sa.Column("priced_fills", sa.Integer(), nullable=False),
+        sa.UniqueConstraint(
+            "day",
+            "account_number",
+            "symbol",
+            "stage",
+            "sec_type",
+            name="uniq_report_daily",
+        ),
+    )
+    op.create_table(
+        "report_runs",
+        sa.Column("run_id", sa.Integer(), sa.ForeignKey("runs.id"), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("account_number", sa.String(), nullable=False),
+        sa.Column("dry_run", sa.Boolean(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("ended_at", sa.DateTime(), nullable=True),
+        sa.Column("success", sa.Boolean(), nullable=True),
+        sa.Column("resumes", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_report_runs_day", "report_runs", ["day"])
+    op.create_table(
+        "report_watermarks",
+        sa.Column("source", sa.String(), primary_key=True),
+        sa.Column("last_id", sa.Integer(), nullable=False),
+    )
+    # Fills carry only the broker order id, so reports look orders up by it.
+    op.create_index("ix_orders_order_id", "orders", ["order_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_order_id", table_name="orders")
+    op.drop_table("report_watermarks")
+    op.drop_index("ix_report_runs_day", table_name="report_runs")
+    op.drop_table("report_runs")
+    op.drop_table("report_daily")
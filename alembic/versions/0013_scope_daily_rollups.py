@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0013_scope_daily_rollups"
+down_revision = "0012_add_run_profile_dir"
+branch_labels = None
+depends_on = None
+
+POSITION_COLUMNS = (
+    "id, day, symbol, con_id, sec_type, expiry, strike, right, currency, "
+    "samples, min_position, max_position, last_position, last_avg_cost, "
+    "last_market_price, last_market_value, last_unrealized_pnl, last_realized_pnl"
+)
+ACCOUNT_COLUMNS = (
+    "id, day, samples, net_liquidation_open, net_liquidation_high, "
+    "net_liquidation_low, net_liquidation_close, last_summary_json"
+)
+
+
+def _position_daily(scoped: bool) -> None:
+    series = (
+        [
+            sa.Column("config_path", sa.String(), nullable=False),
+            sa.Column("account_number", sa.String(), nullable=False),
+        ]
+        if scoped
+        else []
+    )
+    op.create_table(
+        "position_daily",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        *series,
+        sa.Column("symbol", sa.String(), nullable=False),
+        sa.Column("con_id", sa.Integer(), nullable=False),
+        sa.Column("sec_type", sa.String(), nullable=True),
+        sa.Column("expiry", sa.String(), nullable=True),
+        sa.Column("strike", sa.Float(), nullable=True),
+        sa.Column("right", sa.String(), nullable=True),
+        sa.Column("currency", sa.String(), nullable=True),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.Column("min_position", sa.Float(), nullable=True),
+        sa.Column("max_position", sa.Float(), nullable=True),
+        sa.Column("last_position", sa.Float(), nullable=True),
+        sa.Column("last_avg_cost", sa.Float(), nullable=True),
+        sa.Column("last_market_price", sa.Float(), nullable=True),
+        sa.Column("last_market_value", sa.Float(), nullable=True),
+        sa.Column("last_unrealized_pnl", sa.Float(), nullable=True),
+        sa.Column("last_realized_pnl", sa.Float(), nullable=True),
+        sa.UniqueConstraint(
+            "day",
+            *(["config_path", "account_number"] if scoped else []),
+            "symbol",
+            "con_id",
+            name="uniq_position_daily",
+        ),
+    )
+
+
+def _account_daily(scoped: bool) -> None:
+    series = (
+        [
+            sa.Column("config_path", sa.String(), nullable=False),
+            sa.Column("account_number", sa.String(), nullable=False),
+            sa.UniqueConstraint(
+                "day", "config_path", "account_number", name="uniq_account_daily"
+            ),
+        ]
+        if scoped
+        else []
+    )
+    op.create_table(
+        "account_daily",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False, unique=not scoped),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.Column("net_liquidation_open", sa.Float(), nullable=True),
+        sa.Column("net_liquidation_high", sa.Float(), nullable=True),
+        sa.Column("net_liquidation_low", sa.Float(), nullable=True),
+        sa.Column("net_liquidation_close", sa.Float(), nullable=True),
+        sa.Column("last_summary_json", sa.Text(), nullable=False),
+        *series,
+    )
+
+
+def _rebuild(
+    table: str, columns: str, create: Callable[[bool], None], scoped: bool
+) -> None:
+    # SQLite can't change a unique constraint in place, so the table is
+    # recreated. Rows rolled up before this revision have no series.
+    op.rename_table(table, f"_{table}_old")
+    create(scoped)
+    if scoped:
+        op.execute(
+            f"INSERT INTO {table} ({columns}, config_path, account_number) "
+            f"SELECT {columns}, '', '' FROM _{table}_old"
+        )
+    else:
+        # Keep one row per day; the key no longer separates series.
+        op.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM _{table}_old "
+            f"WHERE id IN (SELECT MIN(id) FROM _{table}_old GROUP BY "
+            f"{'day, symbol, con_id' if table == 'position_daily' else 'day'})"
+        )
+    op.drop_table(f"_{table}_old")
+
+
+def upgrade() -> None:
+    _rebuild("position_daily", POSITION_COLUMNS, _position_daily, True)
+    _rebuild("account_daily", ACCOUNT_COLUMNS, _account_daily, True)
+
+
+def downgrade() -> None:
+    _rebuild("account_daily", ACCOUNT_COLUMNS, _account_daily, False)
+    _rebuild("position_daily", POSITION_COLUMNS, _position_daily, False)
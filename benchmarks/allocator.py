@@ -0,0 +1,121 @@
+"""Sizing buy-only, sell-only and put targets for a large symbol universe.
+
+Times the vectorized allocator against sizing each symbol on its own, which
+is how the engines sized symbols before, and reports how far the per-symbol
+buys overshoot the shared buying-power budget.
+
+    python benchmarks/allocator.py [--symbols 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+from typing import Callable
+
+import numpy as np
+
+from thetagang.allocator import (
+    RebalanceInputs,
+    plan_buys,
+    plan_sells,
+    put_write_quantities,
+    target_shares,
+)
+
+
+def _inputs(symbols: int, buying_power: float) -> RebalanceInputs:
+    rng = random.Random(3)
+    weights = np.array([rng.random() for _ in range(symbols)])
+    weights /= weights.sum()
+    prices = [rng.uniform(5, 800) for _ in range(symbols)]
+    targets = weights * buying_power
+    return RebalanceInputs.build(
+        symbols=[f"S{index:04d}" for index in range(symbols)],
+        target_value=np.round(targets, 2),
+        price=prices,
+        current=[
+            math.floor(target / price * rng.uniform(0, 1.5))
+            for target, price in zip(targets, prices)
+        ],
+        min_shares=[rng.choice([1, 1, 5, 10]) for _ in range(symbols)],
+        min_amount=[rng.choice([0.0, 0.0, 250.0, 1000.0]) for _ in range(symbols)],
+        min_percent_relative=[
+            rng.choice([math.nan, math.nan, 0.05]) for _ in range(symbols)
+        ],
+    )
+
+
+def _single(inputs: RebalanceInputs, index: int) -> RebalanceInputs:
+    part = slice(index, index + 1)
+    return RebalanceInputs(
+        symbols=inputs.symbols[part],
+        target_value=inputs.target_value[part],
+        price=inputs.price[part],
+        current=inputs.current[part],
+        min_shares=inputs.min_shares[part],
+        min_amount=inputs.min_amount[part],
+        min_percent_relative=inputs.min_percent_relative[part],
+    )
+
+
+def _best(run: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--buying-power", type=float, default=5_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    inputs = _inputs(args.symbols, args.buying_power)
+    # Half of the buying power not yet held, so the buys have to be scaled.
+    budget = float(args.buying_power - (inputs.current * inputs.price).sum()) / 2
+    singles = [_single(inputs, index) for index in range(args.symbols)]
+    net_short_puts = np.zeros(args.symbols, dtype=np.int64)
+    buy_only = np.zeros(args.symbols, dtype=bool)
+
+    def puts() -> None:
+        put_write_quantities(
+            target_shares(inputs.target_value, inputs.price),
+            inputs.current,
+            net_short_puts,
+            buy_only,
+        )
+
+    timings = {
+        "buys (joint)": _best(lambda: plan_buys(inputs, budget), args.repeat),
+        "buys (per symbol)": _best(
+            lambda: [plan_buys(single, budget) for single in singles], args.repeat
+        ),
+        "sells": _best(lambda: plan_sells(inputs), args.repeat),
+        "put targets": _best(puts, args.repeat),
+    }
+    print(f"{args.symbols} symbols, ${budget:,.0f} buy budget")
+    for name, seconds in timings.items():
+        print(f"{name:>18}: {seconds * 1000:8.3f} ms")
+
+    joint = plan_buys(inputs, budget)
+    separate = [plan_buys(single, budget) for single in singles]
+    prices = dict(zip(inputs.symbols, inputs.price))
+
+    def spend(trades: list[tuple[str, int]]) -> float:
+        return sum(quantity * prices[symbol] for symbol, quantity in trades)
+
+    print(
+        f"spend: ${spend(joint.trades()):,.0f} joint, "
+        f"${sum(spend(plan.trades()) for plan in separate):,.0f} per symbol"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Startup config load time with and without the validated-config cache.
+
+Expands the sample ``thetagang.toml`` to many symbols, each with a few
+per-symbol overrides, then times the uncached load (schema check, TOML
+parsing and validation) against a cache hit.
+
+    python benchmarks/config_cache.py [--symbols 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import tomlkit
+
+from thetagang.thetagang import _load_config
+
+
+def _config_text(symbols: int) -> str:
+    doc = tomlkit.parse(Path("thetagang.toml").read_text(encoding="utf8")).unwrap()
+    weight = 1.0 / symbols
+    doc["portfolio"]["symbols"] = {
+        f"S{index:04d}": {
+            "weight": weight,
+            "primary_exchange": "NASDAQ",
+            "delta": 0.2 + index % 3 * 0.05,
+            "write_threshold": 0.005 * (index % 4),
+            "calls": {"cap_factor": 0.5 + index % 5 * 0.1},
+            "puts": {"strike_limit": 10.0 + index},
+        }
+        for index in range(symbols)
+    }
+    return tomlkit.dumps(doc)
+
+
+def _best(run: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["THETAGANG_CACHE_DIR"] = str(Path(tmp) / "cache")
+        config_path = Path(tmp) / "thetagang.toml"
+        config_path.write_text(_config_text(args.symbols), encoding="utf8")
+        path = str(config_path)
+
+        uncached = _best(lambda: _load_config(path, use_cache=False), args.repeat)
+        _load_config(path)
+        cached = _best(lambda: _load_config(path), args.repeat)
+
+    print(f"{args.symbols} symbols")
+    print(f"uncached: {uncached * 1000:8.2f} ms")
+    print(f"  cached: {cached * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
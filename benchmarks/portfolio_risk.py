@@ -0,0 +1,109 @@
+"""Time to aggregate portfolio greeks for a large synthetic option book.
+
+Builds a book of short puts and calls spread across many symbols and
+expirations, with cached greeks for most lines, then times the array build
+and the vectorized aggregation separately.
+
+    python benchmarks/portfolio_risk.py [--symbols 200] [--lines 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+from ib_async import Option, PortfolioItem, Stock, Ticker
+from ib_async.objects import OptionComputation
+
+from thetagang.portfolio_risk import aggregate_risk, build_risk_arrays
+
+
+def _book(symbols: int, lines: int) -> Dict[str, List[PortfolioItem]]:
+    rng = random.Random(7)
+    expiries = [
+        (date.today() + timedelta(days=7 * week)).strftime("%Y%m%d")
+        for week in range(1, 9)
+    ]
+    book: Dict[str, List[PortfolioItem]] = {}
+    con_id = 1
+    for index in range(symbols):
+        symbol = f"S{index:04d}"
+        price = rng.uniform(20, 500)
+        items = [
+            PortfolioItem(
+                Stock(symbol, "SMART", conId=con_id), 100, price, 0, 0, 0, 0, "DU1"
+            )
+        ]
+        for _ in range(lines):
+            con_id += 1
+            contract = Option(
+                symbol,
+                rng.choice(expiries),
+                round(price * rng.uniform(0.8, 1.2)),
+                rng.choice("PC"),
+                "SMART",
+                "100",
+                conId=con_id,
+            )
+            items.append(
+                PortfolioItem(contract, -rng.randint(1, 5), 0, 0, 0, 0, 0, "DU1")
+            )
+        book[symbol] = items
+    return book
+
+
+def _tickers(book: Dict[str, List[PortfolioItem]]) -> Dict[int, Ticker]:
+    rng = random.Random(11)
+    tickers: Dict[int, Ticker] = {}
+    for items in book.values():
+        for item in items[1:]:
+            # Leave a few lines unquoted, as after a partial run.
+            if rng.random() < 0.05:
+                continue
+            tickers[item.contract.conId] = Ticker(
+                contract=item.contract,
+                modelGreeks=OptionComputation(
+                    0,
+                    delta=rng.uniform(-0.5, 0.5),
+                    gamma=rng.uniform(0, 0.05),
+                    theta=-rng.uniform(0, 0.1),
+                    undPrice=items[0].marketPrice,
+                ),
+            )
+    return tickers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    book = _book(args.symbols, args.lines)
+    tickers = _tickers(book)
+    betas = {symbol: 1.0 + index % 5 * 0.1 for index, symbol in enumerate(book)}
+
+    def cached_ticker(contract: Option) -> Ticker | None:
+        return tickers.get(contract.conId)
+
+    build_times: List[float] = []
+    aggregate_times: List[float] = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        arrays = build_risk_arrays(book, cached_ticker)
+        built = time.perf_counter()
+        aggregate_risk(arrays, betas)
+        build_times.append(built - start)
+        aggregate_times.append(time.perf_counter() - built)
+
+    print(f"{len(arrays)} lines across {args.symbols} symbols")
+    print(f"    build: {min(build_times) * 1000:8.2f} ms")
+    print(f"aggregate: {min(aggregate_times) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Report query time from the aggregate tables versus scanning raw history.
+
+Seeds a database with many runs of intents, orders and fills, folds them
+into the report tables once, then times the per-run incremental update, a
+report read from the aggregates and the equivalent join over the raw tables.
+
+    python benchmarks/report.py [--runs 2000] [--orders 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from sqlalchemy import func, insert, select
+
+from thetagang.db import (
+    DataStore,
+    ExecutionRecord,
+    OrderIntent,
+    OrderRecord,
+    Run,
+)
+from thetagang.reporting import load_report, update_reports
+
+SYMBOLS = [f"S{index:02d}" for index in range(40)]
+
+
+def _best(run: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _seed_run(
+    data_store: DataStore, run_index: int, orders: int, first_id: int
+) -> None:
+    started = datetime(2024, 1, 1) + timedelta(hours=run_index * 4)
+    with data_store.session_scope() as session:
+        run_id = session.execute(
+            insert(Run)
+            .values(
+                started_at=started,
+                config_path="thetagang.toml",
+                dry_run=False,
+                version="bench",
+                hostname="bench",
+                account_number="DU1",
+            )
+            .returning(Run.id)
+        ).scalar_one()
+        intents: List[Dict[str, object]] = []
+        records: List[Dict[str, object]] = []
+        fills: List[Dict[str, object]] = []
+        for offset in range(orders):
+            row_id = first_id + offset
+            symbol = SYMBOLS[row_id % len(SYMBOLS)]
+            sec_type = "OPT" if offset % 2 else "STK"
+            common = dict(
+                id=row_id,
+                run_id=run_id,
+                created_at=started,
+                symbol=symbol,
+                sec_type=sec_type,
+                action="SELL",
+                quantity=1.0,
+                limit_price=2.0,
+            )
+            intents.append(dict(common, dry_run=False))
+            records.append(dict(common, intent_id=row_id, order_id=row_id))
+            fills.append(
+                dict(
+                    id=row_id,
+                    run_id=run_id,
+                    exec_id=f"e{row_id}",
+                    order_id=row_id,
+                    symbol=symbol,
+                    side="SLD",
+                    shares=1.0,
+                    price=1.95,
+                    execution_time=started,
+                    account_number="DU1",
+                )
+            )
+        session.execute(insert(OrderIntent), intents)
+        session.execute(insert(OrderRecord), records)
+        session.execute(insert(ExecutionRecord), fills)
+
+
+def _raw_report(data_store: DataStore, since: date) -> list:
+    stmt = (
+        select(
+            ExecutionRecord.symbol,
+            func.count(),
+            func.sum(ExecutionRecord.shares * ExecutionRecord.price),
+            func.sum(
+                (OrderIntent.limit_price - ExecutionRecord.price)
+                * ExecutionRecord.shares
+            ),
+        )
+        .join(OrderRecord, OrderRecord.order_id == ExecutionRecord.order_id)
+        .join(OrderIntent, OrderIntent.id == OrderRecord.intent_id)
+        .join(Run, Run.id == OrderRecord.run_id)
+        .where(Run.dry_run.is_(False))
+        .where(ExecutionRecord.execution_time >= since)
+        .group_by(ExecutionRecord.symbol)
+    )
+    with data_store.session_scope() as session:
+        return list(session.execute(stmt))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_store = DataStore(
+            f"sqlite:///{Path(tmp) / 'state.db'}",
+            str(Path(tmp) / "thetagang.toml"),
+            dry_run=False,
+        )
+        for run_index in range(args.runs):
+            _seed_run(data_store, run_index, args.orders, run_index * args.orders + 1)
+        start = time.perf_counter()
+        update_reports(data_store.engine)
+        backfill = time.perf_counter() - start
+
+        next_id = args.runs * args.orders + 1
+
+        def incremental() -> None:
+            nonlocal next_id
+            _seed_run(data_store, args.runs, args.orders, next_id)
+            next_id += args.orders
+            start = time.perf_counter()
+            update_reports(data_store.engine)
+            timings.append(time.perf_counter() - start)
+
+        timings: List[float] = []
+        for _ in range(args.repeat):
+            incremental()
+
+        since = date(2024, 1, 1)
+        aggregate = _best(
+            lambda: load_report(data_store.engine, "symbol", since), args.repeat
+        )
+        raw = _best(lambda: _raw_report(data_store, since), args.repeat)
+        data_store.engine.dispose()
+
+    print(f"{args.runs} runs of {args.orders} orders, each filled")
+    print(f"  initial fold: {backfill * 1000:10.1f} ms")
+    print(f"  fold one run: {min(timings) * 1000:10.1f} ms")
+    print(f"report (aggregates): {aggregate * 1000:10.1f} ms")
+    print(f"report (raw tables): {raw * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Option management wall time with and without pipelined roll scans.
+
+Runs the roll stage against a simulated gateway where each rollable check
+waits on an ITM quote and each roll-target scan waits on a chain scan. The
+sequential path checks every position and then scans one position at a time;
+the pipelined path starts each scan as soon as its position is classified.
+At most --concurrent-scans scans run at once, standing in for request pacing.
+
+    python benchmarks/roll_pipeline.py [--positions 20] [--scan-ms 400] [--concurrent-scans 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any
+from unittest import mock
+
+from ib_async import Option, PortfolioItem
+
+from thetagang.strategies.options import (
+    OptionsStrategyDeps,
+    run_option_management_stages,
+)
+from thetagang.strategies.options_engine import OptionsStrategyEngine
+from thetagang.trading_operations import OrderOperations
+
+
+def _engine(args: argparse.Namespace) -> OptionsStrategyEngine:
+    config = mock.Mock()
+    config.runtime.orders.exchange = "SMART"
+    config.runtime.orders.minimum_credit = 0.05
+    config.strategies.wheel.defaults.roll_when.dte = 7
+    config.strategies.wheel.defaults.roll_when.calls.credit_only = False
+    config.get_strike_limit.return_value = None
+    config.maintain_high_water_mark.return_value = False
+
+    async def quote(contract: Any, **_kwargs: Any) -> Any:
+        return SimpleNamespace(contract=contract, midpoint=lambda: 1.0)
+
+    pacing = asyncio.Semaphore(args.concurrent_scans)
+
+    async def scan(underlying: Any, *_args: Any, **_kwargs: Any) -> Any:
+        async with pacing:
+            await asyncio.sleep(args.scan_ms / 1000)
+        return SimpleNamespace(
+            contract=Option(underlying.symbol, "20300118", 110.0, "C", conId=1),
+            midpoint=lambda: 1.5,
+        )
+
+    async def maximum_new_contracts(*_args: Any) -> int:
+        return 100
+
+    order_ops = OrderOperations(
+        config=config, account_number="DU1", orders=mock.Mock(), data_store=None
+    )
+    order_ops.enqueue_order = mock.Mock()  # type: ignore[method-assign]
+    engine = OptionsStrategyEngine(
+        config=config,
+        ibkr=SimpleNamespace(get_ticker_for_contract=quote),  # type: ignore[arg-type]
+        option_scanner=SimpleNamespace(find_eligible_contracts=scan),  # type: ignore[arg-type]
+        order_ops=order_ops,
+        services=SimpleNamespace(  # type: ignore[arg-type]
+            get_primary_exchange=lambda _symbol: "NASDAQ",
+            get_maximum_new_contracts_for=maximum_new_contracts,
+        ),
+        target_quantities={},
+        has_excess_puts=set(),
+        has_excess_calls=set(),
+        qualified_contracts={},
+    )
+
+    async def can_be_rolled(_call: PortfolioItem, _table: Any) -> bool:
+        await asyncio.sleep(args.check_ms / 1000)
+        return True
+
+    engine.call_can_be_rolled = can_be_rolled  # type: ignore[method-assign]
+    return engine
+
+
+def _portfolio(positions: int) -> dict[str, list[PortfolioItem]]:
+    expiry = (date.today() + timedelta(days=3)).strftime("%Y%m%d")
+    return {
+        f"S{index:02d}": [
+            PortfolioItem(
+                contract=Option(f"S{index:02d}", expiry, 100.0, "C", conId=index + 10),
+                position=-1,
+                marketPrice=1.0,
+                marketValue=-100.0,
+                averageCost=150.0,
+                unrealizedPNL=50.0,
+                realizedPNL=0.0,
+                account="DU1",
+            )
+        ]
+        for index in range(positions)
+    }
+
+
+class _Service:
+    """Manage service that optionally hides the prefetch from the engine."""
+
+    def __init__(self, engine: OptionsStrategyEngine, pipelined: bool) -> None:
+        self.engine = engine
+        self.pipelined = pipelined
+
+    async def check_puts(self, _portfolio: Any, prefetch_rolls: bool = False) -> Any:
+        return [], [], ""
+
+    async def check_calls(self, portfolio: Any, prefetch_rolls: bool = False) -> Any:
+        return await self.engine.check_calls(
+            portfolio, prefetch_rolls and self.pipelined
+        )
+
+    async def roll_puts(self, puts: Any, account_summary: Any) -> Any:
+        return []
+
+    async def roll_calls(self, calls: Any, account_summary: Any, portfolio: Any) -> Any:
+        return await self.engine.roll_calls(calls, account_summary, portfolio)
+
+
+async def _run(args: argparse.Namespace, pipelined: bool) -> float:
+    engine = _engine(args)
+    deps = OptionsStrategyDeps(
+        enabled_stages={"options_roll_positions"},
+        write_service=mock.Mock(),
+        manage_service=_Service(engine, pipelined),  # type: ignore[arg-type]
+    )
+    start = time.perf_counter()
+    with mock.patch("thetagang.strategies.options.log.print"):
+        await run_option_management_stages(
+            deps, {}, _portfolio(args.positions), options_enabled=True
+        )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--check-ms", type=float, default=40)
+    parser.add_argument("--scan-ms", type=float, default=400)
+    parser.add_argument("--concurrent-scans", type=int, default=4)
+    args = parser.parse_args()
+
+    sequential = asyncio.run(_run(args, pipelined=False))
+    pipelined = asyncio.run(_run(args, pipelined=True))
+    print(
+        f"{args.positions} rollable calls, {args.check_ms:.0f} ms check, "
+        f"{args.scan_ms:.0f} ms scan, {args.concurrent_scans} scans at once"
+    )
+    print(f"sequential: {sequential * 1000:8.1f} ms")
+    print(f" pipelined: {pipelined * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Rows written and database growth for full versus delta snapshot storage.
+
+Records position and account snapshots for many runs of a synthetic
+portfolio, once with every row stored on every run and once with only the
+changes. A "stable" portfolio changes one position and a few account values
+per run; with --moving-prices every quote changes on every run as well.
+
+    python benchmarks/snapshot_storage.py [--runs 200] [--symbols 60] [--moving-prices]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+
+from sqlalchemy import func, select
+
+from thetagang.db import AccountSnapshot, DataStore, PositionSnapshot
+
+ACCOUNT_KEYS = 120
+
+
+def _portfolio(symbols: int, lines: int) -> Dict[str, List[SimpleNamespace]]:
+    rng = random.Random(5)
+    portfolio: Dict[str, List[SimpleNamespace]] = {}
+    con_id = 0
+    for index in range(symbols):
+        items = []
+        for line in range(lines):
+            con_id += 1
+            items.append(
+                SimpleNamespace(
+                    contract=SimpleNamespace(
+                        conId=con_id,
+                        secType="STK" if line == 0 else "OPT",
+                        currency="USD",
+                        exchange="SMART",
+                        multiplier="" if line == 0 else "100",
+                        lastTradeDateOrContractMonth="" if line == 0 else "20301220",
+                        strike=0.0 if line == 0 else 100.0 + line,
+                        right="" if line == 0 else "P",
+                    ),
+                    position=float(rng.randint(1, 500)),
+                    averageCost=rng.uniform(5, 500),
+                    marketPrice=rng.uniform(5, 500),
+                    marketValue=0.0,
+                    unrealizedPNL=0.0,
+                    realizedPNL=0.0,
+                )
+            )
+        portfolio[f"S{index:03d}"] = items
+    return portfolio
+
+
+def _step(
+    portfolio: Dict[str, List[SimpleNamespace]],
+    account: Dict[str, SimpleNamespace],
+    rng: random.Random,
+    moving_prices: bool,
+) -> None:
+    items = [item for lines in portfolio.values() for item in lines]
+    rng.choice(items).position += 1
+    if moving_prices:
+        for item in items:
+            item.marketPrice *= rng.uniform(0.99, 1.01)
+            item.marketValue = item.position * item.marketPrice
+    for key in rng.sample(sorted(account), 6):
+        account[key] = SimpleNamespace(
+            value=f"{rng.uniform(0, 1e6):.2f}", currency="USD"
+        )
+
+
+def _record(
+    mode: str, runs: int, symbols: int, lines: int, moving_prices: bool
+) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "state.db"
+        data_store = DataStore(
+            f"sqlite:///{db_path}",
+            str(Path(tmp) / "thetagang.toml"),
+            dry_run=False,
+            snapshot_mode=mode,
+        )
+        portfolio = _portfolio(symbols, lines)
+        account = {
+            f"Key{index:03d}": SimpleNamespace(value=f"{index}.00", currency="USD")
+            for index in range(ACCOUNT_KEYS)
+        }
+        rng = random.Random(9)
+        start = time.perf_counter()
+        for _ in range(runs):
+            _step(portfolio, account, rng, moving_prices)
+            data_store.record_positions_snapshot(portfolio)
+            data_store.record_account_snapshot(account)
+            data_store.run_id = data_store._create_run(
+                data_store.config_path, False, None
+            )
+        elapsed = time.perf_counter() - start
+        with data_store.session_scope() as session:
+            position_rows = session.execute(
+                select(func.count()).select_from(PositionSnapshot)
+            ).scalar_one()
+            account_bytes = session.execute(
+                select(func.sum(func.length(AccountSnapshot.summary_json)))
+            ).scalar_one()
+        data_store.engine.dispose()
+        return {
+            "position rows": position_rows,
+            "account JSON KiB": (account_bytes or 0) / 1024,
+            "database KiB": db_path.stat().st_size / 1024,
+            "ms per run": elapsed / runs * 1000,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--symbols", type=int, default=60)
+    parser.add_argument("--lines", type=int, default=5)
+    parser.add_argument("--moving-prices", action="store_true")
+    args = parser.parse_args()
+
+    results = {
+        mode: _record(mode, args.runs, args.symbols, args.lines, args.moving_prices)
+        for mode in ("full", "delta")
+    }
+    print(
+        f"{args.runs} runs of {args.symbols * args.lines} positions and "
+        f"{ACCOUNT_KEYS} account values"
+        + (", moving prices" if args.moving_prices else "")
+    )
+    print(f"{'':>18} {'full':>10} {'delta':>10}")
+    for name in results["full"]:
+        print(
+            f"{name:>18} {results['full'][name]:10.1f} {results['delta'][name]:10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Callback overhead of ticker field waits under a simulated tick storm.
+
+Compares the per-field waits IBKR.get_ticker_for_contract used to attach (one
+updateEvent handler and asyncio.Event per field) with the single
+TickerReadiness handler per ticker. Every ticker receives a burst of quote
+updates before its greeks and open interest arrive, which is what an option
+scan looks like while the model computations catch up.
+
+    python benchmarks/ticker_readiness.py [--tickers 60] [--ticks 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Callable, List
+
+from ib_async import Option, Ticker
+from ib_async.objects import OptionComputation
+
+from thetagang.ticker_readiness import FIELD_CHECKS, TickerField, wait_for_fields
+
+FIELDS = [
+    TickerField.MARKET_PRICE,
+    TickerField.GREEKS,
+    TickerField.OPEN_INTEREST,
+    TickerField.MIDPOINT,
+]
+
+
+async def _legacy_wait(
+    ticker: Ticker, condition: Callable[[Ticker], bool], timeout: float
+) -> bool:
+    event = asyncio.Event()
+
+    def on_ticker(ticker: Ticker) -> None:
+        if condition(ticker):
+            event.set()
+
+    ticker.updateEvent += on_ticker
+    try:
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        ticker.updateEvent -= on_ticker
+
+
+async def _legacy_wait_for_fields(ticker: Ticker, timeout: float) -> None:
+    await asyncio.gather(
+        *(_legacy_wait(ticker, check, timeout) for _bit, check in FIELD_CHECKS)
+    )
+
+
+def _tickers(count: int) -> List[Ticker]:
+    return [
+        Ticker(contract=Option("SPY", "20260116", 300.0 + i, "P", "SMART"))
+        for i in range(count)
+    ]
+
+
+async def _storm(tickers: List[Ticker], ticks: int) -> None:
+    for tick in range(ticks):
+        for ticker in tickers:
+            ticker.bid, ticker.ask = 1.0 + tick * 0.01, 1.2 + tick * 0.01
+            ticker.bidSize = ticker.askSize = 1
+            ticker.updateEvent.emit(ticker)
+        # Let waiters whose events were set run, as the IB reader would.
+        await asyncio.sleep(0)
+    for ticker in tickers:
+        ticker.modelGreeks = OptionComputation(0, delta=-0.3)
+        ticker.putOpenInterest = 100
+        ticker.updateEvent.emit(ticker)
+
+
+async def _run(kind: str, count: int, ticks: int) -> float:
+    tickers = _tickers(count)
+    start = time.perf_counter()
+    if kind == "baseline":
+        await _storm(tickers, ticks)
+        return time.perf_counter() - start
+    if kind == "legacy":
+        waiters = [_legacy_wait_for_fields(ticker, 60) for ticker in tickers]
+    else:
+        waiters = [wait_for_fields(ticker, FIELDS, [], 60) for ticker in tickers]
+    tasks = [asyncio.ensure_future(waiter) for waiter in waiters]
+    while not all(len(ticker.updateEvent) for ticker in tickers):
+        await asyncio.sleep(0)
+    await _storm(tickers, ticks)
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=60)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    updates = args.tickers * (args.ticks + 1)
+    timings = {
+        kind: min(
+            asyncio.run(_run(kind, args.tickers, args.ticks))
+            for _ in range(args.repeat)
+        )
+        for kind in ("baseline", "legacy", "readiness")
+    }
+    print(f"{updates} updates, {timings['baseline'] * 1000:.1f} ms without waiters")
+    for kind in ("legacy", "readiness"):
+        overhead = timings[kind] - timings["baseline"]
+        print(
+            f"{kind:>10}: {timings[kind] * 1000:8.1f} ms, "
+            f"{overhead / updates * 1e6:.2f} us/update waiting overhead"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import math
+
+import numpy as np
+
+from thetagang.allocator import (
+    Allocation,
+    RebalanceInputs,
+    plan_buys,
+    plan_sells,
+    put_write_quantities,
+    target_shares,
+)
+
+
+def _inputs(
+    target_value,
+    price,
+    current,
+    min_shares=None,
+    min_amount=None,
+    min_percent_relative=None,
+):
+    count = len(target_value)
+    return RebalanceInputs.build(
+        symbols=[f"S{index}" for index in range(count)],
+        target_value=target_value,
+        price=price,
+        current=current,
+        min_shares=min_shares or [1] * count,
+        min_amount=min_amount or [0.0] * count,
+        min_percent_relative=min_percent_relative or [math.nan] * count,
+    )
+
+
+def test_target_shares_floors_and_skips_unpriced_symbols():
+    shares = target_shares(
+        np.array([1000.0, 1000.0, 1000.0]), np.array([30.0, math.nan, 0.0])
+    )
+
+    assert shares.tolist() == [33, 0, 0]
+
+
+def test_put_write_quantities_count_short_puts_as_shares():
+    shares, puts = put_write_quantities(
+        np.array([500, 500, 500]),
+        np.array([100, 100, 0]),
+        np.array([2, 0, 0]),
+        np.array([False, False, True]),
+    )
+
+    assert shares.tolist() == [200, 400, 500]
+    assert puts.tolist() == [2, 4, 0]
+
+
+def test_plan_buys_within_budget_buys_each_gap():
+    plan = plan_buys(_inputs([1000.0, 2000.0], [10.0, 20.0], [50, 100]), 10_000)
+
+    assert plan.trades() == [("S0", 50)]
+    assert [status for _, status, *_ in plan] == [
+        Allocation.TRADE,
+        Allocation.AT_TARGET,
+    ]
+
+
+def test_plan_buys_scales_all_buys_to_a_shared_budget():
+    # Each buy fits on its own, together they need $3,000.
+    plan = plan_buys(_inputs([2000.0, 1000.0], [10.0, 10.0], [0, 0]), 1500)
+
+    assert plan.trades() == [("S0", 100), ("S1", 50)]
+
+
+def test_plan_buys_rechecks_thresholds_after_scaling():
+    plan = plan_buys(
+        _inputs(
+            [2000.0, 2000.0],
+            [10.0, 10.0],
+            [0, 0],
+            min_shares=[1, 150],
+        ),
+        2000,
+    )
+
+    assert plan.trades() == [("S0", 100)]
+    assert Allocation(plan.status[1]) == Allocation.INSUFFICIENT_FOR_MIN_SHARES
+    assert plan.quantity[1] == 0
+
+
+def test_plan_buys_applies_thresholds():
+    plan = plan_buys(
+        _inputs(
+            [1000.0, 1000.0, 1000.0, 1000.0],
+            [10.0, 10.0, 10.0, math.nan],
+            [95, 0, 90, 0],
+            min_shares=[1, 200, 1, 1],
+            min_amount=[100.0, 0.0, 0.0, 0.0],
+            min_percent_relative=[math.nan, math.nan, 0.2, math.nan],
+        ),
+        100_000,
+    )
+
+    statuses = [status for _, status, *_ in plan]
+    assert statuses == [
+        Allocation.BELOW_MIN_AMOUNT,
+        Allocation.BELOW_MIN_SHARES,
+        Allocation.BELOW_RELATIVE_THRESHOLD,
+        Allocation.INVALID_PRICE,
+    ]
+    assert plan.quantity.tolist() == [5, 100, 0, 0]
+    assert plan.order_amount[0] == 50.0
+    assert plan.relative_diff[2] == 0.1
+
+
+def test_plan_buys_starts_an_empty_position_with_one_share():
+    plan = plan_buys(_inputs([50.0], [80.0], [0]), 10_000)
+
+    assert plan.trades() == [("S0", 1)]
+
+
+def test_plan_sells_sells_down_to_target_above_thresholds():
+    plan = plan_sells(
+        _inputs(
+            [1000.0, 1000.0, 1000.0],
+            [10.0, 10.0, 10.0],
+            [400, 105, 90],
+            min_amount=[0.0, 100.0, 0.0],
+        )
+    )
+
+    assert plan.trades() == [("S0", 300)]
+    assert [status for _, status, *_ in plan] == [
+        Allocation.TRADE,
+        Allocation.BELOW_MIN_AMOUNT,
+        Allocation.AT_TARGET,
+    ]
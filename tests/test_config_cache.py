@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import pytest
+import tomlkit
+
+import thetagang.config_cache as config_cache
+import thetagang.thetagang as tg
+from thetagang.config import Config
+
+
+@pytest.fixture
+def config_text() -> str:
+    return Path("thetagang.toml").read_text(encoding="utf8")
+
+
+def _config(config_text: str) -> Config:
+    return Config(**tomlkit.parse(config_text).unwrap())
+
+
+def test_cached_config_round_trips_with_resolved_symbol_settings(tmp_path, config_text):
+    config = _config(config_text)
+
+    config_cache.store_cached_config(config_text, config, tmp_path)
+    cached = config_cache.load_cached_config(config_text, tmp_path)
+
+    assert cached is not None
+    assert cached.model_dump() == config.model_dump()
+    assert cached.symbol_settings("SPY", "P") == config.symbol_settings("SPY", "P")
+    assert cached.symbol_settings("VIX", "C") == config.symbol_settings("VIX", "C")
+
+
+def test_cache_misses_on_changed_text_or_version(tmp_path, monkeypatch, config_text):
+    config_cache.store_cached_config(config_text, _config(config_text), tmp_path)
+
+    assert config_cache.load_cached_config(config_text + "\n", tmp_path) is None
+    monkeypatch.setattr(config_cache, "package_version", lambda: "0.0.0-other")
+    assert config_cache.load_cached_config(config_text, tmp_path) is None
+
+
+def test_unreadable_entry_is_a_miss_and_removed(tmp_path, config_text):
+    entry = tmp_path / f"config-{config_cache.cache_key(config_text)}.pickle"
+    entry.write_bytes(b"not a pickle")
+
+    assert config_cache.load_cached_config(config_text, tmp_path) is None
+    assert not entry.exists()
+
+
+def test_store_prunes_old_entries(tmp_path, monkeypatch, config_text):
+    monkeypatch.setattr(config_cache, "MAX_ENTRIES", 2)
+    config = _config(config_text)
+
+    for index in range(4):
+        config_cache.store_cached_config(f"{config_text}#{index}\n", config, tmp_path)
+
+    assert len(list(tmp_path.glob("config-*.pickle"))) == 2
+
+
+def test_load_config_skips_parsing_on_a_hit(tmp_path, monkeypatch, config_text):
+    config_path = tmp_path / "thetagang.toml"
+    config_path.write_text(config_text, encoding="utf8")
+    monkeypatch.setenv("THETAGANG_CACHE_DIR", str(tmp_path / "cache"))
+
+    config, raw_config = tg._load_config(str(config_path))
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("cached config should not be parsed again")
+
+    monkeypatch.setattr(tg, "run_startup_migration", fail)
+    monkeypatch.setattr(tg.tomlkit, "parse", fail)
+    cached, cached_raw = tg._load_config(str(config_path))
+
+    assert cached_raw == raw_config == config_text
+    assert cached.model_dump() == config.model_dump()
+    with pytest.raises(AssertionError):
+        tg._load_config(str(config_path), use_cache=False)
@@ -525,3 +525,25 @@ def test_v2_rejects_transitional_infrastructure_key() -> None:
                 },
             }
         )
+
+
+def test_additional_accounts_share_strategy_config() -> None:
+    raw = _base_config({"strategies": ["wheel"]})
+    raw["runtime"]["additional_accounts"] = [{"number": "DUY", "margin_usage": 0.3}]
+    config = Config(**raw)
+
+    assert [account.number for account in config.accounts] == ["DUX", "DUY"]
+    assert config.for_account(config.runtime.account) is config
+    secondary = config.for_account(config.accounts[1])
+    assert secondary.runtime.account.number == "DUY"
+    assert secondary.runtime.account.margin_usage == 0.3
+    assert secondary.runtime.additional_accounts == []
+    assert secondary.portfolio is config.portfolio
+    assert config.runtime.account.number == "DUX"
+
+
+def test_additional_accounts_reject_duplicates() -> None:
+    raw = _base_config({"strategies": ["wheel"]})
+    raw["runtime"]["additional_accounts"] = [{"number": "DUX", "margin_usage": 0.3}]
+    with pytest.raises(ValueError, match="account numbers must be unique"):
+        Config(**raw)
@@ -3,14 +3,17 @@ from datetime import datetime
 from pathlib import Path
 from types import SimpleNamespace
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 import thetagang.db as db_module
 from thetagang.db import (
+    AccountSnapshot,
     DataStore,
     HistoricalBar,
     OrderIntent,
     OrderRecord,
+    PositionSnapshot,
+    SnapshotLog,
     run_migrations,
     sqlite_db_path,
 )
@@ -253,3 +256,131 @@ def test_get_last_event_payload_ignores_dry_run(tmp_path) -> None:
     payload = live_store.get_last_event_payload("regime_rebalance_state")
 
     assert payload == {"flow_active": False}
+
+
+def test_data_store_scopes_regime_fills_to_account(tmp_path) -> None:
+    db_url = f"sqlite:///{tmp_path / 'state.db'}"
+    config_path = str(tmp_path / "thetagang.toml")
+    first = DataStore(db_url, config_path, dry_run=False, account_number="DU1")
+    second = DataStore(db_url, config_path, dry_run=False, account_number="DU2")
+
+    def fill(exec_id: str, account: str, day: int) -> SimpleNamespace:
+        when = datetime(2024, 1, day, 12, 0, 0)
+        return SimpleNamespace(
+            execution=SimpleNamespace(
+                execId=exec_id,
+                orderRef="tg:regime-rebalance:AAA",
+                acctNumber=account,
+                time=when,
+            ),
+            contract=SimpleNamespace(symbol="AAA"),
+            time=when,
+        )
+
+    first.record_executions([fill("1", "DU1", 5), fill("2", "DU2", 9)])
+
+    def last(data_store: DataStore):
+        return data_store.get_last_regime_rebalance_time(
+            symbols=["AAA"],
+            order_ref_prefix="tg:regime-rebalance",
+            start_time=datetime(2024, 1, 1, 0, 0, 0),
+        )
+
+    assert last(first) == datetime(2024, 1, 5, 12, 0, 0)
+    assert last(second) == datetime(2024, 1, 9, 12, 0, 0)
+
+    first.record_event("regime_rebalance_state", {"account": "DU1"})
+    assert second.get_last_event_payload("regime_rebalance_state") is None
+
+
+def _position(con_id: int, position: float, price: float) -> SimpleNamespace:
+    return SimpleNamespace(
+        contract=SimpleNamespace(conId=con_id, secType="STK", currency="USD"),
+        position=position,
+        averageCost=10.0,
+        marketPrice=price,
+        marketValue=position * price,
+        unrealizedPNL=0.0,
+        realizedPNL=0.0,
+    )
+
+
+def _account(net_liquidation: str) -> dict:
+    return {
+        "NetLiquidation": SimpleNamespace(value=net_liquidation, currency="USD"),
+        "TotalCashValue": SimpleNamespace(value="500", currency="USD"),
+    }
+
+
+def _count(data_store: DataStore, model) -> int:
+    with data_store.session_scope() as session:
+        return session.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+def test_delta_snapshots_store_changes_and_reconstruct_any_run(tmp_path) -> None:
+    db_url = f"sqlite:///{tmp_path / 'state.db'}"
+    config_path = str(tmp_path / "thetagang.toml")
+    runs = []
+    for positions, net_liquidation in (
+        ({"AAA": [_position(1, 100, 10.0)], "BBB": [_position(2, 50, 20.0)]}, "1000"),
+        ({"AAA": [_position(1, 100, 10.0)], "BBB": [_position(2, 50, 20.0)]}, "1000"),
+        ({"AAA": [_position(1, 100, 11.0)]}, "1100"),
+    ):
+        data_store = DataStore(db_url, config_path, dry_run=False)
+        data_store.record_positions_snapshot(positions)
+        data_store.record_account_snapshot(_account(net_liquidation))
+        runs.append(data_store.run_id)
+
+    # A base, nothing, then one changed position and one closed position.
+    assert _count(data_store, PositionSnapshot) == 2 + 0 + 2
+    assert _count(data_store, AccountSnapshot) == 2
+    with data_store.session_scope() as session:
+        assert session.execute(
+            select(SnapshotLog.base).where(SnapshotLog.kind == "positions")
+        ).scalars().all() == [True, False, False]
+
+    def positions(run_id: int) -> dict:
+        return {
+            row["symbol"]: (row["position"], row["market_price"])
+            for row in data_store.get_positions_snapshot(run_id)
+        }
+
+    assert positions(runs[1]) == {"AAA": (100, 10.0), "BBB": (50, 20.0)}
+    assert positions(runs[2]) == {"AAA": (100, 11.0)}
+    assert data_store.get_account_snapshot(runs[1]) == {
+        "NetLiquidation": {"value": "1000", "currency": "USD"},
+        "TotalCashValue": {"value": "500", "currency": "USD"},
+    }
+    assert data_store.get_account_snapshot()["NetLiquidation"]["value"] == "1100"
+
+
+def test_delta_snapshots_write_a_new_base_periodically(tmp_path) -> None:
+    db_url = f"sqlite:///{tmp_path / 'state.db'}"
+    config_path = str(tmp_path / "thetagang.toml")
+    for _ in range(3):
+        data_store = DataStore(
+            db_url, config_path, dry_run=False, snapshot_base_every=2
+        )
+        data_store.record_positions_snapshot({"AAA": [_position(1, 100, 10.0)]})
+
+    with data_store.session_scope() as session:
+        assert session.execute(select(SnapshotLog.base)).scalars().all() == [
+            True,
+            False,
+            True,
+        ]
+    assert _count(data_store, PositionSnapshot) == 2
+    assert len(data_store.get_positions_snapshot()) == 1
+
+
+def test_full_snapshots_write_every_row(tmp_path) -> None:
+    db_url = f"sqlite:///{tmp_path / 'state.db'}"
+    config_path = str(tmp_path / "thetagang.toml")
+    for _ in range(2):
+        data_store = DataStore(db_url, config_path, dry_run=False, snapshot_mode="full")
+        data_store.record_positions_snapshot({"AAA": [_position(1, 100, 10.0)]})
+        data_store.record_account_snapshot(_account("1000"))
+
+    assert _count(data_store, PositionSnapshot) == 2
+    assert _count(data_store, AccountSnapshot) == 2
+    assert data_store.get_positions_snapshot()[0]["position"] == 100
@@ -0,0 +1,115 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select
+
+from thetagang.db import DataStore, ExecutionRecord
+from thetagang.execution_sync import SYNC_OVERLAP, ExecutionSync
+
+
+def _fill(exec_id: str, when: datetime) -> SimpleNamespace:
+    return SimpleNamespace(
+        execution=SimpleNamespace(
+            execId=exec_id,
+            orderRef="tg:regime-rebalance:AAA",
+            acctNumber="DU1",
+            time=when,
+        ),
+        contract=SimpleNamespace(symbol="AAA"),
+        time=when,
+    )
+
+
+def _data_store(tmp_path) -> DataStore:
+    return DataStore(
+        f"sqlite:///{tmp_path / 'state.db'}",
+        str(tmp_path / "thetagang.toml"),
+        dry_run=False,
+        account_number="DU1",
+    )
+
+
+@pytest.mark.asyncio
+async def test_execution_sync_advances_high_water_mark(tmp_path, mocker) -> None:
+    data_store = _data_store(tmp_path)
+    ibkr = SimpleNamespace(request_executions=mocker.AsyncMock())
+    sync = ExecutionSync(ibkr, data_store, "DU1")
+    lookback_start = datetime(2024, 1, 1)
+
+    ibkr.request_executions.return_value = [
+        _fill("1", datetime(2024, 1, 5, 12)),
+        _fill("2", datetime(2024, 1, 7, 12)),
+    ]
+    assert await sync.sync(lookback_start) == 2
+    first_filter = ibkr.request_executions.await_args.args[0]
+    assert first_filter.acctCode == "DU1"
+    assert first_filter.time == "20240101-00:00:00"
+    assert data_store.get_execution_high_water_mark("DU1") == datetime(2024, 1, 7, 12)
+
+    # The next sync starts just before the newest stored fill and the
+    # overlapping fill is not stored twice.
+    ibkr.request_executions.return_value = [
+        _fill("2", datetime(2024, 1, 7, 12)),
+        _fill("3", datetime(2024, 1, 8, 9)),
+    ]
+    assert await sync.sync(lookback_start) == 1
+    second_filter = ibkr.request_executions.await_args.args[0]
+    expected_start = datetime(2024, 1, 7, 12) - SYNC_OVERLAP
+    assert second_filter.time == expected_start.strftime("%Y%m%d-%H:%M:%S")
+    assert data_store.get_execution_high_water_mark("DU1") == datetime(2024, 1, 8, 9)
+
+    with data_store.session_scope() as session:
+        count = session.execute(select(func.count(ExecutionRecord.id))).scalar_one()
+    assert count == 3
+
+
+@pytest.mark.asyncio
+async def test_execution_sync_never_moves_high_water_mark_back(
+    tmp_path, mocker
+) -> None:
+    data_store = _data_store(tmp_path)
+    ibkr = SimpleNamespace(request_executions=mocker.AsyncMock())
+    sync = ExecutionSync(ibkr, data_store, "DU1")
+
+    ibkr.request_executions.return_value = [_fill("1", datetime(2024, 1, 7, 12))]
+    await sync.sync(datetime(2024, 1, 1))
+    ibkr.request_executions.return_value = [_fill("0", datetime(2024, 1, 7, 11, 30))]
+    await sync.sync(datetime(2024, 1, 1))
+    ibkr.request_executions.return_value = []
+    await sync.sync(datetime(2024, 1, 1))
+
+    assert data_store.get_execution_high_water_mark("DU1") == datetime(2024, 1, 7, 12)
+    # A lookback that starts after the high-water mark wins.
+    assert sync.sync_start(datetime(2024, 2, 1)) == datetime(2024, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_execution_sync_keeps_high_water_mark_when_insert_fails(
+    tmp_path, mocker
+) -> None:
+    data_store = _data_store(tmp_path)
+    ibkr = SimpleNamespace(request_executions=mocker.AsyncMock())
+    sync = ExecutionSync(ibkr, data_store, "DU1")
+    lookback_start = datetime(2024, 1, 1)
+
+    ibkr.request_executions.return_value = [_fill("1", datetime(2024, 1, 5, 12))]
+    await sync.sync(lookback_start)
+    with data_store.engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TRIGGER fail_insert BEFORE INSERT ON executions "
+            "BEGIN SELECT RAISE(ABORT, 'disk I/O error'); END"
+        )
+
+    ibkr.request_executions.return_value = [_fill("2", datetime(2024, 1, 9, 12))]
+    assert await sync.sync(lookback_start) == 0
+    assert data_store.get_execution_high_water_mark("DU1") == datetime(2024, 1, 5, 12)
+
+    # Once writes work again the missed fill is requested and stored.
+    with data_store.engine.begin() as connection:
+        connection.exec_driver_sql("DROP TRIGGER fail_insert")
+    assert await sync.sync(lookback_start) == 1
+    retry_filter = ibkr.request_executions.await_args.args[0]
+    expected_start = datetime(2024, 1, 5, 12) - SYNC_OVERLAP
+    assert retry_filter.time == expected_start.strftime("%Y%m%d-%H:%M:%S")
+    assert data_store.get_execution_high_water_mark("DU1") == datetime(2024, 1, 9, 12)
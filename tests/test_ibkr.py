@@ -2,6 +2,7 @@ import asyncio
 from types import SimpleNamespace
 
 import pytest
+from eventkit import Event
 from ib_async import (
     IB,
     AccountValue,
@@ -15,12 +16,14 @@ from ib_async import (
 )
 
 from thetagang import log
+from thetagang.config_models import MarketDataModeEnum
 from thetagang.ibkr import (
     IBKR,
     IBKRRequestTimeout,
     RequiredFieldValidationError,
     TickerField,
 )
+from thetagang.market_data import SharedMarketData
 
 # Mark all tests in this module as asyncio
 pytestmark = pytest.mark.asyncio
@@ -70,15 +73,11 @@ def mock_trade(mocker):
 
 
 async def test_get_ticker_for_contract_success(ibkr, mock_ib, mock_ticker, mocker):
-    """Test get_ticker_for_contract when all waits succeed."""
+    """Test get_ticker_for_contract when all fields arrive."""
     mocker.patch.object(
         ibkr, "__market_data_streaming_handler__", return_value=mock_ticker
     )
-    # Mock the internal wait methods to return True (success)
-    mocker.patch.object(
-        ibkr, "__ticker_wait_for_condition__", return_value=asyncio.Future()
-    )
-    ibkr.__ticker_wait_for_condition__.return_value.set_result(True)
+    mocker.patch("thetagang.ibkr.wait_for_fields", return_value=([], []))
 
     contract = Stock("TEST", "SMART", "USD")
     result = await ibkr.get_ticker_for_contract(
@@ -88,42 +87,51 @@ async def test_get_ticker_for_contract_success(ibkr, mock_ib, mock_ticker, mocke
     )
 
     assert result == mock_ticker
-    # Check that the wait was attempted (indirectly, via the handler logic patch)
     ibkr.__market_data_streaming_handler__.assert_awaited_once()
 
 
-async def test_get_ticker_for_contract_required_timeout(
-    ibkr, mock_ib, mock_ticker, mocker
+async def test_shared_tickers_reuse_streaming_lines_but_requote_snapshots(
+    mock_ib, mock_ticker, mocker
 ):
-    """Test get_ticker_for_contract when a required field wait times out."""
-    # Mock ib methods called by __market_data_streaming_handler__
-    mock_ib.qualifyContractsAsync = mocker.AsyncMock()
-    mock_ib.reqMktData = mocker.Mock(return_value=mock_ticker)
+    """Only streaming tickers keep updating, so only they outlive a request."""
+    ibkr = IBKR(
+        ib=mock_ib,
+        api_response_wait_time=1,
+        default_order_exchange="SMART",
+        market_data=SharedMarketData(),
+    )
+    mocker.patch.object(
+        ibkr, "__market_data_streaming_handler__", return_value=mock_ticker
+    )
+    contract = Stock("TEST", "SMART", "USD")
+    contract.conId = 1
 
-    # Mock __ticker_field_handler__ to return appropriate async functions
-    async def succeed_wait(ticker):
-        return True
+    for _ in range(2):
+        await ibkr.get_ticker_for_contract(contract)
+        await ibkr.get_ticker_for_contract(contract, mode=MarketDataModeEnum.snapshot)
 
-    async def fail_wait(ticker):
-        return False
+    modes = [
+        call.args[3] for call in ibkr.__market_data_streaming_handler__.await_args_list
+    ]
+    assert modes == [
+        MarketDataModeEnum.streaming,
+        MarketDataModeEnum.snapshot,
+        MarketDataModeEnum.snapshot,
+    ]
 
-    def mock_handler_logic(field):
-        if field == TickerField.MARKET_PRICE:  # Required field
-            return fail_wait
-        elif field == TickerField.MIDPOINT:  # Optional field
-            return succeed_wait
-        else:
-            pytest.fail(f"Unexpected field: {field}")
 
-    mocker.patch.object(
-        ibkr, "__ticker_field_handler__", side_effect=mock_handler_logic
+async def test_get_ticker_for_contract_required_timeout(
+    ibkr, mock_ib, mock_ticker, mocker
+):
+    """Test get_ticker_for_contract when a required field wait times out."""
+    mock_ib.reqMktData = mocker.Mock(return_value=mock_ticker)
+    wait = mocker.patch(
+        "thetagang.ibkr.wait_for_fields",
+        return_value=([TickerField.MARKET_PRICE], []),
     )
 
     contract = Stock("TEST", "SMART", "USD")
     contract.conId = 1
-    mocker.patch.object(
-        ibkr, "qualify_contracts", new=mocker.AsyncMock(return_value=[contract])
-    )
     with pytest.raises(RequiredFieldValidationError) as excinfo:
         await ibkr.get_ticker_for_contract(
             contract,
@@ -133,43 +141,23 @@ async def test_get_ticker_for_contract_required_timeout(
 
     assert "Required fields timed out" in str(excinfo.value)
     assert "MARKET_PRICE" in str(excinfo.value)
-    # Ensure the handler was called for both fields
-    assert ibkr.__ticker_field_handler__.call_count == 2
+    wait.assert_awaited_once_with(
+        mock_ticker, [TickerField.MARKET_PRICE], [TickerField.MIDPOINT], 1
+    )
 
 
 async def test_get_ticker_for_contract_optional_timeout(
     ibkr, mock_ib, mock_ticker, mocker
 ):
     """Test get_ticker_for_contract when an optional field wait times out."""
-    # Mock ib methods called by __market_data_streaming_handler__
-    mock_ib.qualifyContractsAsync = mocker.AsyncMock()
     mock_ib.reqMktData = mocker.Mock(return_value=mock_ticker)
     mock_log_warning = mocker.patch.object(log, "warning")
-
-    # Mock __ticker_field_handler__ to return appropriate async functions
-    async def succeed_wait(ticker):
-        return True
-
-    async def fail_wait(ticker):
-        return False
-
-    def mock_handler_logic(field):
-        if field == TickerField.MARKET_PRICE:  # Required field
-            return succeed_wait
-        elif field == TickerField.MIDPOINT:  # Optional field
-            return fail_wait
-        else:
-            pytest.fail(f"Unexpected field: {field}")
-
-    mocker.patch.object(
-        ibkr, "__ticker_field_handler__", side_effect=mock_handler_logic
+    mocker.patch(
+        "thetagang.ibkr.wait_for_fields", return_value=([], [TickerField.MIDPOINT])
     )
 
     contract = Stock("TEST", "SMART", "USD")
     contract.conId = 1
-    mocker.patch.object(
-        ibkr, "qualify_contracts", new=mocker.AsyncMock(return_value=[contract])
-    )
     result = await ibkr.get_ticker_for_contract(
         contract,
         required_fields=[TickerField.MARKET_PRICE],
@@ -177,8 +165,6 @@ async def test_get_ticker_for_contract_optional_timeout(
     )
 
     assert result == mock_ticker
-    # Ensure the handler was called for both fields
-    assert ibkr.__ticker_field_handler__.call_count == 2
     mock_log_warning.assert_called_once()
     assert "Optional fields timed out" in mock_log_warning.call_args[0][0]
     assert "MIDPOINT" in mock_log_warning.call_args[0][0]
@@ -377,6 +363,39 @@ async def test_refresh_positions_uses_timeout_wrapper(ibkr, mocker):
     assert await_args.args[1] == "positions snapshot"
 
 
+async def test_wait_for_portfolio_items_waits_on_update_events(ibkr, mock_ib):
+    """Missing portfolio items are awaited on updatePortfolioEvent."""
+    mock_ib.updatePortfolioEvent = Event("updatePortfolioEvent")
+    held = SimpleNamespace(account="ACC123", contract=SimpleNamespace(conId=1))
+    arriving = SimpleNamespace(account="ACC123", contract=SimpleNamespace(conId=2))
+    portfolio = [held]
+    mock_ib.portfolio.side_effect = lambda account: list(portfolio)
+
+    def arrive():
+        portfolio.append(arriving)
+        mock_ib.updatePortfolioEvent.emit(
+            SimpleNamespace(account="OTHER", contract=SimpleNamespace(conId=2))
+        )
+        mock_ib.updatePortfolioEvent.emit(arriving)
+
+    asyncio.get_running_loop().call_soon(arrive)
+    result = await ibkr.wait_for_portfolio_items("ACC123", [1, 2])
+
+    assert result == [held, arriving]
+    assert len(mock_ib.updatePortfolioEvent) == 0
+
+
+async def test_wait_for_portfolio_items_times_out(ibkr, mock_ib):
+    """A portfolio item that never arrives raises IBKRRequestTimeout."""
+    mock_ib.updatePortfolioEvent = Event("updatePortfolioEvent")
+    mock_ib.portfolio.return_value = []
+    ibkr.api_response_wait_time = 0.01
+
+    with pytest.raises(IBKRRequestTimeout, match="portfolio updates"):
+        await ibkr.wait_for_portfolio_items("ACC123", [1])
+    assert len(mock_ib.updatePortfolioEvent) == 0
+
+
 async def test_refresh_account_updates_propagates_timeout(ibkr, mocker):
     """refresh_account_updates re-raises IBKRRequestTimeout."""
     ibkr.ib.reqAccountUpdatesAsync = mocker.Mock(return_value=object())
@@ -510,3 +529,69 @@ async def test_await_with_timeout_wraps_timeout_error(ibkr, mocker):
         await ibkr._await_with_timeout(dummy(), "positions snapshot")
 
     assert "positions snapshot" in str(excinfo.value)
+
+
+async def test_attached_shards_split_market_data_by_symbol(ibkr, mock_ib, mocker):
+    shard = mocker.Mock(spec=IB)
+    ibkr.attach_shards([shard])
+    symbols = ["AAA", "BBB", "CCC", "DDD", "EEE", "FFF"]
+    routes = {symbol: ibkr._ib_for(Stock(symbol, "SMART", "USD")) for symbol in symbols}
+
+    assert set(routes.values()) == {mock_ib, shard}
+    assert all(
+        ibkr._ib_for(Stock(symbol, "SMART", "USD")) is routes[symbol]
+        for symbol in symbols
+    )
+
+    ibkr.set_market_data_type(3)
+    mock_ib.reqMarketDataType.assert_called_once_with(3)
+    shard.reqMarketDataType.assert_called_once_with(3)
+
+    contract = Stock("AAA", "SMART", "USD")
+    contract.conId = 1
+    routes["AAA"].reqMktData.return_value = mocker.Mock(spec=Ticker)
+    handler = mocker.AsyncMock()
+    await ibkr.__market_data_streaming_handler__(contract, "", handler)
+    routes["AAA"].reqMktData.assert_called_once_with(contract, genericTickList="")
+    other = shard if routes["AAA"] is mock_ib else mock_ib
+    other.reqMktData.assert_not_called()
+
+
+async def test_snapshot_mode_requests_one_off_snapshot(ibkr, mock_ib, mocker):
+    contract = Stock("AAA", "SMART", "USD")
+    contract.conId = 1
+    mock_ib.reqMktData = mocker.Mock(return_value=mocker.Mock(spec=Ticker))
+    mock_ib.cancelMktData = mocker.Mock()
+    handler = mocker.AsyncMock()
+
+    await ibkr.__market_data_streaming_handler__(
+        contract, "", handler, MarketDataModeEnum.snapshot
+    )
+    mock_ib.reqMktData.assert_called_once_with(
+        contract, snapshot=True, regulatorySnapshot=False
+    )
+
+    mock_ib.reqMktData.reset_mock()
+    await ibkr.__market_data_streaming_handler__(
+        contract, "", handler, MarketDataModeEnum.regulatory_snapshot
+    )
+    mock_ib.reqMktData.assert_called_once_with(
+        contract, snapshot=True, regulatorySnapshot=True
+    )
+    mock_ib.cancelMktData.assert_not_called()
+
+
+async def test_snapshot_mode_with_generic_ticks_cancels_line(ibkr, mock_ib, mocker):
+    contract = Stock("AAA", "SMART", "USD")
+    contract.conId = 1
+    mock_ib.reqMktData = mocker.Mock(return_value=mocker.Mock(spec=Ticker))
+    mock_ib.cancelMktData = mocker.Mock()
+    handler = mocker.AsyncMock(side_effect=RequiredFieldValidationError("late"))
+
+    with pytest.raises(RequiredFieldValidationError):
+        await ibkr.__market_data_streaming_handler__(
+            contract, "101", handler, MarketDataModeEnum.snapshot
+        )
+
+    mock_ib.reqMktData.assert_called_once_with(contract, genericTickList="101")
+    mock_ib.cancelMktData.assert_called_once_with(contract)
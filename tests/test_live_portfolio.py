@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+
+import pytest
+from eventkit import Event
+from ib_async import IB
+
+from thetagang.live_portfolio import LivePortfolio
+from thetagang.portfolio_manager import PortfolioManager
+
+
+def _item(con_id, position, account="DU1", symbol="AAA"):
+    return SimpleNamespace(
+        account=account,
+        contract=SimpleNamespace(conId=con_id, symbol=symbol, secType="OPT"),
+        position=position,
+    )
+
+
+def _fill(con_id, account="DU1", sec_type="OPT"):
+    return SimpleNamespace(
+        contract=SimpleNamespace(conId=con_id, secType=sec_type),
+        execution=SimpleNamespace(acctNumber=account),
+    )
+
+
+@pytest.fixture
+def mock_ib(mocker):
+    mock = mocker.Mock(spec=IB)
+    mock.orderStatusEvent = mocker.Mock()
+    mock.orderStatusEvent.__iadd__ = mocker.Mock(return_value=None)
+    mock.updatePortfolioEvent = Event("updatePortfolioEvent")
+    mock.positionEvent = Event("positionEvent")
+    mock.execDetailsEvent = Event("execDetailsEvent")
+    mock.isConnected.return_value = True
+    return mock
+
+
+@pytest.fixture
+def live(mock_ib):
+    live = LivePortfolio(mock_ib, "DU1")
+    live.attach()
+    live.seed([_item(1, -2), _item(2, 0), _item(3, 5, account="DU2")])
+    return live
+
+
+def test_seed_keeps_open_positions_of_the_account(live):
+    assert [item.contract.conId for item in live.items()] == [1]
+    assert not live.has_gap()
+
+
+def test_portfolio_updates_bump_version(live, mock_ib):
+    version = live.version
+    mock_ib.updatePortfolioEvent.emit(_item(4, -1))
+    mock_ib.updatePortfolioEvent.emit(_item(9, -1, account="DU2"))
+    mock_ib.updatePortfolioEvent.emit(_item(1, 0))
+
+    assert live.version == version + 2
+    assert [item.contract.conId for item in live.items()] == [4]
+    assert not live.has_gap()
+
+
+def test_position_change_is_a_gap_until_the_portfolio_confirms(live, mock_ib):
+    mock_ib.positionEvent.emit(_item(1, -1))
+    assert live.has_gap()
+
+    mock_ib.updatePortfolioEvent.emit(_item(1, -2))
+    assert live.has_gap()
+
+    mock_ib.updatePortfolioEvent.emit(_item(1, -1))
+    assert not live.has_gap()
+
+
+def test_fills_are_a_gap_until_the_next_portfolio_update(live, mock_ib):
+    mock_ib.execDetailsEvent.emit(None, _fill(0, sec_type="BAG"))
+    mock_ib.execDetailsEvent.emit(None, _fill(7, account="DU2"))
+    assert not live.has_gap()
+
+    mock_ib.execDetailsEvent.emit(None, _fill(7))
+    assert live.has_gap()
+
+    mock_ib.updatePortfolioEvent.emit(_item(7, 1))
+    assert not live.has_gap()
+
+
+def test_unseeded_detached_or_disconnected_model_has_a_gap(mock_ib):
+    live = LivePortfolio(mock_ib, "DU1")
+    live.attach()
+    assert live.has_gap()
+
+    live.seed([])
+    mock_ib.isConnected.return_value = False
+    assert live.has_gap()
+
+    mock_ib.isConnected.return_value = True
+    live.detach()
+    assert live.has_gap()
+    assert len(mock_ib.updatePortfolioEvent) == 0
+
+
+@pytest.mark.asyncio
+async def test_current_portfolio_positions_reads_the_live_model(mock_ib, mocker):
+    config = mocker.Mock()
+    config.runtime.account.number = "DU1"
+    config.runtime.ib_async.api_response_wait_time = 1
+    config.runtime.orders.exchange = "SMART"
+    config.portfolio.symbols = {"AAA": mocker.Mock()}
+    pm = PortfolioManager(config, mock_ib, mocker.Mock(), dry_run=True)
+    pm.get_portfolio_positions = mocker.AsyncMock(return_value={"AAA": []})
+
+    assert await pm.current_portfolio_positions({}) == {"AAA": []}
+    pm.get_portfolio_positions.assert_awaited_once()
+
+    pm.live_portfolio.attach()
+    pm._seed_live_portfolio([_item(1, -2)])
+    before = {"AAA": ["unchanged"]}
+    assert await pm.current_portfolio_positions(before) is before
+
+    held = _item(1, -3)
+    mock_ib.updatePortfolioEvent.emit(held)
+    assert await pm.current_portfolio_positions(before) == {"AAA": [held]}
+    pm.get_portfolio_positions.assert_awaited_once()
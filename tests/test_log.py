@@ -0,0 +1,80 @@
+import io
+import json
+
+import pytest
+from rich.table import Table
+
+from thetagang import log
+
+
+@pytest.fixture
+def headless_stream():
+    stream = io.StringIO()
+    log.enable_headless(stream=stream)
+    yield stream
+    log.disable_headless()
+
+
+def _records(stream: io.StringIO) -> list[dict]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_headless_logs_json_lines(headless_stream) -> None:
+    log.info("[green]AAA[/green]: ready")
+    log.notice("placing order")
+    log.warning("[/bold] stray closing tag")
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        log.error("request failed")
+    log.disable_headless()
+
+    records = _records(headless_stream)
+    assert [(r["level"], r["message"]) for r in records] == [
+        ("info", "AAA: ready"),
+        ("notice", "placing order"),
+        ("warning", "[/bold] stray closing tag"),
+        ("error", "request failed"),
+    ]
+    assert "RuntimeError: boom" in records[-1]["exception"]
+    assert not log.is_headless()
+
+
+@pytest.mark.asyncio
+async def test_headless_skips_progress_and_tables(headless_stream, mocker) -> None:
+    progress = mocker.patch("thetagang.log.Progress")
+
+    async def value(x: int) -> int:
+        return x
+
+    assert sorted(await log.track_async([value(1), value(2)], "loading")) == [1, 2]
+    assert list(log.track(iter([1, 2, 3]), "loading", total=3)) == [1, 2, 3]
+    progress.assert_not_called()
+
+    table = log.table(title="Summary")
+    assert isinstance(table, log.DeferredTable)
+    table.add_column("Symbol")
+    table.add_row("AAA")
+    build = mocker.spy(table, "build")
+    log.print(table)
+    log.disable_headless()
+
+    build.assert_not_called()
+    assert headless_stream.getvalue() == ""
+
+
+def test_headless_renders_tables_to_table_log(tmp_path) -> None:
+    table_log = tmp_path / "tables.log"
+    log.enable_headless(stream=io.StringIO(), tables_path=str(table_log))
+    table = log.table(title="Summary")
+    table.add_column("Symbol")
+    table.add_row("AAA")
+    table.add_section()
+    table.add_row("BBB")
+    log.print(table)
+    log.disable_headless()
+
+    rendered = table_log.read_text(encoding="utf8")
+    assert "Summary" in rendered
+    assert "AAA" in rendered and "BBB" in rendered
+    assert type(log.table()) is Table
@@ -92,3 +92,43 @@ def test_cli_handles_unknown_schema_without_traceback(tmp_path):
     assert result.exit_code != 0
     assert "Unable to detect config schema. Expected v1 or v2." in result.output
     assert "Traceback" not in result.output
+
+
+def test_cli_headless_flag_enables_json_logging(monkeypatch, tmp_path):
+    config_path = tmp_path / "thetagang.toml"
+    config_path.write_text("x=1\n", encoding="utf8")
+    seen = {}
+
+    def fake_start(config, without_ibc, dry_run, **kwargs):
+        from thetagang import log
+
+        seen["headless"] = log.is_headless()
+
+    monkeypatch.setattr("thetagang.thetagang.start", fake_start)
+
+    result = CliRunner().invoke(cli, ["--config", str(config_path), "--headless"])
+
+    from thetagang import log
+
+    assert result.exit_code == 0
+    assert seen["headless"] is True
+    assert not log.is_headless()
+
+
+def test_cli_warm_passes_config_and_ibc_flag(monkeypatch, tmp_path):
+    config_path = tmp_path / "thetagang.toml"
+    config_path.write_text("x=1\n", encoding="utf8")
+    captured = {}
+
+    def fake_start_warm(config, without_ibc):
+        captured["config"] = config
+        captured["without_ibc"] = without_ibc
+
+    monkeypatch.setattr("thetagang.thetagang.start_warm", fake_start_warm)
+
+    result = CliRunner().invoke(
+        cli, ["--config", str(config_path), "--without-ibc", "warm"]
+    )
+
+    assert result.exit_code == 0
+    assert captured == {"config": str(config_path), "without_ibc": True}
@@ -0,0 +1,155 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from ib_async import IB, BarData, BarDataList, Option, OptionChain, Stock
+from sqlalchemy import select
+
+from thetagang import market_cache
+from thetagang.db import DataStore, MarketDataCacheEntry, utcnow
+from thetagang.ibkr import IBKR
+
+
+@pytest.fixture
+def data_store(tmp_path):
+    return DataStore(
+        f"sqlite:///{tmp_path / 'state.db'}",
+        str(tmp_path / "thetagang.toml"),
+        dry_run=False,
+        config_text="test",
+    )
+
+
+@pytest.fixture
+def mock_ib(mocker):
+    mock = mocker.Mock(spec=IB)
+    mock.orderStatusEvent = mocker.Mock()
+    mock.orderStatusEvent.__iadd__ = mocker.Mock(return_value=None)
+    return mock
+
+
+def _bars(start: date, closes):
+    bars = BarDataList()
+    day = start
+    for close in closes:
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        bars.append(BarData(date=day, close=close))
+        day += timedelta(days=1)
+    return bars
+
+
+def test_duration_days():
+    assert market_cache.duration_days("30 D") == 30
+    assert market_cache.duration_days("2 W") == 14
+    assert market_cache.duration_days("1 Y") == 366
+    assert market_cache.duration_days("3600 S") is None
+
+
+def test_session_expiry_is_next_utc_midnight():
+    assert market_cache.session_expiry(datetime(2024, 3, 4, 12, 30)) == datetime(
+        2024, 3, 5
+    )
+
+
+def test_contract_payload_round_trip():
+    contract = Option("AAPL", "20240419", 150.0, "P", "SMART", conId=42)
+    restored = market_cache.contract_from_payload(
+        market_cache.contract_to_payload(contract)
+    )
+    assert isinstance(restored, Option)
+    assert restored == contract
+
+
+def test_covers_rejects_gaps_and_short_history():
+    bars = _bars(date(2024, 3, 4), range(10))
+    assert market_cache.covers(bars, date(2024, 3, 2))
+    assert not market_cache.covers(bars, date(2024, 2, 20))
+    gapped = bars[:3] + bars[-2:]
+    assert not market_cache.covers(gapped, date(2024, 3, 4))
+
+
+def test_splice_history_prefers_fresh_tail():
+    stored = _bars(date(2024, 3, 4), [1.0, 2.0, 3.0, 4.0, 5.0])
+    fresh = _bars(date(2024, 3, 7), [40.0, 50.0, 60.0])
+    spliced = market_cache.splice_history(stored, fresh)
+    assert spliced is not None
+    assert [bar.close for bar in spliced] == [1.0, 2.0, 3.0, 40.0, 50.0, 60.0]
+
+    assert market_cache.splice_history(stored[:2], fresh) is None
+
+
+def test_cached_market_data_expires(data_store):
+    data_store.save_cached_market_data(
+        "chains", {"a": [1], "b": [2]}, utcnow() + timedelta(hours=1)
+    )
+    data_store.save_cached_market_data("chains", {"b": [3]}, utcnow())
+    assert data_store.get_cached_market_data("chains", ["a", "b", "c"]) == {"a": [1]}
+
+
+def test_saving_cached_market_data_drops_expired_entries(data_store):
+    data_store.save_cached_market_data(
+        "contracts", {"old": [1]}, utcnow() - timedelta(days=1)
+    )
+    data_store.save_cached_market_data(
+        "chains", {"new": [2]}, utcnow() + timedelta(hours=1)
+    )
+
+    with data_store.session_scope() as session:
+        keys = session.execute(select(MarketDataCacheEntry.key)).scalars().all()
+    assert keys == ["new"]
+
+
+@pytest.mark.asyncio
+async def test_qualify_contracts_reuses_stored_qualifications(
+    data_store, mock_ib, mocker
+):
+    def qualify(*contracts):
+        for contract in contracts:
+            contract.conId = 7
+            contract.primaryExchange = "NASDAQ"
+        return list(contracts)
+
+    mock_ib.qualifyContractsAsync = mocker.AsyncMock(side_effect=qualify)
+    ibkr = IBKR(mock_ib, 1, "SMART", data_store=data_store)
+
+    first = await ibkr.qualify_contracts(Stock("AAPL", "SMART", "USD"))
+    stock = Stock("AAPL", "SMART", "USD")
+    second = await ibkr.qualify_contracts(stock)
+
+    mock_ib.qualifyContractsAsync.assert_awaited_once()
+    assert second == first
+    assert second[0] is stock
+    assert stock.conId == 7
+
+
+@pytest.mark.asyncio
+async def test_get_chains_reuses_stored_chains(data_store, mock_ib, mocker):
+    chain = OptionChain("SMART", 7, "AAPL", "100", ["20240419"], [150.0, 155.0])
+    mock_ib.reqSecDefOptParamsAsync = mocker.AsyncMock(return_value=[chain])
+    ibkr = IBKR(mock_ib, 1, "SMART", data_store=data_store)
+    underlying = Stock("AAPL", "SMART", "USD", conId=7)
+
+    assert await ibkr.get_chains_for_contract(underlying) == [chain]
+    assert await ibkr.get_chains_for_contract(underlying) == [chain]
+    mock_ib.reqSecDefOptParamsAsync.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_request_historical_data_splices_stored_bars(data_store, mock_ib, mocker):
+    today = date.today()
+    history = _bars(today - timedelta(days=27), [float(i) for i in range(20)])
+    tail = BarDataList(
+        [BarData(date=bar.date, close=bar.close + 100) for bar in history[-3:]]
+    )
+    mock_ib.reqHistoricalDataAsync = mocker.AsyncMock(side_effect=[history, tail])
+    ibkr = IBKR(mock_ib, 1, "SMART", data_store=data_store)
+    stock = Stock("AAPL", "SMART", "USD", conId=7)
+
+    assert await ibkr.request_historical_data(stock, "30 D") == history
+    bars = await ibkr.request_historical_data(stock, "30 D")
+
+    durations = [call.args[2] for call in mock_ib.reqHistoricalDataAsync.call_args_list]
+    assert durations == ["30 D", f"{market_cache.HISTORY_TAIL_DAYS} D"]
+    assert [bar.close for bar in bars] == [bar.close for bar in history[:-3]] + [
+        bar.close for bar in tail
+    ]
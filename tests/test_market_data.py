@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from thetagang.market_data import SharedMarketData
+
+
+def test_shared_market_data_coalesces_concurrent_fetches() -> None:
+    market_data = SharedMarketData()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return "chain"
+
+    async def run():
+        return await asyncio.gather(
+            *[market_data.get_or_fetch("chains", "AAA", fetch) for _ in range(3)]
+        )
+
+    assert asyncio.run(run()) == ["chain", "chain", "chain"]
+    assert len(calls) == 1
+    assert (market_data.hits, market_data.misses) == (2, 1)
+
+
+def test_shared_market_data_does_not_cache_failures() -> None:
+    market_data = SharedMarketData()
+    attempts = []
+
+    async def fetch():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("pacing violation")
+        return 42
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await market_data.get_or_fetch("bars", "AAA", fetch)
+        return await market_data.get_or_fetch("bars", "AAA", fetch)
+
+    assert asyncio.run(run()) == 42
+    assert len(attempts) == 2
+    assert len(market_data) == 1
+
+
+def test_shared_market_data_forgets_unkept_results() -> None:
+    market_data = SharedMarketData()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return "snapshot"
+
+    async def run():
+        shared = await asyncio.gather(
+            *[
+                market_data.get_or_fetch("ticker", 1, fetch, keep=False)
+                for _ in range(2)
+            ]
+        )
+        later = await market_data.get_or_fetch("ticker", 1, fetch, keep=False)
+        return shared, later
+
+    assert asyncio.run(run()) == (["snapshot", "snapshot"], "snapshot")
+    assert len(calls) == 2
+    assert len(market_data) == 0
@@ -2,7 +2,8 @@ import asyncio
 from types import SimpleNamespace
 
 import pytest
-from ib_async import IB, Stock, Ticker
+from eventkit import Event
+from ib_async import IB, LimitOrder, OrderStatus, Stock, Ticker, Trade
 
 from thetagang.ibkr import IBKRRequestTimeout
 from thetagang.portfolio_manager import PortfolioManager
@@ -14,6 +15,9 @@ def mock_ib(mocker):
     mock = mocker.Mock(spec=IB)
     mock.orderStatusEvent = mocker.Mock()
     mock.orderStatusEvent.__iadd__ = mocker.Mock(return_value=None)
+    mock.updatePortfolioEvent = Event("updatePortfolioEvent")
+    mock.positionEvent = Event("positionEvent")
+    mock.execDetailsEvent = Event("execDetailsEvent")
     return mock
 
 
@@ -152,6 +156,8 @@ class TestPortfolioManager:
         )
 
         pm.options_trading_enabled = mocker.Mock(return_value=False)
+        pm.load_startup_snapshot = mocker.AsyncMock()
+        pm.report_portfolio_risk = mocker.Mock()
         pm.initialize_account = mocker.Mock()
         pm.summarize_account = mocker.AsyncMock(return_value=({}, {}))
         pm.get_portfolio_positions = mocker.AsyncMock(return_value={})
@@ -188,6 +194,8 @@ class TestPortfolioManager:
         )
 
         pm.options_trading_enabled = mocker.Mock(return_value=True)
+        pm.load_startup_snapshot = mocker.AsyncMock()
+        pm.report_portfolio_risk = mocker.Mock()
         pm.initialize_account = mocker.Mock()
         pm.summarize_account = mocker.AsyncMock(return_value=({}, {}))
         pm.get_portfolio_positions = mocker.AsyncMock(return_value={})
@@ -244,6 +252,8 @@ class TestPortfolioManager:
             run_stage_order=["equity_buy_rebalance"],
         )
 
+        pm.load_startup_snapshot = mocker.AsyncMock()
+        pm.report_portfolio_risk = mocker.Mock()
         pm.initialize_account = mocker.Mock()
         pm.summarize_account = mocker.AsyncMock(return_value=({}, {}))
         pm.get_portfolio_positions = mocker.AsyncMock(return_value={})
@@ -280,6 +290,8 @@ class TestPortfolioManager:
             run_stage_order=["equity_buy_rebalance"],
         )
 
+        pm.load_startup_snapshot = mocker.AsyncMock()
+        pm.report_portfolio_risk = mocker.Mock()
         pm.initialize_account = mocker.Mock()
         pm.summarize_account = mocker.AsyncMock(return_value=({}, {}))
         pm.get_portfolio_positions = mocker.AsyncMock(return_value={})
@@ -622,6 +634,117 @@ class TestPortfolioManager:
         assert portfolio_manager.ibkr.refresh_positions.await_count == 3
         sleep_mock.assert_awaited()
 
+    @pytest.mark.asyncio
+    async def test_load_startup_snapshot_requests_everything_at_once(
+        self, portfolio_manager, mocker
+    ):
+        """Issues every startup request before awaiting any of them."""
+        portfolio_manager.config.portfolio.symbols = {"AAPL": mocker.Mock()}
+        events = []
+
+        def request(name, result):
+            async def run(*_args):
+                events.append(f"start {name}")
+                await asyncio.sleep(0)
+                events.append(f"end {name}")
+                return result
+
+            return run
+
+        tracked = SimpleNamespace(
+            account="TEST123",
+            contract=SimpleNamespace(symbol="AAPL", conId=1),
+            position=5,
+        )
+        untracked = SimpleNamespace(
+            account="TEST123",
+            contract=SimpleNamespace(symbol="ZZZ", conId=2),
+            position=1,
+        )
+        trade = mocker.Mock()
+        net_liquidation = SimpleNamespace(tag="NetLiquidation", value="1000")
+        ibkr = portfolio_manager.ibkr
+        ibkr.account_summary = request("summary", [net_liquidation])
+        ibkr.refresh_account_updates = request("updates", None)
+        ibkr.refresh_positions = request("positions", [tracked])
+        ibkr.refresh_open_orders = request("orders", [trade])
+        ibkr.wait_for_portfolio_items = mocker.AsyncMock(
+            return_value=[tracked, untracked]
+        )
+        portfolio_manager.get_portfolio_positions = mocker.AsyncMock()
+
+        snapshot = await portfolio_manager.load_startup_snapshot()
+
+        assert all(event.startswith("start") for event in events[:4])
+        ibkr.wait_for_portfolio_items.assert_awaited_once_with("TEST123", [1])
+        portfolio_manager.get_portfolio_positions.assert_not_awaited()
+        assert snapshot.account_summary == {"NetLiquidation": net_liquidation}
+        assert snapshot.positions == {"AAPL": [tracked]}
+        assert snapshot.untracked_positions == {"ZZZ": [untracked]}
+        assert snapshot.open_trades == [trade]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("cancel_orders", [True, False])
+    async def test_startup_ignores_other_clients_open_orders(
+        self, portfolio_manager, mock_ib, mocker, cancel_orders
+    ):
+        """Orders from other API clients or TWS are not cancelled or tracked."""
+
+        def trade(order_id, client_id):
+            return Trade(
+                contract=Stock("AAPL", "SMART", "USD"),
+                order=LimitOrder(
+                    "BUY", 10, 100.0, orderId=order_id, clientId=client_id
+                ),
+                orderStatus=OrderStatus(status="Submitted"),
+            )
+
+        own, foreign = trade(1, 7), trade(2, 3)
+        mock_ib.client = SimpleNamespace(clientId=7)
+        mock_ib.reqOpenOrdersAsync = mocker.AsyncMock(return_value=[])
+        mock_ib.openTrades.return_value = [own, foreign]
+        portfolio_manager.config.runtime.account.cancel_orders = cancel_orders
+        portfolio_manager.get_symbols = mocker.Mock(return_value=["AAPL"])
+
+        open_trades = await portfolio_manager.ibkr.refresh_open_orders()
+        portfolio_manager.initialize_account(SimpleNamespace(open_trades=open_trades))
+
+        assert open_trades == [own]
+        if cancel_orders:
+            mock_ib.cancelOrder.assert_called_once_with(own.order)
+        else:
+            mock_ib.cancelOrder.assert_not_called()
+            assert portfolio_manager.working_orders.working(
+                "AAPL", "", "equity_buy_rebalance"
+            ) == [own]
+
+    @pytest.mark.asyncio
+    async def test_load_startup_snapshot_falls_back_on_timeouts(
+        self, portfolio_manager, mocker
+    ):
+        """Falls back to the retrying loaders when a startup request times out."""
+        ibkr = portfolio_manager.ibkr
+        ibkr.account_summary = mocker.AsyncMock(return_value=[])
+        ibkr.refresh_account_updates = mocker.AsyncMock()
+        ibkr.refresh_positions = mocker.AsyncMock(
+            side_effect=IBKRRequestTimeout("positions snapshot", 1)
+        )
+        ibkr.refresh_open_orders = mocker.AsyncMock(
+            side_effect=IBKRRequestTimeout("open orders snapshot", 1)
+        )
+        ibkr.open_trades = mocker.Mock(return_value=["synced"])
+        ibkr.wait_for_portfolio_items = mocker.AsyncMock()
+        portfolio_manager.get_portfolio_positions = mocker.AsyncMock(
+            return_value={"AAPL": []}
+        )
+
+        snapshot = await portfolio_manager.load_startup_snapshot()
+
+        ibkr.wait_for_portfolio_items.assert_not_awaited()
+        portfolio_manager.get_portfolio_positions.assert_awaited_once()
+        assert snapshot.positions == {"AAPL": []}
+        assert snapshot.open_trades == ["synced"]
+
     @pytest.mark.asyncio
     async def test_check_buy_only_positions(self, portfolio_manager, mocker):
         """Test check_buy_only_positions method."""
@@ -1086,3 +1209,17 @@ class TestPortfolioManager:
         # Even though 6 shares meets min shares (1), $900 < $2000 min amount
         # Should not buy due to amount threshold
         assert len(to_buy) == 0
+
+
+@pytest.mark.asyncio
+async def test_itm_checks_use_configured_quote_mode(portfolio_manager, mocker):
+    portfolio_manager.config.runtime.ib_async.quote_mode = "snapshot"
+    ticker = mocker.Mock(spec=Ticker)
+    ticker.marketPrice.return_value = 100.0
+    portfolio_manager.ibkr.get_ticker_for_stock = mocker.AsyncMock(return_value=ticker)
+    put = SimpleNamespace(symbol="SPY", primaryExchange="ARCA", strike=105.0)
+
+    assert await portfolio_manager.put_is_itm(put)
+    assert not await portfolio_manager.call_is_itm(put)
+    for call in portfolio_manager.ibkr.get_ticker_for_stock.await_args_list:
+        assert call.kwargs["mode"] == "snapshot"
@@ -0,0 +1,131 @@
+from datetime import date, timedelta
+
+import pytest
+from ib_async import Option, PortfolioItem, Stock, Ticker
+from ib_async.objects import OptionComputation
+from sqlalchemy import select
+
+from thetagang.db import DataStore, RiskSnapshot
+from thetagang.portfolio_risk import aggregate_risk, build_risk_arrays
+
+
+def _expiry(days: int) -> str:
+    return (date.today() + timedelta(days=days)).strftime("%Y%m%d")
+
+
+def _item(contract, position, market_price=0.0):
+    return PortfolioItem(contract, position, market_price, 0.0, 0.0, 0.0, 0.0, "DU1")
+
+
+def _option(symbol, strike, right, days, con_id):
+    return Option(symbol, _expiry(days), strike, right, "SMART", "100", conId=con_id)
+
+
+@pytest.fixture
+def positions():
+    return {
+        "AAA": [
+            _item(Stock("AAA", "SMART", conId=1), 200, market_price=50.0),
+            _item(_option("AAA", 55.0, "C", 30, 2), -2),
+            _item(_option("AAA", 45.0, "P", 30, 3), 0),
+        ],
+        "BBB": [
+            _item(_option("BBB", 100.0, "P", 20, 4), -1),
+            _item(_option("BBB", 90.0, "P", 40, 5), -3),
+        ],
+    }
+
+
+@pytest.fixture
+def tickers():
+    return {
+        2: OptionComputation(0, delta=0.3, gamma=0.05, theta=-0.02, undPrice=50.0),
+        4: OptionComputation(0, delta=-0.4, gamma=0.02, theta=-0.05, undPrice=98.0),
+    }
+
+
+def _cached(tickers):
+    def cached_ticker(contract):
+        greeks = tickers.get(contract.conId)
+        if greeks is None:
+            return None
+        return Ticker(contract=contract, modelGreeks=greeks)
+
+    return cached_ticker
+
+
+def test_build_risk_arrays_skips_flat_lines_and_reads_cached_greeks(positions, tickers):
+    arrays = build_risk_arrays(positions, _cached(tickers))
+
+    assert arrays.symbols == ["AAA", "BBB"]
+    assert len(arrays) == 4
+    assert arrays.symbol_index.tolist() == [0, 0, 1, 1]
+    assert arrays.is_option.tolist() == [False, True, True, True]
+    assert arrays.multiplier.tolist() == [1.0, 100.0, 100.0, 100.0]
+    assert arrays.dte.tolist() == [0, 30, 20, 40]
+    assert arrays.delta[:3].tolist() == [1.0, 0.3, -0.4]
+    assert arrays.underlying_price[:3].tolist() == [50.0, 50.0, 98.0]
+
+
+def test_aggregate_risk_sums_greeks_per_symbol_and_account(positions, tickers):
+    risk = aggregate_risk(build_risk_arrays(positions, _cached(tickers)), {"BBB": 1.5})
+
+    aaa = risk.symbols["AAA"]
+    assert aaa.delta == pytest.approx(200 - 2 * 100 * 0.3)
+    assert aaa.dollar_delta == pytest.approx(140 * 50.0)
+    assert aaa.beta_weighted_delta == pytest.approx(140 * 50.0)
+    assert aaa.gamma == pytest.approx(-2 * 100 * 0.05)
+    assert aaa.theta == pytest.approx(-2 * 100 * -0.02)
+    assert aaa.missing_greeks == 0
+
+    bbb = risk.symbols["BBB"]
+    assert bbb.delta == pytest.approx(40.0)
+    assert bbb.beta_weighted_delta == pytest.approx(40.0 * 98.0 * 1.5)
+    assert bbb.option_lines == 2
+    assert bbb.missing_greeks == 1
+
+    assert risk.total.delta == pytest.approx(180.0)
+    assert risk.total.theta == pytest.approx(4.0 + 5.0)
+    assert risk.total.missing_greeks == 1
+
+
+def test_expiring_option_without_quote_uses_intrinsic_delta():
+    positions = {
+        "AAA": [
+            _item(Stock("AAA", "SMART", conId=1), 100, market_price=50.0),
+            _item(_option("AAA", 45.0, "C", 0, 2), -1),
+            _item(_option("AAA", 40.0, "P", 0, 3), -1),
+        ]
+    }
+
+    risk = aggregate_risk(build_risk_arrays(positions, lambda _contract: None))
+
+    assert risk.symbols["AAA"].delta == pytest.approx(0.0)
+    assert risk.symbols["AAA"].missing_greeks == 0
+
+
+def test_empty_portfolio_has_zero_risk():
+    risk = aggregate_risk(build_risk_arrays({}, lambda _contract: None))
+
+    assert risk.symbols == {}
+    assert risk.total.delta == 0.0
+
+
+def test_record_risk_snapshot(tmp_path, positions, tickers):
+    data_store = DataStore(
+        f"sqlite:///{tmp_path / 'state.db'}",
+        str(tmp_path / "thetagang.toml"),
+        dry_run=False,
+    )
+    risk = aggregate_risk(build_risk_arrays(positions, _cached(tickers)))
+
+    data_store.record_risk_snapshot(risk)
+
+    with data_store.session_scope() as session:
+        rows = session.scalars(select(RiskSnapshot).order_by(RiskSnapshot.id)).all()
+        assert [(row.symbol, row.run_id) for row in rows] == [
+            ("AAA", data_store.run_id),
+            ("BBB", data_store.run_id),
+            (None, data_store.run_id),
+        ]
+        assert rows[-1].delta == pytest.approx(180.0)
@@ -0,0 +1,131 @@
+from datetime import date, timedelta
+
+from ib_async import Option, PortfolioItem
+from ib_async.contract import Stock
+
+from thetagang.position_book import LONG, SHORT, PositionBook
+from thetagang.util import (
+    calculate_net_short_positions,
+    count_long_option_positions,
+    count_short_option_positions,
+    get_short_positions,
+    net_option_positions,
+    weighted_avg_long_strike,
+    weighted_avg_short_strike,
+)
+
+
+def _expiry(days: int) -> str:
+    return (date.today() + timedelta(days=days)).strftime("%Y%m%d")
+
+
+def _option(
+    symbol: str, right: str, strike: float, days: int, position: float
+) -> PortfolioItem:
+    return PortfolioItem(
+        contract=Option(
+            conId=hash((symbol, right, strike, days)) % 1_000_000,
+            symbol=symbol,
+            lastTradeDateOrContractMonth=_expiry(days),
+            strike=strike,
+            right=right,
+            multiplier="100",
+            currency="USD",
+        ),
+        position=position,
+        marketPrice=1.0,
+        marketValue=100.0 * position,
+        averageCost=100.0,
+        unrealizedPNL=0.0,
+        realizedPNL=0.0,
+        account="DUX",
+    )
+
+
+def _stock(symbol: str, position: float, average_cost: float) -> PortfolioItem:
+    return PortfolioItem(
+        contract=Stock(conId=1, symbol=symbol, currency="USD"),
+        position=position,
+        marketPrice=100.0,
+        marketValue=100.0 * position,
+        averageCost=average_cost,
+        unrealizedPNL=0.0,
+        realizedPNL=0.0,
+        account="DUX",
+    )
+
+
+def _positions() -> dict[str, list[PortfolioItem]]:
+    return {
+        "SPY": [
+            _stock("SPY", 250, 400.0),
+            _option("SPY", "P", 390.0, 10, -3),
+            _option("SPY", "P", 380.0, 30, 2),
+            _option("SPY", "P", 395.0, 5, -1),
+            _option("SPY", "C", 420.0, 10, -2),
+            _option("SPY", "C", 410.0, 40, 1),
+        ],
+        "VIX": [
+            _option("VIX", "C", 20.0, 3, 4),
+            _option("VIX", "C", 25.0, 40, 2),
+            _option("VIX", "C", 30.0, -1, 5),
+        ],
+    }
+
+
+def test_position_book_matches_util_helpers() -> None:
+    positions = _positions()
+    book = PositionBook(positions)
+
+    for symbol in positions:
+        for right in ("P", "C"):
+            items = positions[symbol]
+            assert book.count_short_options(symbol, right) == (
+                count_short_option_positions(items, right)
+            )
+            assert book.count_long_options(symbol, right) == (
+                count_long_option_positions(items, right)
+            )
+            assert book.weighted_avg_strike(symbol, right, SHORT) == (
+                weighted_avg_short_strike(items, right)
+            )
+            assert book.weighted_avg_strike(symbol, right, LONG) == (
+                weighted_avg_long_strike(items, right)
+            )
+            assert book.net_short_options(symbol, right) == (
+                calculate_net_short_positions(items, right)
+            )
+            for ignore_dte in (None, 5):
+                assert book.net_options(symbol, right, ignore_dte) == (
+                    net_option_positions(symbol, positions, right, ignore_dte)
+                )
+
+    assert book.stock_quantity("SPY") == 250
+    assert book.stocks("SPY")[0].averageCost == 400.0
+    assert book.stock_quantity("VIX") == 0
+
+
+def test_position_book_short_contracts_across_symbols() -> None:
+    positions = _positions()
+    book = PositionBook(positions)
+
+    expected = [
+        p for items in positions.values() for p in get_short_positions(items, "C")
+    ]
+    assert book.all_short_options("C") == expected
+    assert book.all_short_options("call") == expected
+    assert book.all_short_options("P") == get_short_positions(positions["SPY"], "P")
+
+
+def test_position_book_indexes_and_dict_compatibility() -> None:
+    positions = _positions()
+    book = PositionBook(positions)
+
+    assert dict(book) == positions
+    assert PositionBook.of(book) is book
+    assert PositionBook.of(positions) == book
+    assert [book.dte(p) for p in book.short_options("SPY", "P")] == [10, 5]
+    assert sorted(book.by_expiry("SPY", "P")) == sorted(
+        [_expiry(10), _expiry(30), _expiry(5)]
+    )
+    assert book.short_options("QQQ", "P") == []
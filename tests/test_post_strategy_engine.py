@@ -137,7 +137,7 @@ async def test_do_vix_hedging_closes_existing_calls_when_threshold_hit(mocker):
     engine.config.strategies.vix_call_hedge.enabled = True
     engine.config.strategies.vix_call_hedge.close_hedges_when_vix_exceeds = 20.0
     mocker.patch(
-        "thetagang.strategies.post_engine.net_option_positions", return_value=1
+        "thetagang.strategies.post_engine.PositionBook.net_options", return_value=1
     )
     mocker.patch("thetagang.strategies.post_engine.get_lower_price", return_value=2.0)
     ibkr.get_ticker_for_contract = AsyncMock(
@@ -177,7 +177,7 @@ async def test_do_vix_hedging_buys_new_hedge_from_allocation_band(mocker):
         SimpleNamespace(lower_bound=0.0, upper_bound=100.0, weight=0.01)
     ]
     mocker.patch(
-        "thetagang.strategies.post_engine.net_option_positions", return_value=0
+        "thetagang.strategies.post_engine.PositionBook.net_options", return_value=0
     )
     mocker.patch("thetagang.strategies.post_engine.get_lower_price", return_value=5.0)
     ibkr.get_ticker_for_contract = AsyncMock(
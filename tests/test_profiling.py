@@ -0,0 +1,171 @@
+import json
+import pstats
+
+import pytest
+from click.testing import CliRunner
+from ib_async import IB
+
+from thetagang.config_models import ProfileConfig
+from thetagang.db import DataStore, Run
+from thetagang.main import cli
+from thetagang.portfolio_manager import PortfolioManager
+from thetagang.profiling import SUMMARY_FILE, StageProfiler
+
+
+def _allocate() -> list:
+    return [bytearray(1024) for _ in range(200)]
+
+
+def test_stage_profiler_writes_a_profile_per_stage(tmp_path) -> None:
+    profiler = StageProfiler(tmp_path / "run", top_allocations=5)
+
+    with profiler.stage("options_write_puts"):
+        kept = _allocate()
+    with profiler.stage("post cash management"):
+        sum(range(1000))
+    profiler.close()
+
+    run_dir = tmp_path / "run"
+    summary = json.loads((run_dir / SUMMARY_FILE).read_text(encoding="utf8"))
+    assert [entry["stage"] for entry in summary] == [
+        "options_write_puts",
+        "post cash management",
+    ]
+    first = summary[0]
+    assert first["pstats_file"] == "01-options_write_puts.pstats"
+    assert first["allocated_bytes"] >= 200 * 1024
+    pstats.Stats(str(run_dir / first["pstats_file"]))
+    allocations = (run_dir / first["allocations_file"]).read_text(encoding="utf8")
+    assert "bytearray(1024)" in allocations
+    assert (run_dir / "02-post_cash_management.pstats").exists()
+    assert len(kept) == 200
+
+
+def test_stage_profiler_records_failing_stages(tmp_path) -> None:
+    profiler = StageProfiler(tmp_path, memory=False, entry_points=True)
+
+    with pytest.raises(RuntimeError):
+        with profiler.stage("equity_regime_rebalance"):
+            raise RuntimeError("boom")
+    profiler.close()
+
+    (profile,) = profiler.profiles
+    assert profile.stage == "equity_regime_rebalance"
+    assert profile.peak_bytes is None
+    assert profile.allocations_file is None
+    assert (tmp_path / "01-equity_regime_rebalance.entry.txt").exists()
+
+
+def test_profile_directory_is_relative_to_the_config(tmp_path) -> None:
+    config_path = str(tmp_path / "conf" / "thetagang.toml")
+
+    assert ProfileConfig().resolve_directory(config_path) == (
+        tmp_path / "conf" / "data" / "profiles"
+    )
+
+
+def test_data_store_links_the_profile_directory(tmp_path) -> None:
+    data_store = DataStore(
+        f"sqlite:///{tmp_path / 'state.db'}",
+        str(tmp_path / "thetagang.toml"),
+        dry_run=False,
+    )
+
+    data_store.set_profile_dir(str(tmp_path / "profiles" / "run1"))
+
+    with data_store.session_scope() as session:
+        run = session.get(Run, data_store.run_id)
+        assert run.profile_dir == str(tmp_path / "profiles" / "run1")
+
+
+def test_cli_passes_profile_flag(monkeypatch, tmp_path) -> None:
+    config_path = tmp_path / "thetagang.toml"
+    config_path.write_text("x=1\n", encoding="utf8")
+    captured = {}
+
+    def fake_start(config, without_ibc, dry_run, **kwargs):
+        captured.update(kwargs)
+
+    monkeypatch.setattr("thetagang.thetagang.start", fake_start)
+
+    result = CliRunner().invoke(cli, ["--config", str(config_path), "--profile"])
+
+    assert result.exit_code == 0, result.output
+    assert captured["profile"] is True
+
+
+@pytest.mark.asyncio
+async def test_manage_profiles_startup_and_each_stage(mocker, tmp_path) -> None:
+    mock_ib = mocker.Mock(spec=IB)
+    mock_ib.orderStatusEvent = mocker.Mock()
+    mock_ib.orderStatusEvent.__iadd__ = mocker.Mock(return_value=None)
+    config = mocker.Mock()
+    config.runtime.account.number = "TEST123"
+    config.runtime.ib_async.api_response_wait_time = 1
+    config.runtime.orders.exchange = "SMART"
+    profiler = StageProfiler(tmp_path, memory=False)
+    pm = PortfolioManager(
+        config,
+        mock_ib,
+        mocker.Mock(),
+        dry_run=True,
+        run_stage_order=["equity_buy_rebalance", "post_cash_management"],
+        profiler=profiler,
+    )
+    pm.load_startup_snapshot = mocker.AsyncMock()
+    pm.initialize_account = mocker.Mock()
+    pm.summarize_account = mocker.AsyncMock(return_value=({}, {}))
+    pm.get_portfolio_positions = mocker.AsyncMock(return_value={})
+    pm.report_portfolio_risk = mocker.Mock()
+    pm.orders.print_summary = mocker.Mock()
+    mocker.patch("thetagang.portfolio_manager.run_equity_rebalance_stages")
+    mocker.patch("thetagang.portfolio_manager.run_post_stages")
+
+    await pm.manage()
+
+    assert [profile.stage for profile in profiler.profiles] == [
+        "startup",
+        "equity_buy_rebalance",
+        "post_cash_management",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_manage_does_not_profile_a_close_stage_run_with_rolls(
+    mocker, tmp_path
+) -> None:
+    mock_ib = mocker.Mock(spec=IB)
+    mock_ib.orderStatusEvent = mocker.Mock()
+    mock_ib.orderStatusEvent.__iadd__ = mocker.Mock(return_value=None)
+    config = mocker.Mock()
+    config.runtime.account.number = "TEST123"
+    config.runtime.ib_async.api_response_wait_time = 1
+    config.runtime.orders.exchange = "SMART"
+    profiler = StageProfiler(tmp_path, memory=False)
+    pm = PortfolioManager(
+        config,
+        mock_ib,
+        mocker.Mock(),
+        dry_run=True,
+        run_stage_order=["options_roll_positions", "options_close_positions"],
+        profiler=profiler,
+    )
+    pm.options_trading_enabled = mocker.Mock(return_value=True)
+    pm.load_startup_snapshot = mocker.AsyncMock()
+    pm.initialize_account = mocker.Mock()
+    pm.summarize_account = mocker.AsyncMock(return_value=({}, {}))
+    pm.get_portfolio_positions = mocker.AsyncMock(return_value={})
+    pm.report_portfolio_risk = mocker.Mock()
+    pm.orders.print_summary = mocker.Mock()
+    management = mocker.patch(
+        "thetagang.portfolio_manager.run_option_management_stages"
+    )
+
+    await pm.manage()
+
+    management.assert_awaited_once()
+    assert [profile.stage for profile in profiler.profiles] == [
+        "startup",
+        "options_roll_positions",
+    ]
+    assert not list(tmp_path.glob("*options_close_positions*"))
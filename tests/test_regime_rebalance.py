@@ -1751,3 +1751,72 @@ async def test_regime_rebalance_zero_weights_raises(portfolio_manager, mocker):
         await portfolio_manager.check_regime_rebalance_positions(
             account_summary, portfolio_positions
         )
+
+
+@pytest.mark.asyncio
+async def test_regime_history_window_only_requests_new_days(
+    portfolio_manager_with_db, mocker, monkeypatch
+):
+    _freeze_now(monkeypatch, datetime(2024, 1, 8, 12, 0, 0))
+    engine = portfolio_manager_with_db.regime_engine
+    _mock_regime_history(
+        portfolio_manager_with_db, mocker, [100.0, 101.0, 102.0, 103.0, 104.0, 105.0]
+    )
+
+    dates, closes = await engine._get_windowed_aligned_closes(["AAA", "BBB"], 3, 1)
+    assert closes["AAA"][-5:] == [101.0, 102.0, 103.0, 104.0, 105.0]
+
+    _freeze_now(monkeypatch, datetime(2024, 1, 9, 12, 0, 0))
+    bars = _mock_regime_history(
+        portfolio_manager_with_db,
+        mocker,
+        [100.0, 101.0, 102.0, 103.0, 104.0, 105.5, 106.0],
+    )
+    dates, closes = await engine._get_windowed_aligned_closes(["AAA", "BBB"], 3, 1)
+
+    request = portfolio_manager_with_db.ibkr.request_historical_data
+    assert {call.args[1] for call in request.call_args_list} == {"9 D"}
+    assert dates[-1] == bars[-1].date.date()
+    assert closes["AAA"] == [102.0, 103.0, 104.0, 105.5, 106.0]
+
+    # A revised close before the newest stored day forces a full rebuild.
+    _mock_regime_history(
+        portfolio_manager_with_db,
+        mocker,
+        [50.0, 50.5, 51.0, 51.5, 52.0, 52.75, 53.0],
+    )
+    _, closes = await engine._get_windowed_aligned_closes(["AAA", "BBB"], 3, 1)
+
+    request = portfolio_manager_with_db.ibkr.request_historical_data
+    assert [call.args[1] for call in request.call_args_list][-2:] == ["12 D", "12 D"]
+    assert closes["AAA"][-1] == 53.0
+
+
+@pytest.mark.asyncio
+async def test_get_last_regime_rebalance_time_records_fills_once(
+    portfolio_manager_with_db, mocker, monkeypatch
+):
+    when = datetime(2024, 1, 7, 12, 0, 0)
+    fill = SimpleNamespace(
+        execution=SimpleNamespace(
+            execId="1", orderRef="tg:regime-rebalance:AAA", time=when
+        ),
+        contract=SimpleNamespace(symbol="AAA"),
+        time=when,
+    )
+    portfolio_manager_with_db.ibkr.request_executions = mocker.AsyncMock(
+        return_value=[fill]
+    )
+    record = mocker.spy(portfolio_manager_with_db.data_store, "record_executions")
+    _freeze_now(monkeypatch, datetime(2024, 1, 10, 12, 0, 0))
+
+    last_rebalance = await portfolio_manager_with_db._get_last_regime_rebalance_time(
+        ["AAA"]
+    )
+
+    assert last_rebalance == when
+    assert record.call_count == 1
+    assert (
+        portfolio_manager_with_db.data_store.get_execution_high_water_mark("TEST123")
+        == when
+    )
@@ -0,0 +1,77 @@
+import math
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from thetagang.db import DataStore
+from thetagang.regime_state import (
+    RegimeWindow,
+    load_window,
+    ratio_window_stats,
+    save_window,
+)
+
+
+def _days(count: int, start: date = date(2024, 1, 2)) -> list[date]:
+    return [start + timedelta(days=offset) for offset in range(count)]
+
+
+def test_ratio_window_stats_match_pandas_as_the_window_advances(tmp_path) -> None:
+    lookback = 5
+    keep = lookback + 3
+    levels = np.cumsum(np.random.default_rng(3).normal(0.0, 0.01, 40))
+    dates = _days(len(levels))
+    spec = ["AAA", {"BBB": 1.0}, 1e-8]
+    data_store = DataStore(
+        f"sqlite:///{tmp_path / 'state.db'}",
+        str(tmp_path / "thetagang.toml"),
+        dry_run=False,
+    )
+
+    for end in range(keep, len(levels) + 1, 3):
+        window = load_window(data_store, "key") or RegimeWindow(
+            key="key", dates=[], closes={}
+        )
+        window.dates = dates[end - keep : end]
+        stats = ratio_window_stats(window, levels[end - keep : end], lookback, spec)
+        save_window(data_store, window)
+
+        rolling = pd.Series(levels[:end]).diff().rolling(lookback)
+        expected = (
+            float(rolling.var(ddof=1).iloc[-1]),
+            float(rolling.mean().iloc[-1]),
+            float(rolling.std(ddof=1).iloc[-1]),
+        )
+        assert stats is not None
+        assert all(
+            math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-15)
+            for a, b in zip(stats, expected)
+        )
+        # Only settled days are folded into the persisted sums.
+        assert window.ratio is not None
+        assert window.ratio.last_date == dates[end - 2].isoformat()
+
+    stored = load_window(data_store, "key")
+    assert stored is not None and stored.ratio is not None
+    assert stored.ratio.spec == spec
+
+
+def test_regime_window_merge_appends_and_detects_revisions() -> None:
+    dates = _days(4)
+    window = RegimeWindow(
+        key="key",
+        dates=dates,
+        closes={"AAA": [10.0, 11.0, 12.0, 12.5]},
+    )
+
+    # The last stored bar was intraday; the fresh request settles it at 13.
+    fresh_dates = dates[2:] + _days(2, dates[-1] + timedelta(days=1))
+    written = window.merge(fresh_dates, {"AAA": [12.0, 13.0, 14.0, 15.0]}, keep=4)
+
+    assert written == fresh_dates[1:]
+    assert window.dates == fresh_dates
+    assert window.closes["AAA"] == [12.0, 13.0, 14.0, 15.0]
+
+    # A split rescales history: the anchor close no longer matches.
+    assert window.merge(fresh_dates, {"AAA": [6.0, 6.5, 7.0, 7.5]}, keep=4) is None
@@ -0,0 +1,169 @@
+import math
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+from thetagang.db import DataStore
+from thetagang.main import cli
+from thetagang.regime_sweep import (
+    SweepParams,
+    SweepUniverse,
+    _rolling_ratio_ok,
+    expand_grid,
+    load_aligned_closes,
+    parse_grid,
+    run_sweep,
+    simulate,
+)
+
+
+def _universe(days: int = 120, **kwargs) -> SweepUniverse:
+    rng = np.random.default_rng(7)
+    returns = rng.normal(0.0, 0.02, size=(days, 2))
+    returns[:, 1] += 0.004  # BBB steadily outgrows AAA
+    closes = 100.0 * np.exp(np.cumsum(returns, axis=0))
+    return SweepUniverse(
+        symbols=["AAA", "BBB"],
+        dates=[date(2024, 1, 1) + timedelta(days=i) for i in range(days)],
+        closes=closes,
+        weights=np.array([0.5, 0.5]),
+        eps=1e-8,
+        **kwargs,
+    )
+
+
+def _params(**overrides) -> SweepParams:
+    values = dict(
+        lookback_days=20,
+        soft_band=0.10,
+        hard_band=0.50,
+        hard_band_rebalance_fraction=1.0,
+        cooldown_days=5,
+        choppiness_min=0.0,
+        efficiency_max=1.0,
+    )
+    values.update(overrides)
+    return SweepParams(**values)
+
+
+def test_parse_and_expand_grid() -> None:
+    grid = parse_grid(["lookback_days=20,40", "soft_band=0.1,0.6"])
+    assert grid == {"lookback_days": [20, 40], "soft_band": [0.1, 0.6]}
+    assert all(type(value) is int for value in grid["lookback_days"])
+
+    params = expand_grid(_params(hard_band=0.5), grid)
+    # soft_band=0.6 exceeds hard_band=0.5 and is dropped like an invalid config.
+    assert [(p.lookback_days, p.soft_band) for p in params] == [(20, 0.1), (40, 0.1)]
+
+    with pytest.raises(ValueError, match="Invalid sweep parameter"):
+        parse_grid(["not_a_param=1"])
+
+
+def test_simulate_counts_rebalances_turnover_and_drift() -> None:
+    universe = _universe()
+
+    never = simulate(universe, _params(soft_band=1.0, hard_band=1.0))
+    assert never.rebalances == 0
+    assert never.turnover == 0.0
+    assert never.max_drift > 0.10
+
+    soft = simulate(universe, _params(cooldown_days=0))
+    assert soft.rebalances > 0
+    assert soft.hard_rebalances == 0
+    assert soft.turnover > 0
+    assert soft.max_drift < never.max_drift
+
+    # Gates that never open still let hard-band breaches through.
+    hard = simulate(
+        universe, _params(soft_band=0.05, hard_band=0.05, choppiness_min=1e9)
+    )
+    assert hard.rebalances == hard.hard_rebalances > 0
+
+
+def test_rolling_ratio_gate_matches_live_pandas_statistics() -> None:
+    universe = _universe(days=60, ratio_anchor=0, ratio_enabled=True)
+    params = _params(ratio_var_min=0.0, ratio_drift_max=1.5)
+    verdicts = _rolling_ratio_ok(universe, params)
+
+    ratio = np.log(universe.closes[:, 1] / universe.closes[:, 0])
+    for day in (params.lookback_days, 40, 59):
+        returns = pd.Series(ratio[: day + 1]).diff().rolling(params.lookback_days)
+        var = float(returns.var(ddof=1).iloc[-1])
+        tstat = abs(
+            float(returns.mean().iloc[-1])
+            / (float(returns.std(ddof=1).iloc[-1]) / math.sqrt(params.lookback_days))
+        )
+        assert verdicts[day] == (var >= 0.0 and tstat <= 1.5)
+
+
+def test_run_sweep_in_process_pool_matches_serial() -> None:
+    universe = _universe()
+    params = expand_grid(_params(), {"cooldown_days": [0, 3, 10]})
+
+    assert run_sweep(universe, params, workers=2) == run_sweep(
+        universe, params, workers=1
+    )
+
+
+def test_load_aligned_closes_uses_common_days(tmp_path) -> None:
+    data_store = DataStore(
+        f"sqlite:///{tmp_path / 'state.db'}",
+        str(tmp_path / "thetagang.toml"),
+        dry_run=False,
+    )
+
+    def bars(closes):
+        return [
+            SimpleNamespace(date=datetime(2024, 1, day), close=close)
+            for day, close in closes
+        ]
+
+    data_store.record_historical_bars("AAA", "1 day", bars([(2, 10), (3, 11), (4, 12)]))
+    data_store.record_historical_bars("BBB", "1 day", bars([(3, 20), (4, 21)]))
+
+    dates, closes = load_aligned_closes(data_store.engine, ["AAA", "BBB"])
+
+    assert dates == [date(2024, 1, 3), date(2024, 1, 4)]
+    assert closes.tolist() == [[11.0, 20.0], [12.0, 21.0]]
+
+
+def test_cli_regime_sweep_subcommand(monkeypatch, tmp_path) -> None:
+    config_path = tmp_path / "thetagang.toml"
+    config_path.write_text("x=1\n", encoding="utf8")
+    captured = {}
+
+    def fake_start_regime_sweep(config, **kwargs):
+        captured["config"] = config
+        captured.update(kwargs)
+
+    monkeypatch.setattr(
+        "thetagang.thetagang.start_regime_sweep", fake_start_regime_sweep
+    )
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--config",
+            str(config_path),
+            "regime-sweep",
+            "--grid",
+            "lookback_days=20,40",
+            "--grid",
+            "soft_band=0.05",
+            "--workers",
+            "2",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert captured == {
+        "config": str(config_path),
+        "grid": ("lookback_days=20,40", "soft_band=0.05"),
+        "workers": 2,
+        "limit": 25,
+        "output": None,
+    }
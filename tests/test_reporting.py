@@ -0,0 +1,195 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+from sqlalchemy import func, select
+
+from thetagang.db import DataStore, ReportDaily
+from thetagang.main import cli
+from thetagang.reporting import (
+    load_report,
+    load_run_summary,
+    rebuild_reports,
+    update_reports,
+)
+from thetagang.run_checkpoint import STAGE
+
+SINCE = date(2000, 1, 1)
+
+
+def _make_store(tmp_path, dry_run: bool = False) -> DataStore:
+    return DataStore(
+        f"sqlite:///{tmp_path / 'state.db'}",
+        str(tmp_path / "thetagang.toml"),
+        dry_run=dry_run,
+        config_text="test",
+        account_number="DU1",
+    )
+
+
+def _fill(exec_id: str, order_id: int, symbol: str, side: str, shares, price):
+    return SimpleNamespace(
+        execution=SimpleNamespace(
+            execId=exec_id,
+            orderId=order_id,
+            orderRef=None,
+            side=side,
+            shares=shares,
+            price=price,
+            time=datetime(2024, 3, 4, 15, 0, 0),
+            exchange="SMART",
+            acctNumber="DU1",
+        ),
+        contract=SimpleNamespace(symbol=symbol),
+        time=datetime(2024, 3, 4, 15, 0, 0),
+    )
+
+
+def _trade(data_store: DataStore, stage: str, contract, order) -> int:
+    intent_id = data_store.record_order_intent(contract, order)
+    assert intent_id is not None
+    data_store.record_order(contract, order, intent_id)
+    data_store.record_checkpoint(STAGE, stage, [intent_id])
+    return intent_id
+
+
+def _seed(data_store: DataStore) -> None:
+    data_store.record_event("run_start", {"dry_run": False})
+    put = SimpleNamespace(
+        symbol="AAA", secType="OPT", conId=1, exchange="SMART", currency="USD"
+    )
+    put.multiplier = "100"
+    _trade(
+        data_store,
+        "options_write_puts",
+        put,
+        SimpleNamespace(action="SELL", totalQuantity=2, lmtPrice=1.5, orderId=11),
+    )
+    stock = SimpleNamespace(
+        symbol="BBB", secType="STK", conId=2, exchange="SMART", currency="USD"
+    )
+    _trade(
+        data_store,
+        "equity_regime_rebalance",
+        stock,
+        SimpleNamespace(action="BUY", totalQuantity=10, lmtPrice=50.0, orderId=12),
+    )
+    data_store.record_executions(
+        [
+            _fill("e1", 11, "AAA", "SLD", 2.0, 1.4),
+            _fill("e2", 12, "BBB", "BOT", 10.0, 50.2),
+        ]
+    )
+    data_store.record_event("run_end", {"success": True})
+
+
+def _by_key(engine, by: str):
+    return {row.key: row for row in load_report(engine, by, SINCE)}
+
+
+def test_update_reports_groups_fills_by_symbol_and_stage(tmp_path) -> None:
+    data_store = _make_store(tmp_path)
+    _seed(data_store)
+
+    folded = update_reports(data_store.engine)
+
+    assert folded == {"order_intents": 2, "orders": 2, "executions": 2, "events": 2}
+    by_symbol = _by_key(data_store.engine, "symbol")
+    assert by_symbol["AAA"].intents == 1
+    assert by_symbol["AAA"].fills == 1
+    assert by_symbol["AAA"].sold == pytest.approx(280.0)
+    assert by_symbol["AAA"].premium == pytest.approx(280.0)
+    # Sold at 1.40 against a 1.50 limit: 0.10 x 2 contracts x 100 given up.
+    assert by_symbol["AAA"].slippage == pytest.approx(20.0)
+    assert by_symbol["BBB"].bought == pytest.approx(502.0)
+    assert by_symbol["BBB"].premium == 0.0
+    assert by_symbol["BBB"].slippage == pytest.approx(2.0)
+
+    by_stage = _by_key(data_store.engine, "stage")
+    assert set(by_stage) == {"equity_regime_rebalance", "options_write_puts"}
+    assert by_stage["options_write_puts"].orders == 1
+
+    (summary,) = load_run_summary(data_store.engine, SINCE)
+    assert summary.runs == 1
+    assert summary.failed == 0
+    assert summary.max_seconds is not None
+
+
+def test_update_reports_only_folds_new_rows(tmp_path) -> None:
+    data_store = _make_store(tmp_path)
+    _seed(data_store)
+    update_reports(data_store.engine)
+
+    assert update_reports(data_store.engine) == {
+        "order_intents": 0,
+        "orders": 0,
+        "executions": 0,
+        "events": 0,
+    }
+    data_store.record_executions([_fill("e3", 12, "BBB", "BOT", 5.0, 50.0)])
+    assert update_reports(data_store.engine, batch_size=1)["executions"] == 1
+
+    by_symbol = _by_key(data_store.engine, "symbol")
+    assert by_symbol["BBB"].fills == 2
+    assert by_symbol["BBB"].quantity == pytest.approx(15.0)
+    assert by_symbol["AAA"].fills == 1
+
+
+def test_rebuild_reports_matches_incremental_updates(tmp_path) -> None:
+    data_store = _make_store(tmp_path)
+    _seed(data_store)
+    update_reports(data_store.engine, batch_size=1)
+    incremental = _by_key(data_store.engine, "day")
+
+    rebuild_reports(data_store.engine)
+
+    assert _by_key(data_store.engine, "day") == incremental
+    # Two symbols, each with intents dated today and fills dated 2024-03-04.
+    with data_store.session_scope() as session:
+        rows = session.execute(
+            select(func.count()).select_from(ReportDaily)
+        ).scalar_one()
+    assert rows == 4
+
+
+def test_update_reports_skips_dry_runs(tmp_path) -> None:
+    data_store = _make_store(tmp_path, dry_run=True)
+    _seed(data_store)
+
+    update_reports(data_store.engine)
+
+    by_symbol = _by_key(data_store.engine, "symbol")
+    assert by_symbol["AAA"].intents == 0
+    assert by_symbol["AAA"].orders == 0
+
+
+def test_load_report_rejects_unknown_grouping(tmp_path) -> None:
+    data_store = _make_store(tmp_path)
+    with pytest.raises(ValueError):
+        load_report(data_store.engine, "account", SINCE)
+
+
+def test_cli_report_subcommand(monkeypatch, tmp_path) -> None:
+    config_path = tmp_path / "thetagang.toml"
+    config_path.write_text("x=1\n", encoding="utf8")
+    captured = {}
+
+    def fake_start_report(config, **kwargs):
+        captured["config"] = config
+        captured.update(kwargs)
+
+    monkeypatch.setattr("thetagang.thetagang.start_report", fake_start_report)
+
+    result = CliRunner().invoke(
+        cli,
+        ["--config", str(config_path), "report", "--by", "stage", "--days", "7"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert captured == {
+        "config": str(config_path),
+        "by": "stage",
+        "days": 7,
+        "rebuild": False,
+    }
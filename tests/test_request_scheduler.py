@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from thetagang.request_scheduler import (
+    ACCOUNT,
+    HISTORICAL,
+    MARKET_DATA,
+    ORDERS,
+    CategoryLimit,
+    RequestScheduler,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_refills_up_to_burst():
+    bucket = TokenBucket(rate=2.0, burst=4.0, now=0.0)
+    bucket.tokens = 0.0
+
+    assert bucket.delay(0.0) == 0.5
+    assert bucket.delay(1.0) == 0.0
+    assert bucket.tokens == 2.0
+    assert bucket.delay(10.0, cost=8) == 0.0
+    assert bucket.tokens == 4.0
+
+
+@pytest.mark.asyncio
+async def test_acquire_is_immediate_while_tokens_remain():
+    clock = FakeClock()
+    scheduler = RequestScheduler(clock=clock)
+
+    async with scheduler.request(MARKET_DATA, "ib"):
+        assert scheduler.in_flight[MARKET_DATA] == 1
+
+    assert scheduler.in_flight[MARKET_DATA] == 0
+    assert scheduler.summary() == {
+        MARKET_DATA: {"requests": 1, "queued": 0, "total_wait": 0.0, "max_wait": 0.0}
+    }
+
+
+@pytest.mark.asyncio
+async def test_queued_requests_are_granted_by_priority():
+    limits = {
+        MARKET_DATA: CategoryLimit(rate=100.0, burst=1.0, priority=1),
+        HISTORICAL: CategoryLimit(rate=100.0, burst=1.0, priority=4),
+    }
+    scheduler = RequestScheduler(limits=limits, messages_per_second=100.0)
+    # Drain both buckets so the next requests have to queue.
+    scheduler.spend_now(MARKET_DATA, "ib")
+    scheduler.spend_now(HISTORICAL, "other")
+    granted = []
+
+    async def run(category, connection):
+        async with scheduler.request(category, connection):
+            granted.append(category)
+
+    await asyncio.gather(run(HISTORICAL, "other"), run(MARKET_DATA, "ib"))
+
+    assert granted == [MARKET_DATA, HISTORICAL]
+    assert scheduler.stats[HISTORICAL].queued == 1
+    assert scheduler.stats[MARKET_DATA].max_wait > 0
+
+
+@pytest.mark.asyncio
+async def test_max_in_flight_holds_requests_until_release():
+    limits = {
+        HISTORICAL: CategoryLimit(rate=100.0, burst=100.0, priority=4, max_in_flight=1)
+    }
+    scheduler = RequestScheduler(limits=limits)
+
+    await scheduler.acquire(HISTORICAL, "ib")
+    second = asyncio.ensure_future(scheduler.acquire(HISTORICAL, "ib"))
+    await asyncio.sleep(0.01)
+    assert not second.done()
+
+    scheduler.release(HISTORICAL)
+    await asyncio.wait_for(second, 1)
+    assert scheduler.in_flight[HISTORICAL] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    limits = {
+        HISTORICAL: CategoryLimit(rate=100.0, burst=100.0, priority=4, max_in_flight=1)
+    }
+    scheduler = RequestScheduler(limits=limits)
+
+    await scheduler.acquire(HISTORICAL, "ib")
+    waiting = asyncio.ensure_future(scheduler.acquire(HISTORICAL, "ib"))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    assert scheduler._queue == []
+    scheduler.release(HISTORICAL)
+    assert scheduler.in_flight[HISTORICAL] == 0
+
+
+def test_spend_now_never_waits_but_drains_the_connection():
+    clock = FakeClock()
+    scheduler = RequestScheduler(clock=clock, messages_per_second=2.0)
+
+    for _ in range(3):
+        scheduler.spend_now(ORDERS, "ib")
+
+    assert scheduler.connections["ib"].tokens == -1.0
+    assert scheduler._delay(ACCOUNT, "ib", 1, clock()) == 1.0
+    assert scheduler._delay(ACCOUNT, "other", 1, clock()) == 0.0
+    assert scheduler.stats[ORDERS].requests == 3
+
+
+def test_describe_reports_the_slowest_categories():
+    scheduler = RequestScheduler()
+    scheduler.stats[HISTORICAL].record(2.5)
+    scheduler.stats[MARKET_DATA].record(0.0)
+
+    assert scheduler.describe() == (
+        "IBKR requests: 2 sent, 1 queued for pacing "
+        "(historical: 2.5s total, 2.5s max wait)"
+    )
@@ -0,0 +1,427 @@
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+from click.testing import CliRunner
+from sqlalchemy import func, select
+
+from thetagang.db import (
+    AccountDaily,
+    AccountSnapshot,
+    DataStore,
+    Event,
+    EventDaily,
+    OrderStatus,
+    OrderStatusDaily,
+    PositionDaily,
+    PositionSnapshot,
+)
+from thetagang.main import cli
+from thetagang.retention import retention_cutoff, run_retention
+
+
+def _make_store(tmp_path) -> DataStore:
+    return DataStore(
+        f"sqlite:///{tmp_path / 'state.db'}",
+        str(tmp_path / "thetagang.toml"),
+        dry_run=False,
+        config_text="test",
+    )
+
+
+def _seed(data_store: DataStore) -> None:
+    old = datetime(2024, 1, 5, 15, 0, 0)
+    older = datetime(2024, 1, 5, 10, 0, 0)
+    recent = datetime(2024, 6, 1, 12, 0, 0)
+    with data_store.session_scope() as session:
+        for created_at, position, net_liq in (
+            (older, 100.0, 1000.0),
+            (old, 200.0, 1100.0),
+            (recent, 300.0, 1200.0),
+        ):
+            session.add(
+                PositionSnapshot(
+                    run_id=data_store.run_id,
+                    created_at=created_at,
+                    symbol="AAA",
+                    con_id=1,
+                    sec_type="STK",
+                    position=position,
+                    market_price=10.0,
+                )
+            )
+            session.add(
+                AccountSnapshot(
+                    run_id=data_store.run_id,
+                    created_at=created_at,
+                    summary_json=json.dumps(
+                        {"NetLiquidation": {"value": str(net_liq), "currency": "USD"}}
+                    ),
+                )
+            )
+            session.add(
+                OrderStatus(
+                    run_id=data_store.run_id,
+                    created_at=created_at,
+                    order_id=7,
+                    status="Filled",
+                    filled=position,
+                )
+            )
+        session.add_all(
+            [
+                Event(
+                    run_id=data_store.run_id,
+                    created_at=older,
+                    event_type="regime_rebalance_state",
+                    payload="{}",
+                ),
+                Event(
+                    run_id=data_store.run_id,
+                    created_at=old,
+                    event_type="order_enqueued",
+                    symbol="AAA",
+                ),
+                Event(
+                    run_id=data_store.run_id,
+                    created_at=recent,
+                    event_type="order_enqueued",
+                    symbol="AAA",
+                ),
+            ]
+        )
+
+
+def test_retention_cutoff_is_start_of_day() -> None:
+    assert retention_cutoff(30, datetime(2024, 6, 30, 18, 5)) == datetime(2024, 5, 31)
+
+
+def test_run_retention_rolls_up_and_prunes_old_rows(tmp_path) -> None:
+    data_store = _make_store(tmp_path)
+    _seed(data_store)
+
+    result = run_retention(
+        data_store.engine,
+        raw_days=30,
+        batch_size=1,
+        vacuum_pages=0,
+        now=datetime(2024, 6, 2),
+        show_progress=False,
+    )
+
+    assert result.rolled_up_days == {
+        "position_snapshots": 1,
+        "account_snapshots": 1,
+        "events": 1,
+        "order_statuses": 1,
+    }
+    assert result.deleted_rows == {
+        "position_snapshots": 2,
+        "account_snapshots": 2,
+        "events": 1,
+        "order_statuses": 2,
+        "snapshot_log": 0,
+    }
+
+    with data_store.session_scope() as session:
+        position_daily = session.execute(select(PositionDaily)).scalar_one()
+        assert position_daily.samples == 2
+        assert position_daily.min_position == 100.0
+        assert position_daily.max_position == 200.0
+        assert position_daily.last_position == 200.0
+
+        account_daily = session.execute(select(AccountDaily)).scalar_one()
+        assert account_daily.net_liquidation_open == 1000.0
+        assert account_daily.net_liquidation_close == 1100.0
+
+        event_counts = {
+            row.event_type: row.count
+            for row in session.execute(select(EventDaily)).scalars()
+        }
+        assert event_counts == {"regime_rebalance_state": 1, "order_enqueued": 1}
+
+        status_daily = session.execute(select(OrderStatusDaily)).scalar_one()
+        assert status_daily.count == 2
+        assert status_daily.last_filled == 200.0
+
+        assert (
+            session.execute(
+                select(func.count()).select_from(PositionSnapshot)
+            ).scalar_one()
+            == 1
+        )
+        # The latest event of each type holds persisted state and is kept.
+        remaining_events = session.execute(select(Event.event_type)).scalars().all()
+        assert sorted(remaining_events) == ["order_enqueued", "regime_rebalance_state"]
+
+    assert data_store.get_last_event_payload("regime_rebalance_state") == {}
+
+
+def test_run_retention_is_idempotent(tmp_path) -> None:
+    data_store = _make_store(tmp_path)
+    _seed(data_store)
+    kwargs = dict(
+        raw_days=30,
+        batch_size=100,
+        vacuum_pages=None,
+        now=datetime(2024, 6, 2),
+        show_progress=False,
+    )
+
+    run_retention(data_store.engine, **kwargs)
+    second = run_retention(data_store.engine, **kwargs)
+
+    assert set(second.rolled_up_days.values()) == {0}
+    assert set(second.deleted_rows.values()) == {0}
+    with data_store.session_scope() as session:
+        assert session.execute(select(PositionDaily.samples)).scalar_one() == 2
+
+
+def test_run_retention_keeps_zero_position_bounds(tmp_path) -> None:
+    data_store = _make_store(tmp_path)
+    with data_store.session_scope() as session:
+        # A short put is closed (stored as a removed row at 0) and reopened.
+        for hour, position, removed in (
+            (10, -2.0, False),
+            (11, 0.0, True),
+            (12, -1.0, False),
+        ):
+            session.add(
+                PositionSnapshot(
+                    run_id=data_store.run_id,
+                    created_at=datetime(2024, 1, 5, hour),
+                    symbol="AAA",
+                    con_id=1,
+                    position=position,
+                    removed=removed,
+                )
+            )
+
+    run_retention(
+        data_store.engine,
+        raw_days=30,
+        batch_size=100,
+        vacuum_pages=None,
+        now=datetime(2024, 6, 2),
+        show_progress=False,
+    )
+
+    with data_store.session_scope() as session:
+        position_daily = session.execute(select(PositionDaily)).scalar_one()
+        assert position_daily.min_position == -2.0
+        assert position_daily.max_position == 0.0
+        assert position_daily.last_position == -1.0
+
+
+def test_run_retention_keeps_latest_state_event_of_each_series(tmp_path) -> None:
+    db_url = f"sqlite:///{tmp_path / 'state.db'}"
+    live = DataStore(db_url, "a.toml", dry_run=False, account_number="DU1")
+    other_account = DataStore(db_url, "a.toml", dry_run=False, account_number="DU2")
+    other_config = DataStore(db_url, "b.toml", dry_run=False, account_number="DU1")
+    dry_run = DataStore(db_url, "a.toml", dry_run=True, account_number="DU1")
+    with live.session_scope() as session:
+        # The live account's state is the oldest; every later event belongs
+        # to another series and must not displace it.
+        for hour, store in enumerate((live, other_account, other_config, dry_run)):
+            session.add(
+                Event(
+                    run_id=store.run_id,
+                    created_at=datetime(2024, 1, 5, 10 + hour),
+                    event_type="regime_rebalance_state",
+                    payload=json.dumps({"account": store.account_number}),
+                )
+            )
+
+    run_retention(
+        live.engine,
+        raw_days=30,
+        batch_size=100,
+        vacuum_pages=None,
+        now=datetime(2024, 6, 2),
+        show_progress=False,
+    )
+
+    assert live.get_last_event_payload("regime_rebalance_state") == {"account": "DU1"}
+    assert other_account.get_last_event_payload("regime_rebalance_state") == {
+        "account": "DU2"
+    }
+    assert other_config.get_last_event_payload("regime_rebalance_state") == {
+        "account": "DU1"
+    }
+
+
+def test_run_retention_folds_account_deltas(tmp_path) -> None:
+    data_store = _make_store(tmp_path)
+    with data_store.session_scope() as session:
+        for hour, summary in (
+            (10, {"NetLiquidation": "1000", "TotalCashValue": "500"}),
+            (11, {"TotalCashValue": "400"}),
+            (12, {"NetLiquidation": "1200"}),
+        ):
+            session.add(
+                AccountSnapshot(
+                    run_id=data_store.run_id,
+                    created_at=datetime(2024, 1, 5, hour),
+                    summary_json=json.dumps(
+                        {
+                            key: {"value": value, "currency": "USD"}
+                            for key, value in summary.items()
+                        }
+                    ),
+                )
+            )
+
+    run_retention(
+        data_store.engine,
+        raw_days=30,
+        batch_size=100,
+        vacuum_pages=None,
+        now=datetime(2024, 6, 2),
+        show_progress=False,
+    )
+
+    with data_store.session_scope() as session:
+        account_daily = session.execute(select(AccountDaily)).scalar_one()
+        assert account_daily.net_liquidation_open == 1000.0
+        assert account_daily.net_liquidation_close == 1200.0
+        assert json.loads(account_daily.last_summary_json) == {
+            "NetLiquidation": {"value": "1200", "currency": "USD"},
+            "TotalCashValue": {"value": "400", "currency": "USD"},
+        }
+
+
+def test_run_retention_folds_each_account_separately(tmp_path) -> None:
+    stores = [
+        DataStore(
+            f"sqlite:///{tmp_path / 'state.db'}",
+            str(tmp_path / "thetagang.toml"),
+            dry_run=False,
+            account_number=account,
+        )
+        for account in ("DU1", "DU2")
+    ]
+    with stores[0].session_scope() as session:
+        # Two accounts' delta chains interleave within the day.
+        for hour, store, summary, position in (
+            (10, stores[0], {"NetLiquidation": "1000", "TotalCashValue": "500"}, 1),
+            (11, stores[1], {"NetLiquidation": "5000"}, 5),
+            (12, stores[0], {"TotalCashValue": "400"}, 2),
+            (13, stores[1], {"NetLiquidation": "4000"}, 0),
+        ):
+            created_at = datetime(2024, 1, 5, hour)
+            session.add(
+                AccountSnapshot(
+                    run_id=store.run_id,
+                    created_at=created_at,
+                    summary_json=json.dumps(
+                        {
+                            key: {"value": value, "currency": "USD"}
+                            for key, value in summary.items()
+                        }
+                    ),
+                )
+            )
+            session.add(
+                PositionSnapshot(
+                    run_id=store.run_id,
+                    created_at=created_at,
+                    symbol="AAA",
+                    con_id=1,
+                    position=position,
+                )
+            )
+
+    run_retention(
+        stores[0].engine,
+        raw_days=30,
+        batch_size=100,
+        vacuum_pages=None,
+        now=datetime(2024, 6, 2),
+        show_progress=False,
+    )
+
+    with stores[0].session_scope() as session:
+        accounts = {
+            row.account_number: row
+            for row in session.execute(select(AccountDaily)).scalars()
+        }
+        positions = {
+            row.account_number: row
+            for row in session.execute(select(PositionDaily)).scalars()
+        }
+        assert sorted(accounts) == ["DU1", "DU2"]
+        assert accounts["DU1"].config_path == str(tmp_path / "thetagang.toml")
+        assert json.loads(accounts["DU1"].last_summary_json) == {
+            "NetLiquidation": {"value": "1000", "currency": "USD"},
+            "TotalCashValue": {"value": "400", "currency": "USD"},
+        }
+        assert (
+            accounts["DU2"].net_liquidation_high,
+            accounts["DU2"].net_liquidation_low,
+            accounts["DU2"].net_liquidation_close,
+        ) == (5000.0, 4000.0, 4000.0)
+        assert (positions["DU1"].samples, positions["DU1"].last_position) == (2, 2.0)
+        assert (positions["DU2"].samples, positions["DU2"].last_position) == (2, 0.0)
+
+
+def test_cli_retention_subcommand(monkeypatch, tmp_path) -> None:
+    config_path = tmp_path / "thetagang.toml"
+    config_path.write_text("x=1\n", encoding="utf8")
+    captured = {}
+
+    def fake_start_retention(config, **kwargs):
+        captured["config"] = config
+        captured.update(kwargs)
+
+    def fail_start(*_args, **_kwargs):
+        raise AssertionError("trading run should not start")
+
+    monkeypatch.setattr("thetagang.thetagang.start_retention", fake_start_retention)
+    monkeypatch.setattr("thetagang.thetagang.start", fail_start)
+
+    result = CliRunner().invoke(
+        cli,
+        ["--config", str(config_path), "retention", "--raw-days", "7", "--no-vacuum"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert captured == {
+        "config": str(config_path),
+        "raw_days": 7,
+        "batch_size": None,
+        "vacuum_pages": None,
+        "vacuum": False,
+    }
+
+
+def test_start_retention_uses_config_defaults(monkeypatch, tmp_path) -> None:
+    import thetagang.thetagang as thetagang_module
+
+    config_path = tmp_path / "thetagang.toml"
+    config_path.write_text("", encoding="utf8")
+    config = SimpleNamespace(
+        runtime=SimpleNamespace(
+            database=SimpleNamespace(
+                enabled=True,
+                resolve_url=lambda _path: f"sqlite:///{tmp_path / 'state.db'}",
+                retention=SimpleNamespace(raw_days=45, batch_size=10, vacuum_pages=5),
+            )
+        )
+    )
+    captured = {}
+
+    def fake_run_retention(engine, **kwargs):
+        captured.update(kwargs)
+        return SimpleNamespace(
+            cutoff=datetime(2024, 1, 1),
+            rolled_up_days={},
+            deleted_rows={},
+            reclaimed_pages=0,
+        )
+
+    monkeypatch.setattr(thetagang_module, "_load_config", lambda _path: (config, ""))
+    monkeypatch.setattr(thetagang_module, "run_retention", fake_run_retention)
+
+    thetagang_module.start_retention(str(config_path), batch_size=3)
+
+    assert captured == {"raw_days": 45, "batch_size": 3, "vacuum_pages": 5}
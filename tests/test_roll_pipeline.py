@@ -0,0 +1,141 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from ib_async import Option, PortfolioItem, Stock
+
+from thetagang.strategies.options_engine import OptionsStrategyEngine
+from thetagang.trading_operations import OrderOperations
+
+
+def _expiry(days: int) -> str:
+    return (date.today() + timedelta(days=days)).strftime("%Y%m%d")
+
+
+def _short_call(strike: float, expiry: str, quantity: int):
+    contract = Option(
+        "AAA", expiry, strike, "C", "SMART", conId=int(strike), multiplier="100"
+    )
+    return PortfolioItem(
+        contract=contract,
+        position=-quantity,
+        marketPrice=1.0,
+        marketValue=-100.0 * quantity,
+        averageCost=150.0,
+        unrealizedPNL=50.0 * quantity,
+        realizedPNL=0.0,
+        account="DU1",
+    )
+
+
+@pytest.fixture
+def config(mocker):
+    config = mocker.Mock()
+    config.runtime.orders.exchange = "SMART"
+    config.runtime.orders.minimum_credit = 0.05
+    config.strategies.wheel.defaults.roll_when.dte = 7
+    config.strategies.wheel.defaults.roll_when.calls.credit_only = False
+    config.get_strike_limit.return_value = None
+    config.maintain_high_water_mark.return_value = False
+    return config
+
+
+def _engine(config, mocker, maximum_new_contracts=100):
+    sell_contract = Option("AAA", _expiry(30), 110.0, "C", "SMART", conId=999)
+    ibkr = mocker.Mock()
+    ibkr.get_ticker_for_contract = mocker.AsyncMock(
+        return_value=mocker.Mock(midpoint=mocker.Mock(return_value=0.5))
+    )
+    scanner = mocker.Mock()
+    scanner.find_eligible_contracts = mocker.AsyncMock(
+        return_value=mocker.Mock(contract=sell_contract)
+    )
+    services = mocker.Mock()
+    services.get_primary_exchange.return_value = "NASDAQ"
+    services.get_maximum_new_contracts_for = mocker.AsyncMock(
+        return_value=maximum_new_contracts
+    )
+    order_ops = OrderOperations(
+        config=config, account_number="DU1", orders=mocker.Mock(), data_store=None
+    )
+    order_ops.enqueue_order = mocker.Mock()
+    mocker.patch(
+        "thetagang.strategies.options_engine.midpoint_or_market_price",
+        return_value=1.0,
+    )
+    return OptionsStrategyEngine(
+        config=config,
+        ibkr=ibkr,
+        option_scanner=scanner,
+        order_ops=order_ops,
+        services=services,
+        target_quantities={},
+        has_excess_puts=set(),
+        has_excess_calls=set(),
+        qualified_contracts={},
+    )
+
+
+@pytest.mark.asyncio
+async def test_roll_positions_rolls_each_contract_with_its_own_combo(config, mocker):
+    engine = _engine(config, mocker)
+    expiry = _expiry(3)
+    positions = [_short_call(100.0, expiry, 2), _short_call(105.0, expiry, 3)]
+
+    await engine.roll_positions(
+        positions,
+        "C",
+        {},
+        {
+            "AAA": [
+                *positions,
+                PortfolioItem(Stock("AAA"), 500, 0, 0, 90.0, 0, 0, "DU1"),
+            ]
+        },
+    )
+
+    assert engine.option_scanner.find_eligible_contracts.await_count == 2
+    orders = engine.order_ops.enqueue_order.call_args_list
+    assert [
+        ([leg.conId for leg in combo.comboLegs], order.totalQuantity)
+        for combo, order in (call.args for call in orders)
+    ] == [([100, 999], 2), ([105, 999], 3)]
+
+
+@pytest.mark.asyncio
+async def test_rollable_calls_start_their_scan_during_the_check(config, mocker):
+    engine = _engine(config, mocker)
+    position = _short_call(100.0, _expiry(3), 2)
+    portfolio = {"AAA": [position]}
+    mocker.patch.object(
+        engine, "call_can_be_rolled", mocker.AsyncMock(return_value=True)
+    )
+
+    rollable, _closeable, _group = await engine.check_calls(
+        portfolio, prefetch_rolls=True
+    )
+    await asyncio.sleep(0)
+
+    assert rollable == [position]
+    engine.option_scanner.find_eligible_contracts.assert_awaited_once()
+    await engine.roll_positions(rollable, "C", {}, portfolio)
+
+    engine.option_scanner.find_eligible_contracts.assert_awaited_once()
+    engine.order_ops.enqueue_order.assert_called_once()
+    assert engine.roll_targets == {}
+
+
+@pytest.mark.asyncio
+async def test_unused_prefetched_scans_are_discarded(config, mocker):
+    engine = _engine(config, mocker)
+    expiry = _expiry(3)
+    rolled = _short_call(100.0, expiry, 2)
+    skipped = _short_call(105.0, expiry, 1)
+    portfolio = {"AAA": [rolled, skipped]}
+
+    engine.prefetch_roll_target(rolled, "C", portfolio)
+    engine.prefetch_roll_target(skipped, "C", portfolio)
+    await engine.roll_positions([rolled], "C", {}, portfolio)
+
+    engine.order_ops.enqueue_order.assert_called_once()
+    assert engine.roll_targets == {}
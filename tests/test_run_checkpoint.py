@@ -0,0 +1,225 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from ib_async import IB, LimitOrder, Option, Stock
+
+from thetagang.db import DataStore
+from thetagang.portfolio_manager import PortfolioManager
+from thetagang.run_checkpoint import RunCheckpoint, scan_key
+from thetagang.trading_operations import OptionChainScanner
+
+
+@pytest.fixture
+def data_store(tmp_path):
+    return DataStore(
+        f"sqlite:///{tmp_path / 'state.db'}",
+        str(tmp_path / "thetagang.toml"),
+        dry_run=False,
+        config_text="test",
+    )
+
+
+@pytest.fixture
+def mock_ib(mocker):
+    mock = mocker.Mock(spec=IB)
+    mock.orderStatusEvent = mocker.Mock()
+    mock.orderStatusEvent.__iadd__ = mocker.Mock(return_value=None)
+    mock.isConnected.return_value = True
+    return mock
+
+
+@pytest.fixture
+def mock_config(mocker):
+    config = mocker.Mock()
+    config.runtime.account.number = "TEST123"
+    config.runtime.ib_async.api_response_wait_time = 1
+    config.runtime.orders.exchange = "SMART"
+    config.runtime.orders.algo.strategy = "Adaptive"
+    config.runtime.orders.algo.params = []
+    return config
+
+
+def _portfolio_manager(mock_config, mock_ib, data_store, mocker, **kwargs):
+    pm = PortfolioManager(
+        mock_config,
+        mock_ib,
+        mocker.Mock(),
+        data_store=data_store,
+        resume_on_reconnect=True,
+        run_stage_order=[
+            "equity_buy_rebalance",
+            "options_write_puts",
+            "post_cash_management",
+        ],
+        **kwargs,
+    )
+    pm.options_trading_enabled = mocker.Mock(return_value=True)
+    pm.load_startup_snapshot = mocker.AsyncMock()
+    pm.report_portfolio_risk = mocker.Mock()
+    pm.initialize_account = mocker.Mock()
+    pm.summarize_account = mocker.AsyncMock(return_value=({}, {}))
+    pm.get_portfolio_positions = mocker.AsyncMock(return_value={})
+    pm.orders.print_summary = mocker.Mock()
+    return pm
+
+
+def test_checkpoint_only_reads_back_when_resuming(data_store):
+    checkpoint = RunCheckpoint(data_store)
+    key = scan_key("AAA", "P", None, None, None, None, None)
+
+    assert checkpoint.begin() == {}
+    checkpoint.complete_stage("options_write_puts", [3, 1])
+    checkpoint.save_scan_result(
+        key, Option("AAA", "20240419", 95.0, "P", "SMART", conId=9)
+    )
+    assert checkpoint.scan_result(key) is None
+
+    assert checkpoint.begin() == {"options_write_puts": {1, 3}}
+    scanned = checkpoint.scan_result(key)
+    assert scanned is not None
+    assert scanned.conId == 9
+
+
+@pytest.mark.asyncio
+async def test_manage_resumes_at_first_unfinished_stage(
+    mock_config, mock_ib, data_store, mocker
+):
+    pm = _portfolio_manager(mock_config, mock_ib, data_store, mocker, dry_run=True)
+    calls = []
+    write_attempts = []
+
+    async def fake_equity(_deps, _account_summary, _portfolio_positions):
+        calls.append("equity")
+        pm.order_ops.enqueue_order(
+            Stock("AAA", "SMART", "USD"), LimitOrder("BUY", 10, 100.0)
+        )
+
+    async def fake_write(_deps, _account_summary, _portfolio_positions, _enabled):
+        calls.append("write")
+        pm.order_ops.enqueue_order(
+            Option("AAA", "20240419", 95.0, "P", "SMART"), LimitOrder("SELL", 1, 1.0)
+        )
+        write_attempts.append(None)
+        if len(write_attempts) == 1:
+            mock_ib.isConnected.return_value = False
+            raise ConnectionError("Socket disconnect")
+
+    async def fake_post(_deps, _account_summary, _portfolio_positions):
+        calls.append("post")
+
+    mocker.patch(
+        "thetagang.portfolio_manager.run_equity_rebalance_stages",
+        side_effect=fake_equity,
+    )
+    mocker.patch(
+        "thetagang.portfolio_manager.run_option_write_stages", side_effect=fake_write
+    )
+    mocker.patch("thetagang.portfolio_manager.run_post_stages", side_effect=fake_post)
+
+    await pm.manage()
+    assert calls == ["equity", "write"]
+    pm.completion_future.set_result.assert_not_called()
+
+    mock_ib.isConnected.return_value = True
+    await pm.manage()
+
+    assert calls == ["equity", "write", "write", "post"]
+    pm.completion_future.set_result.assert_called_once_with(True)
+    assert [order.action for _c, order, _i in pm.orders.records()] == [
+        "BUY",
+        "SELL",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_manage_raises_when_not_resumable(
+    mock_config, mock_ib, data_store, mocker
+):
+    pm = _portfolio_manager(mock_config, mock_ib, data_store, mocker, dry_run=True)
+    pm.resume_on_reconnect = False
+    mock_ib.isConnected.return_value = False
+    mocker.patch(
+        "thetagang.portfolio_manager.run_equity_rebalance_stages",
+        side_effect=ConnectionError("Socket disconnect"),
+    )
+
+    with pytest.raises(ConnectionError):
+        await pm.manage()
+    pm.completion_future.set_result.assert_called_once_with(True)
+
+
+@pytest.mark.asyncio
+async def test_manage_does_not_suspend_on_cancellation(
+    mock_config, mock_ib, data_store, mocker
+):
+    pm = _portfolio_manager(mock_config, mock_ib, data_store, mocker, dry_run=True)
+    mock_ib.isConnected.return_value = False
+    mocker.patch(
+        "thetagang.portfolio_manager.run_equity_rebalance_stages",
+        side_effect=asyncio.CancelledError,
+    )
+
+    with pytest.raises(asyncio.CancelledError):
+        await pm.manage()
+    pm.completion_future.set_result.assert_called_once_with(True)
+
+
+def test_submit_orders_reconciles_intents_placed_before_reconnect(
+    mock_config, mock_ib, data_store, mocker
+):
+    pm = _portfolio_manager(mock_config, mock_ib, data_store, mocker, dry_run=False)
+    assert pm.run_checkpoint is not None
+    pm.run_checkpoint.begin()
+
+    placed = LimitOrder("SELL", 1, 1.0, orderId=5)
+    stale = LimitOrder("SELL", 1, 2.0, orderId=6)
+    pending = LimitOrder("BUY", 10, 100.0)
+    for order in (placed, stale, pending):
+        pm.order_ops.enqueue_order(Stock("AAA", "SMART", "USD"), order)
+    for contract, order, intent_id in pm.orders.records()[:2]:
+        data_store.record_order(contract, order, intent_id=intent_id)
+
+    pm.run_checkpoint.begin()
+    working = SimpleNamespace(order=placed)
+    pm.ibkr.open_trades = mocker.Mock(return_value=[working])
+    pm.ibkr.place_order = mocker.Mock(
+        side_effect=lambda contract, order: SimpleNamespace(order=order)
+    )
+    pm.trades.print_summary = mocker.Mock()
+
+    pm.submit_orders()
+
+    pm.ibkr.place_order.assert_called_once()
+    assert pm.ibkr.place_order.call_args.args[1] is pending
+    assert pm.trades.records()[0] is working
+    assert [trade.order for trade in pm.trades.records()] == [placed, pending]
+
+
+@pytest.mark.asyncio
+async def test_scanner_reuses_contract_chosen_before_reconnect(
+    mock_config, data_store, mocker
+):
+    checkpoint = RunCheckpoint(data_store)
+    checkpoint.begin()
+    chosen = Option("AAA", "20240419", 95.0, "P", "SMART", conId=9)
+    checkpoint.save_scan_result(
+        scan_key("AAA", "P", None, None, None, None, None), chosen
+    )
+    checkpoint.begin()
+
+    ibkr = mocker.Mock()
+    ticker = SimpleNamespace(contract=chosen)
+    ibkr.get_ticker_for_contract = mocker.AsyncMock(return_value=ticker)
+    ibkr.get_chains_for_contract = mocker.AsyncMock()
+    scanner = OptionChainScanner(
+        config=mock_config, ibkr=ibkr, order_ops=mocker.Mock(), checkpoint=checkpoint
+    )
+
+    result = await scanner.find_eligible_contracts(
+        Stock("AAA", "SMART", "USD"), "P", None, minimum_price=lambda: 0.0
+    )
+
+    assert result is ticker
+    assert ibkr.get_ticker_for_contract.await_args.args[0].conId == 9
+    ibkr.get_chains_for_contract.assert_not_awaited()
@@ -95,6 +95,8 @@ async def test_run_option_management_stages_roll_only(mocker):
 
     await run_option_management_stages(deps, {}, {}, options_enabled=True)
 
+    manage_service.check_puts.assert_awaited_once_with({}, prefetch_rolls=True)
+    manage_service.check_calls.assert_awaited_once_with({}, prefetch_rolls=True)
     manage_service.roll_puts.assert_awaited_once_with(["RP"], {})
     manage_service.roll_calls.assert_awaited_once_with(["RC"], {}, {})
     manage_service.close_puts.assert_not_called()
@@ -119,6 +121,7 @@ async def test_run_option_management_stages_close_only(mocker):
 
     await run_option_management_stages(deps, {}, {}, options_enabled=True)
 
+    manage_service.check_puts.assert_awaited_once_with({}, prefetch_rolls=False)
     manage_service.roll_puts.assert_not_called()
     manage_service.roll_calls.assert_not_called()
     manage_service.close_puts.assert_awaited_once_with(["CP"])
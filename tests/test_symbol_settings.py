@@ -0,0 +1,131 @@
+import dataclasses
+
+import pytest
+
+from thetagang.config import Config
+from thetagang.symbol_settings import SymbolSettings
+
+
+def _config() -> Config:
+    return Config.model_validate(
+        {
+            "meta": {"schema_version": 2},
+            "run": {"strategies": ["wheel", "vix_call_hedge"]},
+            "runtime": {
+                "account": {"number": "DUX", "margin_usage": 0.5},
+                "option_chains": {"expirations": 4, "strikes": 10},
+            },
+            "portfolio": {
+                "symbols": {
+                    "AAA": {"weight": 0.4},
+                    "BBB": {
+                        "weight": 0.3,
+                        "delta": 0.25,
+                        "dte": 45,
+                        "max_dte": 60,
+                        "write_threshold": 0.01,
+                        "close_if_unable_to_roll": True,
+                        "calls": {
+                            "delta": 0.2,
+                            "cap_factor": 0.8,
+                            "excess_only": True,
+                            "strike_limit": 150.0,
+                            "maintain_high_water_mark": True,
+                            "write_when": {"green": False},
+                        },
+                        "puts": {
+                            "write_threshold_sigma": 1.5,
+                            "write_when": {"red": False},
+                        },
+                    },
+                    "CCC": {"weight": 0.3, "no_trading": True},
+                }
+            },
+            "strategies": {
+                "wheel": {
+                    "defaults": {
+                        "target": {
+                            "dte": 30,
+                            "minimum_open_interest": 5,
+                            "calls": {"delta": 0.35},
+                        },
+                        "roll_when": {"dte": 7},
+                        "constants": {"write_threshold_sigma": 1.0},
+                    },
+                    "equity_rebalance": {
+                        "defaults": {"mode": "buy_only"},
+                        "symbol_overrides": {"BBB": {"mode": "both"}},
+                    },
+                },
+                "vix_call_hedge": {"enabled": True, "max_dte": 50},
+            },
+        }
+    )
+
+
+def _resolved(config: Config, symbol: str, right: str) -> dict:
+    green, red = config._resolve_can_write_when(symbol, right)
+    policy = config._resolve_wheel_rebalance_policy(symbol)
+    return {
+        "target_delta": config._resolve_target_delta(symbol, right),
+        "write_threshold_sigma": config._resolve_write_threshold_sigma(symbol, right),
+        "write_threshold_perc": config._resolve_write_threshold_perc(symbol, right),
+        "strike_limit": config._resolve_strike_limit(symbol, right),
+        "can_write_when_green": green,
+        "can_write_when_red": red,
+        "target_dte": config._resolve_target_dte(symbol),
+        "max_dte": config._resolve_max_dte_for(symbol),
+        "cap_factor": config._resolve_cap_factor(symbol),
+        "cap_target_floor": config._resolve_cap_target_floor(symbol),
+        "write_excess_calls_only": config._resolve_write_excess_calls_only(symbol),
+        "maintain_high_water_mark": config._resolve_maintain_high_water_mark(symbol),
+        "close_if_unable_to_roll": config._resolve_close_if_unable_to_roll(symbol),
+        "trading_allowed": config._resolve_trading_is_allowed(symbol),
+        "wheel_rebalance_policy": policy,
+        "regime_rebalance_policy": config._resolve_regime_rebalance_policy(symbol),
+        "buy_only_rebalancing": policy.allows_buy(),
+        "sell_only_rebalancing": policy.allows_sell(),
+    }
+
+
+@pytest.mark.parametrize("symbol", ["AAA", "BBB", "CCC", "VIX"])
+@pytest.mark.parametrize("right", ["C", "P"])
+def test_symbol_settings_match_resolvers(symbol: str, right: str) -> None:
+    config = _config()
+    settings = config.symbol_settings(symbol, right)
+    compiled = {
+        field.name: getattr(settings, field.name)
+        for field in dataclasses.fields(SymbolSettings)
+        if field.name not in ("symbol", "right")
+    }
+    assert compiled == _resolved(config, symbol, right)
+
+    assert config.get_target_delta(symbol, right) == settings.target_delta
+    assert config.can_write_when(symbol, right) == (
+        settings.can_write_when_green,
+        settings.can_write_when_red,
+    )
+    assert config.get_max_dte_for(symbol) == settings.max_dte
+    assert config.wheel_rebalance_policy(symbol) == settings.wheel_rebalance_policy
+
+
+def test_symbol_settings_are_compiled_once_and_immutable() -> None:
+    config = _config()
+    settings = config.symbol_settings("BBB", "C")
+
+    assert config.symbol_settings("BBB", "call") is settings
+    assert config.symbol_settings("BBB", "C") is settings
+    assert not hasattr(settings, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        settings.target_delta = 0.5  # type: ignore[misc]
+
+    assert settings.target_delta == 0.2
+    assert config.get_target_delta("AAA", "C") == 0.35
+    assert config.get_max_dte_for("VIX") == 50
+    assert not config.trading_is_allowed("CCC")
+    assert config.can_write_when("BBB", "P") == (config.write_when.puts.green, False)
+
+    account_config = config.for_account(
+        config.runtime.account.model_copy(update={"number": "DUY"})
+    )
+    assert account_config.symbol_settings("BBB", "C") is settings
@@ -29,6 +29,8 @@ def test_watchdog_runs_inside_task(monkeypatch, tmp_path):
     config_path = tmp_path / "thetagang.toml"
     config_path.write_text(tomlkit.dumps(tomlkit.item(base_config)), encoding="utf8")
 
+    monkeypatch.setenv("THETAGANG_CACHE_DIR", str(tmp_path / "cache"))
+
     loop = asyncio.new_event_loop()
     monkeypatch.setattr(tg.util, "getLoop", lambda: loop)
     monkeypatch.setattr(tg, "need_to_exit", lambda *_: False)
@@ -94,7 +96,10 @@ def test_watchdog_runs_inside_task(monkeypatch, tmp_path):
             data_store=None,
             run_stage_flags=None,
             run_stage_order=None,
+            resume_on_reconnect=False,
+            request_scheduler=None,
         ):
+            captured["resume_on_reconnect"] = resume_on_reconnect
             if not completion_future.done():
                 completion_future.set_result(True)
 
@@ -115,3 +120,4 @@ def test_watchdog_runs_inside_task(monkeypatch, tmp_path):
     assert captured["watchdog"].stopped is True
     assert captured["ibc"].terminated is True
     assert captured["ibc"].twsVersion == 1045
+    assert captured["resume_on_reconnect"] is True
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from ib_async import Option, Ticker
+from ib_async.objects import OptionComputation
+
+from thetagang.ticker_readiness import (
+    FIELD_BITS,
+    TickerField,
+    TickerReadiness,
+    wait_for_fields,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def _ticker() -> Ticker:
+    return Ticker(contract=Option("SPY", "20260116", 400.0, "P", "SMART"))
+
+
+def _quote(ticker: Ticker) -> None:
+    ticker.bid, ticker.ask, ticker.bidSize, ticker.askSize = 1.0, 1.2, 1, 1
+
+
+async def test_wait_for_fields_resolves_once_all_fields_arrive() -> None:
+    ticker = _ticker()
+    waiter = asyncio.create_task(
+        wait_for_fields(
+            ticker,
+            [TickerField.MARKET_PRICE, TickerField.GREEKS],
+            [TickerField.OPEN_INTEREST],
+            timeout=5,
+        )
+    )
+    await asyncio.sleep(0)
+    _quote(ticker)
+    ticker.updateEvent.emit(ticker)
+    ticker.modelGreeks = OptionComputation(0, delta=-0.3)
+    ticker.updateEvent.emit(ticker)
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    ticker.putOpenInterest = 1200
+    ticker.updateEvent.emit(ticker)
+
+    assert await waiter == ([], [])
+    assert len(ticker.updateEvent) == 0
+
+
+async def test_wait_for_fields_reports_missing_fields_at_deadline() -> None:
+    ticker = _ticker()
+    _quote(ticker)
+
+    missing = await wait_for_fields(
+        ticker,
+        [TickerField.MIDPOINT, TickerField.GREEKS],
+        [TickerField.OPEN_INTEREST],
+        timeout=0.01,
+    )
+
+    assert missing == ([TickerField.GREEKS], [TickerField.OPEN_INTEREST])
+    assert len(ticker.updateEvent) == 0
+
+
+async def test_readiness_checks_current_state_before_subscribing() -> None:
+    ticker = _ticker()
+    _quote(ticker)
+
+    readiness = TickerReadiness(ticker, FIELD_BITS[TickerField.MIDPOINT])
+
+    assert await readiness.wait(timeout=5) == FIELD_BITS[TickerField.MIDPOINT]
+    assert len(ticker.updateEvent) == 0
+
+
+async def test_readiness_stops_checking_fields_once_seen(mocker) -> None:
+    ticker = _ticker()
+    wanted = FIELD_BITS[TickerField.MIDPOINT] | FIELD_BITS[TickerField.GREEKS]
+    readiness = TickerReadiness(ticker, wanted)
+    midpoint = mocker.spy(ticker, "midpoint")
+    waiter = asyncio.create_task(readiness.wait(timeout=5))
+    await asyncio.sleep(0)
+
+    _quote(ticker)
+    for _ in range(10):
+        ticker.updateEvent.emit(ticker)
+    ticker.modelGreeks = OptionComputation(0, delta=-0.3)
+    ticker.updateEvent.emit(ticker)
+
+    assert await waiter == wanted
+    # One check before subscribing, one on the first update.
+    assert midpoint.call_count == 2
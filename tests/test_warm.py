@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+from ib_async import BarData, OptionChain, Stock
+
+from thetagang.trading_operations import OptionChainScanner, OrderOperations
+from thetagang.warm import history_duration, warm_caches, warm_symbol
+
+
+@pytest.fixture
+def config(mocker):
+    config = mocker.Mock()
+    config.runtime.orders.exchange = "SMART"
+    config.runtime.option_chains.expirations = 1
+    config.runtime.option_chains.strikes = 2
+    config.portfolio.symbols = {
+        "AAPL": SimpleNamespace(primary_exchange="NASDAQ"),
+        "MSFT": SimpleNamespace(primary_exchange="NASDAQ"),
+    }
+    config.strategies.wheel.defaults.constants.daily_stddev_window = "30 D"
+    config.strategies.regime_rebalance.enabled = False
+    config.get_strike_limit.return_value = None
+    config.get_target_dte.return_value = 0
+    config.get_max_dte_for.return_value = None
+    return config
+
+
+def _ibkr(mocker, symbols_failing=()):
+    expiry = (date.today() + timedelta(days=10)).strftime("%Y%m%d")
+
+    async def qualify(*contracts):
+        if contracts and contracts[0].symbol in symbols_failing:
+            return []
+        for index, contract in enumerate(contracts):
+            contract.conId = index + 1
+        return list(contracts)
+
+    async def chains(contract):
+        return [
+            OptionChain(
+                "SMART",
+                contract.conId,
+                contract.symbol,
+                "100",
+                [expiry],
+                [90.0, 95.0, 100.0, 105.0, 110.0],
+            )
+        ]
+
+    ibkr = mocker.Mock()
+    ibkr.qualify_contracts = mocker.AsyncMock(side_effect=qualify)
+    ibkr.get_chains_for_contract = mocker.AsyncMock(side_effect=chains)
+    ibkr.request_historical_data = mocker.AsyncMock(
+        return_value=[BarData(close=close) for close in (98.0, 101.0, 99.0, 100.0)]
+    )
+    return ibkr
+
+
+def _scanner(config, ibkr, mocker):
+    order_ops = OrderOperations(
+        config=config, account_number="DUX", orders=mocker.Mock(), data_store=None
+    )
+    return OptionChainScanner(config=config, ibkr=ibkr, order_ops=order_ops)
+
+
+def test_history_duration_covers_regime_lookback(config):
+    assert history_duration(config, "AAPL") == "30 D"
+    config.strategies.regime_rebalance.enabled = True
+    config.strategies.regime_rebalance.symbols = ["AAPL"]
+    config.strategies.regime_rebalance.lookback_days = 40
+    config.strategies.regime_rebalance.cooldown_days = 5
+    assert history_duration(config, "AAPL") == "70 D"
+    assert history_duration(config, "MSFT") == "30 D"
+
+
+@pytest.mark.asyncio
+async def test_warm_symbol_qualifies_scan_contracts(config, mocker):
+    ibkr = _ibkr(mocker)
+    result = await warm_symbol(config, ibkr, _scanner(config, ibkr, mocker), "AAPL")
+
+    assert result.error is None
+    assert result.con_id == 1
+    assert result.bars == 4
+    assert result.last_close == 100.0
+    assert result.realized_vol is not None
+    assert result.expirations == 1
+    assert result.contracts == 4
+
+    underlying = ibkr.qualify_contracts.await_args_list[0].args[0]
+    assert isinstance(underlying, Stock)
+    assert underlying.primaryExchange == "NASDAQ"
+    options = ibkr.qualify_contracts.await_args_list[1].args
+    assert sorted((option.right, option.strike) for option in options) == [
+        ("C", 95.0),
+        ("C", 100.0),
+        ("P", 100.0),
+        ("P", 105.0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_warm_caches_reports_failures_per_symbol(config, mocker):
+    ibkr = _ibkr(mocker, symbols_failing=("AAPL",))
+    results = await warm_caches(config, ibkr, _scanner(config, ibkr, mocker))
+
+    assert [result.symbol for result in results] == ["AAPL", "MSFT"]
+    assert results[0].error == "not qualified"
+    assert results[1].error is None
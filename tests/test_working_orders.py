@@ -0,0 +1,149 @@
+import pytest
+from ib_async import (
+    IB,
+    ComboLeg,
+    Contract,
+    LimitOrder,
+    Option,
+    OrderStatus,
+    Stock,
+    Trade,
+)
+
+from thetagang.portfolio_manager import PortfolioManager
+from thetagang.working_orders import WorkingOrders, order_stages
+
+
+def _trade(contract, action, order_id, status="Submitted", order_ref=""):
+    return Trade(
+        contract=contract,
+        order=LimitOrder(action, 1, 1.0, orderId=order_id, orderRef=order_ref),
+        orderStatus=OrderStatus(status=status),
+    )
+
+
+@pytest.fixture
+def mock_ib(mocker):
+    mock = mocker.Mock(spec=IB)
+    mock.orderStatusEvent = mocker.Mock()
+    mock.orderStatusEvent.__iadd__ = mocker.Mock(return_value=None)
+    return mock
+
+
+@pytest.fixture
+def mock_config(mocker):
+    config = mocker.Mock()
+    config.runtime.account.number = "TEST123"
+    config.runtime.account.cancel_orders = False
+    config.runtime.ib_async.api_response_wait_time = 1
+    config.runtime.orders.exchange = "SMART"
+    config.runtime.orders.algo.strategy = "Adaptive"
+    config.runtime.orders.algo.params = []
+    return config
+
+
+def test_order_stages_classifies_orders_by_stage():
+    put = Option("AAA", "20240419", 95.0, "P", "SMART")
+    call = Option("VIX", "20240419", 20.0, "C", "SMART")
+    combo = Contract(secType="BAG", symbol="AAA", comboLegs=[ComboLeg(conId=1)])
+    stock = Stock("AAA", "SMART", "USD")
+
+    assert order_stages(put, "SELL", "") == [("P", "options_write_puts")]
+    assert order_stages(call, "BUY", "") == [
+        ("C", "options_close_positions"),
+        ("C", "post_vix_call_hedge"),
+    ]
+    assert order_stages(combo, "BUY", "") == [("", "options_roll_positions")]
+    assert order_stages(stock, "SELL", "") == [("", "equity_sell_rebalance")]
+    assert order_stages(stock, "BUY", "tg:regime-rebalance:AAA") == [
+        ("", "equity_regime_rebalance")
+    ]
+
+
+def test_skip_matches_live_orders_only():
+    combo = Contract(secType="BAG", symbol="BBB", comboLegs=[ComboLeg(conId=1)])
+    working_orders = WorkingOrders()
+    working_orders.rebuild(
+        [
+            _trade(Option("AAA", "20240419", 95.0, "P", "SMART"), "SELL", 1),
+            _trade(Option("CCC", "20240419", 95.0, "P", "SMART"), "SELL", 2, "Filled"),
+            _trade(combo, "BUY", 3),
+            _trade(Stock("DDD", "SMART", "USD"), "BUY", 4),
+        ],
+        exclude_order_ids={4},
+    )
+
+    assert working_orders.skip("AAA", "P", "options_write_puts")
+    assert not working_orders.skip("AAA", "C", "options_write_calls")
+    assert not working_orders.skip("CCC", "P", "options_write_puts")
+    assert working_orders.skip("BBB", "C", "options_roll_positions")
+    assert not working_orders.skip("DDD", "", "equity_buy_rebalance")
+    assert [
+        (key, [trade.order.orderId for trade in trades])
+        for key, trades in working_orders.skipped().items()
+    ] == [
+        (("AAA", "P", "options_write_puts"), [1]),
+        (("BBB", "C", "options_roll_positions"), [3]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_write_puts_skips_symbols_with_working_orders(
+    mock_config, mock_ib, mocker
+):
+    pm = PortfolioManager(mock_config, mock_ib, mocker.Mock(), dry_run=True)
+    mock_ib.openTrades.return_value = [
+        _trade(Option("AAA", "20240419", 95.0, "P", "SMART"), "SELL", 7)
+    ]
+    pm.initialize_account()
+    ticker = mocker.Mock(contract=Option("BBB", "20240419", 45.0, "P", "SMART"))
+    pm.option_scanner.find_eligible_contracts = mocker.AsyncMock(return_value=ticker)
+    mocker.patch(
+        "thetagang.strategies.options_engine.get_higher_price", return_value=1.0
+    )
+
+    await pm.options_engine.write_puts(
+        [("AAA", "NASDAQ", 1, None), ("BBB", "NASDAQ", 1, None)]
+    )
+
+    scanned = pm.option_scanner.find_eligible_contracts.await_args_list
+    assert [call.args[0].symbol for call in scanned] == ["BBB"]
+    assert [contract.symbol for contract, _order, _id in pm.orders.records()] == ["BBB"]
+    mock_ib.cancelOrder.assert_not_called()
+    assert list(pm.working_orders.skipped()) == [("AAA", "P", "options_write_puts")]
+
+
+@pytest.mark.asyncio
+async def test_buy_rebalance_skips_working_symbols_before_sizing(
+    mock_config, mock_ib, mocker
+):
+    pm = PortfolioManager(mock_config, mock_ib, mocker.Mock(), dry_run=True)
+    mock_ib.openTrades.return_value = [_trade(Stock("AAA", "SMART"), "BUY", 7)]
+    pm.initialize_account()
+    mock_config.portfolio.symbols = {
+        symbol: mocker.Mock(
+            weight=0.6,
+            buy_only_min_threshold_shares=None,
+            buy_only_min_threshold_amount=None,
+            buy_only_min_threshold_percent=None,
+            buy_only_min_threshold_percent_relative=None,
+        )
+        for symbol in ("AAA", "BBB")
+    }
+    mock_config.is_buy_only_rebalancing = mocker.Mock(return_value=True)
+    pm.get_buying_power = mocker.Mock(return_value=10000)
+    pm.get_primary_exchange = mocker.Mock(return_value="NASDAQ")
+    pm.ibkr.get_ticker_for_stock = mocker.AsyncMock(
+        return_value=mocker.Mock(marketPrice=mocker.Mock(return_value=100.0))
+    )
+
+    _table, to_buy = await pm.check_buy_only_positions(
+        {"NetLiquidation": mocker.Mock(value=10000)}, {}
+    )
+
+    # BBB's $6,000 target fits the $10,000 budget once AAA no longer
+    # reserves its share; sized together both would be scaled to 5/6.
+    assert to_buy == [("BBB", "NASDAQ", 60)]
+    quoted = pm.ibkr.get_ticker_for_stock.await_args_list
+    assert [call.args[0] for call in quoted] == ["BBB"]
+    assert list(pm.working_orders.skipped()) == [("AAA", "", "equity_buy_rebalance")]
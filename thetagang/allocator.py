@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+
+class Allocation(IntEnum):
+    """Outcome of sizing one symbol."""
+
+    INVALID_PRICE = 0
+    TRADE = 1
+    AT_TARGET = 2
+    BELOW_RELATIVE_THRESHOLD = 3
+    BELOW_MIN_AMOUNT = 4
+    BELOW_MIN_SHARES = 5
+    INSUFFICIENT_FOR_MIN_AMOUNT = 6
+    INSUFFICIENT_FOR_MIN_SHARES = 7
+    INSUFFICIENT_BUYING_POWER = 8
+
+
+@dataclass
+class RebalanceInputs:
+    """Per-symbol inputs for sizing stock rebalances, as parallel arrays.
+
+    ``min_amount`` is 0 and ``min_percent_relative`` NaN where no threshold
+    is configured.
+    """
+
+    symbols: List[str]
+    target_value: np.ndarray
+    price: np.ndarray
+    current: np.ndarray
+    min_shares: np.ndarray
+    min_amount: np.ndarray
+    min_percent_relative: np.ndarray
+
+    @classmethod
+    def build(
+        cls,
+        symbols: Sequence[str],
+        target_value: Sequence[float],
+        price: Sequence[float],
+        current: Sequence[int],
+        min_shares: Sequence[int],
+        min_amount: Sequence[float],
+        min_percent_relative: Sequence[float],
+    ) -> RebalanceInputs:
+        return cls(
+            symbols=list(symbols),
+            target_value=np.asarray(target_value, dtype=float),
+            price=np.asarray(price, dtype=float),
+            current=np.asarray(current, dtype=np.int64),
+            min_shares=np.asarray(min_shares, dtype=np.int64),
+            min_amount=np.asarray(min_amount, dtype=float),
+            min_percent_relative=np.asarray(min_percent_relative, dtype=float),
+        )
+
+
+@dataclass
+class RebalancePlan:
+    """Sized rebalances for every symbol of a ``RebalanceInputs``.
+
+    ``quantity`` is the number of shares to trade where the status is
+    ``TRADE``, and otherwise the quantity that was rejected (0 where nothing
+    was attempted). ``relative_diff`` and ``order_amount`` explain the
+    threshold rejections.
+    """
+
+    symbols: List[str]
+    status: np.ndarray
+    target_shares: np.ndarray
+    quantity: np.ndarray
+    relative_diff: np.ndarray
+    order_amount: np.ndarray
+
+    def __iter__(self) -> Iterator[Tuple[str, Allocation, int, int, float, float]]:
+        for index, symbol in enumerate(self.symbols):
+            yield (
+                symbol,
+                Allocation(int(self.status[index])),
+                int(self.target_shares[index]),
+                int(self.quantity[index]),
+                float(self.relative_diff[index]),
+                float(self.order_amount[index]),
+            )
+
+    def trades(self) -> List[Tuple[str, int]]:
+        return [
+            (symbol, int(quantity))
+            for symbol, status, quantity in zip(
+                self.symbols, self.status, self.quantity
+            )
+            if status == Allocation.TRADE
+        ]
+
+
+def _valid_prices(price: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    valid = np.isfinite(price) & ~np.isclose(price, 0)
+    return valid, np.where(valid, price, 1.0)
+
+
+def target_shares(target_value: np.ndarray, price: np.ndarray) -> np.ndarray:
+    """Whole shares worth ``target_value`` at ``price``; 0 where unpriced."""
+    valid, safe_price = _valid_prices(np.asarray(price, dtype=float))
+    shares = np.floor(np.asarray(target_value, dtype=float) / safe_price)
+    return np.where(valid, shares, 0).astype(np.int64)
+
+
+def put_write_quantities(
+    target: np.ndarray,
+    current: np.ndarray,
+    net_short_puts: np.ndarray,
+    buy_only: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Shares still to acquire and the puts that would acquire them.
+
+    Short puts count as the 100 shares each would be assigned. Buy-only
+    symbols never write puts, so they only report the share gap.
+    """
+    gap = target - current
+    net_target_shares = np.where(buy_only, gap, gap - 100 * net_short_puts)
+    net_target_puts = np.where(buy_only, 0, net_target_shares // 100)
+    return net_target_shares, net_target_puts
+
+
+def plan_buys(inputs: RebalanceInputs, budget: float) -> RebalancePlan:
+    """Size buy-only rebalances for all symbols under one buying-power budget.
+
+    Each symbol first gets the shares that bring it to target, subject to its
+    thresholds. If the buys together cost more than ``budget``, every buy is
+    scaled down by the same fraction and its thresholds are checked again
+    against what remains.
+    """
+    valid, price = _valid_prices(inputs.price)
+    target_value = inputs.target_value
+    current = inputs.current
+    min_shares = inputs.min_shares
+    min_amount = inputs.min_amount
+    has_min_amount = min_amount > 0
+    has_value = target_value > 0
+
+    target = np.where(valid, np.floor(target_value / price), 0).astype(np.int64)
+    quantity = target - current
+    relative_diff = np.where(
+        has_value,
+        (target_value - current * price) / np.where(has_value, target_value, 1),
+        0.0,
+    )
+    below_relative = (
+        valid
+        & ~np.isnan(inputs.min_percent_relative)
+        & has_value
+        & (quantity > 0)
+        & (relative_diff < inputs.min_percent_relative)
+    )
+
+    # A symbol with nothing held starts with one share when a share is enough.
+    seed = (
+        (quantity <= 0)
+        & (current == 0)
+        & has_value
+        & np.where(has_min_amount, min_amount < price, min_shares == 1)
+    )
+    quantity = np.where(seed, 1 - current, quantity)
+
+    active = valid & ~below_relative & (quantity > 0)
+    order_amount = quantity * price
+    short_of_amount = active & has_min_amount & (order_amount < min_amount)
+    # A single share already clears a minimum amount below the share price.
+    single = short_of_amount & (min_amount < price)
+    quantity = np.where(single, 1, quantity)
+    below_min_amount = short_of_amount & ~single
+    below_min_shares = active & ~below_min_amount & (quantity < min_shares)
+    candidates = active & ~below_min_amount & ~below_min_shares
+
+    cost = np.where(candidates, quantity * price, 0.0)
+    total_cost = float(cost.sum())
+    scaled = candidates & (total_cost > budget)
+    allotment = cost * (max(budget, 0.0) / total_cost) if total_cost > 0 else cost
+    quantity = np.where(scaled, np.floor(allotment / price), quantity).astype(np.int64)
+    scaled_amount = quantity * price
+    order_amount = np.where(scaled, scaled_amount, order_amount)
+    short_after_scaling = scaled & has_min_amount & (scaled_amount < min_amount)
+    single_after_scaling = (
+        short_after_scaling & (allotment >= price) & (min_amount < price)
+    )
+    quantity = np.where(single_after_scaling, 1, quantity)
+    insufficient_amount = short_after_scaling & ~single_after_scaling
+    insufficient_shares = scaled & ~insufficient_amount & (quantity < min_shares)
+    trade = candidates & ~insufficient_amount & ~insufficient_shares & (quantity > 0)
+    insufficient = (
+        candidates & ~insufficient_amount & ~insufficient_shares & (quantity <= 0)
+    )
+
+    status = np.select(
+        [
+            ~valid,
+            below_relative,
+            below_min_amount,
+            below_min_shares,
+            insufficient_amount,
+            insufficient_shares,
+            insufficient,
+            trade,
+        ],
+        [
+            Allocation.INVALID_PRICE,
+            Allocation.BELOW_RELATIVE_THRESHOLD,
+            Allocation.BELOW_MIN_AMOUNT,
+            Allocation.BELOW_MIN_SHARES,
+            Allocation.INSUFFICIENT_FOR_MIN_AMOUNT,
+            Allocation.INSUFFICIENT_FOR_MIN_SHARES,
+            Allocation.INSUFFICIENT_BUYING_POWER,
+            Allocation.TRADE,
+        ],
+        Allocation.AT_TARGET,
+    )
+    shown = np.where(
+        (status == Allocation.TRADE)
+        | (status == Allocation.BELOW_MIN_AMOUNT)
+        | (status == Allocation.BELOW_MIN_SHARES),
+        quantity,
+        0,
+    )
+    return RebalancePlan(
+        symbols=inputs.symbols,
+        status=status,
+        target_shares=target,
+        quantity=shown,
+        relative_diff=relative_diff,
+        order_amount=order_amount,
+    )
+
+
+def plan_sells(inputs: RebalanceInputs) -> RebalancePlan:
+    """Size sell-only rebalances for all symbols.
+
+    Sales free buying power rather than consume it, so there is no budget;
+    each symbol only has to clear its own thresholds.
+    """
+    valid, price = _valid_prices(inputs.price)
+    target_value = inputs.target_value
+    current = inputs.current
+    has_value = target_value > 0
+
+    target = np.where(valid, np.floor(target_value / price), 0).astype(np.int64)
+    quantity = current - target
+    relative_diff = np.where(
+        has_value,
+        (current * price - target_value) / np.where(has_value, target_value, 1),
+        0.0,
+    )
+    below_relative = (
+        valid
+        & ~np.isnan(inputs.min_percent_relative)
+        & has_value
+        & (quantity > 0)
+        & (relative_diff < inputs.min_percent_relative)
+    )
+    active = valid & ~below_relative & (quantity > 0)
+    order_amount = quantity * price
+    below_min_amount = (
+        active & (inputs.min_amount > 0) & (order_amount < inputs.min_amount)
+    )
+    below_min_shares = active & ~below_min_amount & (quantity < inputs.min_shares)
+    trade = active & ~below_min_amount & ~below_min_shares
+
+    status = np.select(
+        [~valid, below_relative, below_min_amount, below_min_shares, trade],
+        [
+            Allocation.INVALID_PRICE,
+            Allocation.BELOW_RELATIVE_THRESHOLD,
+            Allocation.BELOW_MIN_AMOUNT,
+            Allocation.BELOW_MIN_SHARES,
+            Allocation.TRADE,
+        ],
+        Allocation.AT_TARGET,
+    )
+    return RebalancePlan(
+        symbols=inputs.symbols,
+        status=status,
+        target_shares=target,
+        quantity=np.where(
+            (status == Allocation.TRADE)
+            | (status == Allocation.BELOW_MIN_AMOUNT)
+            | (status == Allocation.BELOW_MIN_SHARES),
+            quantity,
+            0,
+        ),
+        relative_diff=relative_diff,
+        order_amount=order_amount,
+    )
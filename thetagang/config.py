@@ -5,7 +5,7 @@ from collections import defaultdict
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
 
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
 from rich import box
 from rich.console import Console, Group
 from rich.panel import Panel
@@ -23,6 +23,7 @@ from thetagang.config_models import (
     IBCConfig,
     OptionChainsConfig,
     OrdersConfig,
+    ProfileConfig,
     RegimeRebalanceConfig,
     RollWhenConfig,
     SymbolConfig,
@@ -32,6 +33,7 @@ from thetagang.config_models import (
     WriteWhenConfig,
 )
 from thetagang.fmt import dfmt, ffmt, pfmt
+from thetagang.symbol_settings import SymbolSettings, SymbolSettingsTable
 
 STAGE_KIND_BY_ID: dict[str, str] = {
     "options_write_puts": "options.write_puts",
@@ -248,6 +250,7 @@ class RunConfig(BaseModel):
 
 class RuntimeConfig(BaseModel):
     account: AccountConfig
+    additional_accounts: List[AccountConfig] = Field(default_factory=list)
     option_chains: OptionChainsConfig
     exchange_hours: ExchangeHoursConfig = Field(default_factory=ExchangeHoursConfig)
     orders: OrdersConfig = Field(default_factory=OrdersConfig)
@@ -255,6 +258,19 @@ class RuntimeConfig(BaseModel):
     ib_async: IBAsyncConfig = Field(default_factory=IBAsyncConfig)
     ibc: IBCConfig = Field(default_factory=IBCConfig)
     watchdog: WatchdogConfig = Field(default_factory=WatchdogConfig)
+    profile: ProfileConfig = Field(default_factory=ProfileConfig)
+
+    @model_validator(mode="after")
+    def validate_unique_accounts(self) -> "RuntimeConfig":
+        numbers = [self.account.number] + [
+            account.number for account in self.additional_accounts
+        ]
+        duplicates = sorted({number for number in numbers if numbers.count(number) > 1})
+        if duplicates:
+            raise ValueError(
+                f"runtime account numbers must be unique, duplicated: {', '.join(duplicates)}"
+            )
+        return self
 
 
 class PortfolioConfig(BaseModel):
@@ -415,6 +431,8 @@ class Config(BaseModel, DisplayMixin):
     portfolio: PortfolioConfig
     strategies: StrategiesConfig
 
+    _symbol_settings: Optional[SymbolSettingsTable] = PrivateAttr(default=None)
+
     @model_validator(mode="after")
     def apply_strategy_overrides(self) -> "Config":
         symbols = self.portfolio.symbols
@@ -452,12 +470,37 @@ class Config(BaseModel, DisplayMixin):
             WHEEL_SYMBOL_OVERRIDE_KEYS,
         )
 
+        # Resolve the override chain for every portfolio symbol once, now
+        # that the overrides above are applied. The table is shared by
+        # for_account() copies, which only differ in the runtime section.
+        self._symbol_settings = SymbolSettingsTable(self, self.portfolio.symbols)
         return self
 
+    def symbol_settings(self, symbol: str, right: str) -> SymbolSettings:
+        if self._symbol_settings is None:
+            self._symbol_settings = SymbolSettingsTable(self, self.portfolio.symbols)
+        return self._symbol_settings.get(symbol, right)
+
     @property
     def account(self) -> AccountConfig:
         return self.runtime.account
 
+    @property
+    def accounts(self) -> List[AccountConfig]:
+        return [self.runtime.account, *self.runtime.additional_accounts]
+
+    def for_account(self, account: AccountConfig) -> "Config":
+        """Return a view of this config that runs against ``account``.
+
+        Only the runtime section is copied; symbols and strategies are shared.
+        """
+        if account is self.runtime.account:
+            return self
+        runtime = self.runtime.model_copy(
+            update={"account": account, "additional_accounts": []}
+        )
+        return self.model_copy(update={"runtime": runtime})
+
     @property
     def option_chains(self) -> OptionChainsConfig:
         return self.runtime.option_chains
@@ -518,12 +561,12 @@ class Config(BaseModel, DisplayMixin):
     def regime_rebalance(self) -> RegimeRebalanceStrategyConfig:
         return self.strategies.regime_rebalance
 
-    def wheel_rebalance_policy(self, symbol: str) -> RebalanceExecutionPolicy:
+    def _resolve_wheel_rebalance_policy(self, symbol: str) -> RebalanceExecutionPolicy:
         return self.strategies.wheel.equity_rebalance.resolve(
             symbol, fallback_mode=RebalanceMode.off
         )
 
-    def regime_rebalance_policy(self, symbol: str) -> RebalanceExecutionPolicy:
+    def _resolve_regime_rebalance_policy(self, symbol: str) -> RebalanceExecutionPolicy:
         return self.strategies.regime_rebalance.equity_rebalance.resolve(
             symbol, fallback_mode=RebalanceMode.both
         )
@@ -540,17 +583,15 @@ class Config(BaseModel, DisplayMixin):
             return strategy_value
         return self.runtime.account.margin_usage
 
-    def trading_is_allowed(self, symbol: str) -> bool:
+    def _resolve_trading_is_allowed(self, symbol: str) -> bool:
         symbol_config = self.symbols.get(symbol)
         return not symbol_config or not symbol_config.no_trading
 
     def is_buy_only_rebalancing(self, symbol: str) -> bool:
-        policy = self.wheel_rebalance_policy(symbol)
-        return policy.mode in {RebalanceMode.buy_only, RebalanceMode.both}
+        return self.symbol_settings(symbol, "P").buy_only_rebalancing
 
     def is_sell_only_rebalancing(self, symbol: str) -> bool:
-        policy = self.wheel_rebalance_policy(symbol)
-        return policy.mode in {RebalanceMode.sell_only, RebalanceMode.both}
+        return self.symbol_settings(symbol, "P").sell_only_rebalancing
 
     def is_regime_rebalance_symbol(self, symbol: str) -> bool:
         return self.regime_rebalance.enabled and symbol in self.regime_rebalance.symbols
@@ -558,7 +599,57 @@ class Config(BaseModel, DisplayMixin):
     def symbol_config(self, symbol: str) -> Optional[SymbolConfig]:
         return self.symbols.get(symbol)
 
+    # Per-symbol accessors read the compiled settings table. The
+    # _resolve_* methods below walk the override chain and are only used to
+    # build it.
+
+    def wheel_rebalance_policy(self, symbol: str) -> RebalanceExecutionPolicy:
+        return self.symbol_settings(symbol, "P").wheel_rebalance_policy
+
+    def regime_rebalance_policy(self, symbol: str) -> RebalanceExecutionPolicy:
+        return self.symbol_settings(symbol, "P").regime_rebalance_policy
+
+    def trading_is_allowed(self, symbol: str) -> bool:
+        return self.symbol_settings(symbol, "P").trading_allowed
+
     def get_target_delta(self, symbol: str, right: str) -> float:
+        return self.symbol_settings(symbol, right).target_delta
+
+    def maintain_high_water_mark(self, symbol: str) -> bool:
+        return self.symbol_settings(symbol, "C").maintain_high_water_mark
+
+    def get_write_threshold_sigma(self, symbol: str, right: str) -> Optional[float]:
+        return self.symbol_settings(symbol, right).write_threshold_sigma
+
+    def get_write_threshold_perc(self, symbol: str, right: str) -> float:
+        return self.symbol_settings(symbol, right).write_threshold_perc
+
+    def get_target_dte(self, symbol: str) -> int:
+        return self.symbol_settings(symbol, "P").target_dte
+
+    def get_cap_factor(self, symbol: str) -> float:
+        return self.symbol_settings(symbol, "C").cap_factor
+
+    def get_cap_target_floor(self, symbol: str) -> float:
+        return self.symbol_settings(symbol, "C").cap_target_floor
+
+    def get_strike_limit(self, symbol: str, right: str) -> Optional[float]:
+        return self.symbol_settings(symbol, right).strike_limit
+
+    def write_excess_calls_only(self, symbol: str) -> bool:
+        return self.symbol_settings(symbol, "C").write_excess_calls_only
+
+    def get_max_dte_for(self, symbol: str) -> Optional[int]:
+        return self.symbol_settings(symbol, "P").max_dte
+
+    def can_write_when(self, symbol: str, right: str) -> Tuple[bool, bool]:
+        settings = self.symbol_settings(symbol, right)
+        return (settings.can_write_when_green, settings.can_write_when_red)
+
+    def close_if_unable_to_roll(self, symbol: str) -> bool:
+        return self.symbol_settings(symbol, "P").close_if_unable_to_roll
+
+    def _resolve_target_delta(self, symbol: str, right: str) -> float:
         p_or_c = "calls" if right.upper().startswith("C") else "puts"
         symbol_config = self.symbols.get(symbol)
 
@@ -575,7 +666,7 @@ class Config(BaseModel, DisplayMixin):
 
         return self.target.delta
 
-    def maintain_high_water_mark(self, symbol: str) -> bool:
+    def _resolve_maintain_high_water_mark(self, symbol: str) -> bool:
         symbol_config = self.symbols.get(symbol)
         if (
             symbol_config
@@ -585,7 +676,9 @@ class Config(BaseModel, DisplayMixin):
             return symbol_config.calls.maintain_high_water_mark
         return self.roll_when.calls.maintain_high_water_mark
 
-    def get_write_threshold_sigma(self, symbol: str, right: str) -> Optional[float]:
+    def _resolve_write_threshold_sigma(
+        self, symbol: str, right: str
+    ) -> Optional[float]:
         p_or_c = "calls" if right.upper().startswith("C") else "puts"
         symbol_config = self.symbols.get(symbol)
 
@@ -610,7 +703,7 @@ class Config(BaseModel, DisplayMixin):
 
         return None
 
-    def get_write_threshold_perc(self, symbol: str, right: str) -> float:
+    def _resolve_write_threshold_perc(self, symbol: str, right: str) -> float:
         p_or_c = "calls" if right.upper().startswith("C") else "puts"
         symbol_config = self.symbols.get(symbol)
 
@@ -733,6 +826,9 @@ class Config(BaseModel, DisplayMixin):
         config_table.add_column("Value")
 
         self.account.add_to_table(config_table)
+        for account in self.runtime.additional_accounts:
+            config_table.add_section()
+            account.add_to_table(config_table)
         self.exchange_hours.add_to_table(config_table)
         if self.constants:
             self.constants.add_to_table(config_table)
@@ -759,7 +855,7 @@ class Config(BaseModel, DisplayMixin):
 
         console.print(Panel(tree, title="Config"))
 
-    def get_target_dte(self, symbol: str) -> int:
+    def _resolve_target_dte(self, symbol: str) -> int:
         symbol_config = self.symbols.get(symbol)
         return (
             symbol_config.dte
@@ -767,7 +863,7 @@ class Config(BaseModel, DisplayMixin):
             else self.target.dte
         )
 
-    def get_cap_factor(self, symbol: str) -> float:
+    def _resolve_cap_factor(self, symbol: str) -> float:
         symbol_config = self.symbols.get(symbol)
         if (
             symbol_config is not None
@@ -777,7 +873,7 @@ class Config(BaseModel, DisplayMixin):
             return symbol_config.calls.cap_factor
         return self.write_when.calls.cap_factor
 
-    def get_cap_target_floor(self, symbol: str) -> float:
+    def _resolve_cap_target_floor(self, symbol: str) -> float:
         symbol_config = self.symbols.get(symbol)
         if (
             symbol_config is not None
@@ -787,13 +883,13 @@ class Config(BaseModel, DisplayMixin):
             return symbol_config.calls.cap_target_floor
         return self.write_when.calls.cap_target_floor
 
-    def get_strike_limit(self, symbol: str, right: str) -> Optional[float]:
+    def _resolve_strike_limit(self, symbol: str, right: str) -> Optional[float]:
         p_or_c = "calls" if right.upper().startswith("C") else "puts"
         symbol_config = self.symbols.get(symbol)
         option_config = getattr(symbol_config, p_or_c, None) if symbol_config else None
         return option_config.strike_limit if option_config else None
 
-    def write_excess_calls_only(self, symbol: str) -> bool:
+    def _resolve_write_excess_calls_only(self, symbol: str) -> bool:
         symbol_config = self.symbols.get(symbol)
         if (
             symbol_config is not None
@@ -803,7 +899,7 @@ class Config(BaseModel, DisplayMixin):
             return symbol_config.calls.excess_only
         return self.write_when.calls.excess_only
 
-    def get_max_dte_for(self, symbol: str) -> Optional[int]:
+    def _resolve_max_dte_for(self, symbol: str) -> Optional[int]:
         if symbol == "VIX" and self.vix_call_hedge.max_dte is not None:
             return self.vix_call_hedge.max_dte
         symbol_config = self.symbols.get(symbol)
@@ -811,7 +907,7 @@ class Config(BaseModel, DisplayMixin):
             return symbol_config.max_dte
         return self.target.max_dte
 
-    def can_write_when(self, symbol: str, right: str) -> Tuple[bool, bool]:
+    def _resolve_can_write_when(self, symbol: str, right: str) -> Tuple[bool, bool]:
         symbol_config = self.symbols.get(symbol)
         p_or_c = "calls" if right.upper().startswith("C") else "puts"
         option_config = (
@@ -834,7 +930,7 @@ class Config(BaseModel, DisplayMixin):
         )
         return (can_write_when_green, can_write_when_red)
 
-    def close_if_unable_to_roll(self, symbol: str) -> bool:
+    def _resolve_close_if_unable_to_roll(self, symbol: str) -> bool:
         symbol_config = self.symbols.get(symbol)
         return (
             symbol_config.close_if_unable_to_roll
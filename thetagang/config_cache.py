@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from thetagang import log
+from thetagang.config import Config
+
+# Bump when the pickled layout changes in a way the package version misses.
+CACHE_FORMAT = 2
+MAX_ENTRIES = 16
+
+
+def package_version() -> str:
+    try:
+        from importlib.metadata import version as pkg_version
+
+        return pkg_version("thetagang")
+    except Exception:
+        return os.getenv("THETAGANG_VERSION", "unknown")
+
+
+def config_cache_dir() -> Path:
+    """Where validated configs are cached.
+
+    ``THETAGANG_CACHE_DIR`` overrides the default of ``$XDG_CACHE_HOME/thetagang``
+    (``~/.cache/thetagang``).
+    """
+    override = os.getenv("THETAGANG_CACHE_DIR")
+    if override:
+        return Path(override).expanduser()
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "thetagang"
+
+
+def cache_key(config_text: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{package_version()}\0{CACHE_FORMAT}\0".encode("utf8"))
+    digest.update(config_text.encode("utf8"))
+    return digest.hexdigest()
+
+
+def _entry_path(cache_dir: Path, config_text: str) -> Path:
+    return cache_dir / f"config-{cache_key(config_text)}.pickle"
+
+
+def load_cached_config(
+    config_text: str, cache_dir: Optional[Path] = None
+) -> Optional[Config]:
+    """The validated Config for ``config_text``, or None on a cache miss.
+
+    Entries are only written after a v2 config validated, so a hit skips the
+    schema check, TOML parsing and validation. An entry that no longer
+    unpickles (e.g. a model changed without a version bump) is a miss.
+    """
+    path = _entry_path(cache_dir or config_cache_dir(), config_text)
+    try:
+        with path.open("rb") as cache_file:
+            config = pickle.load(cache_file)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        log.warning(f"Ignoring unreadable config cache entry {path}: {exc}")
+        path.unlink(missing_ok=True)
+        return None
+    try:
+        # Pruning keeps the most recently used entries.
+        os.utime(path)
+    except OSError:
+        pass
+    return config if isinstance(config, Config) else None
+
+
+def store_cached_config(
+    config_text: str, config: Config, cache_dir: Optional[Path] = None
+) -> None:
+    cache_dir = cache_dir or config_cache_dir()
+    path = _entry_path(cache_dir, config_text)
+    try:
+        # Entries are unpickled on load, so only the owner may write them.
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(cache_dir))
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                pickle.dump(config, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, path)
+        except Exception:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        _prune(cache_dir)
+    except Exception as exc:
+        log.warning(f"Failed to cache validated config: {exc}")
+
+
+def _prune(cache_dir: Path) -> None:
+    entries = sorted(
+        cache_dir.glob("config-*.pickle"),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in entries[MAX_ENTRIES:]:
+        entry.unlink(missing_ok=True)
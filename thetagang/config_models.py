@@ -102,15 +102,39 @@ class OrdersConfig(BaseModel, DisplayMixin):
         table.add_row("", "Minimum credit", "=", f"{dfmt(self.minimum_credit)}")
 
 
+class MarketDataModeEnum(str, Enum):
+    streaming = "streaming"
+    snapshot = "snapshot"
+    regulatory_snapshot = "regulatory_snapshot"
+
+
 class IBAsyncConfig(BaseModel):
     api_response_wait_time: int = Field(default=60, ge=0)
     logfile: Optional[str] = None
+    connections: int = Field(default=1, ge=1)
+    quote_mode: MarketDataModeEnum = Field(default=MarketDataModeEnum.snapshot)
 
 
 class DatabaseConfig(BaseModel, DisplayMixin):
+    class Retention(BaseModel):
+        run_on_exit: bool = Field(default=False)
+        raw_days: int = Field(default=90, ge=1)
+        batch_size: int = Field(default=5000, ge=1)
+        vacuum_pages: int = Field(default=2000, ge=0)
+
+    class Snapshots(BaseModel):
+        mode: Literal["delta", "full"] = Field(default="delta")
+        base_every: int = Field(default=100, ge=1)
+
     enabled: bool = Field(default=True)
     path: str = Field(default="data/thetagang.db")
     url: Optional[str] = None
+    retention: "DatabaseConfig.Retention" = Field(
+        default_factory=lambda: DatabaseConfig.Retention()
+    )
+    snapshots: "DatabaseConfig.Snapshots" = Field(
+        default_factory=lambda: DatabaseConfig.Snapshots()
+    )
 
     def add_to_table(self, table: Table, section: str = "") -> None:
         table.add_section()
@@ -119,6 +143,9 @@ class DatabaseConfig(BaseModel, DisplayMixin):
         table.add_row("", "Path", "=", self.path)
         if self.url:
             table.add_row("", "URL", "=", self.url)
+        table.add_row("", "Retention on exit", "=", f"{self.retention.run_on_exit}")
+        table.add_row("", "Raw row retention", "=", f"{self.retention.raw_days} days")
+        table.add_row("", "Snapshot storage", "=", self.snapshots.mode)
 
     def resolve_url(self, config_path: str) -> str:
         if self.url:
@@ -130,6 +157,20 @@ class DatabaseConfig(BaseModel, DisplayMixin):
         return f"sqlite:///{db_path}"
 
 
+class ProfileConfig(BaseModel):
+    enabled: bool = Field(default=False)
+    directory: str = Field(default="data/profiles")
+    memory: bool = Field(default=True)
+    top_allocations: int = Field(default=25, ge=1)
+    entry_points: bool = Field(default=False)
+
+    def resolve_directory(self, config_path: str) -> Path:
+        directory = Path(self.directory).expanduser()
+        if not directory.is_absolute():
+            directory = Path(config_path).resolve().parent / directory
+        return directory
+
+
 class IBCConfig(BaseModel):
     tradingMode: Literal["live", "paper"] = Field(default="paper")
     password: Optional[str] = None
@@ -523,6 +564,7 @@ class SymbolConfig(BaseModel):
     puts: Optional["SymbolConfig.Puts"] = None
     volatility_weight: Optional["SymbolConfig.VolatilityWeight"] = None
     adjust_price_after_delay: bool = Field(default=False)
+    beta: float = Field(default=1.0)
     no_trading: Optional[bool] = None
     buy_only_rebalancing: Optional[bool] = None
     buy_only_min_threshold_shares: Optional[int] = Field(default=None, ge=1)
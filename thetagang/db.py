@@ -2,26 +2,34 @@ from __future__ import annotations
 
 import json
 import logging
+import math
 import os
 import platform
 import shutil
 from contextlib import contextmanager
 from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, Iterator, Mapping, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
 from alembic.config import Config as AlembicConfig
 from sqlalchemy import (
     Boolean,
+    Date,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
     create_engine,
+    delete,
+    func,
+    insert,
+    or_,
     select,
+    true,
 )
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.engine.url import make_url
@@ -49,6 +57,8 @@ class Run(Base):
     version: Mapped[str] = mapped_column(String, nullable=False)
     hostname: Mapped[str] = mapped_column(String, nullable=False)
     config_text: Mapped[Optional[str]] = mapped_column(Text)
+    account_number: Mapped[Optional[str]] = mapped_column(String)
+    profile_dir: Mapped[Optional[str]] = mapped_column(String)
 
 
 class Event(Base):
@@ -56,7 +66,7 @@ class Event(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, index=True)
     event_type: Mapped[str] = mapped_column(String, nullable=False)
     symbol: Mapped[Optional[str]] = mapped_column(String)
     payload: Mapped[Optional[str]] = mapped_column(Text)
@@ -67,7 +77,7 @@ class AccountSnapshot(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, index=True)
     summary_json: Mapped[str] = mapped_column(Text, nullable=False)
 
 
@@ -75,8 +85,10 @@ class PositionSnapshot(Base):
     __tablename__ = "position_snapshots"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    run_id: Mapped[int] = mapped_column(
+        ForeignKey("runs.id"), nullable=False, index=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, index=True)
     symbol: Mapped[str] = mapped_column(String, nullable=False)
     con_id: Mapped[Optional[int]] = mapped_column(Integer)
     sec_type: Mapped[Optional[str]] = mapped_column(String)
@@ -92,6 +104,26 @@ class PositionSnapshot(Base):
     expiry: Mapped[Optional[str]] = mapped_column(String)
     strike: Mapped[Optional[float]] = mapped_column(Float)
     right: Mapped[Optional[str]] = mapped_column(String)
+    removed: Mapped[bool] = mapped_column(Boolean, default=False)
+
+
+class SnapshotLog(Base):
+    """One row per position or account snapshot, whether it wrote rows or not.
+
+    A base snapshot holds the complete state; the snapshots after it only hold
+    what changed, so the state as of any run is its latest base plus the
+    changes since.
+    """
+
+    __tablename__ = "snapshot_log"
+    __table_args__ = (Index("ix_snapshot_log_kind_run", "kind", "run_id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, index=True)
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    base: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    rows: Mapped[int] = mapped_column(Integer, nullable=False)
 
 
 class OrderIntent(Base):
@@ -132,7 +164,7 @@ class OrderRecord(Base):
     limit_price: Mapped[Optional[float]] = mapped_column(Float)
     order_type: Mapped[Optional[str]] = mapped_column(String)
     order_ref: Mapped[Optional[str]] = mapped_column(String)
-    order_id: Mapped[Optional[int]] = mapped_column(Integer)
+    order_id: Mapped[Optional[int]] = mapped_column(Integer, index=True)
 
 
 class OrderStatus(Base):
@@ -140,7 +172,7 @@ class OrderStatus(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, index=True)
     order_id: Mapped[Optional[int]] = mapped_column(Integer)
     status: Mapped[Optional[str]] = mapped_column(String)
     filled: Mapped[Optional[float]] = mapped_column(Float)
@@ -152,6 +184,9 @@ class OrderStatus(Base):
 
 class ExecutionRecord(Base):
     __tablename__ = "executions"
+    __table_args__ = (
+        Index("ix_executions_symbol_execution_time", "symbol", "execution_time"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), nullable=False)
@@ -165,6 +200,17 @@ class ExecutionRecord(Base):
     price: Mapped[Optional[float]] = mapped_column(Float)
     execution_time: Mapped[Optional[datetime]] = mapped_column(DateTime)
     exchange: Mapped[Optional[str]] = mapped_column(String)
+    account_number: Mapped[Optional[str]] = mapped_column(String)
+
+
+class ExecutionSyncState(Base):
+    __tablename__ = "execution_sync"
+
+    account_number: Mapped[str] = mapped_column(String, primary_key=True)
+    last_execution_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, nullable=False
+    )
 
 
 class HistoricalBar(Base):
@@ -187,6 +233,202 @@ class HistoricalBar(Base):
     average: Mapped[Optional[float]] = mapped_column(Float)
 
 
+class RegimeWindowState(Base):
+    __tablename__ = "regime_windows"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, nullable=False
+    )
+    last_date: Mapped[date] = mapped_column(Date, nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class RunCheckpointRecord(Base):
+    __tablename__ = "run_checkpoints"
+
+    run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), primary_key=True)
+    kind: Mapped[str] = mapped_column(String, primary_key=True)
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, nullable=False
+    )
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class RiskSnapshot(Base):
+    __tablename__ = "risk_snapshots"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    run_id: Mapped[int] = mapped_column(
+        ForeignKey("runs.id"), nullable=False, index=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, index=True)
+    # NULL for the account-level total.
+    symbol: Mapped[Optional[str]] = mapped_column(String)
+    delta: Mapped[float] = mapped_column(Float, nullable=False)
+    dollar_delta: Mapped[float] = mapped_column(Float, nullable=False)
+    beta_weighted_delta: Mapped[float] = mapped_column(Float, nullable=False)
+    gamma: Mapped[float] = mapped_column(Float, nullable=False)
+    theta: Mapped[float] = mapped_column(Float, nullable=False)
+    option_lines: Mapped[int] = mapped_column(Integer, nullable=False)
+    missing_greeks: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class MarketDataCacheEntry(Base):
+    __tablename__ = "market_data_cache"
+
+    namespace: Mapped[str] = mapped_column(String, primary_key=True)
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class PositionDaily(Base):
+    __tablename__ = "position_daily"
+    __table_args__ = (
+        UniqueConstraint(
+            "day",
+            "config_path",
+            "account_number",
+            "symbol",
+            "con_id",
+            name="uniq_position_daily",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    config_path: Mapped[str] = mapped_column(String, nullable=False, default="")
+    account_number: Mapped[str] = mapped_column(String, nullable=False, default="")
+    symbol: Mapped[str] = mapped_column(String, nullable=False)
+    con_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sec_type: Mapped[Optional[str]] = mapped_column(String)
+    expiry: Mapped[Optional[str]] = mapped_column(String)
+    strike: Mapped[Optional[float]] = mapped_column(Float)
+    right: Mapped[Optional[str]] = mapped_column(String)
+    currency: Mapped[Optional[str]] = mapped_column(String)
+    samples: Mapped[int] = mapped_column(Integer, nullable=False)
+    min_position: Mapped[Optional[float]] = mapped_column(Float)
+    max_position: Mapped[Optional[float]] = mapped_column(Float)
+    last_position: Mapped[Optional[float]] = mapped_column(Float)
+    last_avg_cost: Mapped[Optional[float]] = mapped_column(Float)
+    last_market_price: Mapped[Optional[float]] = mapped_column(Float)
+    last_market_value: Mapped[Optional[float]] = mapped_column(Float)
+    last_unrealized_pnl: Mapped[Optional[float]] = mapped_column(Float)
+    last_realized_pnl: Mapped[Optional[float]] = mapped_column(Float)
+
+
+class AccountDaily(Base):
+    __tablename__ = "account_daily"
+    __table_args__ = (
+        UniqueConstraint(
+            "day", "config_path", "account_number", name="uniq_account_daily"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    config_path: Mapped[str] = mapped_column(String, nullable=False, default="")
+    account_number: Mapped[str] = mapped_column(String, nullable=False, default="")
+    samples: Mapped[int] = mapped_column(Integer, nullable=False)
+    net_liquidation_open: Mapped[Optional[float]] = mapped_column(Float)
+    net_liquidation_high: Mapped[Optional[float]] = mapped_column(Float)
+    net_liquidation_low: Mapped[Optional[float]] = mapped_column(Float)
+    net_liquidation_close: Mapped[Optional[float]] = mapped_column(Float)
+    last_summary_json: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class EventDaily(Base):
+    __tablename__ = "event_daily"
+    __table_args__ = (
+        UniqueConstraint("day", "event_type", "symbol", name="uniq_event_daily"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    event_type: Mapped[str] = mapped_column(String, nullable=False)
+    symbol: Mapped[str] = mapped_column(String, nullable=False, default="")
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class OrderStatusDaily(Base):
+    __tablename__ = "order_status_daily"
+    __table_args__ = (
+        UniqueConstraint("day", "order_id", "status", name="uniq_order_status_daily"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    order_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="")
+    perm_id: Mapped[Optional[int]] = mapped_column(Integer)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_filled: Mapped[Optional[float]] = mapped_column(Float)
+    last_remaining: Mapped[Optional[float]] = mapped_column(Float)
+    last_avg_fill_price: Mapped[Optional[float]] = mapped_column(Float)
+
+
+class ReportDaily(Base):
+    """Order and fill totals per day, account, symbol, stage and security type.
+
+    Maintained incrementally from the raw tables by ``thetagang.reporting``.
+    Values are in dollars, with option prices multiplied out.
+    """
+
+    __tablename__ = "report_daily"
+    __table_args__ = (
+        UniqueConstraint(
+            "day",
+            "account_number",
+            "symbol",
+            "stage",
+            "sec_type",
+            name="uniq_report_daily",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    account_number: Mapped[str] = mapped_column(String, nullable=False, default="")
+    symbol: Mapped[str] = mapped_column(String, nullable=False, default="")
+    stage: Mapped[str] = mapped_column(String, nullable=False, default="")
+    sec_type: Mapped[str] = mapped_column(String, nullable=False, default="")
+    intents: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    orders: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fills: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    quantity: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    buy_value: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sell_value: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    slippage: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    priced_fills: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class ReportRun(Base):
+    __tablename__ = "report_runs"
+
+    run_id: Mapped[int] = mapped_column(ForeignKey("runs.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    account_number: Mapped[str] = mapped_column(String, nullable=False, default="")
+    dry_run: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    ended_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    success: Mapped[Optional[bool]] = mapped_column(Boolean)
+    resumes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class ReportWatermark(Base):
+    """The last raw row of each source table folded into the report tables."""
+
+    __tablename__ = "report_watermarks"
+
+    source: Mapped[str] = mapped_column(String, primary_key=True)
+    last_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
 def sqlite_db_path(db_url: str) -> Optional[Path]:
     url = make_url(db_url)
     if not url.drivername.startswith("sqlite"):
@@ -258,6 +500,9 @@ class DataStore:
         config_path: str,
         dry_run: bool,
         config_text: Optional[str] = None,
+        account_number: Optional[str] = None,
+        snapshot_mode: str = "delta",
+        snapshot_base_every: int = 100,
     ) -> None:
         if not db_url.startswith("sqlite"):
             raise ValueError("Only sqlite database URLs are supported.")
@@ -270,6 +515,9 @@ class DataStore:
         self.Session = sessionmaker(bind=self.engine, future=True)
         run_migrations(db_url)
         self.dry_run = dry_run
+        self.account_number = account_number
+        self.snapshot_mode = snapshot_mode
+        self.snapshot_base_every = snapshot_base_every
         self.run_id = self._create_run(config_path, dry_run, config_text)
 
     @contextmanager
@@ -303,11 +551,31 @@ class DataStore:
                 version=version,
                 hostname=hostname,
                 config_text=config_text,
+                account_number=self.account_number,
             )
             session.add(run)
             session.flush()
             return int(run.id)
 
+    def _same_account(self, column: Any) -> Any:
+        """Filter rows to this store's account.
+
+        Rows written before accounts were tracked have no account number and
+        belong to every account.
+        """
+        if not self.account_number:
+            return true()
+        return or_(column == self.account_number, column.is_(None))
+
+    def set_profile_dir(self, profile_dir: str) -> None:
+        try:
+            with self.session_scope() as session:
+                run = session.get(Run, self.run_id)
+                if run is not None:
+                    run.profile_dir = profile_dir
+        except Exception as exc:
+            log.warning(f"Failed to record profile directory: {exc}")
+
     def record_event(
         self,
         event_type: str,
@@ -337,6 +605,7 @@ class DataStore:
                     .filter(Event.event_type == event_type)
                     .filter(Run.config_path == self.config_path)
                     .filter(Run.dry_run.is_(False))
+                    .filter(self._same_account(Run.account_number))
                     .order_by(Event.created_at.desc())
                     .first()
                 )
@@ -348,6 +617,91 @@ class DataStore:
             log.warning(f"Failed to read event {event_type}: {exc}")
             return None
 
+    def _same_series(self, column: Any) -> Any:
+        """Filter runs to this store's account, excluding unscoped rows."""
+        if not self.account_number:
+            return column.is_(None)
+        return column == self.account_number
+
+    def _snapshot_chain(
+        self, session: Any, kind: str, run_id: Optional[int] = None
+    ) -> List[SnapshotLog]:
+        """This store's ``kind`` snapshots from the latest base up to ``run_id``."""
+        series = (
+            select(SnapshotLog)
+            .join(Run, SnapshotLog.run_id == Run.id)
+            .where(SnapshotLog.kind == kind)
+            .where(Run.config_path == self.config_path)
+            .where(self._same_series(Run.account_number))
+        )
+        if run_id is not None:
+            series = series.where(SnapshotLog.run_id <= run_id)
+        base = session.scalars(
+            series.where(SnapshotLog.base.is_(True))
+            .order_by(SnapshotLog.id.desc())
+            .limit(1)
+        ).first()
+        if base is None:
+            return []
+        return list(
+            session.scalars(
+                series.where(SnapshotLog.id >= base.id).order_by(SnapshotLog.id)
+            )
+        )
+
+    def _is_base(self, chain: List[SnapshotLog], now: datetime) -> bool:
+        # A base on the first snapshot of each day keeps every day that
+        # retention leaves behind reconstructible on its own.
+        return (
+            self.snapshot_mode != "delta"
+            or not chain
+            or chain[0].created_at.date() != now.date()
+            or len(chain) >= self.snapshot_base_every
+        )
+
+    def _positions_state(
+        self, session: Any, chain: List[SnapshotLog]
+    ) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        if not chain:
+            return {}
+        # Only the newest row of each position since the base matters.
+        latest = (
+            select(func.max(PositionSnapshot.id))
+            .where(PositionSnapshot.run_id.in_({entry.run_id for entry in chain}))
+            .where(PositionSnapshot.created_at >= chain[0].created_at)
+            .group_by(
+                PositionSnapshot.symbol, func.coalesce(PositionSnapshot.con_id, 0)
+            )
+        )
+        names = ("symbol", "con_id", *POSITION_FIELDS)
+        rows = session.execute(
+            select(*(getattr(PositionSnapshot, name) for name in names))
+            .where(PositionSnapshot.id.in_(latest))
+            .where(PositionSnapshot.removed.is_(False))
+            .order_by(PositionSnapshot.id)
+        )
+        state: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        for values in rows:
+            row = dict(zip(names, values))
+            state[(row["symbol"], row["con_id"] or 0)] = row
+        return state
+
+    def _account_state(
+        self, session: Any, chain: List[SnapshotLog]
+    ) -> Dict[str, Dict[str, Optional[str]]]:
+        if not chain:
+            return {}
+        rows = session.scalars(
+            select(AccountSnapshot.summary_json)
+            .where(AccountSnapshot.run_id.in_({entry.run_id for entry in chain}))
+            .where(AccountSnapshot.created_at >= chain[0].created_at)
+            .order_by(AccountSnapshot.id)
+        )
+        state: Dict[str, Dict[str, Optional[str]]] = {}
+        for summary_json in rows:
+            apply_account_changes(state, json.loads(summary_json))
+        return state
+
     def record_account_snapshot(self, summary: Dict[str, Any]) -> None:
         try:
             payload: Dict[str, Dict[str, Optional[str]]] = {}
@@ -356,11 +710,30 @@ class DataStore:
                     "value": getattr(value, "value", None),
                     "currency": getattr(value, "currency", None),
                 }
+            now = utcnow()
             with self.session_scope() as session:
+                chain = self._snapshot_chain(session, "account")
+                base = self._is_base(chain, now)
+                changes = (
+                    payload
+                    if base
+                    else account_changes(self._account_state(session, chain), payload)
+                )
+                if base or changes:
+                    session.add(
+                        AccountSnapshot(
+                            run_id=self.run_id,
+                            created_at=now,
+                            summary_json=json.dumps(changes, default=str),
+                        )
+                    )
                 session.add(
-                    AccountSnapshot(
+                    SnapshotLog(
                         run_id=self.run_id,
-                        summary_json=json.dumps(payload, default=str),
+                        created_at=now,
+                        kind="account",
+                        base=base,
+                        rows=int(base or bool(changes)),
                     )
                 )
         except Exception as exc:
@@ -368,40 +741,103 @@ class DataStore:
 
     def record_positions_snapshot(self, positions: Mapping[str, Iterable[Any]]) -> None:
         try:
-            now = datetime.now(timezone.utc).replace(tzinfo=None)
-            rows = []
+            current: Dict[Tuple[str, int], Dict[str, Any]] = {}
             for symbol, items in positions.items():
                 for position in items:
                     contract = getattr(position, "contract", None)
-                    rows.append(
-                        PositionSnapshot(
-                            run_id=self.run_id,
-                            created_at=now,
-                            symbol=symbol,
-                            con_id=getattr(contract, "conId", None),
-                            sec_type=getattr(contract, "secType", None),
-                            position=getattr(position, "position", None),
-                            avg_cost=getattr(position, "averageCost", None),
-                            market_price=getattr(position, "marketPrice", None),
-                            market_value=getattr(position, "marketValue", None),
-                            unrealized_pnl=getattr(position, "unrealizedPNL", None),
-                            realized_pnl=getattr(position, "realizedPNL", None),
-                            currency=getattr(contract, "currency", None),
-                            exchange=getattr(contract, "exchange", None),
-                            multiplier=getattr(contract, "multiplier", None),
-                            expiry=getattr(
-                                contract, "lastTradeDateOrContractMonth", None
-                            ),
-                            strike=getattr(contract, "strike", None),
-                            right=getattr(contract, "right", None),
-                        )
+                    con_id = getattr(contract, "conId", None)
+                    current[(symbol, con_id or 0)] = dict(
+                        symbol=symbol,
+                        con_id=con_id,
+                        sec_type=getattr(contract, "secType", None),
+                        position=getattr(position, "position", None),
+                        avg_cost=getattr(position, "averageCost", None),
+                        market_price=getattr(position, "marketPrice", None),
+                        market_value=getattr(position, "marketValue", None),
+                        unrealized_pnl=getattr(position, "unrealizedPNL", None),
+                        realized_pnl=getattr(position, "realizedPNL", None),
+                        currency=getattr(contract, "currency", None),
+                        exchange=getattr(contract, "exchange", None),
+                        multiplier=getattr(contract, "multiplier", None),
+                        expiry=getattr(contract, "lastTradeDateOrContractMonth", None),
+                        strike=getattr(contract, "strike", None),
+                        right=getattr(contract, "right", None),
                     )
-            if rows:
-                with self.session_scope() as session:
-                    session.add_all(rows)
+            now = utcnow()
+            with self.session_scope() as session:
+                chain = self._snapshot_chain(session, "positions")
+                base = self._is_base(chain, now)
+                previous = {} if base else self._positions_state(session, chain)
+                rows = [
+                    {
+                        "run_id": self.run_id,
+                        "created_at": now,
+                        "removed": False,
+                        **values,
+                    }
+                    for values in position_changes(previous, current)
+                ]
+                if rows:
+                    session.execute(insert(PositionSnapshot), rows)
+                session.add(
+                    SnapshotLog(
+                        run_id=self.run_id,
+                        created_at=now,
+                        kind="positions",
+                        base=base,
+                        rows=len(rows),
+                    )
+                )
         except Exception as exc:
             log.warning(f"Failed to record positions snapshot: {exc}")
 
+    def get_positions_snapshot(
+        self, run_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Positions as of ``run_id`` (default: the latest snapshot)."""
+        try:
+            with self.session_scope() as session:
+                chain = self._snapshot_chain(session, "positions", run_id)
+                return list(self._positions_state(session, chain).values())
+        except Exception as exc:
+            log.warning(f"Failed to read positions snapshot: {exc}")
+            return []
+
+    def get_account_snapshot(
+        self, run_id: Optional[int] = None
+    ) -> Dict[str, Dict[str, Optional[str]]]:
+        """Account summary as of ``run_id`` (default: the latest snapshot)."""
+        try:
+            with self.session_scope() as session:
+                chain = self._snapshot_chain(session, "account", run_id)
+                return self._account_state(session, chain)
+        except Exception as exc:
+            log.warning(f"Failed to read account snapshot: {exc}")
+            return {}
+
+    def record_risk_snapshot(self, risk: Any) -> None:
+        try:
+            now = utcnow()
+            rows = [
+                RiskSnapshot(
+                    run_id=self.run_id,
+                    created_at=now,
+                    symbol=row.symbol or None,
+                    delta=row.delta,
+                    dollar_delta=row.dollar_delta,
+                    beta_weighted_delta=row.beta_weighted_delta,
+                    gamma=row.gamma,
+                    theta=row.theta,
+                    option_lines=row.option_lines,
+                    missing_greeks=row.missing_greeks,
+                )
+                for row in [*risk.symbols.values(), risk.total]
+            ]
+            with self.session_scope() as session:
+                session.add_all(rows)
+        except Exception as exc:
+            log.warning(f"Failed to record risk snapshot: {exc}")
+
     def record_order_intent(self, contract: Any, order: Any) -> Optional[int]:
         try:
 
@@ -484,7 +920,16 @@ class DataStore:
         except Exception as exc:
             log.warning(f"Failed to record order status: {exc}")
 
-    def record_executions(self, fills: Iterable[Any]) -> None:
+    def record_executions(
+        self, fills: Iterable[Any], sync_account: Optional[str] = None
+    ) -> Optional[int]:
+        """Insert fills not seen before and return how many were new.
+
+        With ``sync_account``, the account's execution high-water mark is
+        advanced to the newest fill in the same transaction, so a failed
+        insert never moves it past fills that were not stored. Returns None
+        when nothing could be written.
+        """
         try:
             rows = []
             for fill in fills:
@@ -506,15 +951,64 @@ class DataStore:
                         price=getattr(execution, "price", None),
                         execution_time=exec_time,
                         exchange=getattr(execution, "exchange", None),
+                        account_number=(getattr(execution, "acctNumber", None) or None),
                     )
                 )
-            if rows:
-                with self.session_scope() as session:
-                    stmt = sqlite_insert(ExecutionRecord).values(rows)
-                    stmt = stmt.on_conflict_do_nothing(index_elements=["exec_id"])
-                    session.execute(stmt)
+            if not rows:
+                return 0
+            newest = max(
+                (row["execution_time"] for row in rows if row["execution_time"]),
+                default=None,
+            )
+            with self.session_scope() as session:
+                stmt = sqlite_insert(ExecutionRecord).values(rows)
+                stmt = stmt.on_conflict_do_nothing(index_elements=["exec_id"])
+                recorded = session.execute(stmt).rowcount or 0
+                if sync_account is not None and newest is not None:
+                    session.execute(self._high_water_mark_upsert(sync_account, newest))
+                return recorded
         except Exception as exc:
             log.warning(f"Failed to record executions: {exc}")
+        return None
+
+    def get_execution_high_water_mark(self, account_number: str) -> Optional[datetime]:
+        try:
+            with self.session_scope() as session:
+                state = session.get(ExecutionSyncState, account_number)
+                return state.last_execution_time if state else None
+        except Exception as exc:
+            log.warning(f"Failed to read execution sync state: {exc}")
+            return None
+
+    def advance_execution_high_water_mark(
+        self, account_number: str, execution_time: datetime
+    ) -> None:
+        try:
+            with self.session_scope() as session:
+                session.execute(
+                    self._high_water_mark_upsert(account_number, execution_time)
+                )
+        except Exception as exc:
+            log.warning(f"Failed to record execution sync state: {exc}")
+
+    @staticmethod
+    def _high_water_mark_upsert(account_number: str, execution_time: datetime) -> Any:
+        stmt = sqlite_insert(ExecutionSyncState).values(
+            account_number=account_number,
+            last_execution_time=execution_time,
+            updated_at=utcnow(),
+        )
+        # The mark only moves forward, even if an older fill arrives late.
+        return stmt.on_conflict_do_update(
+            index_elements=["account_number"],
+            set_={
+                "last_execution_time": func.max(
+                    ExecutionSyncState.last_execution_time,
+                    stmt.excluded.last_execution_time,
+                ),
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
 
     def record_historical_bars(
         self, symbol: str, timeframe: str, bars: Iterable[Any]
@@ -559,6 +1053,177 @@ class DataStore:
         except Exception as exc:
             log.warning(f"Failed to record historical bars: {exc}")
 
+    def record_checkpoint(self, kind: str, key: str, payload: Any) -> None:
+        try:
+            with self.session_scope() as session:
+                stmt = sqlite_insert(RunCheckpointRecord).values(
+                    run_id=self.run_id,
+                    kind=kind,
+                    key=key,
+                    created_at=utcnow(),
+                    payload=json.dumps(payload),
+                )
+                session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["run_id", "kind", "key"],
+                        set_={
+                            "created_at": stmt.excluded.created_at,
+                            "payload": stmt.excluded.payload,
+                        },
+                    )
+                )
+        except Exception as exc:
+            log.warning(f"Failed to record run checkpoint: {exc}")
+
+    def get_checkpoints(self, kind: str) -> Dict[str, Any]:
+        """This run's checkpoints of ``kind``, by key, oldest first."""
+        try:
+            with self.session_scope() as session:
+                rows = session.execute(
+                    select(RunCheckpointRecord.key, RunCheckpointRecord.payload)
+                    .where(RunCheckpointRecord.run_id == self.run_id)
+                    .where(RunCheckpointRecord.kind == kind)
+                    .order_by(RunCheckpointRecord.created_at)
+                ).all()
+            return {key: json.loads(payload) for key, payload in rows}
+        except Exception as exc:
+            log.warning(f"Failed to read run checkpoints: {exc}")
+            return {}
+
+    def get_submitted_order_ids(self) -> Dict[int, Optional[int]]:
+        """Order ids of this run's submitted intents, by intent id."""
+        try:
+            with self.session_scope() as session:
+                rows = session.execute(
+                    select(OrderRecord.intent_id, OrderRecord.order_id)
+                    .where(OrderRecord.run_id == self.run_id)
+                    .where(OrderRecord.intent_id.is_not(None))
+                ).all()
+            return {int(intent_id): order_id for intent_id, order_id in rows}
+        except Exception as exc:
+            log.warning(f"Failed to read submitted orders: {exc}")
+            return {}
+
+    def get_historical_bars(
+        self, symbol: str, timeframe: str, start: datetime
+    ) -> List[Dict[str, Any]]:
+        try:
+            with self.session_scope() as session:
+                rows = session.execute(
+                    select(HistoricalBar)
+                    .where(HistoricalBar.symbol == symbol)
+                    .where(HistoricalBar.timeframe == timeframe)
+                    .where(HistoricalBar.bar_time >= start)
+                    .order_by(HistoricalBar.bar_time)
+                ).scalars()
+                return [
+                    dict(
+                        bar_time=row.bar_time,
+                        open=row.open,
+                        high=row.high,
+                        low=row.low,
+                        close=row.close,
+                        volume=row.volume,
+                        bar_count=row.bar_count,
+                        average=row.average,
+                    )
+                    for row in rows
+                ]
+        except Exception as exc:
+            log.warning(f"Failed to read historical bars: {exc}")
+            return []
+
+    def get_cached_market_data(
+        self, namespace: str, keys: Iterable[str]
+    ) -> Dict[str, Any]:
+        """Unexpired cached payloads for ``keys``, by key."""
+        try:
+            with self.session_scope() as session:
+                rows = session.execute(
+                    select(MarketDataCacheEntry.key, MarketDataCacheEntry.payload)
+                    .where(MarketDataCacheEntry.namespace == namespace)
+                    .where(MarketDataCacheEntry.key.in_(list(keys)))
+                    .where(MarketDataCacheEntry.expires_at > utcnow())
+                ).all()
+            return {key: json.loads(payload) for key, payload in rows}
+        except Exception as exc:
+            log.warning(f"Failed to read market data cache: {exc}")
+            return {}
+
+    def save_cached_market_data(
+        self, namespace: str, payloads: Mapping[str, Any], expires_at: datetime
+    ) -> None:
+        if not payloads:
+            return
+        try:
+            now = utcnow()
+            rows = [
+                dict(
+                    namespace=namespace,
+                    key=key,
+                    fetched_at=now,
+                    expires_at=expires_at,
+                    payload=json.dumps(payload),
+                )
+                for key, payload in payloads.items()
+            ]
+            with self.session_scope() as session:
+                # Keys change daily (one per contract qualified), so expired
+                # entries are dropped here rather than left to accumulate.
+                session.execute(
+                    delete(MarketDataCacheEntry).where(
+                        MarketDataCacheEntry.expires_at <= now
+                    )
+                )
+                stmt = sqlite_insert(MarketDataCacheEntry).values(rows)
+                session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["namespace", "key"],
+                        set_={
+                            "fetched_at": stmt.excluded.fetched_at,
+                            "expires_at": stmt.excluded.expires_at,
+                            "payload": stmt.excluded.payload,
+                        },
+                    )
+                )
+        except Exception as exc:
+            log.warning(f"Failed to record market data cache: {exc}")
+
+    def get_regime_window(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self.session_scope() as session:
+                state = session.get(RegimeWindowState, key)
+                payload = state.payload if state else None
+            return json.loads(payload) if payload else None
+        except Exception as exc:
+            log.warning(f"Failed to read regime window state: {exc}")
+            return None
+
+    def save_regime_window(
+        self, key: str, last_date: date, payload: Dict[str, Any]
+    ) -> None:
+        try:
+            values = dict(
+                key=key,
+                updated_at=utcnow(),
+                last_date=last_date,
+                payload=json.dumps(payload),
+            )
+            with self.session_scope() as session:
+                stmt = sqlite_insert(RegimeWindowState).values(values)
+                session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["key"],
+                        set_={
+                            "updated_at": stmt.excluded.updated_at,
+                            "last_date": stmt.excluded.last_date,
+                            "payload": stmt.excluded.payload,
+                        },
+                    )
+                )
+        except Exception as exc:
+            log.warning(f"Failed to record regime window state: {exc}")
+
     def get_last_regime_rebalance_time(
         self,
         symbols: Iterable[str],
@@ -571,6 +1236,7 @@ class DataStore:
                 .where(ExecutionRecord.execution_time >= start_time)
                 .where(ExecutionRecord.order_ref.like(f"{order_ref_prefix}%"))
                 .where(ExecutionRecord.symbol.in_(list(symbols)))
+                .where(self._same_account(ExecutionRecord.account_number))
                 .order_by(ExecutionRecord.execution_time.desc())
                 .limit(1)
             )
@@ -578,6 +1244,78 @@ class DataStore:
             return result
 
 
+POSITION_FIELDS = (
+    "sec_type",
+    "position",
+    "avg_cost",
+    "market_price",
+    "market_value",
+    "unrealized_pnl",
+    "realized_pnl",
+    "currency",
+    "exchange",
+    "multiplier",
+    "expiry",
+    "strike",
+    "right",
+)
+
+
+def _same_value(left: Any, right: Any) -> bool:
+    # NaN quotes read back as NULL, so both count as "no value".
+    left = None if isinstance(left, float) and math.isnan(left) else left
+    right = None if isinstance(right, float) and math.isnan(right) else right
+    return left == right
+
+
+def position_changes(
+    previous: Mapping[Tuple[str, int], Dict[str, Any]],
+    current: Mapping[Tuple[str, int], Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Rows to store so ``previous`` plus the rows gives ``current``.
+
+    New and changed positions are stored whole. A position that disappeared
+    is stored once more as removed, at a position of zero.
+    """
+    rows = [
+        values
+        for key, values in current.items()
+        if key not in previous
+        or not all(
+            _same_value(values[name], previous[key][name]) for name in POSITION_FIELDS
+        )
+    ]
+    for key, values in previous.items():
+        if key not in current:
+            rows.append(
+                {**values, "position": 0.0, "market_value": 0.0, "removed": True}
+            )
+    return rows
+
+
+def account_changes(
+    previous: Mapping[str, Dict[str, Optional[str]]],
+    current: Mapping[str, Dict[str, Optional[str]]],
+) -> Dict[str, Optional[Dict[str, Optional[str]]]]:
+    """Account values that changed, with None for values that disappeared."""
+    changes: Dict[str, Optional[Dict[str, Optional[str]]]] = {
+        key: value for key, value in current.items() if previous.get(key) != value
+    }
+    changes.update({key: None for key in previous if key not in current})
+    return changes
+
+
+def apply_account_changes(
+    state: Dict[str, Dict[str, Optional[str]]],
+    changes: Mapping[str, Optional[Dict[str, Optional[str]]]],
+) -> None:
+    for key, value in changes.items():
+        if value is None:
+            state.pop(key, None)
+        else:
+            state[key] = value
+
+
 def _parse_bar_time(value: Any) -> Optional[datetime]:
     return _parse_datetime(value, assume_start_of_day=True)
 
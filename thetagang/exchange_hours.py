@@ -4,7 +4,6 @@ from datetime import date, datetime, timezone
 import exchange_calendars as xcals
 import pandas as pd
 from rich import box
-from rich.table import Table
 
 from thetagang import log
 from thetagang.config_models import ExchangeHoursConfig
@@ -57,7 +56,7 @@ def determine_action(config: ExchangeHoursConfig, now: datetime) -> str:
         start = session_open + pd.Timedelta(seconds=config.delay_after_open)
         end = session_close - pd.Timedelta(seconds=config.delay_before_close)
 
-        table = Table(box=box.SIMPLE)
+        table = log.table(box=box.SIMPLE)
         table.add_column("Exchange Hours")
         table.add_column(config.exchange)
         table.add_row("Open", str(session_open))
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, List, Optional
+
+from ib_async import ExecutionFilter
+
+from thetagang.db import DataStore
+from thetagang.ibkr import IBKR
+
+# Re-request a little before the newest stored fill. IBKR filters executions
+# by time at one-second resolution and late corrections can carry an earlier
+# timestamp; fills already stored are skipped by their exec_id.
+SYNC_OVERLAP = timedelta(hours=1)
+
+
+class ExecutionSync:
+    """Pull executions into the local store, asking only for recent ones.
+
+    The newest execution time seen for the account is persisted as a
+    high-water mark, so each sync requests fills from just before it rather
+    than replaying the whole lookback window. Everything that reads execution
+    history then queries the local ``executions`` table.
+    """
+
+    def __init__(
+        self, ibkr: IBKR, data_store: DataStore, account_number: Optional[str]
+    ) -> None:
+        self.ibkr = ibkr
+        self.data_store = data_store
+        self.account_number = account_number or ""
+
+    def sync_start(self, lookback_start: datetime) -> datetime:
+        high_water_mark = self.data_store.get_execution_high_water_mark(
+            self.account_number
+        )
+        if high_water_mark is None:
+            return lookback_start
+        return max(high_water_mark - SYNC_OVERLAP, lookback_start)
+
+    async def sync(self, lookback_start: datetime) -> int:
+        """Fetch and record fills newer than the high-water mark.
+
+        ``lookback_start`` is naive UTC and bounds the first sync for an
+        account. Returns the number of fills that were new to the store.
+        The high-water mark only advances when the fills were stored.
+        """
+        start = self.sync_start(lookback_start)
+        exec_filter = ExecutionFilter(
+            acctCode=self.account_number,
+            time=start.strftime("%Y%m%d-%H:%M:%S"),
+        )
+        fills: List[Any] = await self.ibkr.request_executions(exec_filter)
+        recorded = self.data_store.record_executions(
+            fills, sync_account=self.account_number
+        )
+        return recorded or 0
@@ -1,6 +1,19 @@
 import asyncio
-from enum import Enum
-from typing import Any, Awaitable, Callable, Coroutine, List, Optional, TypeVar, cast
+import copy
+import zlib
+from datetime import date, datetime, timedelta
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+    cast,
+)
 
 from ib_async import (
     IB,
@@ -21,19 +34,25 @@ from ib_async import (
 )
 from rich.console import Console
 
-from thetagang import log
-from thetagang.db import DataStore
+from thetagang import log, market_cache
+from thetagang.config_models import MarketDataModeEnum
+from thetagang.db import DataStore, utcnow
+from thetagang.market_cache import duration_days
+from thetagang.market_data import SharedMarketData, contract_key
+from thetagang.request_scheduler import (
+    ACCOUNT,
+    CONTRACT_DETAILS,
+    HISTORICAL,
+    MARKET_DATA,
+    ORDERS,
+    SECDEF,
+    RequestScheduler,
+)
+from thetagang.ticker_readiness import TickerField, wait_for_fields
 
 console = Console()
 
 
-class TickerField(Enum):
-    MIDPOINT = "midpoint"
-    MARKET_PRICE = "market_price"
-    GREEKS = "greeks"
-    OPEN_INTEREST = "open_interest"
-
-
 class RequiredFieldValidationError(Exception):
     def __init__(self, message: str) -> None:
         self.message = message
@@ -61,58 +80,142 @@ class IBKR:
         api_response_wait_time: int,
         default_order_exchange: str,
         data_store: Optional[DataStore] = None,
+        market_data: Optional[SharedMarketData] = None,
+        account_number: Optional[str] = None,
+        scheduler: Optional[RequestScheduler] = None,
     ) -> None:
         self.ib = ib
         self.ib.orderStatusEvent += self.orderStatusEvent
         self.api_response_wait_time = api_response_wait_time
         self.default_order_exchange = default_order_exchange
         self.data_store = data_store
+        self.market_data = market_data
+        self.account_number = account_number
+        self.shards: List[IB] = []
+        self.scheduler = scheduler or RequestScheduler()
+
+    def attach_shards(self, shards: Sequence[IB]) -> None:
+        """Spread market-data requests over additional client connections.
+
+        IBKR paces API messages per client connection, so large symbol universes
+        serialize on a single one. Each symbol is pinned to one connection
+        (the primary included) by a stable hash, which keeps its chain, quote
+        and bar requests together. Orders and account data always use the
+        primary connection.
+        """
+        self.shards = list(shards)
+
+    def _ib_for(self, contract: Contract) -> IB:
+        if not self.shards:
+            return self.ib
+        connections = [self.ib, *self.shards]
+        index = zlib.crc32(contract.symbol.encode("utf8")) % len(connections)
+        return connections[index]
 
     def portfolio(self, account: str) -> List[PortfolioItem]:
         return self.ib.portfolio(account)
 
+    def cached_ticker(self, contract: Contract) -> Optional[Ticker]:
+        """The last ticker received for ``contract``, without requesting one."""
+        return self._ib_for(contract).ticker(contract)
+
     async def account_summary(self, account: str) -> List[AccountValue]:
-        return await self.ib.accountSummaryAsync(account)
+        async with self.scheduler.request(ACCOUNT, self.ib):
+            return await self.ib.accountSummaryAsync(account)
 
     async def request_historical_data(
         self,
         contract: Contract,
         duration: str,
     ) -> BarDataList:
-        bars = await self.ib.reqHistoricalDataAsync(
-            contract,
-            "",
-            duration,
-            "1 day",
-            "TRADES",
-            True,
+        async def fetch() -> BarDataList:
+            if self.data_store:
+                spliced = await self._history_from_store(contract, duration)
+                if spliced is not None:
+                    return spliced
+            return await self._request_daily_bars(contract, duration)
+
+        if self.market_data is None:
+            return await fetch()
+        return await self.market_data.get_or_fetch(
+            "historical_bars", (contract_key(contract), duration), fetch
         )
+
+    async def _request_daily_bars(
+        self, contract: Contract, duration: str
+    ) -> BarDataList:
+        ib = self._ib_for(contract)
+        async with self.scheduler.request(HISTORICAL, ib):
+            bars = await ib.reqHistoricalDataAsync(
+                contract,
+                "",
+                duration,
+                "1 day",
+                "TRADES",
+                True,
+            )
         if self.data_store:
             self.data_store.record_historical_bars(contract.symbol, "1 day", bars)
         return bars
 
+    async def _history_from_store(
+        self, contract: Contract, duration: str
+    ) -> Optional[BarDataList]:
+        """Serve daily bars from the store, refreshing only the newest few days.
+
+        Returns None, so the caller requests the whole duration, when the
+        stored bars don't cover it or don't line up with the refreshed tail.
+        """
+        assert self.data_store is not None
+        days = duration_days(duration)
+        if days is None or days <= market_cache.HISTORY_TAIL_DAYS:
+            return None
+        start = date.today() - timedelta(days=days - 1)
+        stored = market_cache.stored_bars(
+            self.data_store.get_historical_bars(
+                contract.symbol,
+                "1 day",
+                datetime.combine(start, datetime.min.time()),
+            )
+        )
+        if not market_cache.covers(stored, start):
+            return None
+        tail = await self._request_daily_bars(
+            contract, f"{market_cache.HISTORY_TAIL_DAYS} D"
+        )
+        return market_cache.splice_history(stored, tail)
+
     async def request_executions(
         self,
         exec_filter: Optional[ExecutionFilter] = None,
     ) -> List[Fill]:
-        fills = await self.ib.reqExecutionsAsync(exec_filter)
-        if self.data_store:
-            self.data_store.record_executions(fills)
-        return fills
+        async with self.scheduler.request(ACCOUNT, self.ib):
+            return await self.ib.reqExecutionsAsync(exec_filter)
 
     def set_market_data_type(
         self,
         data_type: int,
     ) -> None:
-        self.ib.reqMarketDataType(data_type)
+        for ib in [self.ib, *self.shards]:
+            self.scheduler.spend_now(MARKET_DATA, ib)
+            ib.reqMarketDataType(data_type)
 
     def open_trades(self) -> List[Trade]:
-        return self.ib.openTrades()
+        trades = self.ib.openTrades()
+        if not self.account_number:
+            return trades
+        return [
+            trade
+            for trade in trades
+            if getattr(trade.order, "account", "") in ("", self.account_number)
+        ]
 
     def place_order(self, contract: Contract, order: Order) -> Trade:
+        self.scheduler.spend_now(ORDERS, self.ib)
         return self.ib.placeOrder(contract, order)
 
     def cancel_order(self, order: Order) -> None:
+        self.scheduler.spend_now(ORDERS, self.ib)
         self.ib.cancelOrder(order)
 
     async def refresh_account_updates(self, account: str) -> None:
@@ -123,9 +226,10 @@ class IBKR:
             return
 
         try:
-            await self._await_with_timeout(
-                self.ib.reqAccountUpdatesAsync(account), "account updates"
-            )
+            async with self.scheduler.request(ACCOUNT, self.ib):
+                await self._await_with_timeout(
+                    self.ib.reqAccountUpdatesAsync(account), "account updates"
+                )
         except IBKRRequestTimeout:
             if self._account_snapshot_ready(account):
                 log.info(
@@ -141,20 +245,93 @@ class IBKR:
             )
 
     async def refresh_positions(self) -> List[Position]:
-        return await self._await_with_timeout(
-            self.ib.reqPositionsAsync(), "positions snapshot"
-        )
+        async with self.scheduler.request(ACCOUNT, self.ib):
+            return await self._await_with_timeout(
+                self.ib.reqPositionsAsync(), "positions snapshot"
+            )
 
     def positions(self, account: str) -> List[Position]:
         return self.ib.positions(account)
 
+    async def refresh_open_orders(self) -> List[Trade]:
+        """Re-sync this client's open orders, then return this account's.
+
+        Like the sync at connect, only orders placed through this API client
+        are loaded: other clients' and manually entered orders are neither
+        cancelled nor tracked as working.
+        """
+        async with self.scheduler.request(ACCOUNT, self.ib):
+            await self._await_with_timeout(
+                self.ib.reqOpenOrdersAsync(), "open orders snapshot"
+            )
+        client_id = self.ib.client.clientId
+        return [
+            trade for trade in self.open_trades() if trade.order.clientId == client_id
+        ]
+
+    async def wait_for_portfolio_items(
+        self, account: str, con_ids: Sequence[int]
+    ) -> List[PortfolioItem]:
+        """Wait until the portfolio view holds every contract in ``con_ids``.
+
+        Account updates stream portfolio items after the download completes
+        for some accounts, so missing items are awaited on
+        ``updatePortfolioEvent`` rather than polled for.
+        """
+        missing = set(con_ids) - {
+            item.contract.conId for item in self.portfolio(account)
+        }
+        if missing:
+            arrived = asyncio.Event()
+
+            def on_portfolio_update(item: PortfolioItem) -> None:
+                if item.account == account:
+                    missing.discard(item.contract.conId)
+                if not missing:
+                    arrived.set()
+
+            self.ib.updatePortfolioEvent += on_portfolio_update
+            try:
+                await self._await_with_timeout(arrived.wait(), "portfolio updates")
+            finally:
+                self.ib.updatePortfolioEvent -= on_portfolio_update
+        return self.portfolio(account)
+
     async def get_chains_for_contract(self, contract: Contract) -> List[OptionChain]:
-        return await self.ib.reqSecDefOptParamsAsync(
-            contract.symbol, "", contract.secType, contract.conId
+        async def fetch() -> List[OptionChain]:
+            key = market_cache.chain_cache_key(contract)
+            if self.data_store:
+                cached = self.data_store.get_cached_market_data(
+                    market_cache.CHAINS, [key]
+                )
+                if key in cached:
+                    return [
+                        market_cache.chain_from_payload(chain) for chain in cached[key]
+                    ]
+            ib = self._ib_for(contract)
+            async with self.scheduler.request(SECDEF, ib):
+                chains = await ib.reqSecDefOptParamsAsync(
+                    contract.symbol, "", contract.secType, contract.conId
+                )
+            if self.data_store and chains:
+                self.data_store.save_cached_market_data(
+                    market_cache.CHAINS,
+                    {key: [market_cache.chain_to_payload(chain) for chain in chains]},
+                    market_cache.session_expiry(utcnow()),
+                )
+            return chains
+
+        if self.market_data is None:
+            return await fetch()
+        return await self.market_data.get_or_fetch(
+            "chains", (contract.symbol, contract.secType, contract.conId), fetch
         )
 
     async def qualify_contracts(self, *contracts: Contract) -> List[Contract]:
-        results = await self.ib.qualifyContractsAsync(*contracts)
+        if self.data_store:
+            results = await self._qualify_with_store(contracts)
+        else:
+            results = await self._qualify(contracts)
         # Filter out None values and flatten any nested lists
         qualified: List[Contract] = []
         for result in results:
@@ -168,6 +345,83 @@ class IBKR:
                 qualified.append(result)
         return qualified
 
+    async def _qualify_on(self, ib: IB, contracts: Sequence[Contract]) -> List[Any]:
+        # qualifyContractsAsync sends one contract details request per contract.
+        async with self.scheduler.request(
+            CONTRACT_DETAILS, ib, cost=max(1, len(contracts))
+        ):
+            return await ib.qualifyContractsAsync(*contracts)
+
+    async def _qualify(self, contracts: Sequence[Contract]) -> List[Any]:
+        if self.market_data is None and not self.shards:
+            return await self._qualify_on(self.ib, contracts)
+        if self.market_data is None:
+            return [
+                result
+                for batch in await asyncio.gather(
+                    *[
+                        self._qualify_on(self._ib_for(contract), [contract])
+                        for contract in contracts
+                    ]
+                )
+                for result in batch
+            ]
+        return await asyncio.gather(
+            *[self._qualify_shared(contract) for contract in contracts]
+        )
+
+    async def _qualify_with_store(self, contracts: Sequence[Contract]) -> List[Any]:
+        """Qualify contracts, reusing qualifications stored earlier in the day.
+
+        Like ``qualifyContractsAsync``, a stored qualification is copied onto
+        the caller's contract, which is then returned in its slot.
+        """
+        assert self.data_store is not None
+        keys = [market_cache.cache_key(contract) for contract in contracts]
+        stored = self.data_store.get_cached_market_data(
+            market_cache.QUALIFIED_CONTRACT, keys
+        )
+        results: List[Any] = list(contracts)
+        pending = [index for index, key in enumerate(keys) if key not in stored]
+        for index, key in enumerate(keys):
+            if key in stored:
+                util.dataclassUpdate(
+                    contracts[index], market_cache.contract_from_payload(stored[key])
+                )
+        if not pending:
+            return results
+
+        fresh = await self._qualify([contracts[index] for index in pending])
+        payloads: Dict[str, Any] = {}
+        for index, result in zip(pending, fresh):
+            results[index] = result
+            if isinstance(result, Contract) and result.conId:
+                payload = market_cache.contract_to_payload(result)
+                if payload is not None:
+                    payloads[keys[index]] = payload
+        self.data_store.save_cached_market_data(
+            market_cache.QUALIFIED_CONTRACT,
+            payloads,
+            market_cache.session_expiry(utcnow()),
+        )
+        return results
+
+    async def _qualify_shared(self, contract: Contract) -> Any:
+        assert self.market_data is not None
+
+        async def fetch() -> Any:
+            (result,) = await self._qualify_on(self._ib_for(contract), [contract])
+            return result
+
+        result = await self.market_data.get_or_fetch(
+            "qualified_contract", contract_key(contract), fetch
+        )
+        # Callers may mutate what they get back (e.g. exchange routing), so
+        # every account receives its own copy of the shared result.
+        if isinstance(result, list):
+            return [copy.copy(item) for item in result]
+        return copy.copy(result)
+
     async def get_ticker_for_stock(
         self,
         symbol: str,
@@ -176,6 +430,7 @@ class IBKR:
         generic_tick_list: str = "",
         required_fields: List[TickerField] = [TickerField.MARKET_PRICE],
         optional_fields: List[TickerField] = [TickerField.MIDPOINT],
+        mode: MarketDataModeEnum = MarketDataModeEnum.streaming,
     ) -> Ticker:
         stock = Stock(
             symbol,
@@ -195,7 +450,7 @@ class IBKR:
                 contract = qualified_index[0]
 
         return await self.get_ticker_for_contract(
-            contract, generic_tick_list, required_fields, optional_fields
+            contract, generic_tick_list, required_fields, optional_fields, mode
         )
 
     async def get_tickers_for_contracts(
@@ -205,10 +460,11 @@ class IBKR:
         generic_tick_list: str = "",
         required_fields: List[TickerField] = [TickerField.MARKET_PRICE],
         optional_fields: List[TickerField] = [TickerField.MIDPOINT],
+        mode: MarketDataModeEnum = MarketDataModeEnum.streaming,
     ) -> List[Ticker]:
         async def get_ticker_task(contract: Contract) -> Ticker:
             return await self.get_ticker_for_contract(
-                contract, generic_tick_list, required_fields, optional_fields
+                contract, generic_tick_list, required_fields, optional_fields, mode
             )
 
         tasks: List[Coroutine[Any, Any, Ticker]] = [
@@ -226,95 +482,64 @@ class IBKR:
         generic_tick_list: str = "",
         required_fields: List[TickerField] = [TickerField.MARKET_PRICE],
         optional_fields: List[TickerField] = [TickerField.MIDPOINT],
+        mode: MarketDataModeEnum = MarketDataModeEnum.streaming,
     ) -> Ticker:
-        required_handlers = [
-            (field, self.__ticker_field_handler__(field)) for field in required_fields
-        ]
-        optional_handlers = [
-            (field, self.__ticker_field_handler__(field)) for field in optional_fields
-        ]
+        """Request a ticker and wait for the required and optional fields.
+
+        ``mode`` selects a streaming line (the ticker keeps updating) or a
+        one-off snapshot for quotes that are only read once.
+        """
 
         async def ticker_handler(ticker: Ticker) -> None:
-            required_tasks = [handler(ticker) for _, handler in required_handlers]
-            optional_tasks = [handler(ticker) for _, handler in optional_handlers]
-
-            # Gather results, allowing optional tasks to potentially fail (timeout)
-            results = await asyncio.gather(
-                asyncio.gather(*required_tasks),
-                asyncio.gather(
-                    *optional_tasks, return_exceptions=False
-                ),  # Don't raise exceptions here for optional
+            missing_required, missing_optional = await wait_for_fields(
+                ticker, required_fields, optional_fields, self.api_response_wait_time
             )
-            required_results = results[0]
-            optional_results = results[1]
-
-            # Check required results
-            failed_required_fields = [
-                field.name
-                for i, (field, _) in enumerate(required_handlers)
-                if not required_results[i]
-            ]
-            if failed_required_fields:
+            if missing_required:
                 raise RequiredFieldValidationError(
-                    f"Required fields timed out for {contract.localSymbol}: {', '.join(failed_required_fields)}"
+                    f"Required fields timed out for {contract.localSymbol}: {', '.join(field.name for field in missing_required)}"
                 )
-
-            # Log warnings for optional results that timed out
-            failed_optional_fields = [
-                field.name
-                for i, (field, _) in enumerate(optional_handlers)
-                if not optional_results[i]
-            ]
-            if failed_optional_fields:
+            if missing_optional:
                 log.warning(
-                    f"Optional fields timed out for {contract.localSymbol}: {', '.join(failed_optional_fields)}"
+                    f"Optional fields timed out for {contract.localSymbol}: {', '.join(field.name for field in missing_optional)}"
                 )
 
-        return await self.__market_data_streaming_handler__(
-            contract,
-            generic_tick_list,
-            lambda ticker: ticker_handler(ticker),
-        )
-
-    async def __wait_for_midpoint_price__(self, ticker: Ticker) -> bool:
-        return await self.__ticker_wait_for_condition__(
-            ticker, lambda t: not util.isNan(t.midpoint()), self.api_response_wait_time
-        )
-
-    async def __wait_for_market_price__(self, ticker: Ticker) -> bool:
-        return await self.__ticker_wait_for_condition__(
-            ticker,
-            lambda t: not util.isNan(t.marketPrice()),
-            self.api_response_wait_time,
-        )
+        async def fetch() -> Ticker:
+            return await self.__market_data_streaming_handler__(
+                contract,
+                generic_tick_list,
+                lambda ticker: ticker_handler(ticker),
+                mode,
+            )
 
-    async def __wait_for_greeks__(self, ticker: Ticker) -> bool:
-        return await self.__ticker_wait_for_condition__(
-            ticker,
-            lambda t: not (
-                t.modelGreeks is None
-                or t.modelGreeks.delta is None
-                or util.isNan(t.modelGreeks.delta)
+        if self.market_data is None or not contract.conId:
+            return await fetch()
+        # A streaming ticker that already satisfied the same field
+        # requirements keeps updating and can be reused as-is. Snapshots stop
+        # updating once they are read, so they are only shared by concurrent
+        # requests and each later account asks for a fresh quote.
+        mode = MarketDataModeEnum(mode)
+        return await self.market_data.get_or_fetch(
+            "ticker",
+            (
+                contract.conId,
+                generic_tick_list,
+                tuple(field.value for field in required_fields),
+                tuple(field.value for field in optional_fields),
+                mode.value,
             ),
-            self.api_response_wait_time,
-        )
-
-    async def __wait_for_open_interest__(self, ticker: Ticker) -> bool:
-        def open_interest_is_not_ready(ticker: Ticker) -> bool:
-            if not ticker.contract:
-                return False
-            if ticker.contract.right.startswith("P"):
-                return util.isNan(ticker.putOpenInterest)
-            else:
-                return util.isNan(ticker.callOpenInterest)
-
-        return await self.__ticker_wait_for_condition__(
-            ticker,
-            lambda t: not open_interest_is_not_ready(t),
-            self.api_response_wait_time,
+            fetch,
+            keep=mode == MarketDataModeEnum.streaming,
         )
 
     def orderStatusEvent(self, trade: Trade) -> None:
+        order_account = getattr(trade.order, "account", "")
+        if (
+            self.account_number
+            and order_account
+            and order_account != self.account_number
+        ):
+            # Another account's trade on the shared connection.
+            return
         if "Filled" in trade.orderStatus.status:
             log.info(f"{trade.contract.symbol}: Order filled")
         if "Fill" in trade.orderStatus.status:
@@ -376,18 +601,22 @@ class IBKR:
         contract: Contract,
         generic_tick_list: str,
         handler: Callable[[Ticker], Awaitable[Any]],
+        mode: MarketDataModeEnum = MarketDataModeEnum.streaming,
     ) -> Ticker:
         """
         Handles the streaming of market data for a given contract.
 
         This asynchronous method qualifies the contract, requests market data,
-        and processes the data using the provided handler. Once the handler
-        completes, the market data request is canceled.
+        and processes the data using the provided handler. Streaming requests
+        stay open afterwards. Snapshot requests ask IBKR for a one-off
+        snapshot; since IBKR rejects generic ticks on snapshots, those stream
+        until the handler completes and the line is then canceled.
 
         Args:
             contract (Contract): The contract for which market data is requested.
             handler (Callable[[Ticker], Awaitable[None]]): An asynchronous function
                 that processes the received market data ticker.
+            mode (MarketDataModeEnum): Streaming, snapshot or regulatory snapshot.
 
         Returns:
             Ticker: The market data ticker for the given contract.
@@ -400,27 +629,30 @@ class IBKR:
             raise ValueError(
                 f"Contract {contract} can't be qualified because no 'conId' value exists."
             )
-        ticker = self.ib.reqMktData(contract, genericTickList=generic_tick_list)
-        await handler(ticker)
-        return ticker
-
-    async def __ticker_wait_for_condition__(
-        self, ticker: Ticker, condition: Callable[[Ticker], bool], timeout: float
-    ) -> bool:
-        event = asyncio.Event()
-
-        def onTicker(ticker: Ticker) -> None:
-            if condition(ticker):
-                event.set()
-
-        ticker.updateEvent += onTicker
+        ib = self._ib_for(contract)
+        mode = MarketDataModeEnum(mode)
+        if mode == MarketDataModeEnum.streaming:
+            async with self.scheduler.request(MARKET_DATA, ib):
+                ticker = ib.reqMktData(contract, genericTickList=generic_tick_list)
+            await handler(ticker)
+            return ticker
+        if not generic_tick_list:
+            async with self.scheduler.request(MARKET_DATA, ib):
+                ticker = ib.reqMktData(
+                    contract,
+                    snapshot=True,
+                    regulatorySnapshot=mode == MarketDataModeEnum.regulatory_snapshot,
+                )
+            await handler(ticker)
+            return ticker
+        async with self.scheduler.request(MARKET_DATA, ib):
+            ticker = ib.reqMktData(contract, genericTickList=generic_tick_list)
         try:
-            await asyncio.wait_for(event.wait(), timeout=timeout)
-            return True
-        except asyncio.TimeoutError:
-            return False
+            await handler(ticker)
         finally:
-            ticker.updateEvent -= onTicker
+            self.scheduler.spend_now(MARKET_DATA, ib)
+            ib.cancelMktData(contract)
+        return ticker
 
     async def wait_for_submitting_orders(
         self, trades: List[Trade], timetout: int = 60
@@ -428,8 +660,9 @@ class IBKR:
         tasks: List[Coroutine[Any, Any, bool]] = [
             self.__trade_wait_for_condition__(
                 trade,
-                lambda trade: trade.orderStatus.status
-                not in ["PendingSubmit", "PreSubmitted"],
+                lambda trade: (
+                    trade.orderStatus.status not in ["PendingSubmit", "PreSubmitted"]
+                ),
                 timetout,
             )
             for trade in trades
@@ -505,15 +738,3 @@ class IBKR:
             return False
         finally:
             trade.statusEvent -= onStatusEvent
-
-    def __ticker_field_handler__(
-        self, ticker_field: TickerField
-    ) -> Callable[[Ticker], Awaitable[bool]]:
-        if ticker_field == TickerField.MIDPOINT:
-            return self.__wait_for_midpoint_price__
-        if ticker_field == TickerField.MARKET_PRICE:
-            return self.__wait_for_market_price__
-        if ticker_field == TickerField.GREEKS:
-            return self.__wait_for_greeks__
-        if ticker_field == TickerField.OPEN_INTEREST:
-            return self.__wait_for_open_interest__
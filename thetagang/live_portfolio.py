@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+from ib_async import IB, Fill, PortfolioItem, Position, Trade
+
+
+class LivePortfolio:
+    """The account's portfolio, kept current from IB's update events.
+
+    After a full snapshot seeds it, portfolio updates replace items as they
+    stream in and every change bumps ``version``. Position and execution
+    events don't carry market values, so they only mark a contract as
+    pending until a portfolio update confirms its new quantity. While
+    anything is pending, before the first seed, or after the connection
+    drops, ``has_gap()`` tells the caller to reconcile with a full snapshot
+    instead of trusting the model.
+    """
+
+    def __init__(self, ib: IB, account: str) -> None:
+        self.ib = ib
+        self.account = account
+        self.version = 0
+        self.__items: Dict[int, PortfolioItem] = {}
+        # conId -> quantity reported by the position stream, or None when a
+        # fill was seen and any later portfolio update settles it.
+        self.__pending: Dict[int, Optional[float]] = {}
+        self.__seeded = False
+        self.__attached = False
+
+    def attach(self) -> None:
+        if self.__attached:
+            return
+        self.ib.updatePortfolioEvent += self.on_portfolio_update
+        self.ib.positionEvent += self.on_position
+        self.ib.execDetailsEvent += self.on_exec_details
+        self.__attached = True
+
+    def detach(self) -> None:
+        if not self.__attached:
+            return
+        self.ib.updatePortfolioEvent -= self.on_portfolio_update
+        self.ib.positionEvent -= self.on_position
+        self.ib.execDetailsEvent -= self.on_exec_details
+        self.__attached = False
+
+    def seed(self, items: Iterable[PortfolioItem]) -> None:
+        """Replace the model with a full snapshot of the account."""
+        self.__items = {
+            item.contract.conId: item
+            for item in items
+            if item.account == self.account and item.position != 0
+        }
+        self.__pending = {}
+        self.__seeded = True
+        self.version += 1
+
+    def items(self) -> List[PortfolioItem]:
+        return list(self.__items.values())
+
+    def has_gap(self) -> bool:
+        return (
+            not self.__seeded
+            or not self.__attached
+            or bool(self.__pending)
+            or not self.ib.isConnected()
+        )
+
+    def on_portfolio_update(self, item: PortfolioItem) -> None:
+        if item.account != self.account:
+            return
+        con_id = item.contract.conId
+        if item.position == 0:
+            self.__items.pop(con_id, None)
+        else:
+            self.__items[con_id] = item
+        if con_id in self.__pending:
+            expected = self.__pending[con_id]
+            if expected is None or expected == item.position:
+                del self.__pending[con_id]
+        self.version += 1
+
+    def on_position(self, position: Position) -> None:
+        if position.account != self.account:
+            return
+        con_id = position.contract.conId
+        item = self.__items.get(con_id)
+        held = item.position if item is not None else 0
+        if held == position.position:
+            self.__pending.pop(con_id, None)
+        else:
+            self.__pending[con_id] = position.position
+
+    def on_exec_details(self, trade: Trade, fill: Fill) -> None:
+        if fill.execution.acctNumber != self.account:
+            return
+        # Combo fills are also reported per leg, which is what's held.
+        if fill.contract.secType == "BAG":
+            return
+        self.__pending.setdefault(fill.contract.conId, None)
@@ -1,9 +1,18 @@
 import asyncio
+import copy
+import json
+import logging
+import queue
 import sys
-from typing import Any, Coroutine, Iterable, Iterator, List, Union
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Any, Coroutine, Iterable, Iterator, List, Optional, TextIO, Union
 
 from annotated_types import T
-from rich.console import Console
+from rich.console import Console, ConsoleOptions, RenderResult
+from rich.errors import MarkupError
+from rich.measure import Measurement
 from rich.panel import Panel
 from rich.progress import (
     BarColumn,
@@ -13,6 +22,7 @@ from rich.progress import (
     TextColumn,
 )
 from rich.table import Table
+from rich.text import Text
 from rich.theme import Theme
 
 custom_theme = Theme(
@@ -25,31 +35,235 @@ custom_theme = Theme(
 
 console: Console = Console(theme=custom_theme)
 
+NOTICE = logging.INFO + 5
+logging.addLevelName(NOTICE, "NOTICE")
+_LEVEL_NAMES = {
+    logging.INFO: "info",
+    NOTICE: "notice",
+    logging.WARNING: "warning",
+    logging.ERROR: "error",
+}
+
+
+class DeferredTable(Table):
+    """A Table that only records its rows until something needs to render it.
+
+    Headless runs hand these out instead of real tables, so the engines'
+    summary tables cost a few list appends on the event loop and are only
+    laid out when a table sink is configured, on the sink's thread.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._args = args
+        self._kwargs = kwargs
+        self._calls: List[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    def add_column(self, *args: Any, **kwargs: Any) -> None:  # type: ignore[override]
+        self._calls.append(("add_column", args, kwargs))
+
+    def add_row(self, *args: Any, **kwargs: Any) -> None:  # type: ignore[override]
+        self._calls.append(("add_row", args, kwargs))
+
+    def add_section(self) -> None:
+        self._calls.append(("add_section", (), {}))
+
+    def build(self) -> Table:
+        table = Table(*self._args, **self._kwargs)
+        for name, args, kwargs in self._calls:
+            getattr(table, name)(*args, **kwargs)
+        return table
+
+    def __rich_console__(
+        self, console: Console, options: ConsoleOptions
+    ) -> RenderResult:
+        yield self.build()
+
+    def __rich_measure__(
+        self, console: Console, options: ConsoleOptions
+    ) -> Measurement:
+        return Measurement.get(console, options, self.build())
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, with rich markup stripped from messages."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        try:
+            message = Text.from_markup(message).plain
+        except MarkupError:
+            pass
+        payload: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": _LEVEL_NAMES.get(record.levelno, record.levelname.lower()),
+            "message": message,
+        }
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class _RecordQueueHandler(QueueHandler):
+    """Queue records with the traceback captured but the message unformatted.
+
+    The stock QueueHandler folds the traceback into the message; the JSON
+    formatter wants it as a separate field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class _RecordsFilter(logging.Filter):
+    def __init__(self, renderables: bool) -> None:
+        super().__init__()
+        self.renderables = renderables
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return hasattr(record, "renderable") == self.renderables
+
+
+class _TableFileHandler(logging.Handler):
+    def __init__(self, path: Path) -> None:
+        super().__init__()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("a", encoding="utf8")
+        self._console = Console(file=self._file, width=160, force_terminal=False)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._console.print(getattr(record, "renderable"))
+            self._file.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+class _Headless:
+    def __init__(self, stream: TextIO, tables_path: Optional[Path]) -> None:
+        records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        self.logger = logging.getLogger("thetagang.headless")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.handler = _RecordQueueHandler(records)
+        self.logger.addHandler(self.handler)
+
+        lines = logging.StreamHandler(stream)
+        lines.setFormatter(JsonLinesFormatter())
+        lines.addFilter(_RecordsFilter(renderables=False))
+        handlers: List[logging.Handler] = [lines]
+        self.tables: Optional[logging.Handler] = None
+        if tables_path is not None:
+            self.tables = _TableFileHandler(tables_path)
+            self.tables.addFilter(_RecordsFilter(renderables=True))
+            handlers.append(self.tables)
+        self.listener = QueueListener(records, *handlers, respect_handler_level=False)
+        self.listener.start()
+
+    def stop(self) -> None:
+        self.listener.stop()
+        self.logger.removeHandler(self.handler)
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+_headless: Optional[_Headless] = None
+
+
+def enable_headless(
+    stream: Optional[TextIO] = None, tables_path: Optional[str] = None
+) -> None:
+    """Switch to headless output for unattended runs.
+
+    Messages become JSON lines written by a background thread, progress bars
+    are skipped, and summary tables are only built and rendered if
+    ``tables_path`` is set, in which case they are appended to that file.
+    """
+    global _headless
+    disable_headless()
+    _headless = _Headless(
+        stream or sys.stdout, Path(tables_path).expanduser() if tables_path else None
+    )
+
+
+def disable_headless() -> None:
+    """Flush pending headless output and return to console rendering."""
+    global _headless
+    if _headless is not None:
+        _headless.stop()
+        _headless = None
+
+
+def is_headless() -> bool:
+    return _headless is not None
+
+
+def _emit(level: int, text: str, exc_info: bool = False) -> None:
+    assert _headless is not None
+    _headless.logger.log(level, text, exc_info=exc_info)
+
 
 def info(text: str) -> None:
+    if _headless is not None:
+        _emit(logging.INFO, text)
+        return
     console.print(text)
 
 
 def notice(text: str) -> None:
+    if _headless is not None:
+        _emit(NOTICE, text)
+        return
     console.print(text, style="notice")
 
 
 def warning(text: str) -> None:
+    if _headless is not None:
+        _emit(logging.WARNING, text)
+        return
     console.print(text, style="warning")
 
 
 def error(text: str) -> None:
+    if _headless is not None:
+        _emit(logging.ERROR, text, exc_info=sys.exc_info()[0] is not None)
+        return
     if sys.exc_info()[0] is not None:
         console.print_exception()
     console.print(text, style="red")
 
 
+def table(*args: Any, **kwargs: Any) -> Table:
+    """Create a summary table; deferred when running headless."""
+    if _headless is not None:
+        return DeferredTable(*args, **kwargs)
+    return Table(*args, **kwargs)
+
+
 def print(content: Union[Panel, Table]) -> None:
+    if _headless is not None:
+        if _headless.tables is not None:
+            _headless.logger.info("", extra={"renderable": content})
+        return
     console.print(content)
 
 
 async def track_async(tasks: List[Coroutine[Any, Any, T]], description: str) -> List[T]:
     results = []
+    if _headless is not None:
+        for coro in asyncio.as_completed(tasks):
+            results.append(await coro)
+        return results
     total_tasks = len(tasks)
 
     progress = Progress(
@@ -70,6 +284,10 @@ async def track_async(tasks: List[Coroutine[Any, Any, T]], description: str) ->
 
 
 def track(sequence: Iterable[T], description: str, total: int) -> Iterator[T]:
+    if _headless is not None:
+        yield from sequence
+        return
+
     progress = Progress(
         TextColumn("{task.description: <80}"),
         BarColumn(),
@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 import click
 import click_log
@@ -12,7 +13,34 @@ CONTEXT_SETTINGS = dict(
 )
 
 
-@click.command(context_settings=CONTEXT_SETTINGS)
+def _migration_errors() -> tuple[type[Exception], ...]:
+    from thetagang.config_migration.startup_migration import (
+        InvalidMigrationOptionError,
+        MigrationDeclinedError,
+        MigrationPreviewRedactionError,
+        MigrationRequiredError,
+        UnknownSchemaError,
+    )
+
+    return (
+        InvalidMigrationOptionError,
+        MigrationDeclinedError,
+        MigrationPreviewRedactionError,
+        MigrationRequiredError,
+        UnknownSchemaError,
+    )
+
+
+def _quiet_library_loggers() -> None:
+    if logger.getEffectiveLevel() > logging.INFO:
+        logging.getLogger("alembic").setLevel(logging.WARNING)
+        logging.getLogger("alembic.runtime").setLevel(logging.WARNING)
+        logging.getLogger("alembic.runtime.migration").setLevel(logging.WARNING)
+        logging.getLogger("ib_async").setLevel(logging.WARNING)
+        logging.getLogger("ib_async.client").setLevel(logging.WARNING)
+
+
+@click.group(context_settings=CONTEXT_SETTINGS, invoke_without_command=True)
 @click_log.simple_verbosity_option(logger, default="WARNING")
 @click.option(
     "-c",
@@ -43,12 +71,41 @@ CONTEXT_SETTINGS = dict(
     is_flag=True,
     help="Automatically approve config migration prompts.",
 )
+@click.option(
+    "--no-config-cache",
+    is_flag=True,
+    help="Parse and validate the config for the trading run instead of "
+    "reusing the validated copy cached for an unchanged config file.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Profile CPU and memory for each run stage and write the reports "
+    "to a run directory (see runtime.profile in the config).",
+)
+@click.option(
+    "--headless",
+    is_flag=True,
+    help="Log JSON lines instead of rendering tables and progress bars. "
+    "Intended for containers and other unattended runs.",
+)
+@click.option(
+    "--table-log",
+    help="With --headless, append the summary tables to this file.",
+    type=click.Path(dir_okay=False, writable=True),
+)
+@click.pass_context
 def cli(
+    ctx: click.Context,
     config: str,
     without_ibc: bool,
     dry_run: bool,
     migrate_config: bool,
     yes: bool,
+    no_config_cache: bool,
+    profile: bool,
+    headless: bool,
+    table_log: Optional[str],
 ) -> None:
     """ThetaGang is an IBKR bot for collecting money.
 
@@ -57,20 +114,15 @@ def cli(
     https://github.com/brndnmtthws/thetagang/blob/main/thetagang.toml
     """
 
-    if logger.getEffectiveLevel() > logging.INFO:
-        logging.getLogger("alembic").setLevel(logging.WARNING)
-        logging.getLogger("alembic.runtime").setLevel(logging.WARNING)
-        logging.getLogger("alembic.runtime.migration").setLevel(logging.WARNING)
-        logging.getLogger("ib_async").setLevel(logging.WARNING)
-        logging.getLogger("ib_async.client").setLevel(logging.WARNING)
+    _quiet_library_loggers()
+    if headless:
+        from thetagang import log
 
-    from thetagang.config_migration.startup_migration import (
-        InvalidMigrationOptionError,
-        MigrationDeclinedError,
-        MigrationPreviewRedactionError,
-        MigrationRequiredError,
-        UnknownSchemaError,
-    )
+        log.enable_headless(tables_path=table_log)
+        ctx.call_on_close(log.disable_headless)
+    ctx.obj = {"config": config, "without_ibc": without_ibc}
+    if ctx.invoked_subcommand is not None:
+        return
 
     from .thetagang import start
 
@@ -81,12 +133,153 @@ def cli(
             dry_run,
             migrate_config=migrate_config,
             auto_approve_migration=yes,
+            use_config_cache=not no_config_cache,
+            profile=profile,
         )
-    except (
-        InvalidMigrationOptionError,
-        MigrationDeclinedError,
-        MigrationPreviewRedactionError,
-        MigrationRequiredError,
-        UnknownSchemaError,
-    ) as exc:
+    except _migration_errors() as exc:
+        raise click.ClickException(str(exc)) from exc
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--raw-days",
+    type=click.IntRange(min=1),
+    help="Keep raw per-run rows for this many days (defaults to the config value).",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    help="Number of rows deleted per transaction (defaults to the config value).",
+)
+@click.option(
+    "--vacuum-pages",
+    type=click.IntRange(min=0),
+    help="Free pages to reclaim after pruning, 0 for all (defaults to the config "
+    "value).",
+)
+@click.option("--no-vacuum", is_flag=True, help="Skip the incremental vacuum.")
+@click.pass_context
+def retention(
+    ctx: click.Context,
+    raw_days: Optional[int],
+    batch_size: Optional[int],
+    vacuum_pages: Optional[int],
+    no_vacuum: bool,
+) -> None:
+    """Roll up old state database rows into daily tables and prune them."""
+
+    from .thetagang import start_retention
+
+    try:
+        start_retention(
+            ctx.obj["config"],
+            raw_days=raw_days,
+            batch_size=batch_size,
+            vacuum_pages=vacuum_pages,
+            vacuum=not no_vacuum,
+        )
+    except _migration_errors() as exc:
+        raise click.ClickException(str(exc)) from exc
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--by",
+    type=click.Choice(["symbol", "stage", "day"]),
+    default="symbol",
+    show_default=True,
+    help="How to group the order and fill totals.",
+)
+@click.option(
+    "--days",
+    type=click.IntRange(min=1),
+    default=30,
+    show_default=True,
+    help="Days of history to report.",
+)
+@click.option(
+    "--rebuild",
+    is_flag=True,
+    help="Recompute the report tables from the raw tables first, e.g. to "
+    "backfill history recorded before the report tables existed.",
+)
+@click.pass_context
+def report(ctx: click.Context, by: str, days: int, rebuild: bool) -> None:
+    """Summarize orders, fills, option premium, slippage and run durations.
+
+    Reads the report tables, which every run keeps up to date with the rows
+    it added, so reports don't scan the raw history.
+    """
+
+    from .thetagang import start_report
+
+    try:
+        start_report(ctx.obj["config"], by=by, days=days, rebuild=rebuild)
+    except _migration_errors() as exc:
+        raise click.ClickException(str(exc)) from exc
+
+
+@cli.command("regime-sweep", context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--grid",
+    "grid",
+    multiple=True,
+    metavar="KEY=V1,V2,...",
+    help="Values to sweep for one regime_rebalance parameter (repeatable), e.g. "
+    "--grid lookback_days=20,40,60 --grid soft_band=0.05,0.1. Unswept "
+    "parameters keep their config values.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Worker processes (defaults to the number of CPUs).",
+)
+@click.option(
+    "--limit",
+    type=click.IntRange(min=1),
+    default=25,
+    show_default=True,
+    help="Rows to display, ordered by turnover then mean drift.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Also write every result to this CSV file.",
+)
+@click.pass_context
+def regime_sweep(
+    ctx: click.Context,
+    grid: tuple[str, ...],
+    workers: Optional[int],
+    limit: int,
+    output: Optional[str],
+) -> None:
+    """Replay regime rebalancing over stored daily bars for a parameter grid."""
+
+    from .thetagang import start_regime_sweep
+
+    try:
+        start_regime_sweep(
+            ctx.obj["config"], grid=grid, workers=workers, limit=limit, output=output
+        )
+    except (*_migration_errors(), ValueError) as exc:
+        raise click.ClickException(str(exc)) from exc
+
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.pass_context
+def warm(ctx: click.Context) -> None:
+    """Fill the state database caches before the session opens.
+
+    Qualifies every configured symbol and the option contracts its chain
+    scans would request, and stores option chains and daily history, so the
+    first trading run after the open starts with hot caches. Cached chains
+    and qualifications are kept until the end of the (UTC) day.
+    """
+
+    from .thetagang import start_warm
+
+    try:
+        start_warm(ctx.obj["config"], ctx.obj["without_ibc"])
+    except _migration_errors() as exc:
         raise click.ClickException(str(exc)) from exc
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from ib_async import BarData, BarDataList, Contract, OptionChain
+
+from thetagang.market_data import contract_key
+
+CHAINS = "chains"
+QUALIFIED_CONTRACT = "qualified_contract"
+
+# Daily history is re-requested for this many calendar days and spliced onto
+# the stored bars; it always covers the newest, possibly partial, bar.
+HISTORY_TAIL_DAYS = 5
+# Longest run of calendar days without a bar we accept in stored history
+# (a weekend plus a holiday on either side).
+MAX_BAR_GAP = timedelta(days=5)
+
+_DURATION_DAYS = {"D": 1, "W": 7, "M": 31, "Y": 366}
+_DURATION = re.compile(r"^\s*(\d+)\s*([DWMY])\s*$")
+
+
+def cache_key(contract: Contract) -> str:
+    return json.dumps(contract_key(contract))
+
+
+def chain_cache_key(contract: Contract) -> str:
+    return json.dumps([contract.symbol, contract.secType, contract.conId])
+
+
+def session_expiry(now: datetime) -> datetime:
+    """Cached reads are good for the rest of the (UTC) day they were made."""
+    return datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+
+
+def contract_to_payload(contract: Contract) -> Optional[Dict[str, Any]]:
+    # Combos and delta-neutral contracts don't round-trip through JSON.
+    if contract.comboLegs or contract.deltaNeutralContract:
+        return None
+    payload = asdict(contract)
+    del payload["comboLegs"], payload["deltaNeutralContract"]
+    return payload
+
+
+def contract_from_payload(payload: Dict[str, Any]) -> Contract:
+    return Contract.create(**payload)
+
+
+def chain_to_payload(chain: OptionChain) -> Dict[str, Any]:
+    return asdict(chain)
+
+
+def chain_from_payload(payload: Dict[str, Any]) -> OptionChain:
+    return OptionChain(**payload)
+
+
+def duration_days(duration: str) -> Optional[int]:
+    """Calendar days spanned by an IBKR duration string such as ``"30 D"``."""
+    match = _DURATION.match(duration)
+    if match is None:
+        return None
+    return int(match.group(1)) * _DURATION_DAYS[match.group(2)]
+
+
+def _bar_date(bar: Any) -> date:
+    value = bar.date
+    return value.date() if isinstance(value, datetime) else value
+
+
+def stored_bars(rows: Sequence[Dict[str, Any]]) -> List[BarData]:
+    return [
+        BarData(
+            date=row["bar_time"].date(),
+            open=row["open"],
+            high=row["high"],
+            low=row["low"],
+            close=row["close"],
+            volume=row["volume"],
+            average=row["average"],
+            barCount=row["bar_count"],
+        )
+        for row in rows
+    ]
+
+
+def covers(bars: Sequence[BarData], start: date) -> bool:
+    """Whether ``bars`` reach back to ``start`` without a missing stretch."""
+    if not bars or _bar_date(bars[0]) - start > MAX_BAR_GAP:
+        return False
+    return all(
+        _bar_date(later) - _bar_date(earlier) <= MAX_BAR_GAP
+        for earlier, later in zip(bars, bars[1:])
+    )
+
+
+def splice_history(
+    stored: Sequence[BarData], fresh: BarDataList
+) -> Optional[BarDataList]:
+    """Stored bars before the fresh tail, followed by the tail itself.
+
+    Returns None when the two don't overlap, because the stored side may then
+    end in a bar that was still partial when it was recorded.
+    """
+    if not fresh:
+        return None
+    first_fresh = _bar_date(fresh[0])
+    if not stored or _bar_date(stored[-1]) < first_fresh:
+        return None
+    return BarDataList(
+        [bar for bar in stored if _bar_date(bar) < first_fresh] + list(fresh)
+    )
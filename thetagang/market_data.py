@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from ib_async import Contract
+
+T = TypeVar("T")
+
+
+def contract_key(contract: Contract) -> Tuple[Any, ...]:
+    """Hashable identity of a contract request, qualified or not."""
+    return (
+        contract.secType,
+        contract.conId,
+        contract.symbol,
+        contract.lastTradeDateOrContractMonth,
+        contract.strike,
+        contract.right,
+        contract.multiplier,
+        contract.exchange,
+        contract.primaryExchange,
+        contract.currency,
+        contract.localSymbol,
+        contract.tradingClass,
+    )
+
+
+class SharedMarketData:
+    """Process-wide memo of account-independent IBKR reads.
+
+    When several accounts are managed from one process they ask for the same
+    option chains, contract qualifications, historical bars and quotes. IBKR
+    instances that share one of these fetch each item once; concurrent
+    requests for the same key wait on the first one instead of issuing their
+    own. Failed fetches are not cached, so the next caller retries, and
+    ``keep=False`` results are only shared while the fetch is in flight.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[Tuple[str, Hashable], asyncio.Future[Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_fetch(
+        self,
+        namespace: str,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[T]],
+        keep: bool = True,
+    ) -> T:
+        cache_key = (namespace, key)
+        existing = self._entries.get(cache_key)
+        if existing is not None:
+            self.hits += 1
+            return await asyncio.shield(existing)
+
+        self.misses += 1
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._entries[cache_key] = future
+        try:
+            result = await fetch()
+        except BaseException as exc:
+            del self._entries[cache_key]
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+                # Waiters re-raise it; don't warn when there are none.
+                future.exception()
+            raise
+        future.set_result(result)
+        if not keep:
+            del self._entries[cache_key]
+        return result
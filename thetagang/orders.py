@@ -1,9 +1,8 @@
-from typing import List, Optional, Tuple
+from typing import Collection, List, Optional, Tuple
 
 from ib_async import Contract, LimitOrder
 from rich import box
 from rich.pretty import Pretty
-from rich.table import Table
 
 from thetagang import log
 from thetagang.fmt import dfmt, ifmt
@@ -21,11 +20,17 @@ class Orders:
     def records(self) -> List[Tuple[Contract, LimitOrder, Optional[int]]]:
         return self.__records
 
+    def retain(self, intent_ids: Collection[int]) -> None:
+        """Drop every queued order whose intent isn't in ``intent_ids``."""
+        self.__records = [
+            record for record in self.__records if record[2] in intent_ids
+        ]
+
     def print_summary(self) -> None:
         if not self.__records:
             return
 
-        table = Table(
+        table = log.table(
             title="Order Summary", show_lines=True, box=box.MINIMAL_HEAVY_HEAD
         )
         table.add_column("Symbol")
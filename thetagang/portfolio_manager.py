@@ -3,13 +3,24 @@ import logging
 import math
 import random
 from asyncio import Future
+from contextlib import nullcontext
 from datetime import date, datetime
-from typing import Any, Coroutine, Dict, List, Optional, Tuple, cast
+from typing import (
+    Any,
+    ContextManager,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    cast,
+)
 
 import numpy as np
 from ib_async import (
     AccountValue,
     PortfolioItem,
+    Position,
     Ticker,
     util,
 )
@@ -37,7 +48,20 @@ from thetagang.ibkr import (
     RequiredFieldValidationError,
     TickerField,
 )
+from thetagang.live_portfolio import LivePortfolio
+from thetagang.market_data import SharedMarketData
 from thetagang.orders import Orders
+from thetagang.portfolio_risk import (
+    PortfolioRisk,
+    aggregate_risk,
+    build_risk_arrays,
+    print_portfolio_risk,
+)
+from thetagang.position_book import PositionBook
+from thetagang.profiling import StageProfiler
+from thetagang.request_scheduler import RequestScheduler
+from thetagang.run_checkpoint import RunCheckpoint
+from thetagang.startup_snapshot import StartupSnapshot
 from thetagang.strategies import (
     EquityStrategyDeps,
     OptionsStrategyDeps,
@@ -65,12 +89,12 @@ from thetagang.trading_operations import (
 )
 from thetagang.util import (
     account_summary_to_dict,
-    get_short_positions,
     midpoint_or_market_price,
     portfolio_positions_to_dict,
     position_pnl,
     would_increase_spread,
 )
+from thetagang.working_orders import WorkingOrders
 
 from .options import option_dte
 
@@ -97,25 +121,38 @@ class PortfolioManager:
         data_store: Optional[DataStore] = None,
         run_stage_flags: Optional[Dict[str, bool]] = None,
         run_stage_order: Optional[List[str]] = None,
+        market_data: Optional[SharedMarketData] = None,
+        resume_on_reconnect: bool = False,
+        request_scheduler: Optional[RequestScheduler] = None,
+        profiler: Optional[StageProfiler] = None,
     ) -> None:
         self.account_number = config.runtime.account.number
+        self.profiler = profiler
         self.config = config
         self.data_store = data_store
+        self.run_checkpoint = RunCheckpoint(data_store) if data_store else None
+        self.resume_on_reconnect = resume_on_reconnect
         self.ibkr = IBKR(
             ib,
             config.runtime.ib_async.api_response_wait_time,
             config.runtime.orders.exchange,
             data_store=data_store,
+            market_data=market_data,
+            account_number=self.account_number,
+            scheduler=request_scheduler,
         )
         self.completion_future = completion_future
         self.has_excess_calls: set[str] = set()
         self.has_excess_puts: set[str] = set()
         self.orders: Orders = Orders()
         self.trades: Trades = Trades(self.ibkr, data_store=data_store)
+        self.working_orders = WorkingOrders()
         self.target_quantities: Dict[str, int] = {}
         self.qualified_contracts: Dict[int, Contract] = {}
         self.dry_run = dry_run
         self.last_untracked_positions: Dict[str, List[PortfolioItem]] = {}
+        self.live_portfolio = LivePortfolio(ib, self.account_number)
+        self.positions_version = 0
         self.order_ops = OrderOperations(
             config=self.config,
             account_number=self.account_number,
@@ -150,7 +187,10 @@ class PortfolioManager:
             ),
         )
         self.option_scanner = OptionChainScanner(
-            config=self.config, ibkr=self.ibkr, order_ops=self.order_ops
+            config=self.config,
+            ibkr=self.ibkr,
+            order_ops=self.order_ops,
+            checkpoint=self.run_checkpoint,
         )
         self.options_engine = OptionsStrategyEngine(
             config=self.config,
@@ -162,6 +202,7 @@ class PortfolioManager:
             has_excess_puts=self.has_excess_puts,
             has_excess_calls=self.has_excess_calls,
             qualified_contracts=self.qualified_contracts,
+            working_orders=self.working_orders,
         )
         self.regime_engine = RegimeRebalanceEngine(
             config=self.config,
@@ -178,6 +219,7 @@ class PortfolioManager:
             order_ops=self.order_ops,
             services=self.equity_runtime_services,
             regime_engine=self.regime_engine,
+            working_orders=self.working_orders,
         )
         self.post_engine = PostStrategyEngine(
             config=self.config,
@@ -186,6 +228,7 @@ class PortfolioManager:
             option_scanner=self.option_scanner,
             orders=self.orders,
             qualified_contracts=self.qualified_contracts,
+            working_orders=self.working_orders,
         )
         if run_stage_flags is None:
             default_run = RunConfig(strategies=DEFAULT_RUN_STRATEGIES)
@@ -260,10 +303,7 @@ class PortfolioManager:
     def get_short_contracts(
         self, portfolio_positions: Dict[str, List[PortfolioItem]], right: str
     ) -> List[PortfolioItem]:
-        ret: List[PortfolioItem] = []
-        for symbol in portfolio_positions:
-            ret = ret + get_short_positions(portfolio_positions[symbol], right)
-        return ret
+        return list(PositionBook.of(portfolio_positions).all_short_options(right))
 
     async def put_is_itm(self, contract: Contract) -> bool:
         return await self.options_engine.put_is_itm(contract)
@@ -315,9 +355,119 @@ class PortfolioManager:
                 untracked_positions.append(item)
         return (tracked_positions, untracked_positions)
 
-    async def get_portfolio_positions(self) -> Dict[str, List[PortfolioItem]]:
-        attempts = 3
+    def tracked_positions(self, positions: List[Position]) -> List[Position]:
         symbols = set(self.get_symbols())
+        return [
+            pos
+            for pos in positions
+            if pos.account == self.account_number
+            and (
+                pos.contract.symbol in symbols
+                or pos.contract.symbol == "VIX"
+                or pos.contract.symbol
+                == self.config.strategies.cash_management.cash_fund
+            )
+            and pos.position != 0
+        ]
+
+    async def load_startup_snapshot(self) -> StartupSnapshot:
+        """Load the account state the run plans from, with requests in flight together.
+
+        Portfolio items that the positions snapshot reports but the portfolio
+        view doesn't hold yet are awaited on IB's update events. Only when a
+        request times out does this fall back to the retrying
+        ``get_portfolio_positions``.
+        """
+        # Listen before requesting, so no update lands between the two.
+        self.live_portfolio.attach()
+        (
+            summary,
+            account_updates,
+            positions,
+            open_trades,
+        ) = await asyncio.gather(
+            self.ibkr.account_summary(self.account_number),
+            self.ibkr.refresh_account_updates(self.account_number),
+            self.ibkr.refresh_positions(),
+            self.ibkr.refresh_open_orders(),
+            return_exceptions=True,
+        )
+        if isinstance(summary, BaseException):
+            raise summary
+        if isinstance(open_trades, IBKRRequestTimeout):
+            log.warning(f"{open_trades}. Using the open orders synced at connect.")
+            open_trades = self.ibkr.open_trades()
+        elif isinstance(open_trades, BaseException):
+            raise open_trades
+
+        portfolio_positions: Optional[PositionBook] = None
+        timeout: Optional[IBKRRequestTimeout] = None
+        for result in (account_updates, positions):
+            if isinstance(result, IBKRRequestTimeout):
+                timeout = timeout or result
+            elif isinstance(result, BaseException):
+                raise result
+        if timeout is not None:
+            log.warning(f"{timeout}. Retrying the portfolio snapshot...")
+        else:
+            con_ids = [
+                pos.contract.conId
+                for pos in self.tracked_positions(cast(List[Position], positions))
+            ]
+            try:
+                items = await self.ibkr.wait_for_portfolio_items(
+                    self.account_number, con_ids
+                )
+            except IBKRRequestTimeout as exc:
+                log.warning(f"{exc}. Retrying the portfolio snapshot...")
+            else:
+                filtered_positions, untracked_positions = self.partition_positions(
+                    items
+                )
+                portfolio_positions = PositionBook(
+                    portfolio_positions_to_dict(filtered_positions)
+                )
+                self.last_untracked_positions = portfolio_positions_to_dict(
+                    untracked_positions
+                )
+                self._seed_live_portfolio(items)
+        if portfolio_positions is None:
+            portfolio_positions = await self.get_portfolio_positions()
+
+        return StartupSnapshot(
+            account_summary=account_summary_to_dict(summary),
+            positions=portfolio_positions,
+            untracked_positions=self.last_untracked_positions,
+            open_trades=list(open_trades),
+        )
+
+    def _seed_live_portfolio(self, items: List[PortfolioItem]) -> None:
+        self.live_portfolio.seed(items)
+        self.positions_version = self.live_portfolio.version
+
+    async def current_portfolio_positions(
+        self, positions: Dict[str, List[PortfolioItem]]
+    ) -> Dict[str, List[PortfolioItem]]:
+        """Return the positions as of now without a round trip when possible.
+
+        The live portfolio answers unless it has a gap, in which case the
+        positions are reconciled with a full ``get_portfolio_positions``.
+        ``positions`` is returned as is when nothing changed since it was read.
+        """
+        if self.live_portfolio.has_gap():
+            log.info("Reconciling portfolio positions with IBKR...")
+            return await self.get_portfolio_positions()
+        if self.live_portfolio.version == self.positions_version:
+            return positions
+        filtered_positions, untracked_positions = self.partition_positions(
+            self.live_portfolio.items()
+        )
+        self.last_untracked_positions = portfolio_positions_to_dict(untracked_positions)
+        self.positions_version = self.live_portfolio.version
+        return PositionBook(portfolio_positions_to_dict(filtered_positions))
+
+    async def get_portfolio_positions(self) -> PositionBook:
+        attempts = 3
         self.last_untracked_positions = {}
 
         for attempt in range(1, attempts + 1):
@@ -342,7 +492,9 @@ class PortfolioManager:
             filtered_positions, untracked_positions = self.partition_positions(
                 portfolio_positions
             )
-            portfolio_by_symbol = portfolio_positions_to_dict(filtered_positions)
+            portfolio_by_symbol = PositionBook(
+                portfolio_positions_to_dict(filtered_positions)
+            )
             self.last_untracked_positions = portfolio_positions_to_dict(
                 untracked_positions
             )
@@ -362,18 +514,7 @@ class PortfolioManager:
                     await asyncio.sleep(1)
                     continue
 
-                tracked_positions = [
-                    pos
-                    for pos in positions_snapshot
-                    if pos.account == self.account_number
-                    and (
-                        pos.contract.symbol in symbols
-                        or pos.contract.symbol == "VIX"
-                        or pos.contract.symbol
-                        == self.config.strategies.cash_management.cash_fund
-                    )
-                    and pos.position != 0
-                ]
+                tracked_positions = self.tracked_positions(positions_snapshot)
                 missing_positions = [
                     pos
                     for pos in tracked_positions
@@ -381,6 +522,7 @@ class PortfolioManager:
                 ]
 
                 if not missing_positions:
+                    self._seed_live_portfolio(portfolio_positions)
                     return portfolio_by_symbol
 
                 missing_symbols = ", ".join(
@@ -407,20 +549,10 @@ class PortfolioManager:
                 await asyncio.sleep(1)
                 continue
 
-            tracked_positions = [
-                pos
-                for pos in positions_snapshot
-                if pos.account == self.account_number
-                and (
-                    pos.contract.symbol in symbols
-                    or pos.contract.symbol == "VIX"
-                    or pos.contract.symbol
-                    == self.config.strategies.cash_management.cash_fund
-                )
-                and pos.position != 0
-            ]
+            tracked_positions = self.tracked_positions(positions_snapshot)
 
             if not tracked_positions:
+                self._seed_live_portfolio(portfolio_positions)
                 return portfolio_by_symbol
 
             log.warning(
@@ -437,13 +569,27 @@ class PortfolioManager:
             "Aborting run to avoid trading on incomplete data."
         )
 
-    def initialize_account(self) -> None:
+    def initialize_account(self, snapshot: Optional[StartupSnapshot] = None) -> None:
         self.ibkr.set_market_data_type(self.config.runtime.account.market_data_type)
+        open_trades = (
+            snapshot.open_trades if snapshot is not None else self.ibkr.open_trades()
+        )
 
-        if self.config.runtime.account.cancel_orders:
+        # Orders this run already placed before a reconnect are left alone.
+        own_order_ids = (
+            set(self.run_checkpoint.submitted_order_ids().values())
+            if self.run_checkpoint
+            else set()
+        )
+        if not self.config.runtime.account.cancel_orders:
+            # Keep earlier orders working, and let the stages skip symbols
+            # that already have one instead of planning them again.
+            self.working_orders.rebuild(open_trades, exclude_order_ids=own_order_ids)
+        else:
             # Cancel any existing orders
-            open_trades = self.ibkr.open_trades()
             for trade in open_trades:
+                if trade.order.orderId in own_order_ids:
+                    continue
                 if not trade.isDone() and (
                     trade.contract.symbol in self.get_symbols()
                     or (
@@ -463,19 +609,21 @@ class PortfolioManager:
 
     async def summarize_account(
         self,
+        snapshot: Optional[StartupSnapshot] = None,
     ) -> Tuple[
         Dict[str, AccountValue],
         Dict[str, List[PortfolioItem]],
     ]:
-        account_summary = await self.ibkr.account_summary(self.account_number)
-        account_summary = account_summary_to_dict(account_summary)
+        if snapshot is None:
+            snapshot = await self.load_startup_snapshot()
+        account_summary = snapshot.account_summary
 
         if "NetLiquidation" not in account_summary:
             raise RuntimeError(
                 f"Account number {self.config.runtime.account.number} appears invalid (no account data returned)"
             )
 
-        table = Table(title="Account summary")
+        table = log.table(title="Account summary")
         table.add_column("Item")
         table.add_column("Value", justify="right")
         table.add_row(
@@ -497,8 +645,8 @@ class PortfolioManager:
         )
         log.print(Panel(table))
 
-        portfolio_positions = await self.get_portfolio_positions()
-        untracked_positions = self.last_untracked_positions
+        portfolio_positions = snapshot.positions
+        untracked_positions = snapshot.untracked_positions
         if self.data_store:
             self.data_store.record_account_snapshot(account_summary)
             combined_positions: Dict[str, List[PortfolioItem]] = dict(
@@ -564,7 +712,7 @@ class PortfolioManager:
                 tasks.append(load_position_task(position))
         await log.track_async(tasks, "Loading portfolio positions...")
 
-        table = Table(
+        table = log.table(
             title="Portfolio positions",
             collapse_padding=True,
         )
@@ -649,13 +797,120 @@ class PortfolioManager:
 
         return (account_summary, portfolio_positions)
 
+    def report_portfolio_risk(
+        self,
+        portfolio_positions: Dict[str, List[PortfolioItem]],
+        untracked_positions: Dict[str, List[PortfolioItem]],
+    ) -> PortfolioRisk:
+        """Print and record account greeks from the quotes this run cached."""
+        positions = {
+            symbol: list(items) for symbol, items in portfolio_positions.items()
+        }
+        for symbol, items in untracked_positions.items():
+            positions.setdefault(symbol, []).extend(items)
+        betas = {
+            symbol: symbol_config.beta
+            for symbol, symbol_config in self.config.portfolio.symbols.items()
+        }
+        risk = aggregate_risk(
+            build_risk_arrays(positions, self.ibkr.cached_ticker), betas
+        )
+        print_portfolio_risk(risk)
+        if self.data_store:
+            self.data_store.record_risk_snapshot(risk)
+        return risk
+
+    def report_working_order_skips(self) -> None:
+        skipped = self.working_orders.skipped()
+        if not skipped:
+            return
+        self.working_orders.print_summary()
+        if self.data_store:
+            self.data_store.record_event(
+                "working_orders_skipped",
+                {
+                    "skipped": [
+                        {
+                            "symbol": symbol,
+                            "right": right or None,
+                            "stage": stage_id,
+                            "order_ids": [trade.order.orderId for trade in trades],
+                        }
+                        for (symbol, right, stage_id), trades in skipped.items()
+                    ]
+                },
+            )
+
+    def _resume_checkpoint(self) -> set[str]:
+        """Restore in-memory run state to the last completed stage.
+
+        Orders queued by completed stages are kept, those of the interrupted
+        stage are dropped so it can queue them again, and trades are rebuilt
+        from the open orders when the orders are submitted.
+        """
+        if self.run_checkpoint is None:
+            return set()
+        completed = self.run_checkpoint.begin()
+        if not self.run_checkpoint.resuming:
+            return set()
+        self.orders.retain(set().union(*completed.values()))
+        self.trades.clear()
+        remaining = [
+            stage_id for stage_id in self.run_stage_order if stage_id not in completed
+        ]
+        log.notice(
+            f"Resuming run after reconnect (attempt {self.run_checkpoint.attempts}), "
+            f"{len(completed)} stages already done, next: "
+            f"{remaining[0] if remaining else 'order submission'}"
+        )
+        if self.data_store:
+            self.data_store.record_event(
+                "run_resume",
+                {
+                    "attempt": self.run_checkpoint.attempts,
+                    "completed_stages": list(completed),
+                },
+            )
+        return set(completed)
+
+    def _complete_stage(self, stage_ids: List[str], queued_before: int) -> None:
+        if self.run_checkpoint is None:
+            return
+        intent_ids = [
+            intent_id
+            for _contract, _order, intent_id in self.orders.records()[queued_before:]
+            if intent_id is not None
+        ]
+        for stage_id in stage_ids:
+            self.run_checkpoint.complete_stage(
+                stage_id, intent_ids if stage_id == stage_ids[0] else []
+            )
+
+    def _profile_stage(self, name: str) -> ContextManager[None]:
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(name)
+
+    def _interrupted_by_disconnect(self) -> bool:
+        return (
+            self.resume_on_reconnect
+            and self.run_checkpoint is not None
+            and not self.ibkr.ib.isConnected()
+        )
+
     async def manage(self) -> None:
         had_error = False
+        suspended = False
         try:
             if self.data_store:
                 self.data_store.record_event("run_start", {"dry_run": self.dry_run})
-            self.initialize_account()
-            (account_summary, portfolio_positions) = await self.summarize_account()
+            completed_stages = self._resume_checkpoint()
+            with self._profile_stage("startup"):
+                snapshot = await self.load_startup_snapshot()
+                self.initialize_account(snapshot)
+                (account_summary, portfolio_positions) = await self.summarize_account(
+                    snapshot
+                )
 
             options_enabled = self.options_trading_enabled()
             enabled_stages = set(self.run_stage_order)
@@ -680,6 +935,8 @@ class PortfolioManager:
             }
 
             for stage_id in self.run_stage_order:
+                if stage_id in completed_stages:
+                    continue
                 if stage_id in option_stage_ids and not options_enabled:
                     if not options_disabled_notice_logged:
                         log.notice(
@@ -687,68 +944,87 @@ class PortfolioManager:
                         )
                         options_disabled_notice_logged = True
                     continue
+                if stage_id == "options_close_positions" and close_stage_handled:
+                    # Already run together with options_roll_positions.
+                    continue
 
-                if stage_id in refresh_before_stage_ids and positions_might_be_stale:
-                    portfolio_positions = await self.get_portfolio_positions()
-                    positions_might_be_stale = False
-
-                if stage_id in write_stage_ids:
-                    await run_option_write_stages(
-                        self._options_strategy_deps({stage_id}),
-                        account_summary,
-                        portfolio_positions,
-                        options_enabled,
-                    )
-                elif stage_id == "options_roll_positions":
+                with self._profile_stage(stage_id):
                     if (
-                        "options_close_positions" in enabled_stages
-                        and stage_index[stage_id]
-                        < stage_index["options_close_positions"]
+                        stage_id in refresh_before_stage_ids
+                        and positions_might_be_stale
                     ):
-                        await run_option_management_stages(
-                            self._options_strategy_deps(
-                                {"options_roll_positions", "options_close_positions"}
-                            ),
+                        portfolio_positions = await self.current_portfolio_positions(
+                            portfolio_positions
+                        )
+                        positions_might_be_stale = False
+
+                    queued_before = len(self.orders.records())
+                    handled_stage_ids = [stage_id]
+
+                    if stage_id in write_stage_ids:
+                        await run_option_write_stages(
+                            self._options_strategy_deps({stage_id}),
                             account_summary,
                             portfolio_positions,
                             options_enabled,
                         )
-                        close_stage_handled = True
-                    else:
+                    elif stage_id == "options_roll_positions":
+                        if (
+                            "options_close_positions" in enabled_stages
+                            and stage_index[stage_id]
+                            < stage_index["options_close_positions"]
+                        ):
+                            await run_option_management_stages(
+                                self._options_strategy_deps(
+                                    {
+                                        "options_roll_positions",
+                                        "options_close_positions",
+                                    }
+                                ),
+                                account_summary,
+                                portfolio_positions,
+                                options_enabled,
+                            )
+                            close_stage_handled = True
+                            handled_stage_ids.append("options_close_positions")
+                        else:
+                            await run_option_management_stages(
+                                self._options_strategy_deps({"options_roll_positions"}),
+                                account_summary,
+                                portfolio_positions,
+                                options_enabled,
+                            )
+                    elif stage_id == "options_close_positions":
                         await run_option_management_stages(
-                            self._options_strategy_deps({"options_roll_positions"}),
+                            self._options_strategy_deps({"options_close_positions"}),
                             account_summary,
                             portfolio_positions,
                             options_enabled,
                         )
-                elif stage_id == "options_close_positions":
-                    if close_stage_handled:
-                        continue
-                    await run_option_management_stages(
-                        self._options_strategy_deps({"options_close_positions"}),
-                        account_summary,
-                        portfolio_positions,
-                        options_enabled,
-                    )
-                elif stage_id in {
-                    "equity_regime_rebalance",
-                    "equity_buy_rebalance",
-                    "equity_sell_rebalance",
-                }:
-                    await run_equity_rebalance_stages(
-                        self._equity_strategy_deps({stage_id}),
-                        account_summary,
-                        portfolio_positions,
-                    )
-                elif stage_id in post_stage_ids:
-                    await run_post_stages(
-                        self._post_strategy_deps({stage_id}),
-                        account_summary,
-                        portfolio_positions,
-                    )
+                    elif stage_id in {
+                        "equity_regime_rebalance",
+                        "equity_buy_rebalance",
+                        "equity_sell_rebalance",
+                    }:
+                        await run_equity_rebalance_stages(
+                            self._equity_strategy_deps({stage_id}),
+                            account_summary,
+                            portfolio_positions,
+                        )
+                    elif stage_id in post_stage_ids:
+                        await run_post_stages(
+                            self._post_strategy_deps({stage_id}),
+                            account_summary,
+                            portfolio_positions,
+                        )
+
+                    self._complete_stage(handled_stage_ids, queued_before)
+                    if stage_id in pre_management_trade_stage_ids:
+                        positions_might_be_stale = True
 
-                if stage_id in pre_management_trade_stage_ids:
-                    positions_might_be_stale = True
+            self.report_portfolio_risk(
+                portfolio_positions, snapshot.untracked_positions
+            )
 
             if self.dry_run:
                 log.warning("Dry run enabled, no trades will be executed.")
@@ -803,27 +1079,53 @@ class PortfolioManager:
                         f"{unexpected_orders}"
                     )
 
+            self.report_working_order_skips()
             log.info("ThetaGang is done, shutting down! Cya next time. :sparkles:")
-        except:
+        except BaseException as exc:
+            # Cancellation and interrupts always end the run, so shutdown never
+            # waits on a resume that won't come.
+            if isinstance(exc, Exception) and self._interrupted_by_disconnect():
+                # The watchdog reconnects and calls manage() again, which
+                # picks up from the last completed stage.
+                suspended = True
+                log.warning(
+                    "Lost the connection to IB Gateway, the run resumes after "
+                    "reconnecting."
+                )
+                return
             had_error = True
             log.error("ThetaGang terminated with error...")
             raise
 
         finally:
             # Shut it down
-            if self.data_store:
-                self.data_store.record_event("run_end", {"success": not had_error})
-            self.completion_future.set_result(True)
+            self.live_portfolio.detach()
+            if suspended:
+                if self.data_store:
+                    self.data_store.record_event("run_suspended", {})
+            else:
+                if self.data_store:
+                    self.data_store.record_event(
+                        "request_pacing", self.ibkr.scheduler.summary()
+                    )
+                    self.data_store.record_event("run_end", {"success": not had_error})
+                self.completion_future.set_result(True)
 
     async def check_puts(
-        self, portfolio_positions: Dict[str, List[PortfolioItem]]
+        self,
+        portfolio_positions: Dict[str, List[PortfolioItem]],
+        prefetch_rolls: bool = False,
     ) -> Tuple[List[Any], List[Any], Group]:
-        return await self.options_engine.check_puts(portfolio_positions)
+        return await self.options_engine.check_puts(portfolio_positions, prefetch_rolls)
 
     async def check_calls(
-        self, portfolio_positions: Dict[str, List[PortfolioItem]]
+        self,
+        portfolio_positions: Dict[str, List[PortfolioItem]],
+        prefetch_rolls: bool = False,
     ) -> Tuple[List[Any], List[Any], Group]:
-        return await self.options_engine.check_calls(portfolio_positions)
+        return await self.options_engine.check_calls(
+            portfolio_positions, prefetch_rolls
+        )
 
     async def get_maximum_new_contracts_for(
         self,
@@ -1051,7 +1353,26 @@ class PortfolioManager:
         await self.post_engine.do_cashman(account_summary, portfolio_positions)
 
     def submit_orders(self) -> None:
+        submitted = (
+            self.run_checkpoint.submitted_order_ids() if self.run_checkpoint else {}
+        )
+        working = (
+            {trade.order.orderId: trade for trade in self.ibkr.open_trades()}
+            if submitted
+            else {}
+        )
         for contract, order, intent_id in self.orders.records():
+            if intent_id is not None and intent_id in submitted:
+                # Placed by an attempt that was cut off by a disconnect.
+                trade = working.get(submitted[intent_id])
+                if trade is not None:
+                    self.trades.track(trade)
+                else:
+                    log.info(
+                        f"{contract.symbol}: Order {submitted[intent_id]} was "
+                        "submitted before reconnecting and is no longer working"
+                    )
+                continue
             self.trades.submit_order(contract, order, intent_id=intent_id)
         self.trades.print_summary()
 
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+from ib_async import PortfolioItem, Ticker
+from ib_async.contract import Contract, Option, Stock
+
+from thetagang import log
+from thetagang.fmt import dfmt, ffmt, ifmt
+from thetagang.options import option_dte
+
+RISK_FIELDS = (
+    "delta",
+    "dollar_delta",
+    "beta_weighted_delta",
+    "gamma",
+    "theta",
+)
+
+
+@dataclass
+class RiskArrays:
+    """One row per stock or option line, as parallel numpy arrays.
+
+    Per-share greeks are NaN where no cached quote carried them. Stocks have
+    a delta of one and no gamma or theta.
+    """
+
+    symbols: List[str]
+    symbol_index: np.ndarray
+    is_option: np.ndarray
+    quantity: np.ndarray
+    multiplier: np.ndarray
+    strike: np.ndarray
+    is_call: np.ndarray
+    dte: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    theta: np.ndarray
+    underlying_price: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.quantity)
+
+
+@dataclass(frozen=True)
+class SymbolRisk:
+    symbol: str
+    delta: float
+    dollar_delta: float
+    beta_weighted_delta: float
+    gamma: float
+    theta: float
+    option_lines: int
+    missing_greeks: int
+
+
+@dataclass(frozen=True)
+class PortfolioRisk:
+    """Greeks summed per symbol and across the account.
+
+    ``delta`` and ``gamma`` are in shares of the underlying, ``dollar_delta``
+    and ``beta_weighted_delta`` in dollars, and ``theta`` in dollars per day.
+    Option lines without greeks contribute nothing and are counted in
+    ``missing_greeks``.
+    """
+
+    symbols: Dict[str, SymbolRisk]
+    total: SymbolRisk
+
+
+def _as_array(values: List[Optional[float]]) -> np.ndarray:
+    """Float array with missing (None) and non-finite values as NaN."""
+    array = np.array(values, dtype=float)
+    array[~np.isfinite(array)] = math.nan
+    return array
+
+
+def build_risk_arrays(
+    positions: Mapping[str, Iterable[PortfolioItem]],
+    cached_ticker: Callable[[Contract], Optional[Ticker]],
+) -> RiskArrays:
+    """Flatten positions and their cached greeks into arrays.
+
+    ``cached_ticker`` must only read quotes that were already received; the
+    risk summary never issues market data requests of its own.
+    """
+    symbols = list(positions)
+    lines = [
+        (index, item)
+        for index, items in enumerate(positions.values())
+        for item in items
+        if item.position != 0 and isinstance(item.contract, (Stock, Option))
+    ]
+    # Filled as lists and converted once; per-element numpy writes are slow.
+    count = len(lines)
+    symbol_index = [index for index, _item in lines]
+    quantity = [item.position for _index, item in lines]
+    is_option = [False] * count
+    multiplier = [1.0] * count
+    strike = [math.nan] * count
+    is_call = [False] * count
+    dte = [0] * count
+    delta: List[Optional[float]] = [1.0] * count
+    gamma: List[Optional[float]] = [0.0] * count
+    theta: List[Optional[float]] = [0.0] * count
+    underlying_price: List[Optional[float]] = [math.nan] * count
+
+    dte_by_expiry: Dict[str, int] = {}
+    stock_prices: List[Optional[float]] = [math.nan] * len(symbols)
+    for row, (index, item) in enumerate(lines):
+        contract = item.contract
+        if isinstance(contract, Stock):
+            underlying_price[row] = stock_prices[index] = item.marketPrice
+            continue
+        expiry = contract.lastTradeDateOrContractMonth
+        if expiry not in dte_by_expiry:
+            dte_by_expiry[expiry] = option_dte(expiry)
+        ticker = cached_ticker(contract)
+        greeks = ticker.modelGreeks if ticker is not None else None
+        is_option[row] = True
+        multiplier[row] = float(contract.multiplier or 100)
+        strike[row] = contract.strike
+        is_call[row] = contract.right[:1].upper() == "C"
+        dte[row] = dte_by_expiry[expiry]
+        if greeks is not None:
+            delta[row] = greeks.delta
+            gamma[row] = greeks.gamma
+            theta[row] = greeks.theta
+            underlying_price[row] = greeks.undPrice
+        else:
+            delta[row] = gamma[row] = theta[row] = math.nan
+
+    arrays = RiskArrays(
+        symbols=symbols,
+        symbol_index=np.array(symbol_index, dtype=np.intp),
+        is_option=np.array(is_option, dtype=bool),
+        quantity=np.array(quantity, dtype=float),
+        multiplier=np.array(multiplier, dtype=float),
+        strike=np.array(strike, dtype=float),
+        is_call=np.array(is_call, dtype=bool),
+        dte=np.array(dte, dtype=np.int64),
+        delta=_as_array(delta),
+        gamma=_as_array(gamma),
+        theta=_as_array(theta),
+        underlying_price=_as_array(underlying_price),
+    )
+    # Options quoted without greeks can still be valued against the shares.
+    missing_price = np.isnan(arrays.underlying_price)
+    arrays.underlying_price[missing_price] = _as_array(stock_prices)[
+        arrays.symbol_index[missing_price]
+    ]
+    return arrays
+
+
+def aggregate_risk(
+    arrays: RiskArrays, betas: Optional[Mapping[str, float]] = None
+) -> PortfolioRisk:
+    """Sum position greeks per symbol in one vectorized pass."""
+    betas = betas or {}
+    delta = arrays.delta.copy()
+    # An option expiring today without a quote is worth its intrinsic delta.
+    expiring = arrays.is_option & (arrays.dte <= 0) & np.isnan(delta)
+    itm = np.where(
+        arrays.is_call,
+        arrays.underlying_price > arrays.strike,
+        arrays.underlying_price < arrays.strike,
+    )
+    intrinsic = np.where(itm, np.where(arrays.is_call, 1.0, -1.0), 0.0)
+    known_price = ~np.isnan(arrays.underlying_price)
+    delta[expiring & known_price] = intrinsic[expiring & known_price]
+    gamma = np.where(expiring & known_price, 0.0, arrays.gamma)
+    theta = np.where(expiring & known_price, 0.0, arrays.theta)
+
+    shares = arrays.quantity * arrays.multiplier
+    share_delta = shares * delta
+    dollar_delta = share_delta * arrays.underlying_price
+    beta = np.array([betas.get(symbol, 1.0) for symbol in arrays.symbols], dtype=float)
+    line_beta = beta[arrays.symbol_index]
+    columns = {
+        "delta": share_delta,
+        "dollar_delta": dollar_delta,
+        "beta_weighted_delta": dollar_delta * line_beta,
+        "gamma": shares * gamma,
+        "theta": shares * theta,
+    }
+
+    count = len(arrays.symbols)
+    sums = {
+        name: np.bincount(
+            arrays.symbol_index, weights=np.nan_to_num(values), minlength=count
+        )
+        for name, values in columns.items()
+    }
+    option_lines = np.bincount(
+        arrays.symbol_index, weights=arrays.is_option, minlength=count
+    )
+    missing = np.bincount(
+        arrays.symbol_index,
+        weights=arrays.is_option & np.isnan(delta),
+        minlength=count,
+    )
+
+    per_symbol = {
+        symbol: SymbolRisk(
+            symbol,
+            *(float(sums[name][index]) for name in RISK_FIELDS),
+            option_lines=int(option_lines[index]),
+            missing_greeks=int(missing[index]),
+        )
+        for index, symbol in enumerate(arrays.symbols)
+    }
+    total = SymbolRisk(
+        "",
+        *(float(sums[name].sum()) for name in RISK_FIELDS),
+        option_lines=int(option_lines.sum()),
+        missing_greeks=int(missing.sum()),
+    )
+    return PortfolioRisk(symbols=per_symbol, total=total)
+
+
+def print_portfolio_risk(risk: PortfolioRisk) -> None:
+    table = log.table(title="Portfolio risk")
+    table.add_column("Symbol")
+    table.add_column("Delta", justify="right")
+    table.add_column("$ Delta", justify="right")
+    table.add_column("β-wtd $ Delta", justify="right")
+    table.add_column("Gamma", justify="right")
+    table.add_column("Theta/day", justify="right")
+    table.add_column("No greeks", justify="right")
+
+    def add_row(name: str, row: SymbolRisk) -> None:
+        table.add_row(
+            name,
+            ffmt(row.delta, 1),
+            dfmt(row.dollar_delta, 0),
+            dfmt(row.beta_weighted_delta, 0),
+            ffmt(row.gamma, 2),
+            dfmt(row.theta, 0),
+            ifmt(row.missing_greeks) if row.missing_greeks else "",
+        )
+
+    for symbol, row in risk.symbols.items():
+        add_row(symbol, row)
+    table.add_section()
+    add_row("Total", risk.total)
+    log.print(table)
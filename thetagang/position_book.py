@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from ib_async import PortfolioItem
+from ib_async.contract import Option, Stock
+
+from thetagang.options import option_dte
+from thetagang.util import net_short_contracts
+
+SHORT = "short"
+LONG = "long"
+
+
+def _normalize_right(right: str) -> str:
+    return right.upper()[:1]
+
+
+class PositionBook(Dict[str, List[PortfolioItem]]):
+    """Portfolio positions grouped by symbol, plus indexes built once.
+
+    A PositionBook is a drop-in replacement for the ``Dict[str,
+    List[PortfolioItem]]`` mapping the engines already accept, so callers that
+    only iterate it keep working. Option positions are additionally indexed by
+    (symbol, right, side) with their DTE parsed once, and aggregates are cached
+    on first use. The book is a point-in-time snapshot: build a new one after
+    refreshing positions rather than mutating it.
+    """
+
+    def __init__(self, positions: Mapping[str, Iterable[PortfolioItem]]) -> None:
+        super().__init__({symbol: list(items) for symbol, items in positions.items()})
+        self._by_sec_type: Dict[Tuple[str, str], List[PortfolioItem]] = {}
+        self._options: Dict[Tuple[str, str, str], List[PortfolioItem]] = {}
+        self._short_by_right: Dict[str, List[PortfolioItem]] = {}
+        self._dte: Dict[int, int] = {}
+        self._aggregates: Dict[Tuple[Any, ...], Any] = {}
+        dte_by_expiry: Dict[str, int] = {}
+        for symbol, items in self.items():
+            for item in items:
+                contract = item.contract
+                if isinstance(contract, Option):
+                    sec_type = "OPT"
+                    expiry = contract.lastTradeDateOrContractMonth
+                    if expiry not in dte_by_expiry:
+                        dte_by_expiry[expiry] = option_dte(expiry)
+                    self._dte[id(item)] = dte_by_expiry[expiry]
+                    if item.position != 0:
+                        right = _normalize_right(contract.right)
+                        side = SHORT if item.position < 0 else LONG
+                        self._options.setdefault((symbol, right, side), []).append(item)
+                        if side == SHORT:
+                            self._short_by_right.setdefault(right, []).append(item)
+                elif isinstance(contract, Stock):
+                    sec_type = "STK"
+                else:
+                    sec_type = getattr(contract, "secType", "")
+                self._by_sec_type.setdefault((symbol, sec_type), []).append(item)
+
+    @classmethod
+    def of(cls, positions: Mapping[str, Iterable[PortfolioItem]]) -> PositionBook:
+        """Return ``positions`` if it is already a book, otherwise index it."""
+        if isinstance(positions, PositionBook):
+            return positions
+        return cls(positions)
+
+    def _cached(self, key: Tuple[Any, ...], compute: Callable[[], Any]) -> Any:
+        if key not in self._aggregates:
+            self._aggregates[key] = compute()
+        return self._aggregates[key]
+
+    def dte(self, item: PortfolioItem) -> int:
+        cached = self._dte.get(id(item))
+        if cached is not None:
+            return cached
+        return option_dte(item.contract.lastTradeDateOrContractMonth)
+
+    def by_sec_type(self, symbol: str, sec_type: str) -> List[PortfolioItem]:
+        return self._by_sec_type.get((symbol, sec_type), [])
+
+    def stocks(self, symbol: str) -> List[PortfolioItem]:
+        return self.by_sec_type(symbol, "STK")
+
+    def stock_quantity(self, symbol: str) -> int:
+        return self._cached(
+            ("stock_quantity", symbol),
+            lambda: math.floor(sum(p.position for p in self.stocks(symbol))),
+        )
+
+    def options(self, symbol: str, right: str, side: str) -> List[PortfolioItem]:
+        return self._options.get((symbol, _normalize_right(right), side), [])
+
+    def short_options(self, symbol: str, right: str) -> List[PortfolioItem]:
+        return self.options(symbol, right, SHORT)
+
+    def long_options(self, symbol: str, right: str) -> List[PortfolioItem]:
+        return self.options(symbol, right, LONG)
+
+    def all_short_options(self, right: str) -> List[PortfolioItem]:
+        return self._short_by_right.get(_normalize_right(right), [])
+
+    def by_expiry(self, symbol: str, right: str) -> Dict[str, List[PortfolioItem]]:
+        def compute() -> Dict[str, List[PortfolioItem]]:
+            grouped: Dict[str, List[PortfolioItem]] = {}
+            for side in (SHORT, LONG):
+                for item in self.options(symbol, right, side):
+                    expiry = item.contract.lastTradeDateOrContractMonth
+                    grouped.setdefault(expiry, []).append(item)
+            return grouped
+
+        return self._cached(("by_expiry", symbol, _normalize_right(right)), compute)
+
+    def count_short_options(self, symbol: str, right: str) -> int:
+        return self._cached(
+            ("count", symbol, _normalize_right(right), SHORT),
+            lambda: math.floor(
+                -sum(p.position for p in self.short_options(symbol, right))
+            ),
+        )
+
+    def count_long_options(self, symbol: str, right: str) -> int:
+        return self._cached(
+            ("count", symbol, _normalize_right(right), LONG),
+            lambda: math.floor(
+                sum(p.position for p in self.long_options(symbol, right))
+            ),
+        )
+
+    def weighted_avg_strike(
+        self, symbol: str, right: str, side: str
+    ) -> Optional[float]:
+        def compute() -> Optional[float]:
+            legs = [
+                (abs(p.position), p.contract.strike)
+                for p in self.options(symbol, right, side)
+            ]
+            den = sum(qty for qty, _strike in legs)
+            if den > 0:
+                return sum(qty * strike for qty, strike in legs) / den
+            return None
+
+        return self._cached(
+            ("avg_strike", symbol, _normalize_right(right), side), compute
+        )
+
+    def net_short_options(self, symbol: str, right: str) -> int:
+        def legs(side: str) -> List[Tuple[int, float, float]]:
+            return [
+                (self.dte(p), float(p.contract.strike), float(p.position))
+                for p in self.options(symbol, right, side)
+            ]
+
+        return self._cached(
+            ("net_short", symbol, _normalize_right(right)),
+            lambda: net_short_contracts(legs(SHORT), legs(LONG), right),
+        )
+
+    def net_options(
+        self, symbol: str, right: str, ignore_dte: Optional[int] = None
+    ) -> int:
+        def compute() -> int:
+            return math.floor(
+                sum(
+                    p.position
+                    for side in (SHORT, LONG)
+                    for p in self.options(symbol, right, side)
+                    if self.dte(p) >= 0 and (not ignore_dte or self.dte(p) > ignore_dte)
+                )
+            )
+
+        return self._cached(
+            ("net", symbol, _normalize_right(right), ignore_dte), compute
+        )
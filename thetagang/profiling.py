@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import linecache
+import pstats
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from thetagang import log
+
+# Frames kept per allocation; the report groups by the innermost one.
+TRACE_FRAMES = 10
+# Functions in these files are reported as engine entry points.
+ENTRY_POINT_PATHS = ("thetagang/strategies/", "thetagang\\strategies\\")
+SUMMARY_FILE = "summary.json"
+
+
+@dataclass(frozen=True)
+class StageProfile:
+    stage: str
+    wall_seconds: float
+    cpu_seconds: float
+    peak_bytes: Optional[int]
+    allocated_bytes: Optional[int]
+    pstats_file: Optional[str]
+    allocations_file: Optional[str]
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "stage"
+
+
+class StageProfiler:
+    """Profile each stage of a run into files under ``directory``.
+
+    Each stage gets a cProfile dump (``NN-<stage>.pstats``, readable with
+    ``python -m pstats``) and, when memory tracing is on, the source lines
+    that allocated the most memory during the stage (``NN-<stage>.alloc.txt``).
+    ``summary.json`` lists the wall time, CPU time and peak traced memory of
+    every stage. Profiling never fails a run: errors only log a warning.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        memory: bool = True,
+        top_allocations: int = 25,
+        entry_points: bool = False,
+    ) -> None:
+        self.directory = directory
+        self.memory = memory
+        self.top_allocations = top_allocations
+        self.entry_points = entry_points
+        self.profiles: List[StageProfile] = []
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        stem = f"{len(self.profiles) + 1:02d}-{_slug(name)}"
+        before: Optional[tracemalloc.Snapshot] = None
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACE_FRAMES)
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+        profile: Optional[cProfile.Profile] = cProfile.Profile()
+        try:
+            profile.enable()  # type: ignore[union-attr]
+        except ValueError as exc:
+            # Another profiler (or a debugger) already owns the hook.
+            log.warning(f"Not profiling {name} for CPU: {exc}")
+            profile = None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = tracemalloc.get_traced_memory()[1] if before else None
+            try:
+                self._record(name, stem, profile, before, wall, cpu, peak)
+            except Exception as exc:
+                log.warning(f"Failed to write the profile of {name}: {exc}")
+
+    def _record(
+        self,
+        name: str,
+        stem: str,
+        profile: Optional[cProfile.Profile],
+        before: Optional[tracemalloc.Snapshot],
+        wall: float,
+        cpu: float,
+        peak: Optional[int],
+    ) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        pstats_file = None
+        if profile is not None:
+            pstats_file = f"{stem}.pstats"
+            profile.dump_stats(self.directory / pstats_file)
+            if self.entry_points:
+                self._write_entry_points(profile, self.directory / f"{stem}.entry.txt")
+        allocations_file = None
+        allocated = None
+        if before is not None:
+            allocations_file = f"{stem}.alloc.txt"
+            allocated = self._write_allocations(
+                name, before, self.directory / allocations_file
+            )
+        self.profiles.append(
+            StageProfile(
+                stage=name,
+                wall_seconds=wall,
+                cpu_seconds=cpu,
+                peak_bytes=peak,
+                allocated_bytes=allocated,
+                pstats_file=pstats_file,
+                allocations_file=allocations_file,
+            )
+        )
+
+    def _write_allocations(
+        self, name: str, before: tracemalloc.Snapshot, path: Path
+    ) -> int:
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ]
+        after = tracemalloc.take_snapshot().filter_traces(filters)
+        stats = after.compare_to(before.filter_traces(filters), "lineno")
+        lines = [f"Top allocations during {name} (net change, by source line)", ""]
+        for stat in stats[: self.top_allocations]:
+            frame = stat.traceback[0]
+            lines.append(
+                f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  "
+                f"{frame.filename}:{frame.lineno}"
+            )
+            source = linecache.getline(frame.filename, frame.lineno).strip()
+            if source:
+                lines.append(f"{'':32}{source}")
+        path.write_text("\n".join(lines) + "\n", encoding="utf8")
+        return sum(stat.size_diff for stat in stats)
+
+    def _write_entry_points(self, profile: cProfile.Profile, path: Path) -> None:
+        rows: List[Tuple[float, float, int, str]] = []
+        stats = pstats.Stats(profile).stats  # type: ignore[attr-defined]
+        for (filename, lineno, function), row in stats.items():
+            _primitive_calls, calls, tottime, cumtime, _callers = row
+            if function.startswith("_") or not any(
+                part in filename for part in ENTRY_POINT_PATHS
+            ):
+                continue
+            location = f"{Path(filename).name}:{lineno}({function})"
+            rows.append((cumtime, tottime, calls, location))
+        rows.sort(reverse=True)
+        # Coroutines are only timed while they run, not while they await.
+        lines = [f"{'cumulative s':>12} {'own s':>9} {'calls':>7}  entry point"]
+        lines += [
+            f"{cumtime:12.4f} {tottime:9.4f} {calls:7d}  {location}"
+            for cumtime, tottime, calls, location in rows
+        ]
+        path.write_text("\n".join(lines) + "\n", encoding="utf8")
+
+    def close(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        if not self.profiles:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (self.directory / SUMMARY_FILE).write_text(
+                json.dumps([asdict(profile) for profile in self.profiles], indent=2)
+                + "\n",
+                encoding="utf8",
+            )
+        except Exception as exc:
+            log.warning(f"Failed to write the profile summary: {exc}")
+            return
+        log.notice(f"Wrote profiles of {len(self.profiles)} stages to {self.directory}")
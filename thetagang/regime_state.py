@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from dataclasses import asdict, dataclass, field, replace
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from thetagang.db import DataStore
+
+
+def window_key(symbols: Sequence[str], lookback_days: int, cooldown_days: int) -> str:
+    raw = json.dumps([list(symbols), lookback_days, cooldown_days])
+    return hashlib.sha1(raw.encode("utf8")).hexdigest()
+
+
+@dataclass
+class RatioAccumulator:
+    """Rolling sums of the rest/anchor log-ratio returns over ``lookback`` days.
+
+    The sums cover settled days only, up to ``last_date``. ``spec`` identifies
+    the anchor, basket weights and eps they were built with; a different spec
+    means the stored sums are meaningless.
+    """
+
+    spec: List[Any]
+    last_date: str
+    level: float
+    returns: List[float] = field(default_factory=list)
+    total: float = 0.0
+    total_sq: float = 0.0
+    advances: int = 0
+
+    @classmethod
+    def build(
+        cls, spec: List[Any], last_date: date, levels: Sequence[float], lookback: int
+    ) -> RatioAccumulator:
+        accumulator = cls(spec=spec, last_date=last_date.isoformat(), level=levels[0])
+        accumulator.advance(levels[1:], lookback)
+        accumulator.resync()
+        return accumulator
+
+    def advance(self, levels: Sequence[float], lookback: int) -> None:
+        for level in levels:
+            value = level - self.level
+            self.level = level
+            self.returns.append(value)
+            self.total += value
+            self.total_sq += value * value
+            if len(self.returns) > lookback:
+                dropped = self.returns.pop(0)
+                self.total -= dropped
+                self.total_sq -= dropped * dropped
+            self.advances += 1
+        # Add/subtract updates accumulate rounding error; re-summing once per
+        # window length keeps it bounded at O(1) amortized cost.
+        if self.advances >= lookback:
+            self.resync()
+
+    def resync(self) -> None:
+        self.total = math.fsum(self.returns)
+        self.total_sq = math.fsum(value * value for value in self.returns)
+        self.advances = 0
+
+    def stats(self, lookback: int) -> Optional[Tuple[float, float, float]]:
+        """Return (variance, mean, std) with ddof=1, or None without a window."""
+        if len(self.returns) < lookback or lookback < 2:
+            return None
+        mean = self.total / lookback
+        variance = max((self.total_sq - lookback * mean * mean) / (lookback - 1), 0.0)
+        return variance, mean, math.sqrt(variance)
+
+
+@dataclass
+class RegimeWindow:
+    """The trailing aligned closes the regime gates read, plus ratio sums."""
+
+    key: str
+    dates: List[date]
+    closes: Dict[str, List[float]]
+    ratio: Optional[RatioAccumulator] = None
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "dates": [day.isoformat() for day in self.dates],
+            "closes": self.closes,
+            "ratio": asdict(self.ratio) if self.ratio else None,
+        }
+
+    @classmethod
+    def from_payload(cls, key: str, payload: Dict[str, Any]) -> RegimeWindow:
+        ratio = payload.get("ratio")
+        return cls(
+            key=key,
+            dates=[date.fromisoformat(day) for day in payload["dates"]],
+            closes={
+                symbol: [float(close) for close in closes]
+                for symbol, closes in payload["closes"].items()
+            },
+            ratio=RatioAccumulator(**ratio) if ratio else None,
+        )
+
+    def merge(
+        self, dates: Sequence[date], closes: Dict[str, List[float]], keep: int
+    ) -> Optional[List[date]]:
+        """Replace the days after the stored window's anchor and trim to ``keep``.
+
+        The newest stored day may have been a partial intraday bar, so the
+        anchor is the day before it. Returns the days that were (re)written,
+        or None when the fresh history disagrees with the stored anchor close
+        (a split or other revision), in which case the caller must rebuild
+        from a full history request.
+        """
+        anchor = self.dates[-2] if len(self.dates) >= 2 else self.dates[-1]
+        if anchor not in dates:
+            return None
+        fresh_index = list(dates).index(anchor)
+        stored_index = self.dates.index(anchor)
+        for symbol, stored in self.closes.items():
+            fresh = closes.get(symbol)
+            if fresh is None or not math.isclose(
+                fresh[fresh_index], stored[stored_index], rel_tol=1e-9
+            ):
+                return None
+        written = list(dates[fresh_index + 1 :])
+        self.dates = (self.dates[: stored_index + 1] + written)[-keep:]
+        for symbol in self.closes:
+            self.closes[symbol] = (
+                self.closes[symbol][: stored_index + 1]
+                + list(closes[symbol][fresh_index + 1 :])
+            )[-keep:]
+        return written
+
+
+def load_window(data_store: Optional[DataStore], key: str) -> Optional[RegimeWindow]:
+    if data_store is None:
+        return None
+    payload = data_store.get_regime_window(key)
+    if payload is None:
+        return None
+    try:
+        return RegimeWindow.from_payload(key, payload)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def save_window(data_store: Optional[DataStore], window: RegimeWindow) -> None:
+    if data_store is not None:
+        data_store.save_regime_window(window.key, window.dates[-1], window.to_payload())
+
+
+def ratio_window_stats(
+    window: RegimeWindow,
+    levels: Sequence[float],
+    lookback: int,
+    spec: List[Any],
+) -> Optional[Tuple[float, float, float]]:
+    """Ratio-gate (variance, mean, std) for the newest day of ``window``.
+
+    ``levels`` are the log-ratio levels aligned with ``window.dates``. Stored
+    sums are advanced over the settled days added since the last run and the
+    newest, possibly intraday, day is applied to a throwaway copy. The sums
+    are rebuilt from the window when the spec changed or they fell out of it.
+    """
+    settled = window.dates[:-1]
+    accumulator = window.ratio
+    stored_date = (
+        date.fromisoformat(accumulator.last_date) if accumulator is not None else None
+    )
+    if (
+        accumulator is None
+        or accumulator.spec != spec
+        or stored_date not in settled
+        or not settled
+    ):
+        if not settled:
+            return None
+        accumulator = RatioAccumulator.build(spec, settled[-1], levels[:-1], lookback)
+    else:
+        start = window.dates.index(stored_date) + 1
+        accumulator.advance(levels[start:-1], lookback)
+        accumulator.last_date = settled[-1].isoformat()
+    window.ratio = accumulator
+    current = replace(accumulator, returns=list(accumulator.returns))
+    current.advance(levels[-1:], lookback)
+    return current.stats(lookback)
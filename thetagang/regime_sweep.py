@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import csv
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple, get_type_hints
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from rich.table import Table
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from thetagang import log
+from thetagang.config import Config
+from thetagang.db import HistoricalBar
+from thetagang.fmt import ffmt, pfmt
+from thetagang.strategies.runtime_services import resolve_symbol_configs
+
+
+@dataclass(frozen=True)
+class SweepParams:
+    lookback_days: int
+    soft_band: float
+    hard_band: float
+    hard_band_rebalance_fraction: float
+    cooldown_days: int
+    choppiness_min: float
+    efficiency_max: float
+    ratio_var_min: float = 0.0
+    ratio_drift_max: float = 0.0
+    volatility_target_vol: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class SweepUniverse:
+    """Aligned closes and static settings shared by every parameter set."""
+
+    symbols: List[str]
+    dates: List[date]
+    closes: np.ndarray
+    weights: np.ndarray
+    eps: float
+    ratio_anchor: Optional[int] = None
+    ratio_enabled: bool = False
+    volatility: Optional[Dict[int, Dict[str, Any]]] = None
+
+
+@dataclass
+class SweepResult:
+    params: SweepParams
+    days: int
+    rebalances: int
+    hard_rebalances: int
+    turnover: float
+    mean_drift: float
+    max_drift: float
+
+
+# Sweepable parameters and the type each grid value is cast to. Annotations
+# are strings under postponed evaluation, so they are resolved here.
+SWEEP_KEYS: Dict[str, type] = {
+    name: int if hint is int else float
+    for name, hint in get_type_hints(SweepParams).items()
+}
+
+
+def base_params(config: Config) -> SweepParams:
+    regime = config.strategies.regime_rebalance
+    ratio_gate = regime.ratio_gate
+    return SweepParams(
+        lookback_days=regime.lookback_days,
+        soft_band=regime.soft_band,
+        hard_band=regime.hard_band,
+        hard_band_rebalance_fraction=regime.hard_band_rebalance_fraction,
+        cooldown_days=regime.cooldown_days,
+        choppiness_min=regime.choppiness_min,
+        efficiency_max=regime.efficiency_max,
+        ratio_var_min=ratio_gate.var_min if ratio_gate else 0.0,
+        ratio_drift_max=ratio_gate.drift_max if ratio_gate else 0.0,
+    )
+
+
+def parse_grid(specs: Sequence[str]) -> Dict[str, List[Any]]:
+    """Parse ``key=v1,v2`` specs into typed value lists keyed by parameter."""
+    grid: Dict[str, List[Any]] = {}
+    for spec in specs:
+        key, sep, raw_values = spec.partition("=")
+        key = key.strip()
+        if not sep or key not in SWEEP_KEYS:
+            raise ValueError(
+                f"Invalid sweep parameter '{spec}', expected one of "
+                f"{', '.join(sorted(SWEEP_KEYS))} as key=v1,v2,..."
+            )
+        cast = SWEEP_KEYS[key]
+        grid[key] = [cast(value) for value in raw_values.split(",") if value.strip()]
+    return grid
+
+
+def expand_grid(base: SweepParams, grid: Dict[str, List[Any]]) -> List[SweepParams]:
+    keys = list(grid)
+    params = [
+        replace(base, **dict(zip(keys, values)))
+        for values in itertools.product(*(grid[key] for key in keys))
+    ]
+    # Sets with hard_band below soft_band are rejected by the config model.
+    return [p for p in params if p.hard_band >= p.soft_band and p.lookback_days >= 2]
+
+
+def build_universe(config: Config, engine: Engine) -> SweepUniverse:
+    regime = config.strategies.regime_rebalance
+    symbol_configs = resolve_symbol_configs(config, context="regime sweep")
+    symbols = [symbol for symbol in regime.symbols if symbol_configs[symbol].weight > 0]
+    if not symbols:
+        raise ValueError("Regime-aware rebalancing requires positive target weights.")
+    dates, closes = load_aligned_closes(engine, symbols)
+    weights = np.array(
+        [symbol_configs[symbol].weight for symbol in symbols], dtype=float
+    )
+    volatility: Dict[int, Dict[str, Any]] = {}
+    for index, symbol in enumerate(symbols):
+        volatility_weight = symbol_configs[symbol].volatility_weight
+        if volatility_weight is not None and volatility_weight.enabled:
+            volatility[index] = volatility_weight.model_dump()
+    ratio_gate = regime.ratio_gate
+    return SweepUniverse(
+        symbols=symbols,
+        dates=dates,
+        closes=closes,
+        weights=weights / weights.sum(),
+        eps=regime.eps,
+        ratio_anchor=symbols.index(ratio_gate.anchor)
+        if ratio_gate and ratio_gate.anchor in symbols
+        else None,
+        ratio_enabled=bool(ratio_gate and ratio_gate.enabled),
+        volatility=volatility or None,
+    )
+
+
+def load_aligned_closes(
+    engine: Engine, symbols: Sequence[str], timeframe: str = "1 day"
+) -> Tuple[List[date], np.ndarray]:
+    """Return the common trading days and a (days x symbols) close matrix."""
+    closes_by_symbol: Dict[str, Dict[date, float]] = {symbol: {} for symbol in symbols}
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(HistoricalBar.symbol, HistoricalBar.bar_time, HistoricalBar.close)
+            .where(HistoricalBar.symbol.in_(list(symbols)))
+            .where(HistoricalBar.timeframe == timeframe)
+        )
+        for symbol, bar_time, close in rows:
+            if close is not None and close > 0 and not math.isnan(close):
+                closes_by_symbol[symbol][bar_time.date()] = float(close)
+    common = set.intersection(*(set(closes) for closes in closes_by_symbol.values()))
+    dates = sorted(common)
+    if len(dates) < 2:
+        raise ValueError(
+            "Regime sweep requires aligned historical_bars for all symbols; "
+            "run ThetaGang with the database enabled to collect them."
+        )
+    closes = np.array(
+        [[closes_by_symbol[symbol][day] for symbol in symbols] for day in dates],
+        dtype=float,
+    )
+    return dates, closes
+
+
+def _rolling_ratio_ok(universe: SweepUniverse, params: SweepParams) -> np.ndarray:
+    """Ratio-gate verdict for every day, matching the live rolling statistics."""
+    days = len(universe.dates)
+    ok = np.zeros(days, dtype=bool)
+    anchor = universe.ratio_anchor
+    lookback = params.lookback_days
+    if anchor is None or days <= lookback:
+        return ok
+    rest = [i for i in range(len(universe.symbols)) if i != anchor]
+    rest_weights = universe.weights[rest] / universe.weights[rest].sum()
+    basket = np.maximum(universe.closes[:, rest] @ rest_weights, universe.eps)
+    ratio = np.log(basket / np.maximum(universe.closes[:, anchor], universe.eps))
+    windows = sliding_window_view(np.diff(ratio), lookback)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = windows.var(axis=1, ddof=1)
+        tstat = np.abs(windows.mean(axis=1) / (np.sqrt(var) / math.sqrt(lookback)))
+    tstat = np.where(var <= 0, np.inf, tstat)
+    verdict = (var >= max(params.ratio_var_min, 0.0)) & (
+        tstat <= params.ratio_drift_max
+    )
+    # windows[k] ends on the return into day k + lookback.
+    ok[lookback:] = np.nan_to_num(verdict, nan=0.0).astype(bool)
+    return ok
+
+
+def _realized_vols(universe: SweepUniverse) -> Dict[int, np.ndarray]:
+    vols: Dict[int, np.ndarray] = {}
+    returns = np.diff(np.log(universe.closes), axis=0)
+    for index, settings in (universe.volatility or {}).items():
+        lookback = int(settings["lookback_days"])
+        series = np.full(len(universe.dates), np.nan)
+        if len(returns) >= lookback:
+            windows = sliding_window_view(returns[:, index], lookback)
+            series[lookback:] = windows.std(axis=1, ddof=1) * math.sqrt(252)
+        vols[index] = series
+    return vols
+
+
+def _volatility_weights(
+    universe: SweepUniverse,
+    params: SweepParams,
+    vols: Dict[int, np.ndarray],
+    previous: np.ndarray,
+    day: int,
+) -> np.ndarray:
+    weights = previous.copy()
+    for index, settings in (universe.volatility or {}).items():
+        realized = vols[index][day]
+        if math.isnan(realized) or realized <= 0:
+            continue
+        base = universe.weights[index]
+        target_vol = params.volatility_target_vol or settings["target_vol"]
+        target = min(
+            max(base * target_vol / realized, settings["min_weight"]),
+            settings["max_weight"],
+        )
+        smoothing = settings["smoothing_factor"]
+        if target > previous[index] and settings["increase_smoothing_factor"]:
+            smoothing = settings["increase_smoothing_factor"]
+        elif target < previous[index] and settings["decrease_smoothing_factor"]:
+            smoothing = settings["decrease_smoothing_factor"]
+        if abs(target - previous[index]) >= settings["rebalance_band"]:
+            weights[index] = previous[index] + smoothing * (target - previous[index])
+    return weights
+
+
+def simulate(universe: SweepUniverse, params: SweepParams) -> SweepResult:
+    """Replay the regime gates day by day over a self-financing book.
+
+    The book starts at target weights and only trades when the live engine
+    would take a hard or soft rebalance. Cash flows, and therefore the flow
+    and deficit rails, are outside the simulation.
+    """
+    closes = universe.closes
+    eps = universe.eps
+    lookback = params.lookback_days
+    gross = closes[1:] / closes[:-1]
+    ratio_ok = _rolling_ratio_ok(universe, params) if universe.ratio_enabled else None
+    vols = _realized_vols(universe)
+    warmup = max(
+        [lookback]
+        + [int(s["lookback_days"]) for s in (universe.volatility or {}).values()]
+    )
+
+    effective = universe.weights.copy()
+    holdings = effective / closes[warmup]
+    last_rebalance = warmup
+    rebalances = hard_rebalances = 0
+    turnover = 0.0
+    drifts: List[float] = []
+    for day in range(warmup + 1, len(closes)):
+        if vols:
+            effective = _volatility_weights(universe, params, vols, effective, day)
+        targets = effective / effective.sum()
+        values = holdings * closes[day]
+        total = float(values.sum())
+        current = values / total
+        drift = float(np.max(np.abs(current / targets - 1.0)))
+        drifts.append(drift)
+
+        hard = drift + eps >= params.hard_band
+        soft = drift + eps >= params.soft_band
+        if not hard:
+            if not soft or day - last_rebalance < params.cooldown_days:
+                continue
+            if ratio_ok is not None and not ratio_ok[day]:
+                continue
+            factors = np.maximum(gross[day - lookback : day] @ current, eps)
+            log_returns = np.log(factors)
+            choppiness = math.sqrt(float(np.sum(log_returns**2))) / max(
+                abs(float(np.sum(log_returns))), eps
+            )
+            path = np.concatenate(([1.0], np.cumprod(factors)))
+            efficiency = abs(float(path[-1] - path[0])) / max(
+                float(np.sum(np.abs(np.diff(path)))), eps
+            )
+            if choppiness < params.choppiness_min or efficiency > params.efficiency_max:
+                continue
+
+        fraction = params.hard_band_rebalance_fraction if hard else 1.0
+        trade = fraction * (targets * total - values)
+        turnover += float(np.sum(np.abs(trade))) / total
+        holdings = (values + trade) / closes[day]
+        rebalances += 1
+        hard_rebalances += int(hard)
+        last_rebalance = day
+
+    return SweepResult(
+        params=params,
+        days=len(drifts),
+        rebalances=rebalances,
+        hard_rebalances=hard_rebalances,
+        turnover=turnover,
+        mean_drift=float(np.mean(drifts)) if drifts else 0.0,
+        max_drift=float(np.max(drifts)) if drifts else 0.0,
+    )
+
+
+_worker_universe: Optional[SweepUniverse] = None
+
+
+def _init_worker(universe: SweepUniverse) -> None:
+    global _worker_universe
+    _worker_universe = universe
+
+
+def _simulate_in_worker(params: SweepParams) -> SweepResult:
+    assert _worker_universe is not None
+    return simulate(_worker_universe, params)
+
+
+def run_sweep(
+    universe: SweepUniverse,
+    params: Sequence[SweepParams],
+    workers: Optional[int] = None,
+) -> List[SweepResult]:
+    """Simulate every parameter set, in a process pool when ``workers`` > 1.
+
+    The close matrix is handed to each worker once at start-up rather than
+    pickled with every task.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(params) <= 1:
+        return [simulate(universe, p) for p in params]
+    chunksize = max(1, len(params) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(universe,)
+    ) as executor:
+        return list(
+            log.track(
+                executor.map(_simulate_in_worker, params, chunksize=chunksize),
+                "Sweeping regime rebalance parameters",
+                total=len(params),
+            )
+        )
+
+
+def print_sweep_results(results: Sequence[SweepResult], limit: int) -> None:
+    ordered = sorted(results, key=lambda r: (r.turnover, r.mean_drift))
+    table = Table(title=f"Regime rebalance sweep ({len(results)} parameter sets)")
+    for column in (
+        "lookback",
+        "soft",
+        "hard",
+        "cooldown",
+        "chop min",
+        "ER max",
+        "rebalances",
+        "hard",
+        "turnover",
+        "mean drift",
+        "max drift",
+    ):
+        table.add_column(column, justify="right")
+    for result in ordered[:limit]:
+        p = result.params
+        table.add_row(
+            str(p.lookback_days),
+            pfmt(p.soft_band, 0),
+            pfmt(p.hard_band, 0),
+            str(p.cooldown_days),
+            ffmt(p.choppiness_min),
+            pfmt(p.efficiency_max, 0),
+            str(result.rebalances),
+            str(result.hard_rebalances),
+            pfmt(result.turnover),
+            pfmt(result.mean_drift),
+            pfmt(result.max_drift),
+        )
+    log.print(table)
+
+
+def write_sweep_csv(results: Sequence[SweepResult], path: str) -> None:
+    with open(path, "w", newline="", encoding="utf8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(
+            list(SWEEP_KEYS)
+            + [
+                "days",
+                "rebalances",
+                "hard_rebalances",
+                "turnover",
+                "mean_drift",
+                "max_drift",
+            ]
+        )
+        for result in results:
+            writer.writerow(
+                list(asdict(result.params).values())
+                + [
+                    result.days,
+                    result.rebalances,
+                    result.hard_rebalances,
+                    result.turnover,
+                    result.mean_drift,
+                    result.max_drift,
+                ]
+            )
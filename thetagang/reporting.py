@@ -0,0 +1,472 @@
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from thetagang import log
+from thetagang.db import (
+    Event,
+    ExecutionRecord,
+    OrderIntent,
+    OrderRecord,
+    ReportDaily,
+    ReportRun,
+    ReportWatermark,
+    Run,
+    RunCheckpointRecord,
+)
+from thetagang.fmt import dfmt, ifmt
+from thetagang.run_checkpoint import STAGE
+
+RUN_EVENTS = ("run_start", "run_end", "run_resume")
+OPTION_SEC_TYPES = ("OPT", "FOP")
+COUNTERS = (
+    "intents",
+    "orders",
+    "fills",
+    "quantity",
+    "buy_value",
+    "sell_value",
+    "slippage",
+    "priced_fills",
+)
+GROUPINGS = ("symbol", "stage", "day")
+
+DailyKey = Tuple[date, str, str, str, str]
+
+
+@dataclass(frozen=True)
+class ReportRow:
+    key: str
+    intents: int
+    orders: int
+    fills: int
+    quantity: float
+    bought: float
+    sold: float
+    premium: float
+    slippage: float
+    priced_fills: int
+
+
+@dataclass(frozen=True)
+class RunSummary:
+    day: date
+    runs: int
+    failed: int
+    resumed: int
+    mean_seconds: Optional[float]
+    max_seconds: Optional[float]
+
+
+def update_reports(engine: Engine, batch_size: int = 5000) -> Dict[str, int]:
+    """Fold the raw rows added since the last update into the report tables.
+
+    Each source table has a watermark (the last row id folded), advanced in
+    the same transaction as the totals, so an update only reads new rows and
+    an interrupted one resumes where it stopped. Returns the rows folded per
+    source.
+    """
+    sources: Tuple[Tuple[str, Any, Callable[[Session, List[Any]], None]], ...] = (
+        ("order_intents", OrderIntent, _fold_intents),
+        ("orders", OrderRecord, _fold_orders),
+        ("executions", ExecutionRecord, _fold_executions),
+        ("events", Event, _fold_events),
+    )
+    folded: Dict[str, int] = {}
+    for source, model, fold in sources:
+        folded[source] = 0
+        while True:
+            with Session(engine) as session, session.begin():
+                watermark = session.get(ReportWatermark, source)
+                last_id = watermark.last_id if watermark else 0
+                rows = list(
+                    session.scalars(
+                        select(model)
+                        .where(model.id > last_id)
+                        .order_by(model.id)
+                        .limit(batch_size)
+                    )
+                )
+                if not rows:
+                    break
+                fold(session, rows)
+                stmt = sqlite_insert(ReportWatermark).values(
+                    source=source, last_id=rows[-1].id
+                )
+                session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["source"],
+                        set_={"last_id": stmt.excluded.last_id},
+                    )
+                )
+            folded[source] += len(rows)
+    return folded
+
+
+def rebuild_reports(engine: Engine, batch_size: int = 5000) -> Dict[str, int]:
+    """Recompute the report tables from whatever raw rows are still stored."""
+    with Session(engine) as session, session.begin():
+        for model in (ReportDaily, ReportRun, ReportWatermark):
+            session.execute(delete(model))
+    return update_reports(engine, batch_size)
+
+
+def _runs(session: Session, run_ids: Iterable[int]) -> Dict[int, Run]:
+    return {
+        run.id: run
+        for run in session.scalars(select(Run).where(Run.id.in_(set(run_ids))))
+    }
+
+
+def _stages(session: Session, run_ids: Iterable[int]) -> Dict[int, str]:
+    """Stage of each intent, from the stage checkpoints of its run."""
+    stages: Dict[int, str] = {}
+    rows = session.execute(
+        select(RunCheckpointRecord.key, RunCheckpointRecord.payload)
+        .where(RunCheckpointRecord.kind == STAGE)
+        .where(RunCheckpointRecord.run_id.in_(set(run_ids)))
+    )
+    for stage, payload in rows:
+        for intent_id in json.loads(payload):
+            stages[int(intent_id)] = stage
+    return stages
+
+
+def _add_daily(session: Session, totals: Dict[DailyKey, Dict[str, float]]) -> None:
+    if not totals:
+        return
+    rows = [
+        dict(
+            day=day,
+            account_number=account_number,
+            symbol=symbol,
+            stage=stage,
+            sec_type=sec_type,
+            **{name: counters.get(name, 0) for name in COUNTERS},
+        )
+        for (day, account_number, symbol, stage, sec_type), counters in totals.items()
+    ]
+    # One statement executed for every row, so it is compiled once rather
+    # than once per distinct batch size.
+    session.connection().execute(_DAILY_UPSERT, rows)
+
+
+def _daily_upsert() -> Any:
+    stmt = sqlite_insert(ReportDaily)
+    return stmt.on_conflict_do_update(
+        index_elements=["day", "account_number", "symbol", "stage", "sec_type"],
+        set_={
+            name: getattr(ReportDaily, name) + getattr(stmt.excluded, name)
+            for name in COUNTERS
+        },
+    )
+
+
+_DAILY_UPSERT = _daily_upsert()
+
+
+def _totals() -> Dict[DailyKey, Dict[str, float]]:
+    return defaultdict(lambda: defaultdict(float))
+
+
+def _fold_intents(session: Session, intents: List[OrderIntent]) -> None:
+    runs = _runs(session, (intent.run_id for intent in intents))
+    stages = _stages(session, runs)
+    totals = _totals()
+    for intent in intents:
+        run = runs.get(intent.run_id)
+        if intent.dry_run or run is None or run.dry_run:
+            continue
+        key = (
+            intent.created_at.date(),
+            run.account_number or "",
+            intent.symbol,
+            stages.get(intent.id, ""),
+            intent.sec_type or "",
+        )
+        totals[key]["intents"] += 1
+    _add_daily(session, totals)
+
+
+def _fold_orders(session: Session, orders: List[OrderRecord]) -> None:
+    runs = _runs(session, (order.run_id for order in orders))
+    stages = _stages(session, runs)
+    totals = _totals()
+    for order in orders:
+        run = runs.get(order.run_id)
+        if run is None or run.dry_run:
+            continue
+        key = (
+            order.created_at.date(),
+            run.account_number or "",
+            order.symbol,
+            stages.get(order.intent_id, "") if order.intent_id else "",
+            order.sec_type or "",
+        )
+        totals[key]["orders"] += 1
+    _add_daily(session, totals)
+
+
+def _multiplier(intent: Optional[OrderIntent], sec_type: str) -> float:
+    try:
+        payload = json.loads(intent.payload_json or "{}") if intent else {}
+        multiplier = payload.get("contract", {}).get("multiplier")
+        if multiplier:
+            return float(multiplier)
+    except (TypeError, ValueError, AttributeError):
+        pass
+    return 100.0 if sec_type in OPTION_SEC_TYPES else 1.0
+
+
+def _fold_executions(session: Session, executions: List[ExecutionRecord]) -> None:
+    order_ids = {fill.order_id for fill in executions if fill.order_id is not None}
+    # Order ids are only unique per client, so the latest order wins.
+    orders: Dict[int, OrderRecord] = {}
+    for order in session.scalars(
+        select(OrderRecord)
+        .where(OrderRecord.order_id.in_(order_ids))
+        .order_by(OrderRecord.id)
+    ):
+        orders[order.order_id] = order
+    intent_ids = {order.intent_id for order in orders.values() if order.intent_id}
+    intents = {
+        intent.id: intent
+        for intent in session.scalars(
+            select(OrderIntent).where(OrderIntent.id.in_(intent_ids))
+        )
+    }
+    runs = _runs(session, (order.run_id for order in orders.values()))
+    stages = _stages(session, (intent.run_id for intent in intents.values()))
+
+    totals = _totals()
+    for fill in executions:
+        order = orders.get(fill.order_id) if fill.order_id is not None else None
+        intent = intents.get(order.intent_id) if order and order.intent_id else None
+        run = runs.get(order.run_id) if order else None
+        sec_type = (order.sec_type if order else None) or ""
+        when = fill.execution_time or fill.created_at
+        key = (
+            when.date(),
+            fill.account_number or (run.account_number if run else None) or "",
+            fill.symbol or (order.symbol if order else ""),
+            stages.get(intent.id, "") if intent else "",
+            sec_type,
+        )
+        shares = fill.shares or 0.0
+        price = fill.price or 0.0
+        multiplier = _multiplier(intent, sec_type)
+        bought = (fill.side or "").upper().startswith("B")
+        counters = totals[key]
+        counters["fills"] += 1
+        counters["quantity"] += shares
+        counters["buy_value" if bought else "sell_value"] += price * shares * multiplier
+        if intent is not None and intent.limit_price is not None:
+            # Positive when the fill was worse than the price first asked.
+            direction = 1 if bought else -1
+            counters["slippage"] += (
+                direction * (price - intent.limit_price) * shares * multiplier
+            )
+            counters["priced_fills"] += 1
+    _add_daily(session, totals)
+
+
+def _fold_events(session: Session, events: List[Event]) -> None:
+    events = [event for event in events if event.event_type in RUN_EVENTS]
+    if not events:
+        return
+    runs = _runs(session, (event.run_id for event in events))
+    reports = {
+        report.run_id: report
+        for report in session.scalars(
+            select(ReportRun).where(ReportRun.run_id.in_(set(runs)))
+        )
+    }
+    for event in events:
+        run = runs.get(event.run_id)
+        if run is None:
+            continue
+        report = reports.get(run.id)
+        if report is None:
+            started_at = (
+                event.created_at if event.event_type == "run_start" else run.started_at
+            )
+            report = reports[run.id] = ReportRun(
+                run_id=run.id,
+                day=started_at.date(),
+                account_number=run.account_number or "",
+                dry_run=run.dry_run,
+                started_at=started_at,
+                resumes=0,
+            )
+            session.add(report)
+        if event.event_type == "run_start":
+            report.started_at = min(report.started_at, event.created_at)
+        elif event.event_type == "run_resume":
+            report.resumes += 1
+        else:
+            if report.ended_at is None or event.created_at > report.ended_at:
+                report.ended_at = event.created_at
+                payload = json.loads(event.payload) if event.payload else {}
+                report.success = bool(payload.get("success"))
+
+
+def load_report(
+    engine: Engine,
+    by: str,
+    since: date,
+    account_number: Optional[str] = None,
+) -> List[ReportRow]:
+    """Report totals since ``since``, grouped by symbol, stage or day."""
+    if by not in GROUPINGS:
+        raise ValueError(f"Unknown report grouping {by!r}, expected one of {GROUPINGS}")
+    group = getattr(ReportDaily, by)
+    is_option = ReportDaily.sec_type.in_(OPTION_SEC_TYPES)
+    stmt = (
+        select(
+            group,
+            func.sum(ReportDaily.intents),
+            func.sum(ReportDaily.orders),
+            func.sum(ReportDaily.fills),
+            func.sum(ReportDaily.quantity),
+            func.sum(ReportDaily.buy_value),
+            func.sum(ReportDaily.sell_value),
+            func.sum(
+                case(
+                    (is_option, ReportDaily.sell_value - ReportDaily.buy_value),
+                    else_=0.0,
+                )
+            ),
+            func.sum(ReportDaily.slippage),
+            func.sum(ReportDaily.priced_fills),
+        )
+        .where(ReportDaily.day >= since)
+        .group_by(group)
+        .order_by(group)
+    )
+    if account_number is not None:
+        stmt = stmt.where(ReportDaily.account_number == account_number)
+    with engine.connect() as connection:
+        return [
+            ReportRow(
+                key=str(key) if key != "" else "(none)",
+                intents=int(intents or 0),
+                orders=int(orders or 0),
+                fills=int(fills or 0),
+                quantity=float(quantity or 0),
+                bought=float(bought or 0),
+                sold=float(sold or 0),
+                premium=float(premium or 0),
+                slippage=float(slippage or 0),
+                priced_fills=int(priced_fills or 0),
+            )
+            for (
+                key,
+                intents,
+                orders,
+                fills,
+                quantity,
+                bought,
+                sold,
+                premium,
+                slippage,
+                priced_fills,
+            ) in connection.execute(stmt)
+        ]
+
+
+def load_run_summary(engine: Engine, since: date) -> List[RunSummary]:
+    seconds = (
+        func.julianday(ReportRun.ended_at) - func.julianday(ReportRun.started_at)
+    ) * 86400
+    stmt = (
+        select(
+            ReportRun.day,
+            func.count(),
+            func.sum(case((ReportRun.success.is_(False), 1), else_=0)),
+            func.sum(case((ReportRun.resumes > 0, 1), else_=0)),
+            func.avg(seconds),
+            func.max(seconds),
+        )
+        .where(ReportRun.day >= since)
+        .group_by(ReportRun.day)
+        .order_by(ReportRun.day)
+    )
+    with engine.connect() as connection:
+        return [
+            RunSummary(
+                day=day if isinstance(day, date) else date.fromisoformat(day),
+                runs=int(runs),
+                failed=int(failed or 0),
+                resumed=int(resumed or 0),
+                mean_seconds=mean,
+                max_seconds=longest,
+            )
+            for day, runs, failed, resumed, mean, longest in connection.execute(stmt)
+        ]
+
+
+def _seconds(value: Optional[float]) -> str:
+    return f"{value:.0f}s" if value is not None else "-"
+
+
+def print_report(rows: List[ReportRow], by: str, runs: List[RunSummary]) -> None:
+    table = log.table(title=f"Orders and fills by {by}")
+    table.add_column(by.capitalize())
+    table.add_column("Intents", justify="right")
+    table.add_column("Orders", justify="right")
+    table.add_column("Fills", justify="right")
+    table.add_column("Bought", justify="right")
+    table.add_column("Sold", justify="right")
+    table.add_column("Option premium", justify="right")
+    table.add_column("Slippage", justify="right")
+    for row in rows:
+        table.add_row(
+            row.key,
+            ifmt(row.intents),
+            ifmt(row.orders),
+            ifmt(row.fills),
+            dfmt(row.bought, 0),
+            dfmt(row.sold, 0),
+            dfmt(row.premium, 0),
+            dfmt(row.slippage, 0) if row.priced_fills else "-",
+        )
+    if rows:
+        table.add_section()
+        table.add_row(
+            "Total",
+            ifmt(sum(row.intents for row in rows)),
+            ifmt(sum(row.orders for row in rows)),
+            ifmt(sum(row.fills for row in rows)),
+            dfmt(sum(row.bought for row in rows), 0),
+            dfmt(sum(row.sold for row in rows), 0),
+            dfmt(sum(row.premium for row in rows), 0),
+            dfmt(sum(row.slippage for row in rows), 0),
+        )
+    log.print(table)
+
+    run_table = log.table(title="Runs")
+    run_table.add_column("Day")
+    run_table.add_column("Runs", justify="right")
+    run_table.add_column("Failed", justify="right")
+    run_table.add_column("Resumed", justify="right")
+    run_table.add_column("Mean duration", justify="right")
+    run_table.add_column("Longest", justify="right")
+    for summary in runs:
+        run_table.add_row(
+            summary.day.isoformat(),
+            ifmt(summary.runs),
+            ifmt(summary.failed),
+            ifmt(summary.resumed),
+            _seconds(summary.mean_seconds),
+            _seconds(summary.max_seconds),
+        )
+    log.print(run_table)
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, Hashable, List, Optional
+
+# Request categories. Each has its own token bucket, and every request also
+# spends a message token on the connection it's sent over.
+MARKET_DATA = "market_data"
+ACCOUNT = "account"
+ORDERS = "orders"
+CONTRACT_DETAILS = "contract_details"
+SECDEF = "secdef"
+HISTORICAL = "historical"
+
+# Lower runs first: quotes that price orders go ahead of chain and history
+# requests feeding analytics.
+PRIORITY_ORDERS = 0
+PRIORITY_QUOTES = 1
+PRIORITY_ACCOUNT = 2
+PRIORITY_LOOKUP = 3
+PRIORITY_ANALYTICS = 4
+
+# IBKR drops connections that exceed 50 API messages per second.
+MESSAGES_PER_SECOND = 45.0
+
+
+@dataclass(frozen=True)
+class CategoryLimit:
+    rate: float
+    burst: float
+    priority: int
+    max_in_flight: Optional[int] = None
+
+
+DEFAULT_LIMITS: Dict[str, CategoryLimit] = {
+    MARKET_DATA: CategoryLimit(rate=40.0, burst=40.0, priority=PRIORITY_QUOTES),
+    ACCOUNT: CategoryLimit(rate=10.0, burst=10.0, priority=PRIORITY_ACCOUNT),
+    ORDERS: CategoryLimit(rate=40.0, burst=40.0, priority=PRIORITY_ORDERS),
+    CONTRACT_DETAILS: CategoryLimit(rate=20.0, burst=20.0, priority=PRIORITY_LOOKUP),
+    SECDEF: CategoryLimit(rate=10.0, burst=10.0, priority=PRIORITY_LOOKUP),
+    # At most 50 historical requests may be open at once. IBKR also rejects
+    # more than six requests for one contract within two seconds; pacing all
+    # of them at that rate keeps bursts of tails for many symbols clear of it.
+    HISTORICAL: CategoryLimit(
+        rate=3.0, burst=6.0, priority=PRIORITY_ANALYTICS, max_in_flight=50
+    ),
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float, cost: float = 1) -> float:
+        """Seconds until ``cost`` tokens are available."""
+        self.refill(now)
+        cost = min(cost, self.burst)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+@dataclass
+class QueueStats:
+    requests: int = 0
+    queued: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record(self, wait: float) -> None:
+        self.requests += 1
+        if wait > 0:
+            self.queued += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    sequence: int
+    category: str = field(compare=False)
+    connection: Hashable = field(compare=False)
+    cost: int = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: asyncio.Future[None] = field(compare=False)
+
+
+class RequestScheduler:
+    """Paces outbound IBKR requests with token buckets and a priority queue.
+
+    Every request spends a token from its category's bucket and one from
+    the message bucket of the connection it's sent on, modeled on IBKR's
+    documented pacing limits. Requests that find a bucket empty wait in one
+    priority queue, so order-pricing quotes are dispatched ahead of history
+    and chain lookups. Order placement never waits, but it still spends its
+    tokens so that the requests behind it back off.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, CategoryLimit]] = None,
+        messages_per_second: float = MESSAGES_PER_SECOND,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.messages_per_second = messages_per_second
+        self.clock = clock
+        now = clock()
+        self.buckets = {
+            category: TokenBucket(limit.rate, limit.burst, now)
+            for category, limit in self.limits.items()
+        }
+        self.connections: Dict[Hashable, TokenBucket] = {}
+        self.in_flight: Dict[str, int] = {category: 0 for category in self.limits}
+        self.stats: Dict[str, QueueStats] = {
+            category: QueueStats() for category in self.limits
+        }
+        self._queue: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task[None]] = None
+
+    def _connection(self, connection: Hashable, now: float) -> TokenBucket:
+        bucket = self.connections.get(connection)
+        if bucket is None:
+            bucket = TokenBucket(
+                self.messages_per_second, self.messages_per_second, now
+            )
+            self.connections[connection] = bucket
+        return bucket
+
+    def _delay(
+        self, category: str, connection: Hashable, cost: int, now: float
+    ) -> float:
+        """Seconds until ``category`` may send on ``connection``, inf if capped."""
+        limit = self.limits[category]
+        if limit.max_in_flight is not None and (
+            self.in_flight[category] >= limit.max_in_flight
+        ):
+            return float("inf")
+        return max(
+            self.buckets[category].delay(now, cost),
+            self._connection(connection, now).delay(now, cost),
+        )
+
+    def _spend(
+        self, category: str, connection: Hashable, cost: int, now: float
+    ) -> None:
+        for bucket in (self.buckets[category], self._connection(connection, now)):
+            bucket.refill(now)
+            bucket.tokens -= cost
+
+    async def acquire(self, category: str, connection: Hashable, cost: int = 1) -> None:
+        """Wait for a turn to send ``cost`` messages of ``category``."""
+        now = self.clock()
+        if not self._queue and self._delay(category, connection, cost, now) == 0:
+            self._spend(category, connection, cost, now)
+            self.in_flight[category] += 1
+            self.stats[category].record(0.0)
+            return
+        waiter = _Waiter(
+            priority=self.limits[category].priority,
+            sequence=next(self._sequence),
+            category=category,
+            connection=connection,
+            cost=cost,
+            enqueued_at=now,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._queue, waiter)
+        self._wake()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as it was cancelled; hand the slot back.
+                self.release(category)
+            elif waiter in self._queue:
+                self._queue.remove(waiter)
+                heapq.heapify(self._queue)
+            raise
+
+    def release(self, category: str) -> None:
+        self.in_flight[category] -= 1
+        if self._queue:
+            self._wake()
+
+    def spend_now(self, category: str, connection: Hashable, cost: int = 1) -> None:
+        """Account for messages that must go out immediately."""
+        self._spend(category, connection, cost, self.clock())
+        self.stats[category].record(0.0)
+
+    @asynccontextmanager
+    async def request(
+        self, category: str, connection: Hashable, cost: int = 1
+    ) -> AsyncIterator[None]:
+        await self.acquire(category, connection, cost)
+        try:
+            yield
+        finally:
+            self.release(category)
+
+    def _wake(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+        elif self._wakeup is not None:
+            self._wakeup.set()
+
+    def _grant_ready(self) -> float:
+        """Grant queued requests in priority order; return the next retry delay."""
+        now = self.clock()
+        next_delay = float("inf")
+        blocked: List[_Waiter] = []
+        while self._queue:
+            waiter = heapq.heappop(self._queue)
+            if waiter.future.done():
+                continue
+            delay = self._delay(waiter.category, waiter.connection, waiter.cost, now)
+            if delay > 0:
+                blocked.append(waiter)
+                next_delay = min(next_delay, delay)
+                continue
+            self._spend(waiter.category, waiter.connection, waiter.cost, now)
+            self.in_flight[waiter.category] += 1
+            self.stats[waiter.category].record(now - waiter.enqueued_at)
+            waiter.future.set_result(None)
+        for waiter in blocked:
+            heapq.heappush(self._queue, waiter)
+        return next_delay
+
+    async def _dispatch(self) -> None:
+        assert self._wakeup is not None
+        while self._queue:
+            delay = self._grant_ready()
+            if not self._queue:
+                break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), None if delay == float("inf") else delay
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            category: {
+                "requests": stats.requests,
+                "queued": stats.queued,
+                "total_wait": round(stats.total_wait, 3),
+                "max_wait": round(stats.max_wait, 3),
+            }
+            for category, stats in self.stats.items()
+            if stats.requests
+        }
+
+    def describe(self) -> str:
+        requests = sum(stats.requests for stats in self.stats.values())
+        queued = sum(stats.queued for stats in self.stats.values())
+        text = f"IBKR requests: {requests} sent, {queued} queued for pacing"
+        waits = sorted(
+            (
+                (stats.total_wait, stats.max_wait, category)
+                for category, stats in self.stats.items()
+                if stats.queued
+            ),
+            reverse=True,
+        )
+        if waits:
+            text += (
+                " ("
+                + ", ".join(
+                    f"{category}: {total:.1f}s total, {longest:.1f}s max wait"
+                    for total, longest, category in waits
+                )
+                + ")"
+            )
+        return text
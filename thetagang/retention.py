@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from thetagang import log
+from thetagang.db import (
+    AccountDaily,
+    AccountSnapshot,
+    Event,
+    EventDaily,
+    OrderStatus,
+    OrderStatusDaily,
+    PositionDaily,
+    PositionSnapshot,
+    Run,
+    SnapshotLog,
+    apply_account_changes,
+    utcnow,
+)
+
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+
+@dataclass
+class RetentionResult:
+    cutoff: datetime
+    rolled_up_days: Dict[str, int] = field(default_factory=dict)
+    deleted_rows: Dict[str, int] = field(default_factory=dict)
+    reclaimed_pages: int = 0
+
+
+def retention_cutoff(raw_days: int, now: Optional[datetime] = None) -> datetime:
+    """Start of the oldest UTC day whose raw rows are kept."""
+    current = now or utcnow()
+    return datetime.combine(
+        current.date() - timedelta(days=raw_days), datetime.min.time()
+    )
+
+
+def run_retention(
+    engine: Engine,
+    *,
+    raw_days: int,
+    batch_size: int,
+    vacuum_pages: Optional[int],
+    now: Optional[datetime] = None,
+    show_progress: bool = True,
+) -> RetentionResult:
+    """Roll raw rows older than the horizon into daily tables, prune, vacuum.
+
+    Each day is aggregated exactly once: a day that already has rollup rows is
+    skipped, so an interrupted run can be resumed without double counting.
+    ``vacuum_pages=None`` skips vacuuming and ``0`` reclaims every free page.
+    """
+    cutoff = retention_cutoff(raw_days, now)
+    result = RetentionResult(cutoff=cutoff)
+    for name, model, daily_model, rollup, by_series in (
+        (
+            "position_snapshots",
+            PositionSnapshot,
+            PositionDaily,
+            _rollup_positions,
+            True,
+        ),
+        ("account_snapshots", AccountSnapshot, AccountDaily, _rollup_accounts, True),
+        ("events", Event, EventDaily, _rollup_events, False),
+        (
+            "order_statuses",
+            OrderStatus,
+            OrderStatusDaily,
+            _rollup_order_statuses,
+            False,
+        ),
+    ):
+        result.rolled_up_days[name] = _rollup_table(
+            engine, name, model, daily_model, rollup, by_series, cutoff, show_progress
+        )
+        keep_ids = _latest_event_ids(engine) if model is Event else None
+        result.deleted_rows[name] = _delete_in_batches(
+            engine, name, model, cutoff, batch_size, keep_ids, show_progress
+        )
+    result.deleted_rows["snapshot_log"] = _delete_in_batches(
+        engine, "snapshot_log", SnapshotLog, cutoff, batch_size, None, show_progress
+    )
+    if vacuum_pages is not None:
+        result.reclaimed_pages = incremental_vacuum(engine, vacuum_pages)
+    return result
+
+
+def incremental_vacuum(engine: Engine, pages: int) -> int:
+    """Return up to ``pages`` free pages to the filesystem (0 means all).
+
+    Databases created before incremental auto-vacuum was enabled are converted
+    once with a full VACUUM; subsequent calls only touch the freelist.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        mode = connection.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+        before = int(connection.exec_driver_sql("PRAGMA freelist_count").scalar() or 0)
+        if mode != SQLITE_AUTO_VACUUM_INCREMENTAL:
+            log.notice("Retention: enabling incremental auto-vacuum (one-time VACUUM)")
+            connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.exec_driver_sql("VACUUM")
+        elif pages > 0:
+            connection.exec_driver_sql(f"PRAGMA incremental_vacuum({pages})").fetchall()
+        else:
+            connection.exec_driver_sql("PRAGMA incremental_vacuum").fetchall()
+        after = int(connection.exec_driver_sql("PRAGMA freelist_count").scalar() or 0)
+    return max(before - after, 0)
+
+
+def _progress(
+    sequence: Sequence[Any], description: str, show_progress: bool
+) -> Iterable[Any]:
+    if show_progress and sequence:
+        return log.track(sequence, description, total=len(sequence))
+    return sequence
+
+
+def _rollup_table(
+    engine: Engine,
+    name: str,
+    model: Any,
+    daily_model: Any,
+    rollup: Callable[[date, List[Any]], List[Dict[str, Any]]],
+    by_series: bool,
+    cutoff: datetime,
+    show_progress: bool,
+) -> int:
+    """Roll up each day before ``cutoff`` that has no rollup rows yet.
+
+    Snapshots are delta-encoded per series, that is per config path and
+    account, so with ``by_series`` each series of a day is folded on its own
+    and its daily rows carry the series.
+    """
+    day_expr = func.date(model.created_at)
+    with engine.connect() as connection:
+        days = [
+            date.fromisoformat(value)
+            for value in connection.execute(
+                select(day_expr)
+                .where(model.created_at < cutoff)
+                .group_by(day_expr)
+                .order_by(day_expr)
+            ).scalars()
+            if value
+        ]
+        done = set(
+            connection.execute(
+                select(daily_model.day).where(daily_model.day.in_(days)).distinct()
+            ).scalars()
+        )
+    pending = [day for day in days if day not in done]
+    for day in _progress(pending, f"Retention: rolling up {name}", show_progress):
+        start = datetime.combine(day, datetime.min.time())
+        with Session(engine) as session, session.begin():
+            rows = session.execute(
+                select(
+                    model,
+                    func.coalesce(Run.config_path, ""),
+                    func.coalesce(Run.account_number, ""),
+                )
+                .join(Run, model.run_id == Run.id)
+                .where(model.created_at >= start)
+                .where(model.created_at < start + timedelta(days=1))
+                .order_by(model.created_at, model.id)
+            ).all()
+            if by_series:
+                series: Dict[tuple[str, str], List[Any]] = {}
+                for row, config_path, account_number in rows:
+                    series.setdefault((config_path, account_number), []).append(row)
+                values = [
+                    dict(entry, config_path=config_path, account_number=account_number)
+                    for (config_path, account_number), members in series.items()
+                    for entry in rollup(day, members)
+                ]
+            else:
+                values = rollup(day, [row for row, _config, _account in rows])
+            if values:
+                session.execute(
+                    sqlite_insert(daily_model).values(values).on_conflict_do_nothing()
+                )
+    return len(pending)
+
+
+def _latest_event_ids(engine: Engine) -> List[int]:
+    # The latest event of each type carries persisted strategy state (see
+    # DataStore.get_last_event_payload), so it must survive pruning. That
+    # reader scopes by config, account and dry run, so keep one per series.
+    with engine.connect() as connection:
+        return list(
+            connection.execute(
+                select(func.max(Event.id))
+                .join(Run, Event.run_id == Run.id)
+                .group_by(
+                    Event.event_type,
+                    Run.config_path,
+                    Run.account_number,
+                    Run.dry_run,
+                )
+            ).scalars()
+        )
+
+
+def _delete_in_batches(
+    engine: Engine,
+    name: str,
+    model: Any,
+    cutoff: datetime,
+    batch_size: int,
+    keep_ids: Optional[List[int]],
+    show_progress: bool,
+) -> int:
+    condition = model.created_at < cutoff
+    if keep_ids:
+        condition = condition & model.id.not_in(keep_ids)
+    with engine.connect() as connection:
+        total = int(
+            connection.execute(
+                select(func.count()).select_from(model).where(condition)
+            ).scalar()
+            or 0
+        )
+    batches = range(math.ceil(total / batch_size))
+    deleted = 0
+    for _ in _progress(batches, f"Retention: pruning {name}", show_progress):
+        with engine.begin() as connection:
+            ids = list(
+                connection.execute(
+                    select(model.id)
+                    .where(condition)
+                    .order_by(model.id)
+                    .limit(batch_size)
+                ).scalars()
+            )
+            if not ids:
+                break
+            connection.execute(delete(model).where(model.id.in_(ids)))
+            deleted += len(ids)
+    return deleted
+
+
+def _rollup_positions(day: date, rows: List[Any]) -> List[Dict[str, Any]]:
+    grouped: Dict[tuple[str, int], Dict[str, Any]] = {}
+    for row in rows:
+        key = (row.symbol, row.con_id or 0)
+        entry = grouped.get(key)
+        if entry is None:
+            entry = grouped[key] = dict(
+                day=day,
+                symbol=row.symbol,
+                con_id=row.con_id or 0,
+                samples=0,
+                min_position=row.position,
+                max_position=row.position,
+            )
+        entry["samples"] += 1
+        if row.position is not None:
+            if entry["min_position"] is None:
+                entry["min_position"] = entry["max_position"] = row.position
+            entry["min_position"] = min(entry["min_position"], row.position)
+            entry["max_position"] = max(entry["max_position"], row.position)
+        entry.update(
+            sec_type=row.sec_type,
+            expiry=row.expiry,
+            strike=row.strike,
+            right=row.right,
+            currency=row.currency,
+            last_position=row.position,
+            last_avg_cost=row.avg_cost,
+            last_market_price=row.market_price,
+            last_market_value=row.market_value,
+            last_unrealized_pnl=row.unrealized_pnl,
+            last_realized_pnl=row.realized_pnl,
+        )
+    return list(grouped.values())
+
+
+def _rollup_accounts(day: date, rows: List[Any]) -> List[Dict[str, Any]]:
+    if not rows:
+        return []
+    # In delta mode only the first row of a day is complete; later rows only
+    # carry the values that changed, so an absent value is an unchanged one.
+    summary: Dict[str, Any] = {}
+    for row in rows:
+        apply_account_changes(summary, json.loads(row.summary_json))
+    net_liquidation = [
+        value
+        for value in (_net_liquidation(row.summary_json) for row in rows)
+        if value is not None
+    ]
+    return [
+        dict(
+            day=day,
+            samples=len(rows),
+            net_liquidation_open=net_liquidation[0] if net_liquidation else None,
+            net_liquidation_high=max(net_liquidation) if net_liquidation else None,
+            net_liquidation_low=min(net_liquidation) if net_liquidation else None,
+            net_liquidation_close=net_liquidation[-1] if net_liquidation else None,
+            last_summary_json=json.dumps(summary),
+        )
+    ]
+
+
+def _rollup_events(day: date, rows: List[Any]) -> List[Dict[str, Any]]:
+    counts: Dict[tuple[str, str], int] = {}
+    for row in rows:
+        key = (row.event_type, row.symbol or "")
+        counts[key] = counts.get(key, 0) + 1
+    return [
+        dict(day=day, event_type=event_type, symbol=symbol, count=count)
+        for (event_type, symbol), count in counts.items()
+    ]
+
+
+def _rollup_order_statuses(day: date, rows: List[Any]) -> List[Dict[str, Any]]:
+    grouped: Dict[tuple[int, str], Dict[str, Any]] = {}
+    for row in rows:
+        key = (row.order_id or 0, row.status or "")
+        entry = grouped.setdefault(
+            key, dict(day=day, order_id=key[0], status=key[1], count=0)
+        )
+        entry["count"] += 1
+        entry.update(
+            perm_id=row.perm_id,
+            last_filled=row.filled,
+            last_remaining=row.remaining,
+            last_avg_fill_price=row.avg_fill_price,
+        )
+    return list(grouped.values())
+
+
+def _net_liquidation(summary_json: str) -> Optional[float]:
+    try:
+        value = json.loads(summary_json).get("NetLiquidation", {}).get("value")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def print_retention_result(result: RetentionResult) -> None:
+    log.notice(
+        f"Retention: kept raw rows since {result.cutoff.date().isoformat()}, "
+        f"reclaimed {result.reclaimed_pages} pages"
+    )
+    for name, deleted in result.deleted_rows.items():
+        log.info(
+            f"  {name}: rolled up {result.rolled_up_days.get(name, 0)} days, "
+            f"pruned {deleted} rows"
+        )
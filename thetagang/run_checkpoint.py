@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from ib_async import Contract
+
+from thetagang.db import DataStore
+from thetagang.market_cache import contract_from_payload, contract_to_payload
+
+STAGE = "stage"
+SCAN = "scan"
+
+
+def scan_key(
+    symbol: str,
+    right: str,
+    strike_limit: Optional[float],
+    exclude_expirations_before: Optional[str],
+    exclude_exp_strike: Optional[Tuple[float, str]],
+    target_dte: Optional[int],
+    target_delta: Optional[float],
+) -> str:
+    return json.dumps(
+        [
+            symbol,
+            right,
+            strike_limit,
+            exclude_expirations_before,
+            list(exclude_exp_strike) if exclude_exp_strike else None,
+            target_dte,
+            target_delta,
+        ]
+    )
+
+
+class RunCheckpoint:
+    """Stage progress and scan results of one run, kept in the DataStore.
+
+    When the gateway drops mid-run the watchdog reconnects and ``manage()`` is
+    called again on the same PortfolioManager. The second attempt skips the
+    stages that completed (keeping the orders they queued), reuses contracts
+    the interrupted stage had already chosen, and reconciles orders that were
+    already submitted instead of placing them twice.
+    """
+
+    def __init__(self, data_store: DataStore) -> None:
+        self.data_store = data_store
+        self.attempts = 0
+
+    @property
+    def resuming(self) -> bool:
+        return self.attempts > 1
+
+    def begin(self) -> Dict[str, Set[int]]:
+        """Start an attempt; return the completed stages and their intent ids."""
+        self.attempts += 1
+        if not self.resuming:
+            return {}
+        return {
+            stage_id: set(intent_ids)
+            for stage_id, intent_ids in self.data_store.get_checkpoints(STAGE).items()
+        }
+
+    def complete_stage(self, stage_id: str, intent_ids: Iterable[int]) -> None:
+        self.data_store.record_checkpoint(STAGE, stage_id, sorted(intent_ids))
+
+    def scan_result(self, key: str) -> Optional[Contract]:
+        # Only a resumed attempt reuses scans: within one attempt the same
+        # scan may legitimately run twice with different price floors.
+        if not self.resuming:
+            return None
+        payload = self.data_store.get_checkpoints(SCAN).get(key)
+        return contract_from_payload(payload) if payload else None
+
+    def save_scan_result(self, key: str, contract: Contract) -> None:
+        payload = contract_to_payload(contract)
+        if payload is not None:
+            self.data_store.record_checkpoint(SCAN, key, payload)
+
+    def submitted_order_ids(self) -> Dict[int, Optional[int]]:
+        if not self.resuming:
+            return {}
+        return self.data_store.get_submitted_order_ids()
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List
+
+from ib_async import AccountValue, PortfolioItem, Trade
+
+from thetagang.position_book import PositionBook
+
+
+@dataclass
+class StartupSnapshot:
+    """Account state loaded once at the start of a run.
+
+    The account summary, account updates, positions and open orders are
+    requested together, so everything ``manage()`` plans from was read at the
+    same moment instead of across a chain of sequential round trips.
+    """
+
+    account_summary: Dict[str, AccountValue]
+    positions: PositionBook
+    untracked_positions: Dict[str, List[PortfolioItem]]
+    open_trades: List[Trade]
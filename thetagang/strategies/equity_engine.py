@@ -1,19 +1,28 @@
 from __future__ import annotations
 
 import math
-from typing import Any, Coroutine, Dict, List, Protocol, Tuple
+from typing import Any, Coroutine, Dict, List, Optional, Protocol, Tuple
 
 from ib_async import AccountValue, PortfolioItem
 from ib_async.contract import Stock
 from rich.table import Table
 
 from thetagang import log
+from thetagang.allocator import (
+    Allocation,
+    RebalanceInputs,
+    RebalancePlan,
+    plan_buys,
+    plan_sells,
+)
 from thetagang.config import Config
 from thetagang.fmt import ifmt
 from thetagang.ibkr import IBKR, TickerField
+from thetagang.position_book import PositionBook
 from thetagang.strategies.regime_engine import RegimeRebalanceEngine
 from thetagang.strategies.runtime_services import resolve_symbol_configs
 from thetagang.trading_operations import OrderOperations
+from thetagang.working_orders import REGIME_ORDER_REF_PREFIX, WorkingOrders
 
 
 class EquityRuntimeServices(Protocol):
@@ -33,13 +42,15 @@ class EquityRebalanceEngine:
         order_ops: OrderOperations,
         services: EquityRuntimeServices,
         regime_engine: RegimeRebalanceEngine,
+        working_orders: Optional[WorkingOrders] = None,
     ) -> None:
         self.config = config
         self.ibkr = ibkr
         self.order_ops = order_ops
         self.services = services
         self.regime_engine = regime_engine
-        self.regime_rebalance_order_ref_prefix = "tg:regime-rebalance"
+        self.regime_rebalance_order_ref_prefix = REGIME_ORDER_REF_PREFIX
+        self.working_orders = working_orders or WorkingOrders()
 
     def _regime_rebalance_symbols(self) -> set[str]:
         regime_rebalance = getattr(self.config, "regime_rebalance", None)
@@ -75,6 +86,8 @@ class EquityRebalanceEngine:
         self, orders: List[Tuple[str, str, int]]
     ) -> None:
         for symbol, primary_exchange, quantity in orders:
+            if self.working_orders.skip(symbol, "", "equity_regime_rebalance"):
+                continue
             try:
                 action = "BUY" if quantity > 0 else "SELL"
                 stock_contract = Stock(
@@ -115,30 +128,171 @@ class EquityRebalanceEngine:
             account_summary, portfolio_positions
         )
 
-    async def check_buy_only_positions(
+    def _rebalance_thresholds(
         self,
+        symbol: str,
+        side: str,
+        symbol_config: Any,
         account_summary: Dict[str, AccountValue],
-        portfolio_positions: Dict[str, List[PortfolioItem]],
-    ) -> Tuple[Table, List[Tuple[str, str, int]]]:
-        stock_positions = [
-            position
-            for symbol in portfolio_positions
-            for position in portfolio_positions[symbol]
-            if isinstance(position.contract, Stock)
+    ) -> Tuple[int, float, float]:
+        """Minimum shares, minimum amount and relative threshold for a side.
+
+        The wheel rebalance policy takes precedence over the symbol's
+        ``buy_only_*``/``sell_only_*`` settings. A percentage of net
+        liquidation raises the minimum amount. Unset thresholds come back as
+        0 for the amount and NaN for the relative threshold.
+        """
+        rebalance_policy = self.config.wheel_rebalance_policy(symbol)
+        min_shares = (
+            self._as_int_or_none(rebalance_policy.min_threshold_shares)
+            or self._as_int_or_none(
+                getattr(symbol_config, f"{side}_only_min_threshold_shares")
+            )
+            or 1
+        )
+        min_amount = self._as_float_or_none(
+            rebalance_policy.min_threshold_amount
+        ) or self._as_float_or_none(
+            getattr(symbol_config, f"{side}_only_min_threshold_amount")
+        )
+        min_percent = self._as_float_or_none(
+            rebalance_policy.min_threshold_percent
+        ) or self._as_float_or_none(
+            getattr(symbol_config, f"{side}_only_min_threshold_percent")
+        )
+        min_percent_relative = self._as_float_or_none(
+            rebalance_policy.min_threshold_percent_relative
+        ) or self._as_float_or_none(
+            getattr(symbol_config, f"{side}_only_min_threshold_percent_relative")
+        )
+
+        if min_percent is not None:
+            net_liquidation_value = float(account_summary["NetLiquidation"].value)
+            percent_min_amount = net_liquidation_value * min_percent
+            min_amount = (
+                max(min_amount, percent_min_amount)
+                if min_amount is not None
+                else percent_min_amount
+            )
+        return (
+            min_shares,
+            min_amount or 0.0,
+            math.nan if min_percent_relative is None else min_percent_relative,
+        )
+
+    async def _stock_prices(
+        self, symbols: List[str], description: str
+    ) -> Dict[str, float]:
+        prices: Dict[str, float] = {}
+
+        async def price_task(symbol: str) -> None:
+            ticker = await self.ibkr.get_ticker_for_stock(
+                symbol, self.get_primary_exchange(symbol)
+            )
+            prices[symbol] = ticker.marketPrice()
+
+        tasks: List[Coroutine[Any, Any, None]] = [
+            price_task(symbol) for symbol in symbols
         ]
-        total_buying_power = self.get_buying_power(account_summary)
+        await log.track_async(tasks, description=description)
+        return prices
+
+    async def _rebalance_inputs(
+        self,
+        side: str,
+        symbols: List[str],
+        account_summary: Dict[str, AccountValue],
+        portfolio_positions: Dict[str, List[PortfolioItem]],
+    ) -> Tuple[RebalanceInputs, List[Tuple[int, float, float]]]:
+        book = PositionBook.of(portfolio_positions)
         stock_symbols: Dict[str, PortfolioItem] = {
-            stock.contract.symbol: stock for stock in stock_positions
+            stock.contract.symbol: stock
+            for symbol in book
+            for stock in book.stocks(symbol)
         }
+        total_buying_power = self.get_buying_power(account_summary)
+        symbol_configs = resolve_symbol_configs(
+            self.config, context=f"{side}-only rebalancing"
+        )
+        prices = await self._stock_prices(
+            symbols, description=f"Checking {side}-only positions..."
+        )
+        thresholds = [
+            self._rebalance_thresholds(
+                symbol, side, symbol_configs[symbol], account_summary
+            )
+            for symbol in symbols
+        ]
+        inputs = RebalanceInputs.build(
+            symbols=symbols,
+            target_value=[
+                round(symbol_configs[symbol].weight * total_buying_power, 2)
+                for symbol in symbols
+            ],
+            price=[prices[symbol] or math.nan for symbol in symbols],
+            current=[
+                math.floor(
+                    stock_symbols[symbol].position if symbol in stock_symbols else 0
+                )
+                for symbol in symbols
+            ],
+            min_shares=[min_shares for min_shares, _, _ in thresholds],
+            min_amount=[min_amount for _, min_amount, _ in thresholds],
+            min_percent_relative=[relative for _, _, relative in thresholds],
+        )
+        return inputs, thresholds
+
+    def _add_plan_rows(
+        self,
+        table: Table,
+        inputs: RebalanceInputs,
+        plan: RebalancePlan,
+        thresholds: List[Tuple[int, float, float]],
+        verb: str,
+        at_target: str,
+    ) -> None:
+        rows = zip(plan, inputs.price, inputs.current, thresholds)
+        for (
+            (symbol, status, target_shares, quantity, relative_diff, order_amount),
+            market_price,
+            current_position,
+            (min_shares, min_amount, min_percent_relative),
+        ) in rows:
+            if status == Allocation.INVALID_PRICE:
+                log.error(
+                    f"Invalid market price for {symbol} (market_price={market_price}), skipping for now"
+                )
+                continue
+            action = {
+                Allocation.TRADE: f"[green]{verb} {quantity} shares",
+                Allocation.AT_TARGET: at_target,
+                Allocation.BELOW_RELATIVE_THRESHOLD: f"[yellow]Below relative threshold {min_percent_relative:.1%} (diff: {relative_diff:.1%})",
+                Allocation.BELOW_MIN_AMOUNT: f"[yellow]Below min amount ${min_amount:.2f} (would be ${order_amount:.2f})",
+                Allocation.BELOW_MIN_SHARES: f"[yellow]Below min shares {min_shares}",
+                Allocation.INSUFFICIENT_FOR_MIN_AMOUNT: f"[yellow]Insufficient buying power to meet min amount ${min_amount:.2f}",
+                Allocation.INSUFFICIENT_FOR_MIN_SHARES: f"[yellow]Insufficient buying power to meet min shares {min_shares}",
+                Allocation.INSUFFICIENT_BUYING_POWER: "[yellow]Insufficient buying power",
+            }[status]
+            table.add_row(
+                symbol,
+                ifmt(int(current_position)),
+                ifmt(target_shares),
+                ifmt(quantity),
+                action,
+            )
 
-        buy_actions_table = Table(title="Buy-only rebalancing summary")
+    async def check_buy_only_positions(
+        self,
+        account_summary: Dict[str, AccountValue],
+        portfolio_positions: Dict[str, List[PortfolioItem]],
+    ) -> Tuple[Table, List[Tuple[str, str, int]]]:
+        buy_actions_table = log.table(title="Buy-only rebalancing summary")
         buy_actions_table.add_column("Symbol")
         buy_actions_table.add_column("Current shares", justify="right")
         buy_actions_table.add_column("Target shares", justify="right")
         buy_actions_table.add_column("Shares to buy", justify="right")
         buy_actions_table.add_column("Action")
 
-        to_buy: List[Tuple[str, str, int]] = []
         regime_symbols = self._regime_rebalance_symbols()
         symbols = resolve_symbol_configs(self.config, context="buy-only rebalancing")
         buy_only_symbols = [
@@ -146,169 +300,29 @@ class EquityRebalanceEngine:
             for symbol in symbols.keys()
             if self.config.is_buy_only_rebalancing(symbol)
             and symbol not in regime_symbols
+            # A symbol with a working order is neither quoted nor sized.
+            and not self.working_orders.skip(symbol, "", "equity_buy_rebalance")
         ]
         if not buy_only_symbols:
-            return (buy_actions_table, to_buy)
+            return (buy_actions_table, [])
 
-        async def check_buy_position_task(symbol: str) -> None:
-            ticker = await self.ibkr.get_ticker_for_stock(
-                symbol, self.get_primary_exchange(symbol)
-            )
-            current_position = math.floor(
-                stock_symbols[symbol].position if symbol in stock_symbols else 0
-            )
-            target_value = round(symbols[symbol].weight * total_buying_power, 2)
-            market_price = ticker.marketPrice()
-            if (
-                not market_price
-                or math.isnan(market_price)
-                or math.isclose(market_price, 0)
-            ):
-                log.error(
-                    f"Invalid market price for {symbol} (market_price={market_price}), skipping for now"
-                )
-                return
-            target_shares = math.floor(target_value / market_price)
-            shares_to_buy = target_shares - current_position
-
-            rebalance_policy = self.config.wheel_rebalance_policy(symbol)
-            symbol_config = symbols[symbol]
-            min_shares = (
-                self._as_int_or_none(rebalance_policy.min_threshold_shares)
-                or self._as_int_or_none(symbol_config.buy_only_min_threshold_shares)
-                or 1
-            )
-            min_amount = self._as_float_or_none(
-                rebalance_policy.min_threshold_amount
-            ) or self._as_float_or_none(symbol_config.buy_only_min_threshold_amount)
-            min_percent = self._as_float_or_none(
-                rebalance_policy.min_threshold_percent
-            ) or self._as_float_or_none(symbol_config.buy_only_min_threshold_percent)
-            min_percent_relative = self._as_float_or_none(
-                rebalance_policy.min_threshold_percent_relative
-            ) or self._as_float_or_none(
-                symbol_config.buy_only_min_threshold_percent_relative
-            )
-
-            if min_percent is not None:
-                net_liquidation_value = float(account_summary["NetLiquidation"].value)
-                percent_min_amount = net_liquidation_value * min_percent
-                min_amount = (
-                    max(min_amount, percent_min_amount)
-                    if min_amount is not None
-                    else percent_min_amount
-                )
-
-            if (
-                min_percent_relative is not None
-                and target_value > 0
-                and shares_to_buy > 0
-            ):
-                current_value = current_position * market_price
-                relative_diff = (target_value - current_value) / target_value
-                if relative_diff < min_percent_relative:
-                    buy_actions_table.add_row(
-                        symbol,
-                        ifmt(current_position),
-                        ifmt(target_shares),
-                        ifmt(0),
-                        f"[yellow]Below relative threshold {min_percent_relative:.1%} (diff: {relative_diff:.1%})",
-                    )
-                    return
-
-            if shares_to_buy <= 0 and current_position == 0 and target_value > 0:
-                if min_amount and min_amount < market_price:
-                    shares_to_buy = 1 - current_position
-                elif not min_amount and min_shares == 1:
-                    shares_to_buy = 1 - current_position
-
-            if shares_to_buy > 0:
-                order_amount = shares_to_buy * market_price
-                if min_amount and order_amount < min_amount:
-                    if min_amount < market_price:
-                        shares_to_buy = 1
-                        order_amount = market_price
-                    else:
-                        buy_actions_table.add_row(
-                            symbol,
-                            ifmt(current_position),
-                            ifmt(target_shares),
-                            ifmt(shares_to_buy),
-                            f"[yellow]Below min amount ${min_amount:.2f} (would be ${order_amount:.2f})",
-                        )
-                        return
-                if shares_to_buy < min_shares:
-                    buy_actions_table.add_row(
-                        symbol,
-                        ifmt(current_position),
-                        ifmt(target_shares),
-                        ifmt(shares_to_buy),
-                        f"[yellow]Below min shares {min_shares}",
-                    )
-                    return
-
-                cost = shares_to_buy * market_price
-                available_buying_power = self.get_buying_power(account_summary)
-                if cost > available_buying_power:
-                    shares_to_buy = math.floor(available_buying_power / market_price)
-                    order_amount = shares_to_buy * market_price
-                    if min_amount and order_amount < min_amount:
-                        if (
-                            available_buying_power >= market_price
-                            and min_amount < market_price
-                        ):
-                            shares_to_buy = 1
-                        else:
-                            buy_actions_table.add_row(
-                                symbol,
-                                ifmt(current_position),
-                                ifmt(target_shares),
-                                ifmt(0),
-                                f"[yellow]Insufficient buying power to meet min amount ${min_amount:.2f}",
-                            )
-                            return
-                    if shares_to_buy < min_shares:
-                        buy_actions_table.add_row(
-                            symbol,
-                            ifmt(current_position),
-                            ifmt(target_shares),
-                            ifmt(0),
-                            f"[yellow]Insufficient buying power to meet min shares {min_shares}",
-                        )
-                        return
-
-                if shares_to_buy > 0:
-                    buy_actions_table.add_row(
-                        symbol,
-                        ifmt(current_position),
-                        ifmt(target_shares),
-                        ifmt(shares_to_buy),
-                        f"[green]Buy {shares_to_buy} shares",
-                    )
-                    to_buy.append(
-                        (symbol, self.get_primary_exchange(symbol), shares_to_buy)
-                    )
-                else:
-                    buy_actions_table.add_row(
-                        symbol,
-                        ifmt(current_position),
-                        ifmt(target_shares),
-                        ifmt(0),
-                        "[yellow]Insufficient buying power",
-                    )
-            else:
-                buy_actions_table.add_row(
-                    symbol,
-                    ifmt(current_position),
-                    ifmt(target_shares),
-                    ifmt(0),
-                    "[cyan]At or above target",
-                )
-
-        tasks: List[Coroutine[Any, Any, None]] = [
-            check_buy_position_task(symbol) for symbol in buy_only_symbols
+        inputs, thresholds = await self._rebalance_inputs(
+            "buy", buy_only_symbols, account_summary, portfolio_positions
+        )
+        # Every buy draws on the same buying power, so they're sized together.
+        plan = plan_buys(inputs, self.get_buying_power(account_summary))
+        self._add_plan_rows(
+            buy_actions_table,
+            inputs,
+            plan,
+            thresholds,
+            "Buy",
+            "[cyan]At or above target",
+        )
+        to_buy = [
+            (symbol, self.get_primary_exchange(symbol), quantity)
+            for symbol, quantity in plan.trades()
         ]
-        await log.track_async(tasks, description="Checking buy-only positions...")
         return (buy_actions_table, to_buy)
 
     async def execute_buy_orders(self, buy_orders: List[Tuple[str, str, int]]) -> None:
@@ -347,25 +361,13 @@ class EquityRebalanceEngine:
         account_summary: Dict[str, AccountValue],
         portfolio_positions: Dict[str, List[PortfolioItem]],
     ) -> Tuple[Table, List[Tuple[str, str, int]]]:
-        stock_positions = [
-            position
-            for symbol in portfolio_positions
-            for position in portfolio_positions[symbol]
-            if isinstance(position.contract, Stock)
-        ]
-        total_buying_power = self.get_buying_power(account_summary)
-        stock_symbols: Dict[str, PortfolioItem] = {
-            stock.contract.symbol: stock for stock in stock_positions
-        }
-
-        sell_actions_table = Table(title="Sell-only rebalancing summary")
+        sell_actions_table = log.table(title="Sell-only rebalancing summary")
         sell_actions_table.add_column("Symbol")
         sell_actions_table.add_column("Current shares", justify="right")
         sell_actions_table.add_column("Target shares", justify="right")
         sell_actions_table.add_column("Shares to sell", justify="right")
         sell_actions_table.add_column("Action")
 
-        to_sell: List[Tuple[str, str, int]] = []
         regime_symbols = self._regime_rebalance_symbols()
         symbols = resolve_symbol_configs(self.config, context="sell-only rebalancing")
         sell_only_symbols = [
@@ -373,120 +375,28 @@ class EquityRebalanceEngine:
             for symbol in symbols.keys()
             if self.config.is_sell_only_rebalancing(symbol)
             and symbol not in regime_symbols
+            # A symbol with a working order is neither quoted nor sized.
+            and not self.working_orders.skip(symbol, "", "equity_sell_rebalance")
         ]
         if not sell_only_symbols:
-            return (sell_actions_table, to_sell)
-
-        async def check_sell_position_task(symbol: str) -> None:
-            ticker = await self.ibkr.get_ticker_for_stock(
-                symbol, self.get_primary_exchange(symbol)
-            )
-            current_position = math.floor(
-                stock_symbols[symbol].position if symbol in stock_symbols else 0
-            )
-            target_value = round(symbols[symbol].weight * total_buying_power, 2)
-            market_price = ticker.marketPrice()
-            if (
-                not market_price
-                or math.isnan(market_price)
-                or math.isclose(market_price, 0)
-            ):
-                log.error(
-                    f"Invalid market price for {symbol} (market_price={market_price}), skipping for now"
-                )
-                return
-            target_shares = math.floor(target_value / market_price)
-            shares_to_sell = current_position - target_shares
-
-            rebalance_policy = self.config.wheel_rebalance_policy(symbol)
-            symbol_config = symbols[symbol]
-            min_shares = (
-                self._as_int_or_none(rebalance_policy.min_threshold_shares)
-                or self._as_int_or_none(symbol_config.sell_only_min_threshold_shares)
-                or 1
-            )
-            min_amount = self._as_float_or_none(
-                rebalance_policy.min_threshold_amount
-            ) or self._as_float_or_none(symbol_config.sell_only_min_threshold_amount)
-            min_percent = self._as_float_or_none(
-                rebalance_policy.min_threshold_percent
-            ) or self._as_float_or_none(symbol_config.sell_only_min_threshold_percent)
-            min_percent_relative = self._as_float_or_none(
-                rebalance_policy.min_threshold_percent_relative
-            ) or self._as_float_or_none(
-                symbol_config.sell_only_min_threshold_percent_relative
-            )
+            return (sell_actions_table, [])
 
-            if min_percent is not None:
-                net_liquidation_value = float(account_summary["NetLiquidation"].value)
-                percent_min_amount = net_liquidation_value * min_percent
-                min_amount = (
-                    max(min_amount, percent_min_amount)
-                    if min_amount is not None
-                    else percent_min_amount
-                )
-
-            if (
-                min_percent_relative is not None
-                and target_value > 0
-                and shares_to_sell > 0
-            ):
-                current_value = current_position * market_price
-                relative_diff = (current_value - target_value) / target_value
-                if relative_diff < min_percent_relative:
-                    sell_actions_table.add_row(
-                        symbol,
-                        ifmt(current_position),
-                        ifmt(target_shares),
-                        ifmt(0),
-                        f"[yellow]Below relative threshold {min_percent_relative:.1%} (diff: {relative_diff:.1%})",
-                    )
-                    return
-
-            if shares_to_sell > 0:
-                order_amount = shares_to_sell * market_price
-                if min_amount and order_amount < min_amount:
-                    sell_actions_table.add_row(
-                        symbol,
-                        ifmt(current_position),
-                        ifmt(target_shares),
-                        ifmt(shares_to_sell),
-                        f"[yellow]Below min amount ${min_amount:.2f} (would be ${order_amount:.2f})",
-                    )
-                    return
-                if shares_to_sell < min_shares:
-                    sell_actions_table.add_row(
-                        symbol,
-                        ifmt(current_position),
-                        ifmt(target_shares),
-                        ifmt(shares_to_sell),
-                        f"[yellow]Below min shares {min_shares}",
-                    )
-                    return
-
-                sell_actions_table.add_row(
-                    symbol,
-                    ifmt(current_position),
-                    ifmt(target_shares),
-                    ifmt(shares_to_sell),
-                    f"[green]Sell {shares_to_sell} shares",
-                )
-                to_sell.append(
-                    (symbol, self.get_primary_exchange(symbol), shares_to_sell)
-                )
-            else:
-                sell_actions_table.add_row(
-                    symbol,
-                    ifmt(current_position),
-                    ifmt(target_shares),
-                    ifmt(0),
-                    "[cyan]At or below target",
-                )
-
-        tasks: List[Coroutine[Any, Any, None]] = [
-            check_sell_position_task(symbol) for symbol in sell_only_symbols
+        inputs, thresholds = await self._rebalance_inputs(
+            "sell", sell_only_symbols, account_summary, portfolio_positions
+        )
+        plan = plan_sells(inputs)
+        self._add_plan_rows(
+            sell_actions_table,
+            inputs,
+            plan,
+            thresholds,
+            "Sell",
+            "[cyan]At or below target",
+        )
+        to_sell = [
+            (symbol, self.get_primary_exchange(symbol), quantity)
+            for symbol, quantity in plan.trades()
         ]
-        await log.track_async(tasks, description="Checking sell-only positions...")
         return (sell_actions_table, to_sell)
 
     async def execute_sell_orders(
@@ -35,9 +35,13 @@ class OptionsWriteService(Protocol):
 
 
 class OptionsManageService(Protocol):
-    async def check_puts(self, portfolio_positions: PortfolioBySymbol) -> Any: ...
+    async def check_puts(
+        self, portfolio_positions: PortfolioBySymbol, prefetch_rolls: bool = False
+    ) -> Any: ...
 
-    async def check_calls(self, portfolio_positions: PortfolioBySymbol) -> Any: ...
+    async def check_calls(
+        self, portfolio_positions: PortfolioBySymbol, prefetch_rolls: bool = False
+    ) -> Any: ...
 
     async def roll_puts(
         self, puts: List[Any], account_summary: AccountSummary
@@ -104,11 +108,13 @@ async def run_option_management_stages(
     if not (should_roll or should_close):
         return
 
+    # With rolls enabled, each rollable position's roll-target scan starts as
+    # soon as it is classified, so the scans overlap the remaining checks.
     (rollable_puts, closeable_puts, group1) = await deps.manage_service.check_puts(
-        portfolio_positions
+        portfolio_positions, prefetch_rolls=should_roll
     )
     (rollable_calls, closeable_calls, group2) = await deps.manage_service.check_calls(
-        portfolio_positions
+        portfolio_positions, prefetch_rolls=should_roll
     )
     log.print(Panel(Group(group1, group2)))
 
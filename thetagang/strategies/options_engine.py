@@ -1,19 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 import math
 import sys
+from dataclasses import dataclass
 from typing import Any, Coroutine, Dict, List, Optional, Protocol, Tuple
 
+import numpy as np
 from ib_async import AccountValue, PortfolioItem, Ticker, util
 from ib_async.contract import ComboLeg, Contract, Index, Option, Stock
 from rich.console import Group
 from rich.table import Table
 
 from thetagang import log
+from thetagang.allocator import put_write_quantities, target_shares
 from thetagang.config import Config
 from thetagang.fmt import dfmt, ifmt, pfmt
 from thetagang.ibkr import IBKR, RequiredFieldValidationError, TickerField
 from thetagang.options import option_dte
+from thetagang.position_book import LONG, SHORT, PositionBook
 from thetagang.strategies.runtime_services import resolve_symbol_configs
 from thetagang.trading_operations import (
     NoValidContractsError,
@@ -21,18 +26,22 @@ from thetagang.trading_operations import (
     OrderOperations,
 )
 from thetagang.util import (
-    calculate_net_short_positions,
-    count_long_option_positions,
-    count_short_option_positions,
     get_higher_price,
     get_lower_price,
-    get_short_positions,
     get_target_calls,
     midpoint_or_market_price,
     position_pnl,
-    weighted_avg_long_strike,
-    weighted_avg_short_strike,
 )
+from thetagang.working_orders import WorkingOrders
+
+
+def _discard(task: asyncio.Task[Any]) -> None:
+    if task.done():
+        if not task.cancelled():
+            # Mark a failed scan's exception as retrieved.
+            task.exception()
+    else:
+        task.cancel()
 
 
 class OptionsRuntimeServices(Protocol):
@@ -56,6 +65,23 @@ class OptionsRuntimeServices(Protocol):
     def get_close_price(self, ticker: Ticker) -> float: ...
 
 
+RollKey = Tuple[str, str, int]
+
+
+def roll_key(position: PortfolioItem) -> RollKey:
+    """Identify a position to roll; IB reports one per contract and account.
+
+    The right comes first so scans can be dropped by right.
+    """
+    return (position.contract.right[:1], position.account, position.contract.conId)
+
+
+@dataclass(frozen=True)
+class RollTarget:
+    buy_ticker: Ticker
+    sell_ticker: Ticker
+
+
 class OptionsStrategyEngine:
     def __init__(
         self,
@@ -69,6 +95,7 @@ class OptionsStrategyEngine:
         has_excess_puts: set[str],
         has_excess_calls: set[str],
         qualified_contracts: Dict[int, Contract],
+        working_orders: Optional[WorkingOrders] = None,
     ) -> None:
         self.config = config
         self.ibkr = ibkr
@@ -79,6 +106,10 @@ class OptionsStrategyEngine:
         self.has_excess_puts = has_excess_puts
         self.has_excess_calls = has_excess_calls
         self.qualified_contracts = qualified_contracts
+        self.working_orders = working_orders or WorkingOrders()
+        # Roll-target scans started while positions were still being checked,
+        # with the average cost each was started for.
+        self.roll_targets: Dict[RollKey, asyncio.Task[RollTarget]] = {}
 
     def get_symbols(self) -> List[str]:
         return self.services.get_symbols()
@@ -139,7 +170,7 @@ class OptionsStrategyEngine:
         account_summary: Dict[str, AccountValue],
         portfolio_positions: Dict[str, List[PortfolioItem]],
     ) -> Tuple[Table, List[Tuple[str, str, int, int]]]:
-        call_actions_table = Table(title="Call writing summary")
+        call_actions_table = log.table(title="Call writing summary")
         call_actions_table.add_column("Symbol")
         call_actions_table.add_column("Action")
         call_actions_table.add_column("Detail")
@@ -152,33 +183,22 @@ class OptionsStrategyEngine:
         symbol_configs = resolve_symbol_configs(
             self.config, context="options uncovered position check"
         )
+        book = PositionBook.of(portfolio_positions)
 
         async def update_to_write_task(symbol: str) -> None:
             if symbol not in symbols:
                 return
 
             short_call_count = (
-                calculate_net_short_positions(portfolio_positions[symbol], "C")
+                book.net_short_options(symbol, "C")
                 if calculate_net_contracts
-                else count_short_option_positions(portfolio_positions[symbol], "C")
-            )
-            stock_count = math.floor(
-                sum(
-                    [
-                        p.position
-                        for p in portfolio_positions[symbol]
-                        if isinstance(p.contract, Stock)
-                    ]
-                )
+                else book.count_short_options(symbol, "C")
             )
+            stock_count = book.stock_quantity(symbol)
             strike_limit = math.ceil(
                 max(
                     [self.config.get_strike_limit(symbol, "C") or 0]
-                    + [
-                        p.averageCost or 0
-                        for p in portfolio_positions[symbol]
-                        if isinstance(p.contract, Stock)
-                    ]
+                    + [p.averageCost or 0 for p in book.stocks(symbol)]
                 )
             )
 
@@ -355,6 +375,8 @@ class OptionsStrategyEngine:
 
     async def write_calls(self, calls: List[Any]) -> None:
         for symbol, primary_exchange, quantity, strike_limit in calls:
+            if self.working_orders.skip(symbol, "C", "options_write_calls"):
+                continue
             try:
                 sell_ticker = await self.option_scanner.find_eligible_contracts(
                     Stock(
@@ -384,6 +406,8 @@ class OptionsStrategyEngine:
         self, puts: List[Tuple[str, str, int, Optional[float]]]
     ) -> None:
         for symbol, primary_exchange, quantity, strike_limit in puts:
+            if self.working_orders.skip(symbol, "P", "options_write_puts"):
+                continue
             try:
                 sell_ticker = await self.option_scanner.find_eligible_contracts(
                     Stock(
@@ -414,11 +438,9 @@ class OptionsStrategyEngine:
         account_summary: Dict[str, AccountValue],
         portfolio_positions: Dict[str, List[PortfolioItem]],
     ) -> Tuple[Table, Table, List[Tuple[str, str, int, Optional[float]]]]:
+        book = PositionBook.of(portfolio_positions)
         stock_positions = [
-            position
-            for symbol in portfolio_positions
-            for position in portfolio_positions[symbol]
-            if isinstance(position.contract, Stock)
+            position for symbol in book for position in book.stocks(symbol)
         ]
 
         total_buying_power = self.get_buying_power(account_summary)
@@ -443,7 +465,7 @@ class OptionsStrategyEngine:
             self.config.strategies.wheel.defaults.write_when.calculate_net_contracts
         )
 
-        positions_summary_table = Table(title="Positions summary", show_edge=False)
+        positions_summary_table = log.table(title="Positions summary", show_edge=False)
         positions_summary_table.add_column("Symbol")
         positions_summary_table.add_column("Shares", justify="right")
         positions_summary_table.add_column("Short puts", justify="right")
@@ -459,7 +481,7 @@ class OptionsStrategyEngine:
         positions_summary_table.add_column("Net target shares", justify="right")
         positions_summary_table.add_column("Net target contracts", justify="right")
 
-        put_actions_table = Table(title="Put writing summary")
+        put_actions_table = log.table(title="Put writing summary")
         put_actions_table.add_column("Symbol")
         put_actions_table.add_column("Action")
         put_actions_table.add_column("Detail")
@@ -468,17 +490,66 @@ class OptionsStrategyEngine:
             self.config, context="options put write check"
         )
 
-        async def calculate_target_position_task(symbol: str) -> None:
-            ticker = await self.ibkr.get_ticker_for_stock(
+        tickers: Dict[str, Ticker] = {}
+
+        async def fetch_ticker_task(symbol: str) -> None:
+            tickers[symbol] = await self.ibkr.get_ticker_for_stock(
                 symbol, self.get_primary_exchange(symbol)
             )
-            current_position = math.floor(
-                stock_symbols[symbol].position if symbol in stock_symbols else 0
-            )
 
+        fetch_tasks: List[Coroutine[Any, Any, None]] = [
+            fetch_ticker_task(symbol) for symbol in symbol_configs.keys()
+        ]
+        await log.track_async(fetch_tasks, description="Fetching underlying quotes...")
+
+        # Size every symbol in one pass; the per-symbol tasks below only
+        # report the result and check the write conditions.
+        symbols = [symbol for symbol in symbol_configs.keys() if symbol in tickers]
+        for symbol in symbols:
             targets[symbol] = round(
                 symbol_configs[symbol].weight * total_buying_power, 2
             )
+        current_positions = np.array(
+            [
+                math.floor(
+                    stock_symbols[symbol].position if symbol in stock_symbols else 0
+                )
+                for symbol in symbols
+            ],
+            dtype=np.int64,
+        )
+        target_share_quantities = target_shares(
+            np.array([targets[symbol] for symbol in symbols], dtype=float),
+            np.array(
+                [tickers[symbol].marketPrice() or math.nan for symbol in symbols],
+                dtype=float,
+            ),
+        )
+        net_target_shares_by_symbol, net_target_puts_by_symbol = put_write_quantities(
+            target_share_quantities,
+            current_positions,
+            np.array(
+                [
+                    (
+                        book.net_short_options(symbol, "P")
+                        if calculate_net_contracts
+                        else book.count_short_options(symbol, "P")
+                    )
+                    if symbol in book
+                    else 0
+                    for symbol in symbols
+                ],
+                dtype=np.int64,
+            ),
+            np.array(
+                [self.config.is_buy_only_rebalancing(symbol) for symbol in symbols],
+                dtype=bool,
+            ),
+        )
+
+        async def calculate_target_position_task(index: int, symbol: str) -> None:
+            ticker = tickers[symbol]
+            current_position = int(current_positions[index])
             market_price = ticker.marketPrice()
             if (
                 not market_price
@@ -490,61 +561,35 @@ class OptionsStrategyEngine:
                 )
                 return
 
-            self.target_quantities[symbol] = math.floor(targets[symbol] / market_price)
+            self.target_quantities[symbol] = int(target_share_quantities[index])
             if symbol not in position_values:
                 position_values[symbol] = current_position * market_price
 
-            if symbol in portfolio_positions:
-                net_short_put_count = short_put_count = count_short_option_positions(
-                    portfolio_positions[symbol], "P"
-                )
-                short_put_avg_strike = weighted_avg_short_strike(
-                    portfolio_positions[symbol], "P"
-                )
-                long_put_count = count_long_option_positions(
-                    portfolio_positions[symbol], "P"
-                )
-                long_put_avg_strike = weighted_avg_long_strike(
-                    portfolio_positions[symbol], "P"
-                )
-                net_short_call_count = short_call_count = count_short_option_positions(
-                    portfolio_positions[symbol], "C"
-                )
-                short_call_avg_strike = weighted_avg_short_strike(
-                    portfolio_positions[symbol], "C"
-                )
-                long_call_count = count_long_option_positions(
-                    portfolio_positions[symbol], "C"
+            if symbol in book:
+                net_short_put_count = short_put_count = book.count_short_options(
+                    symbol, "P"
                 )
-                long_call_avg_strike = weighted_avg_long_strike(
-                    portfolio_positions[symbol], "C"
+                short_put_avg_strike = book.weighted_avg_strike(symbol, "P", SHORT)
+                long_put_count = book.count_long_options(symbol, "P")
+                long_put_avg_strike = book.weighted_avg_strike(symbol, "P", LONG)
+                net_short_call_count = short_call_count = book.count_short_options(
+                    symbol, "C"
                 )
+                short_call_avg_strike = book.weighted_avg_strike(symbol, "C", SHORT)
+                long_call_count = book.count_long_options(symbol, "C")
+                long_call_avg_strike = book.weighted_avg_strike(symbol, "C", LONG)
 
                 if calculate_net_contracts:
-                    net_short_put_count = calculate_net_short_positions(
-                        portfolio_positions[symbol], "P"
-                    )
-                    net_short_call_count = calculate_net_short_positions(
-                        portfolio_positions[symbol], "C"
-                    )
+                    net_short_put_count = book.net_short_options(symbol, "P")
+                    net_short_call_count = book.net_short_options(symbol, "C")
             else:
                 net_short_put_count = short_put_count = long_put_count = 0
                 short_put_avg_strike = long_put_avg_strike = None
                 net_short_call_count = short_call_count = long_call_count = 0
                 short_call_avg_strike = long_call_avg_strike = None
 
-            if self.config.is_buy_only_rebalancing(symbol):
-                qty_to_write = 0
-                net_target_shares = self.target_quantities[symbol] - current_position
-                net_target_puts = 0
-            else:
-                qty_to_write = math.floor(
-                    self.target_quantities[symbol]
-                    - current_position
-                    - 100 * net_short_put_count
-                )
-                net_target_shares = qty_to_write
-                net_target_puts = net_target_shares // 100
+            net_target_shares = int(net_target_shares_by_symbol[index])
+            net_target_puts = int(net_target_puts_by_symbol[index])
 
             if calculate_net_contracts:
                 positions_summary_table.add_row(
@@ -680,7 +725,8 @@ class OptionsStrategyEngine:
             }
 
         tasks: List[Coroutine[Any, Any, None]] = [
-            calculate_target_position_task(symbol) for symbol in symbol_configs.keys()
+            calculate_target_position_task(index, symbol)
+            for index, symbol in enumerate(symbols)
         ]
         await log.track_async(tasks, description="Calculating target positions...")
 
@@ -742,10 +788,7 @@ class OptionsStrategyEngine:
     def get_short_contracts(
         self, portfolio_positions: Dict[str, List[PortfolioItem]], right: str
     ) -> List[PortfolioItem]:
-        ret: List[PortfolioItem] = []
-        for symbol in portfolio_positions:
-            ret = ret + get_short_positions(portfolio_positions[symbol], right)
-        return ret
+        return list(PositionBook.of(portfolio_positions).all_short_options(right))
 
     def get_short_calls(
         self, portfolio_positions: Dict[str, List[PortfolioItem]]
@@ -759,17 +802,22 @@ class OptionsStrategyEngine:
 
     async def put_is_itm(self, contract: Contract) -> bool:
         ticker = await self.ibkr.get_ticker_for_stock(
-            contract.symbol, contract.primaryExchange
+            contract.symbol,
+            contract.primaryExchange,
+            mode=self.config.runtime.ib_async.quote_mode,
         )
         return contract.strike >= ticker.marketPrice()
 
     async def call_is_itm(self, contract: Contract) -> bool:
+        quote_mode = self.config.runtime.ib_async.quote_mode
         if contract.symbol == "VIX":
             vix_contract = Index("VIX", "CBOE", "USD")
-            ticker = await self.ibkr.get_ticker_for_contract(vix_contract)
+            ticker = await self.ibkr.get_ticker_for_contract(
+                vix_contract, mode=quote_mode
+            )
         else:
             ticker = await self.ibkr.get_ticker_for_stock(
-                contract.symbol, contract.primaryExchange
+                contract.symbol, contract.primaryExchange, mode=quote_mode
             )
         return contract.strike <= ticker.marketPrice()
 
@@ -958,14 +1006,16 @@ class OptionsStrategyEngine:
         return False
 
     async def check_puts(
-        self, portfolio_positions: Dict[str, List[PortfolioItem]]
+        self,
+        portfolio_positions: Dict[str, List[PortfolioItem]],
+        prefetch_rolls: bool = False,
     ) -> Tuple[List[Any], List[Any], Group]:
         puts = self.get_short_puts(portfolio_positions)
         puts = [put for put in puts if put.contract.symbol != "VIX"]
         rollable_puts: List[PortfolioItem] = []
         closeable_puts: List[PortfolioItem] = []
 
-        table = Table(title="Rollable & closeable puts")
+        table = log.table(title="Rollable & closeable puts")
         table.add_column("Contract")
         table.add_column("Action")
         table.add_column("Detail")
@@ -975,6 +1025,8 @@ class OptionsStrategyEngine:
         ) -> None:
             if await self.put_can_be_rolled(put, table):
                 rollable_puts.append(put)
+                if prefetch_rolls:
+                    self.prefetch_roll_target(put, "P", portfolio_positions)
             elif self.put_can_be_closed(put, table):
                 closeable_puts.append(put)
 
@@ -997,14 +1049,16 @@ class OptionsStrategyEngine:
         return (rollable_puts, closeable_puts, group)
 
     async def check_calls(
-        self, portfolio_positions: Dict[str, List[PortfolioItem]]
+        self,
+        portfolio_positions: Dict[str, List[PortfolioItem]],
+        prefetch_rolls: bool = False,
     ) -> Tuple[List[Any], List[Any], Group]:
         calls = self.get_short_calls(portfolio_positions)
         calls = [call for call in calls if call.contract.symbol != "VIX"]
         rollable_calls: List[PortfolioItem] = []
         closeable_calls: List[PortfolioItem] = []
 
-        table = Table(title="Rollable & closeable calls")
+        table = log.table(title="Rollable & closeable calls")
         table.add_column("Contract")
         table.add_column("Action")
         table.add_column("Detail")
@@ -1014,6 +1068,8 @@ class OptionsStrategyEngine:
         ) -> None:
             if await self.call_can_be_rolled(call, table):
                 rollable_calls.append(call)
+                if prefetch_rolls:
+                    self.prefetch_roll_target(call, "C", portfolio_positions)
             elif self.call_can_be_closed(call, table):
                 closeable_calls.append(call)
 
@@ -1063,6 +1119,10 @@ class OptionsStrategyEngine:
     async def close_positions(self, right: str, positions: List[PortfolioItem]) -> None:
         log.notice(f"Close {right} positions...")
         for position in positions:
+            if self.working_orders.skip(
+                position.contract.symbol, right, "options_close_positions"
+            ):
+                continue
             try:
                 position.contract.exchange = self.order_ops.get_order_exchange()
                 ticker = await self.ibkr.get_ticker_for_contract(
@@ -1099,6 +1159,122 @@ class OptionsStrategyEngine:
                 )
                 continue
 
+    async def find_roll_target(
+        self, position: PortfolioItem, right: str, book: PositionBook
+    ) -> RollTarget:
+        """Quote ``position`` and scan the chain for the contract to roll to."""
+        symbol = position.contract.symbol
+        position.contract.exchange = self.order_ops.get_order_exchange()
+        buy_ticker = await self.ibkr.get_ticker_for_contract(
+            position.contract,
+            required_fields=[],
+            optional_fields=[TickerField.MIDPOINT, TickerField.MARKET_PRICE],
+        )
+
+        strike_limit = self.config.get_strike_limit(symbol, right)
+        if right.startswith("C"):
+            average_cost = [p.averageCost for p in book.stocks(symbol)] or [0]
+            strike_limit = round(max([strike_limit or 0] + average_cost), 2)
+            if self.config.maintain_high_water_mark(symbol):
+                strike_limit = max([strike_limit, position.contract.strike])
+        elif right.startswith("P"):
+            strike_limit = round(
+                min(
+                    [strike_limit or sys.float_info.max]
+                    + [
+                        max(
+                            [
+                                position.contract.strike,
+                                position.contract.strike
+                                + (
+                                    position.averageCost
+                                    / float(position.contract.multiplier)
+                                )
+                                - midpoint_or_market_price(buy_ticker),
+                            ]
+                        )
+                    ]
+                ),
+                2,
+            )
+            if isinstance(position.contract, Option) and await self.put_is_itm(
+                position.contract
+            ):
+                strike_limit = min([strike_limit, position.contract.strike])
+
+        kind = "calls" if right.startswith("C") else "puts"
+        minimum_price = (
+            (lambda: self.config.runtime.orders.minimum_credit)
+            if not getattr(
+                self.config.strategies.wheel.defaults.roll_when, kind
+            ).credit_only
+            else (
+                lambda: (
+                    midpoint_or_market_price(buy_ticker)
+                    + self.config.runtime.orders.minimum_credit
+                )
+            )
+        )
+
+        def fallback_minimum_price() -> float:
+            return midpoint_or_market_price(buy_ticker)
+
+        sell_ticker = await self.option_scanner.find_eligible_contracts(
+            Stock(
+                symbol,
+                self.order_ops.get_order_exchange(),
+                "USD",
+                primaryExchange=self.get_primary_exchange(symbol),
+            ),
+            right,
+            strike_limit,
+            exclude_expirations_before=position.contract.lastTradeDateOrContractMonth,
+            exclude_exp_strike=(
+                position.contract.strike,
+                position.contract.lastTradeDateOrContractMonth,
+            ),
+            minimum_price=minimum_price,
+            fallback_minimum_price=fallback_minimum_price,
+        )
+        if not sell_ticker.contract:
+            raise RuntimeError(f"Invalid ticker (no contract): {sell_ticker}")
+        return RollTarget(buy_ticker=buy_ticker, sell_ticker=sell_ticker)
+
+    def prefetch_roll_target(
+        self,
+        position: PortfolioItem,
+        right: str,
+        portfolio_positions: Dict[str, List[PortfolioItem]],
+    ) -> None:
+        """Start scanning for ``position``'s roll target in the background.
+
+        Called as soon as a position is classified rollable, so the scans run
+        while the remaining positions are still being checked and
+        roll_positions mostly waits on scans already in flight.
+        """
+        key = roll_key(position)
+        if key in self.roll_targets or self.working_orders.working(
+            position.contract.symbol, right, "options_roll_positions"
+        ):
+            return
+        task = asyncio.create_task(
+            self.find_roll_target(position, right, PositionBook.of(portfolio_positions))
+        )
+        self.roll_targets[key] = task
+
+    async def take_roll_target(
+        self, position: PortfolioItem, right: str, book: PositionBook
+    ) -> RollTarget:
+        prefetched = self.roll_targets.pop(roll_key(position), None)
+        if prefetched is not None:
+            return await prefetched
+        return await self.find_roll_target(position, right, book)
+
+    def discard_roll_targets(self, right: str) -> None:
+        """Drop prefetched scans of ``right`` that no roll used."""
+        for key in [key for key in self.roll_targets if key[0] == right[:1]]:
+            _discard(self.roll_targets.pop(key))
+
     async def roll_positions(
         self,
         positions: List[PortfolioItem],
@@ -1107,91 +1283,20 @@ class OptionsStrategyEngine:
         portfolio_positions: Optional[Dict[str, List[PortfolioItem]]] = None,
     ) -> List[PortfolioItem]:
         closeable_positions: List[PortfolioItem] = []
+        book = PositionBook.of(portfolio_positions or {})
         log.notice(f"Rolling {right} positions...")
 
         for position in positions:
+            if self.working_orders.skip(
+                position.contract.symbol, right, "options_roll_positions"
+            ):
+                continue
             try:
                 symbol = position.contract.symbol
-                position.contract.exchange = self.order_ops.get_order_exchange()
-                buy_ticker = await self.ibkr.get_ticker_for_contract(
-                    position.contract,
-                    required_fields=[],
-                    optional_fields=[TickerField.MIDPOINT, TickerField.MARKET_PRICE],
-                )
-
-                strike_limit = self.config.get_strike_limit(symbol, right)
-                if right.startswith("C"):
-                    average_cost = (
-                        [
-                            p.averageCost
-                            for p in portfolio_positions[symbol]
-                            if isinstance(p.contract, Stock)
-                        ]
-                        if portfolio_positions and symbol in portfolio_positions
-                        else [0]
-                    )
-                    strike_limit = round(max([strike_limit or 0] + average_cost), 2)
-                    if self.config.maintain_high_water_mark(symbol):
-                        strike_limit = max([strike_limit, position.contract.strike])
-                elif right.startswith("P"):
-                    strike_limit = round(
-                        min(
-                            [strike_limit or sys.float_info.max]
-                            + [
-                                max(
-                                    [
-                                        position.contract.strike,
-                                        position.contract.strike
-                                        + (
-                                            position.averageCost
-                                            / float(position.contract.multiplier)
-                                        )
-                                        - midpoint_or_market_price(buy_ticker),
-                                    ]
-                                )
-                            ]
-                        ),
-                        2,
-                    )
-                    if isinstance(position.contract, Option) and await self.put_is_itm(
-                        position.contract
-                    ):
-                        strike_limit = min([strike_limit, position.contract.strike])
-
+                target = await self.take_roll_target(position, right, book)
+                buy_ticker = target.buy_ticker
+                sell_ticker = target.sell_ticker
                 kind = "calls" if right.startswith("C") else "puts"
-                minimum_price = (
-                    (lambda: self.config.runtime.orders.minimum_credit)
-                    if not getattr(
-                        self.config.strategies.wheel.defaults.roll_when, kind
-                    ).credit_only
-                    else (
-                        lambda: midpoint_or_market_price(buy_ticker)
-                        + self.config.runtime.orders.minimum_credit
-                    )
-                )
-
-                def fallback_minimum_price() -> float:
-                    return midpoint_or_market_price(buy_ticker)
-
-                sell_ticker = await self.option_scanner.find_eligible_contracts(
-                    Stock(
-                        symbol,
-                        self.order_ops.get_order_exchange(),
-                        "USD",
-                        primaryExchange=self.get_primary_exchange(symbol),
-                    ),
-                    right,
-                    strike_limit,
-                    exclude_expirations_before=position.contract.lastTradeDateOrContractMonth,
-                    exclude_exp_strike=(
-                        position.contract.strike,
-                        position.contract.lastTradeDateOrContractMonth,
-                    ),
-                    minimum_price=minimum_price,
-                    fallback_minimum_price=fallback_minimum_price,
-                )
-                if not sell_ticker.contract:
-                    raise RuntimeError(f"Invalid ticker (no contract): {sell_ticker}")
 
                 qty_to_roll = math.floor(abs(position.position))
                 maximum_new_contracts = await self.get_maximum_new_contracts_for(
@@ -1279,4 +1384,5 @@ class OptionsStrategyEngine:
                 )
                 continue
 
+        self.discard_roll_targets(right)
         return closeable_positions
@@ -10,12 +10,14 @@ from thetagang import log
 from thetagang.config import Config
 from thetagang.ibkr import IBKR
 from thetagang.orders import Orders
+from thetagang.position_book import PositionBook
 from thetagang.trading_operations import (
     NoValidContractsError,
     OptionChainScanner,
     OrderOperations,
 )
-from thetagang.util import get_lower_price, net_option_positions
+from thetagang.util import get_lower_price
+from thetagang.working_orders import WorkingOrders
 
 
 class PostStrategyEngine:
@@ -28,6 +30,7 @@ class PostStrategyEngine:
         option_scanner: OptionChainScanner,
         orders: Orders,
         qualified_contracts: Dict[int, Contract],
+        working_orders: Optional[WorkingOrders] = None,
     ) -> None:
         self.config = config
         self.ibkr = ibkr
@@ -35,6 +38,7 @@ class PostStrategyEngine:
         self.option_scanner = option_scanner
         self.orders = orders
         self.qualified_contracts = qualified_contracts
+        self.working_orders = working_orders or WorkingOrders()
 
     def calc_pending_cash_balance(self) -> float:
         def get_multiplier(contract: Contract) -> float:
@@ -92,8 +96,8 @@ class PostStrategyEngine:
             return
 
         ignore_dte = self.config.strategies.vix_call_hedge.ignore_dte
-        net_vix_call_count = net_option_positions(
-            "VIX", portfolio_positions, "C", ignore_dte=ignore_dte
+        net_vix_call_count = PositionBook.of(portfolio_positions).net_options(
+            "VIX", "C", ignore_dte=ignore_dte
         )
         if net_vix_call_count > 0:
             (
@@ -128,6 +132,8 @@ class PostStrategyEngine:
         (close_vix_calls, _vix_ticker, _threshold) = await vix_calls_should_be_closed()
         if close_vix_calls:
             return
+        if self.working_orders.skip("VIX", "C", "post_vix_call_hedge"):
+            return
         try:
             vixmo_contract = Index("VIXMO", "CBOE", "USD")
             vixmo_ticker = await self.ibkr.get_ticker_for_contract(vixmo_contract)
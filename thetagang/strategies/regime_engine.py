@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import math
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple
 
 import exchange_calendars as xcals
@@ -15,8 +15,17 @@ from thetagang import log
 from thetagang.config import Config
 from thetagang.config_models import RegimeRebalanceBaseEnum
 from thetagang.db import DataStore
+from thetagang.execution_sync import ExecutionSync
 from thetagang.fmt import dfmt, ffmt, ifmt, pfmt
 from thetagang.ibkr import IBKR
+from thetagang.position_book import PositionBook
+from thetagang.regime_state import (
+    RegimeWindow,
+    load_window,
+    ratio_window_stats,
+    save_window,
+    window_key,
+)
 from thetagang.strategies.runtime_services import resolve_symbol_configs
 from thetagang.trading_operations import OrderOperations
 
@@ -26,6 +35,13 @@ AlignedClosesFetcher = Callable[
 ]
 
 
+def regime_history_duration(lookback_days: int, cooldown_days: int) -> str:
+    """IBKR duration covering the daily closes a full regime evaluation reads."""
+    trading_days_needed = lookback_days + 1 + max(cooldown_days, 0)
+    calendar_days = math.ceil(trading_days_needed * 7 / 5) + 5
+    return f"{calendar_days} D"
+
+
 class RegimeHistoryCache:
     def __init__(self, fetcher: AlignedClosesFetcher) -> None:
         self._fetcher = fetcher
@@ -66,6 +82,12 @@ class RegimeRebalanceEngine:
         self._get_buying_power = get_buying_power
         self._now = now_provider
         self.regime_rebalance_order_ref_prefix = "tg:regime-rebalance"
+        self._windows: Dict[str, RegimeWindow] = {}
+        self.execution_sync = (
+            ExecutionSync(ibkr, data_store, config.runtime.account.number)
+            if data_store
+            else None
+        )
 
     @staticmethod
     def _as_int_or_none(value: Any) -> int | None:
@@ -165,10 +187,13 @@ class RegimeRebalanceEngine:
         if not symbols:
             log.error("Regime-aware rebalancing has no symbols to build a proxy.")
             raise ValueError("Regime-aware rebalancing requires proxy symbols.")
-        trading_days_needed = lookback_days + 1 + max(cooldown_days, 0)
-        calendar_days = math.ceil(trading_days_needed * 7 / 5) + 5
-        duration = f"{calendar_days} D"
+        return await self._fetch_aligned_closes(
+            symbols, regime_history_duration(lookback_days, cooldown_days)
+        )
 
+    async def _fetch_aligned_closes(
+        self, symbols: List[str], duration: str
+    ) -> Tuple[List[date], Dict[str, List[float]]]:
         async def fetch_history_task(symbol: str) -> Tuple[str, List[Any]]:
             contract = Stock(
                 symbol,
@@ -229,6 +254,53 @@ class RegimeRebalanceEngine:
 
         return (sorted_dates, aligned_closes)
 
+    async def _get_windowed_aligned_closes(
+        self,
+        symbols: List[str],
+        lookback_days: int,
+        cooldown_days: int,
+    ) -> Tuple[List[date], Dict[str, List[float]]]:
+        """Aligned closes, extending the window stored by the previous run.
+
+        When the DataStore holds this window, only the bars since its last day
+        are requested and appended. A revised or stale window, or one built for
+        different symbols or lookbacks (they are part of the key), is rebuilt
+        from a full history request.
+        """
+        keep = lookback_days + 1 + max(cooldown_days, 0)
+        key = window_key(symbols, lookback_days, cooldown_days)
+        window = load_window(self.data_store, key)
+        if window is not None and set(window.closes) == set(symbols):
+            gap_days = max((self._now().date() - window.dates[-1]).days, 0)
+            try:
+                dates, closes = await self._fetch_aligned_closes(
+                    symbols, f"{gap_days + 7} D"
+                )
+            except ValueError:
+                dates, closes = [], {}
+            if window.merge(dates, closes, keep) is not None and (
+                len(window.dates) >= keep
+            ):
+                self._windows[key] = window
+                save_window(self.data_store, window)
+                return list(window.dates), {
+                    symbol: list(window.closes[symbol]) for symbol in symbols
+                }
+            log.info("Regime history window is stale or revised, rebuilding it.")
+
+        dates, closes = await self._get_regime_aligned_closes(
+            symbols, lookback_days, cooldown_days
+        )
+        if self.data_store is not None:
+            window = RegimeWindow(
+                key=key,
+                dates=dates[-keep:],
+                closes={symbol: closes[symbol][-keep:] for symbol in symbols},
+            )
+            self._windows[key] = window
+            save_window(self.data_store, window)
+        return dates, closes
+
     async def _resolve_effective_weights(
         self,
         symbols: List[str],
@@ -391,17 +463,18 @@ class RegimeRebalanceEngine:
 
         lookback_days = max(regime_rebalance.order_history_lookback_days, 1)
         start_time = self._now() - timedelta(days=lookback_days)
-        exec_filter = ExecutionFilter(time=start_time.strftime("%Y%m%d %H:%M:%S"))
 
-        if self.data_store:
-            fills = await self.ibkr.request_executions(exec_filter)
-            self.data_store.record_executions(fills)
+        if self.data_store and self.execution_sync:
+            await self.execution_sync.sync(
+                start_time.astimezone(timezone.utc).replace(tzinfo=None)
+            )
             return self.data_store.get_last_regime_rebalance_time(
                 symbols,
                 self.regime_rebalance_order_ref_prefix,
                 start_time,
             )
 
+        exec_filter = ExecutionFilter(time=start_time.strftime("%Y%m%d %H:%M:%S"))
         fills = await self.ibkr.request_executions(exec_filter)
         last_rebalance: Optional[datetime] = None
         for fill in fills:
@@ -460,7 +533,7 @@ class RegimeRebalanceEngine:
         symbol_configs = resolve_symbol_configs(
             self.config, context="regime rebalance check"
         )
-        table = Table(title="Regime-aware rebalancing summary")
+        table = log.table(title="Regime-aware rebalancing summary")
         table.add_column("Symbol")
         table.add_column("Weights", justify="right")
         table.add_column("Value", justify="right")
@@ -504,11 +577,9 @@ class RegimeRebalanceEngine:
                 "Regime-aware rebalancing requires positive target weights."
             )
 
+        book = PositionBook.of(portfolio_positions)
         stock_positions = [
-            position
-            for symbol in portfolio_positions
-            for position in portfolio_positions[symbol]
-            if isinstance(position.contract, Stock)
+            position for symbol in book for position in book.stocks(symbol)
         ]
         stock_symbols: Dict[str, PortfolioItem] = {
             position.contract.symbol: position for position in stock_positions
@@ -584,7 +655,8 @@ class RegimeRebalanceEngine:
             log.error("Rebalance base value is not positive, skipping rebalancing.")
             raise ValueError("Regime-aware rebalancing requires a positive base value.")
 
-        history_cache = RegimeHistoryCache(self._get_regime_aligned_closes)
+        self._windows = {}
+        history_cache = RegimeHistoryCache(self._get_windowed_aligned_closes)
         current_weights: Dict[str, float] = {}
         effective_weights, volatility_details = await self._resolve_effective_weights(
             symbols,
@@ -704,20 +776,42 @@ class RegimeRebalanceEngine:
                 max(price, regime_rebalance.eps) for price in anchor_series
             ]
             ratio_series = np.log(np.array(rest_index) / np.array(anchor_prices))
-            ratio_returns = pd.Series(ratio_series).diff()
-            ratio_var = float(
-                ratio_returns.rolling(regime_rebalance.lookback_days)
-                .var(ddof=1)
-                .iloc[-1]
-            )
-            ratio_mean = float(
-                ratio_returns.rolling(regime_rebalance.lookback_days).mean().iloc[-1]
-            )
-            ratio_std = float(
-                ratio_returns.rolling(regime_rebalance.lookback_days)
-                .std(ddof=1)
-                .iloc[-1]
+            window = self._windows.get(
+                window_key(
+                    symbols,
+                    regime_rebalance.lookback_days,
+                    regime_rebalance.cooldown_days,
+                )
             )
+            if window is not None:
+                window_levels = ratio_series[-len(window.dates) :]
+                stats = ratio_window_stats(
+                    window,
+                    window_levels,
+                    regime_rebalance.lookback_days,
+                    [ratio_anchor, normalized_rest_weights, regime_rebalance.eps],
+                )
+                save_window(self.data_store, window)
+                ratio_var, ratio_mean, ratio_std = (
+                    stats if stats is not None else (math.nan, math.nan, math.nan)
+                )
+            else:
+                ratio_returns = pd.Series(ratio_series).diff()
+                ratio_var = float(
+                    ratio_returns.rolling(regime_rebalance.lookback_days)
+                    .var(ddof=1)
+                    .iloc[-1]
+                )
+                ratio_mean = float(
+                    ratio_returns.rolling(regime_rebalance.lookback_days)
+                    .mean()
+                    .iloc[-1]
+                )
+                ratio_std = float(
+                    ratio_returns.rolling(regime_rebalance.lookback_days)
+                    .std(ddof=1)
+                    .iloc[-1]
+                )
             if math.isnan(ratio_var) or math.isnan(ratio_mean) or math.isnan(ratio_std):
                 ratio_ok = False
                 ratio_tstat = float("inf")
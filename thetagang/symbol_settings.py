@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Iterable, Mapping, Optional, Tuple
+
+if TYPE_CHECKING:
+    from thetagang.config import Config, RebalanceExecutionPolicy
+
+RIGHTS = ("C", "P")
+
+
+def normalize_right(right: str) -> str:
+    return "C" if right.upper().startswith("C") else "P"
+
+
+@dataclass(frozen=True, slots=True)
+class SymbolSettings:
+    """Every per-symbol wheel setting for one (symbol, right), fully resolved.
+
+    Symbol-level values (DTE, cap factor, rebalance policy, ...) are repeated
+    in the call and put records so a single lookup answers any question.
+    """
+
+    symbol: str
+    right: str
+    target_delta: float
+    write_threshold_sigma: Optional[float]
+    write_threshold_perc: float
+    strike_limit: Optional[float]
+    can_write_when_green: bool
+    can_write_when_red: bool
+    target_dte: int
+    max_dte: Optional[int]
+    cap_factor: float
+    cap_target_floor: float
+    write_excess_calls_only: bool
+    maintain_high_water_mark: bool
+    close_if_unable_to_roll: bool
+    trading_allowed: bool
+    wheel_rebalance_policy: RebalanceExecutionPolicy
+    regime_rebalance_policy: RebalanceExecutionPolicy
+    buy_only_rebalancing: bool
+    sell_only_rebalancing: bool
+
+    @classmethod
+    def resolve(cls, config: Config, symbol: str, right: str) -> SymbolSettings:
+        wheel_policy = config._resolve_wheel_rebalance_policy(symbol)
+        can_write_when_green, can_write_when_red = config._resolve_can_write_when(
+            symbol, right
+        )
+        return cls(
+            symbol=symbol,
+            right=right,
+            target_delta=config._resolve_target_delta(symbol, right),
+            write_threshold_sigma=config._resolve_write_threshold_sigma(symbol, right),
+            write_threshold_perc=config._resolve_write_threshold_perc(symbol, right),
+            strike_limit=config._resolve_strike_limit(symbol, right),
+            can_write_when_green=can_write_when_green,
+            can_write_when_red=can_write_when_red,
+            target_dte=config._resolve_target_dte(symbol),
+            max_dte=config._resolve_max_dte_for(symbol),
+            cap_factor=config._resolve_cap_factor(symbol),
+            cap_target_floor=config._resolve_cap_target_floor(symbol),
+            write_excess_calls_only=config._resolve_write_excess_calls_only(symbol),
+            maintain_high_water_mark=config._resolve_maintain_high_water_mark(symbol),
+            close_if_unable_to_roll=config._resolve_close_if_unable_to_roll(symbol),
+            trading_allowed=config._resolve_trading_is_allowed(symbol),
+            wheel_rebalance_policy=wheel_policy,
+            regime_rebalance_policy=config._resolve_regime_rebalance_policy(symbol),
+            buy_only_rebalancing=wheel_policy.allows_buy(),
+            sell_only_rebalancing=wheel_policy.allows_sell(),
+        )
+
+
+class SymbolSettingsTable:
+    """Read-only (symbol, right) -> SymbolSettings lookup.
+
+    Portfolio symbols are compiled up front. Symbols outside the portfolio
+    (the VIX hedge, the cash fund) resolve to defaults and are compiled on
+    first use.
+    """
+
+    __slots__ = ("_config", "_settings", "_extra")
+
+    def __init__(self, config: Config, symbols: Iterable[str]) -> None:
+        self._config = config
+        self._settings: Mapping[Tuple[str, str], SymbolSettings] = MappingProxyType(
+            {
+                (symbol, right): SymbolSettings.resolve(config, symbol, right)
+                for symbol in symbols
+                for right in RIGHTS
+            }
+        )
+        self._extra: Dict[Tuple[str, str], SymbolSettings] = {}
+
+    def __getstate__(self) -> Tuple[Config, Dict, Dict]:
+        # MappingProxyType cannot be pickled; the config cache pickles Config.
+        return self._config, dict(self._settings), self._extra
+
+    def __setstate__(self, state: Tuple[Config, Dict, Dict]) -> None:
+        self._config, settings, self._extra = state
+        self._settings = MappingProxyType(settings)
+
+    def __len__(self) -> int:
+        return len(self._settings)
+
+    def get(self, symbol: str, right: str) -> SymbolSettings:
+        key = (symbol, right)
+        settings = self._settings.get(key) or self._extra.get(key)
+        if settings is None:
+            right = normalize_right(right)
+            settings = self._settings.get((symbol, right)) or self._extra.get(
+                (symbol, right)
+            )
+            if settings is None:
+                settings = SymbolSettings.resolve(self._config, symbol, right)
+                self._extra[(symbol, right)] = settings
+            self._extra[key] = settings
+        return settings
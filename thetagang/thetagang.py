@@ -1,20 +1,47 @@
 import asyncio
 from asyncio import Future
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Awaitable, Optional, Protocol, cast
+from typing import Any, Awaitable, List, Optional, Protocol, Sequence, cast
 
 import tomlkit
-from ib_async import IB, IBC, Contract, Watchdog, util
+from ib_async import IB, IBC, Contract, StartupFetch, Watchdog, util
 from rich.console import Console
+from sqlalchemy import create_engine
 
 from thetagang import log
 from thetagang.config import Config, enabled_stage_ids_from_run, stage_enabled_map
+from thetagang.config_cache import load_cached_config, store_cached_config
 from thetagang.config_migration.startup_migration import (
     run_startup_migration,
 )
-from thetagang.db import DataStore, sqlite_db_path
+from thetagang.db import DataStore, run_migrations, sqlite_db_path
 from thetagang.exchange_hours import need_to_exit
+from thetagang.ibkr import IBKR
+from thetagang.market_data import SharedMarketData
+from thetagang.orders import Orders
 from thetagang.portfolio_manager import PortfolioManager
+from thetagang.profiling import StageProfiler
+from thetagang.regime_sweep import (
+    base_params,
+    build_universe,
+    expand_grid,
+    parse_grid,
+    print_sweep_results,
+    run_sweep,
+    write_sweep_csv,
+)
+from thetagang.reporting import (
+    load_report,
+    load_run_summary,
+    print_report,
+    rebuild_reports,
+    update_reports,
+)
+from thetagang.request_scheduler import RequestScheduler
+from thetagang.retention import print_retention_result, run_retention
+from thetagang.trading_operations import OptionChainScanner, OrderOperations
+from thetagang.warm import print_warm_results, warm_caches
 
 
 class _IBRunner(Protocol):
@@ -46,71 +73,107 @@ def _configure_ib_async_logging(logfile: Optional[str]) -> None:
         )
 
 
-def start(
-    config_path: str,
-    without_ibc: bool = False,
-    dry_run: bool = False,
-    *,
-    migrate_config: bool = False,
-    auto_approve_migration: bool = False,
-) -> None:
-    migration_flow = run_startup_migration(
-        config_path,
-        migrate_only=migrate_config,
-        auto_approve=auto_approve_migration,
-    )
-
-    raw_config = migration_flow.config_text
-    if migrate_config:
-        if migration_flow.was_migrated:
-            console.print(
-                "Migration complete. Exiting because --migrate-config was set."
+async def _connect_market_data_shards(config: Config) -> List[IB]:
+    watchdog = config.runtime.watchdog
+    shards: List[IB] = []
+    for offset in range(1, config.runtime.ib_async.connections):
+        shard = IB()
+        client_id = watchdog.clientId + offset
+        try:
+            await shard.connectAsync(
+                watchdog.host,
+                watchdog.port,
+                clientId=client_id,
+                timeout=watchdog.probeTimeout,
+                readonly=True,
+                fetchFields=StartupFetch(0),
             )
-        else:
-            console.print(
-                "Config already uses schema v2. Exiting because --migrate-config was set."
+        except Exception as exc:
+            log.warning(
+                f"Unable to open market data connection clientId={client_id}: "
+                f"{exc}. Continuing with {len(shards) + 1} connection(s)."
             )
-        return
+            break
+        shards.append(shard)
+    if shards:
+        log.info(f"Spreading market data over {len(shards) + 1} connections")
+    return shards
 
-    config_doc = tomlkit.parse(raw_config).unwrap()
-    config = Config(**config_doc)
-    run_stage_flags = stage_enabled_map(config)
-    run_stage_order = enabled_stage_ids_from_run(config.run)
 
-    config.display(config_path)
+def _load_config(config_path: str, use_cache: bool = True) -> tuple[Config, str]:
+    """Validated config and its text, from the config cache when it is current."""
+    if use_cache:
+        raw_config = Path(config_path).read_text(encoding="utf8")
+        cached = load_cached_config(raw_config)
+        if cached is not None:
+            return cached, raw_config
+    migration_flow = run_startup_migration(
+        config_path, migrate_only=False, auto_approve=False
+    )
+    raw_config = migration_flow.config_text
+    config = Config(**tomlkit.parse(raw_config).unwrap())
+    if use_cache:
+        store_cached_config(raw_config, config)
+    return config, raw_config
 
-    data_store = None
-    if config.runtime.database.enabled:
-        db_url = config.runtime.database.resolve_url(config_path)
-        sqlite_path = sqlite_db_path(db_url)
-        if sqlite_path:
-            sqlite_path.parent.mkdir(parents=True, exist_ok=True)
-        data_store = DataStore(db_url, config_path, dry_run, raw_config)
 
-    _configure_ib_async_logging(config.runtime.ib_async.logfile)
+def _stage_profilers(
+    config: Config, config_path: str, data_stores: Sequence[DataStore]
+) -> List[StageProfiler]:
+    """One profiler per account, each writing to its own run directory."""
+    settings = config.runtime.profile
+    base_dir = settings.resolve_directory(config_path)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    profilers: List[StageProfiler] = []
+    for index, account in enumerate(config.accounts):
+        data_store = data_stores[index] if data_stores else None
+        name = f"{stamp}-run{data_store.run_id}" if data_store else stamp
+        if len(config.accounts) > 1:
+            name = f"{name}-{account.number}"
+        profilers.append(
+            StageProfiler(
+                base_dir / name,
+                memory=settings.memory,
+                top_allocations=settings.top_allocations,
+                entry_points=settings.entry_points,
+            )
+        )
+        if data_store is not None:
+            data_store.set_profile_dir(str(base_dir / name))
+    log.notice(f"Profiling run stages into {base_dir}")
+    return profilers
 
-    # Check if exchange is open before continuing
-    if need_to_exit(config.runtime.exchange_hours):
+
+def _update_reports(data_store: Optional[DataStore]) -> None:
+    if data_store is None:
         return
+    try:
+        update_reports(data_store.engine)
+    except Exception as exc:
+        log.warning(f"Failed to update report tables: {exc}")
 
-    async def onConnected() -> None:
-        log.info(f"Connected to IB Gateway, serverVersion={ib.client.serverVersion()}")
-        await portfolio_manager.manage()
 
-    ib = IB()
-    ib.connectedEvent += onConnected
+def _run_end_of_run_retention(config: Config, data_store: Optional[DataStore]) -> None:
+    retention = config.runtime.database.retention
+    if data_store is None or not retention.run_on_exit:
+        return
+    try:
+        result = run_retention(
+            data_store.engine,
+            raw_days=retention.raw_days,
+            batch_size=retention.batch_size,
+            vacuum_pages=retention.vacuum_pages,
+            show_progress=False,
+        )
+        print_retention_result(result)
+    except Exception as exc:
+        log.warning(f"Failed to apply database retention: {exc}")
 
-    completion_future: Future[bool] = util.getLoop().create_future()
-    portfolio_manager = PortfolioManager(
-        config,
-        ib,
-        completion_future,
-        dry_run,
-        data_store=data_store,
-        run_stage_flags=run_stage_flags,
-        run_stage_order=run_stage_order,
-    )
 
+def _run_until_complete(
+    config: Config, ib: IB, completion_future: Awaitable[Any], without_ibc: bool
+) -> None:
+    """Connect (starting TWS through IBC unless told not to) and run until done."""
     probe_contract_config = config.runtime.watchdog.probeContract
     watchdog_config = config.runtime.watchdog
     probeContract = Contract(
@@ -151,3 +214,303 @@ def start(
         )
         cast(_IBRunner, ib).run(completion_future)
         ib.disconnect()
+
+
+def start_retention(
+    config_path: str,
+    *,
+    raw_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    vacuum_pages: Optional[int] = None,
+    vacuum: bool = True,
+) -> None:
+    config, _raw_config = _load_config(config_path)
+    if not config.runtime.database.enabled:
+        console.print("Database is disabled in config; nothing to do.")
+        return
+    retention = config.runtime.database.retention
+    db_url = config.runtime.database.resolve_url(config_path)
+    run_migrations(db_url)
+    engine = create_engine(db_url, future=True)
+    try:
+        result = run_retention(
+            engine,
+            raw_days=raw_days or retention.raw_days,
+            batch_size=batch_size or retention.batch_size,
+            vacuum_pages=(
+                (retention.vacuum_pages if vacuum_pages is None else vacuum_pages)
+                if vacuum
+                else None
+            ),
+        )
+    finally:
+        engine.dispose()
+    print_retention_result(result)
+
+
+def start_report(
+    config_path: str,
+    *,
+    by: str = "symbol",
+    days: int = 30,
+    rebuild: bool = False,
+) -> None:
+    config, _raw_config = _load_config(config_path)
+    if not config.runtime.database.enabled:
+        console.print("Database is disabled in config; there is nothing to report.")
+        return
+    db_url = config.runtime.database.resolve_url(config_path)
+    run_migrations(db_url)
+    engine = create_engine(db_url, future=True)
+    try:
+        if rebuild:
+            folded = rebuild_reports(engine)
+            log.notice(
+                "Rebuilt report tables from "
+                + ", ".join(f"{rows} {source}" for source, rows in folded.items())
+            )
+        else:
+            update_reports(engine)
+        since = date.today() - timedelta(days=days)
+        print_report(
+            load_report(engine, by, since), by, load_run_summary(engine, since)
+        )
+    finally:
+        engine.dispose()
+
+
+def start_regime_sweep(
+    config_path: str,
+    *,
+    grid: Sequence[str],
+    workers: Optional[int] = None,
+    limit: int = 25,
+    output: Optional[str] = None,
+) -> None:
+    config, _raw_config = _load_config(config_path)
+    if not config.strategies.regime_rebalance.enabled:
+        console.print("Regime rebalancing is disabled in config; nothing to sweep.")
+        return
+    if not config.runtime.database.enabled:
+        console.print("Database is disabled in config; no stored bars to replay.")
+        return
+    params = expand_grid(base_params(config), parse_grid(grid))
+    db_url = config.runtime.database.resolve_url(config_path)
+    run_migrations(db_url)
+    engine = create_engine(db_url, future=True)
+    try:
+        universe = build_universe(config, engine)
+    finally:
+        engine.dispose()
+    log.notice(
+        f"Regime sweep: {len(params)} parameter sets over {len(universe.dates)} "
+        f"days of {', '.join(universe.symbols)}"
+    )
+    results = run_sweep(universe, params, workers)
+    print_sweep_results(results, limit)
+    if output:
+        write_sweep_csv(results, output)
+        log.info(f"Regime sweep results written to {output}")
+
+
+def start_warm(config_path: str, without_ibc: bool = False) -> None:
+    config, raw_config = _load_config(config_path)
+    if not config.runtime.database.enabled:
+        console.print("Database is disabled in config; there are no caches to warm.")
+        return
+    db_url = config.runtime.database.resolve_url(config_path)
+    sqlite_path = sqlite_db_path(db_url)
+    if sqlite_path:
+        sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+    data_store = DataStore(db_url, config_path, True, raw_config)
+
+    _configure_ib_async_logging(config.runtime.ib_async.logfile)
+
+    ib = IB()
+    ibkr = IBKR(
+        ib,
+        config.runtime.ib_async.api_response_wait_time,
+        config.runtime.orders.exchange,
+        data_store=data_store,
+    )
+    scanner = OptionChainScanner(
+        config=config,
+        ibkr=ibkr,
+        order_ops=OrderOperations(
+            config=config,
+            account_number=config.runtime.account.number,
+            orders=Orders(),
+            data_store=data_store,
+        ),
+    )
+    completion_future: Future[bool] = util.getLoop().create_future()
+    shards: List[IB] = []
+
+    async def onConnected() -> None:
+        log.info(f"Connected to IB Gateway, serverVersion={ib.client.serverVersion()}")
+        if not any(shard.isConnected() for shard in shards):
+            shards[:] = await _connect_market_data_shards(config)
+        ibkr.attach_shards(shards)
+        try:
+            print_warm_results(await warm_caches(config, ibkr, scanner))
+        finally:
+            if not completion_future.done():
+                completion_future.set_result(True)
+
+    ib.connectedEvent += onConnected
+    _run_until_complete(config, ib, completion_future, without_ibc)
+
+    for shard in shards:
+        shard.disconnect()
+
+
+def start(
+    config_path: str,
+    without_ibc: bool = False,
+    dry_run: bool = False,
+    *,
+    migrate_config: bool = False,
+    auto_approve_migration: bool = False,
+    use_config_cache: bool = True,
+    profile: bool = False,
+) -> None:
+    if migrate_config or auto_approve_migration:
+        migration_flow = run_startup_migration(
+            config_path,
+            migrate_only=migrate_config,
+            auto_approve=auto_approve_migration,
+        )
+        if migrate_config:
+            if migration_flow.was_migrated:
+                console.print(
+                    "Migration complete. Exiting because --migrate-config was set."
+                )
+            else:
+                console.print(
+                    "Config already uses schema v2. Exiting because --migrate-config was set."
+                )
+            return
+    # After an approved migration the file on disk is already v2.
+    config, raw_config = _load_config(config_path, use_config_cache)
+    run_stage_flags = stage_enabled_map(config)
+    run_stage_order = enabled_stage_ids_from_run(config.run)
+
+    if log.is_headless():
+        log.info(f"Loaded config from {config_path}")
+    else:
+        config.display(config_path)
+
+    accounts = config.accounts
+    data_stores: List[DataStore] = []
+    if config.runtime.database.enabled:
+        db_url = config.runtime.database.resolve_url(config_path)
+        sqlite_path = sqlite_db_path(db_url)
+        if sqlite_path:
+            sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+        data_stores = [
+            DataStore(
+                db_url,
+                config_path,
+                dry_run,
+                raw_config,
+                account_number=account.number if len(accounts) > 1 else None,
+                snapshot_mode=config.runtime.database.snapshots.mode,
+                snapshot_base_every=config.runtime.database.snapshots.base_every,
+            )
+            for account in accounts
+        ]
+
+    _configure_ib_async_logging(config.runtime.ib_async.logfile)
+
+    # Check if exchange is open before continuing
+    if need_to_exit(config.runtime.exchange_hours):
+        return
+
+    profilers = (
+        _stage_profilers(config, config_path, data_stores)
+        if profile or config.runtime.profile.enabled
+        else []
+    )
+
+    ib = IB()
+    # Account-independent reads (chains, qualification, bars, quotes) are only
+    # worth sharing when more than one account is managed.
+    market_data = SharedMarketData() if len(accounts) > 1 else None
+    # One scheduler paces every account, since they share the connection.
+    scheduler = RequestScheduler()
+    completion_futures: List[Future[bool]] = []
+    portfolio_managers: List[PortfolioManager] = []
+    for index, account in enumerate(accounts):
+        kwargs: dict[str, Any] = {"request_scheduler": scheduler}
+        if market_data is not None:
+            kwargs["market_data"] = market_data
+        if profilers:
+            kwargs["profiler"] = profilers[index]
+        completion_futures.append(util.getLoop().create_future())
+        portfolio_managers.append(
+            PortfolioManager(
+                config.for_account(account),
+                ib,
+                completion_futures[-1],
+                dry_run,
+                data_store=data_stores[index] if data_stores else None,
+                run_stage_flags=run_stage_flags,
+                run_stage_order=run_stage_order,
+                resume_on_reconnect=not without_ibc,
+                **kwargs,
+            )
+        )
+
+    shards: List[IB] = []
+
+    async def onConnected() -> None:
+        log.info(f"Connected to IB Gateway, serverVersion={ib.client.serverVersion()}")
+        if not any(shard.isConnected() for shard in shards):
+            shards[:] = await _connect_market_data_shards(config)
+        for portfolio_manager in portfolio_managers:
+            portfolio_manager.ibkr.attach_shards(shards)
+        for portfolio_manager in portfolio_managers:
+            if portfolio_manager.completion_future.done():
+                # Finished before the connection dropped.
+                continue
+            if len(portfolio_managers) > 1:
+                log.notice(f"Managing account {portfolio_manager.account_number}")
+            try:
+                await portfolio_manager.manage()
+            except Exception:
+                # One failing account must not prevent the others from running.
+                if len(portfolio_managers) == 1:
+                    raise
+                log.error(
+                    f"Account {portfolio_manager.account_number} failed, continuing"
+                )
+        if market_data is not None:
+            log.info(
+                f"Shared market data: {market_data.hits} hits, "
+                f"{market_data.misses} requests"
+            )
+        log.info(scheduler.describe())
+
+    ib.connectedEvent += onConnected
+
+    completion_future: Awaitable[Any]
+    if len(completion_futures) == 1:
+        completion_future = completion_futures[0]
+    else:
+        completion_future = asyncio.gather(*completion_futures)
+
+    try:
+        _run_until_complete(config, ib, completion_future, without_ibc)
+    finally:
+        # Profiles of a failed run are the ones most worth keeping.
+        for profiler in profilers:
+            profiler.close()
+
+    for shard in shards:
+        shard.disconnect()
+
+    # Every account writes to the same database, so fold the new rows into
+    # the report tables and prune it once. Reports go first so no raw row is
+    # pruned before it has been counted.
+    _update_reports(data_stores[0] if data_stores else None)
+    _run_end_of_run_retention(config, data_stores[0] if data_stores else None)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ib_async import Ticker, util
+
+
+class TickerField(Enum):
+    MIDPOINT = "midpoint"
+    MARKET_PRICE = "market_price"
+    GREEKS = "greeks"
+    OPEN_INTEREST = "open_interest"
+
+
+def _has_midpoint(ticker: Ticker) -> bool:
+    return not util.isNan(ticker.midpoint())
+
+
+def _has_market_price(ticker: Ticker) -> bool:
+    return not util.isNan(ticker.marketPrice())
+
+
+def _has_greeks(ticker: Ticker) -> bool:
+    greeks = ticker.modelGreeks
+    return not (greeks is None or greeks.delta is None or util.isNan(greeks.delta))
+
+
+def _has_open_interest(ticker: Ticker) -> bool:
+    if not ticker.contract:
+        return True
+    if ticker.contract.right.startswith("P"):
+        return not util.isNan(ticker.putOpenInterest)
+    return not util.isNan(ticker.callOpenInterest)
+
+
+FIELD_BITS: Dict[TickerField, int] = {
+    field: 1 << index for index, field in enumerate(TickerField)
+}
+FIELD_CHECKS: Tuple[Tuple[int, Callable[[Ticker], bool]], ...] = (
+    (FIELD_BITS[TickerField.MIDPOINT], _has_midpoint),
+    (FIELD_BITS[TickerField.MARKET_PRICE], _has_market_price),
+    (FIELD_BITS[TickerField.GREEKS], _has_greeks),
+    (FIELD_BITS[TickerField.OPEN_INTEREST], _has_open_interest),
+)
+
+
+def field_mask(fields: Iterable[TickerField]) -> int:
+    mask = 0
+    for field in fields:
+        mask |= FIELD_BITS[field]
+    return mask
+
+
+def fields_in(mask: int) -> List[TickerField]:
+    return [field for field in TickerField if mask & FIELD_BITS[field]]
+
+
+class TickerReadiness:
+    """Wait for a set of ticker fields with one update handler.
+
+    Each update only re-checks fields that are still missing, and the whole
+    wait resolves a single future: as soon as every requested field is
+    present, or when the deadline passes with whatever has arrived by then.
+    Once a field has been seen it is not re-checked, matching the previous
+    per-field waits, which stopped watching a field after it first appeared.
+    """
+
+    __slots__ = ("ticker", "wanted", "ready", "pending", "future", "_timer")
+
+    def __init__(self, ticker: Ticker, wanted: int) -> None:
+        self.ticker = ticker
+        self.wanted = wanted
+        self.ready = 0
+        self.pending = [(bit, check) for bit, check in FIELD_CHECKS if bit & wanted]
+        self.future: asyncio.Future[int] = asyncio.get_running_loop().create_future()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def on_update(self, ticker: Ticker) -> None:
+        ready = self.ready
+        for bit, check in self.pending:
+            if check(ticker):
+                ready |= bit
+        if ready == self.ready:
+            return
+        self.ready = ready
+        if ready == self.wanted:
+            self._resolve()
+        else:
+            self.pending = [entry for entry in self.pending if not entry[0] & ready]
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(self.ready)
+
+    async def wait(self, timeout: float) -> int:
+        """Return the bitmask of fields that arrived before ``timeout``."""
+        self.on_update(self.ticker)
+        if self.future.done():
+            return self.future.result()
+        self.ticker.updateEvent += self.on_update
+        self._timer = asyncio.get_running_loop().call_later(timeout, self._resolve)
+        try:
+            return await self.future
+        finally:
+            self._timer.cancel()
+            self.ticker.updateEvent -= self.on_update
+
+
+async def wait_for_fields(
+    ticker: Ticker,
+    required: Iterable[TickerField],
+    optional: Iterable[TickerField],
+    timeout: float,
+) -> Tuple[List[TickerField], List[TickerField]]:
+    """Wait for ticker fields; return the (required, optional) still missing."""
+    required_mask = field_mask(required)
+    optional_mask = field_mask(optional)
+    ready = await TickerReadiness(ticker, required_mask | optional_mask).wait(timeout)
+    return (
+        fields_in(required_mask & ~ready),
+        fields_in(optional_mask & ~ready),
+    )
@@ -3,7 +3,6 @@ from typing import List, Optional
 from ib_async import Contract, LimitOrder, Trade
 from rich import box
 from rich.pretty import Pretty
-from rich.table import Table
 
 from thetagang import log
 from thetagang.db import DataStore
@@ -38,6 +37,13 @@ class Trades:
     def records(self) -> List[Trade]:
         return self.__records
 
+    def track(self, trade: Trade) -> None:
+        """Follow a trade that was placed before, e.g. by an earlier attempt."""
+        self.__add_trade(trade)
+
+    def clear(self) -> None:
+        self.__records = []
+
     def is_empty(self) -> bool:
         return len(self.__records) == 0
 
@@ -45,7 +51,7 @@ class Trades:
         if not self.__records:
             return
 
-        table = Table(
+        table = log.table(
             title="Trade Summary", show_lines=True, box=box.MINIMAL_HEAVY_HEAD
         )
         table.add_column("Symbol")
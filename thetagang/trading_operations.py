@@ -3,7 +3,7 @@ from __future__ import annotations
 import math
 from typing import Any, Callable, List, Optional, Tuple
 
-from ib_async import TagValue, Ticker, util
+from ib_async import OptionChain, TagValue, Ticker, util
 from ib_async.contract import Contract, Option
 from ib_async.order import LimitOrder
 
@@ -14,6 +14,7 @@ from thetagang.fmt import dfmt
 from thetagang.ibkr import IBKR, TickerField
 from thetagang.options import option_dte
 from thetagang.orders import Orders
+from thetagang.run_checkpoint import RunCheckpoint, scan_key
 from thetagang.util import midpoint_or_market_price
 
 
@@ -116,46 +117,30 @@ class OrderOperations:
 
 class OptionChainScanner:
     def __init__(
-        self, *, config: Config, ibkr: IBKR, order_ops: OrderOperations
+        self,
+        *,
+        config: Config,
+        ibkr: IBKR,
+        order_ops: OrderOperations,
+        checkpoint: Optional[RunCheckpoint] = None,
     ) -> None:
         self.config = config
         self.ibkr = ibkr
         self.order_ops = order_ops
+        self.checkpoint = checkpoint
 
-    async def find_eligible_contracts(
+    def scan_contracts(
         self,
         underlying: Contract,
+        chains: List[OptionChain],
         right: str,
+        underlying_price: float,
         strike_limit: Optional[float],
-        minimum_price: Callable[[], float],
+        target_dte: int,
+        max_dte: Optional[int],
         exclude_expirations_before: Optional[str] = None,
-        exclude_exp_strike: Optional[Tuple[float, str]] = None,
-        fallback_minimum_price: Optional[Callable[[], float]] = None,
-        target_dte: Optional[int] = None,
-        target_delta: Optional[float] = None,
-    ) -> Ticker:
-        contract_target_dte: int = (
-            target_dte if target_dte else self.config.get_target_dte(underlying.symbol)
-        )
-        contract_target_delta: float = (
-            target_delta
-            if target_delta
-            else self.config.get_target_delta(underlying.symbol, right)
-        )
-        contract_max_dte = self.config.get_max_dte_for(underlying.symbol)
-
-        log.notice(
-            f"{underlying.symbol}: Searching option chain for "
-            f"right={right} strike_limit={strike_limit} minimum_price={dfmt(minimum_price(), 3)} "
-            f"fallback_minimum_price={dfmt(fallback_minimum_price() if fallback_minimum_price else 0, 3)} "
-            f"contract_target_dte={contract_target_dte} contract_max_dte={contract_max_dte} "
-            f"contract_target_delta={contract_target_delta}, "
-            "this can take a while...",
-        )
-
-        underlying_ticker = await self.ibkr.get_ticker_for_contract(underlying)
-        underlying_price = midpoint_or_market_price(underlying_ticker)
-        chains = await self.ibkr.get_chains_for_contract(underlying)
+    ) -> List[Contract]:
+        """The unqualified option contracts a chain scan asks quotes for."""
         chain = next(
             c
             for c in chains
@@ -181,9 +166,9 @@ class OptionChainScanner:
         expirations = sorted(
             exp
             for exp in chain.expirations
-            if option_dte(exp) >= contract_target_dte
+            if option_dte(exp) >= target_dte
             and option_dte(exp) >= min_dte
-            and (not contract_max_dte or option_dte(exp) <= contract_max_dte)
+            and (not max_dte or option_dte(exp) <= max_dte)
         )[:chain_expirations]
         if len(expirations) < 1:
             raise NoValidContractsError(
@@ -201,12 +186,7 @@ class OptionChainScanner:
             raise NoValidContractsError(
                 f"No valid contract strikes found for {underlying.symbol}. Continuing anyway..."
             )
-        log.info(
-            f"{underlying.symbol}: Scanning between strikes {strikes[0]} and {strikes[-1]},"
-            f" from expirations {expirations[0]} to {expirations[-1]}"
-        )
-
-        contracts = [
+        return [
             Option(
                 underlying.symbol,
                 expiration,
@@ -217,6 +197,89 @@ class OptionChainScanner:
             for expiration in expirations
             for strike in strikes
         ]
+
+    async def find_eligible_contracts(
+        self,
+        underlying: Contract,
+        right: str,
+        strike_limit: Optional[float],
+        minimum_price: Callable[[], float],
+        exclude_expirations_before: Optional[str] = None,
+        exclude_exp_strike: Optional[Tuple[float, str]] = None,
+        fallback_minimum_price: Optional[Callable[[], float]] = None,
+        target_dte: Optional[int] = None,
+        target_delta: Optional[float] = None,
+    ) -> Ticker:
+        contract_target_dte: int = (
+            target_dte if target_dte else self.config.get_target_dte(underlying.symbol)
+        )
+        contract_target_delta: float = (
+            target_delta
+            if target_delta
+            else self.config.get_target_delta(underlying.symbol, right)
+        )
+        contract_max_dte = self.config.get_max_dte_for(underlying.symbol)
+        quote_mode = self.config.runtime.ib_async.quote_mode
+
+        checkpoint_key = None
+        if self.checkpoint is not None:
+            checkpoint_key = scan_key(
+                underlying.symbol,
+                right,
+                strike_limit,
+                exclude_expirations_before,
+                exclude_exp_strike,
+                target_dte,
+                target_delta,
+            )
+            scanned = self.checkpoint.scan_result(checkpoint_key)
+            if scanned is not None:
+                log.notice(
+                    f"{underlying.symbol}: Reusing contract at strike={scanned.strike} "
+                    f"expiration={scanned.lastTradeDateOrContractMonth} "
+                    "chosen before reconnecting"
+                )
+                return await self.ibkr.get_ticker_for_contract(
+                    scanned,
+                    required_fields=[],
+                    optional_fields=[
+                        TickerField.MARKET_PRICE,
+                        TickerField.GREEKS,
+                        TickerField.MIDPOINT,
+                    ],
+                    mode=quote_mode,
+                )
+
+        log.notice(
+            f"{underlying.symbol}: Searching option chain for "
+            f"right={right} strike_limit={strike_limit} minimum_price={dfmt(minimum_price(), 3)} "
+            f"fallback_minimum_price={dfmt(fallback_minimum_price() if fallback_minimum_price else 0, 3)} "
+            f"contract_target_dte={contract_target_dte} contract_max_dte={contract_max_dte} "
+            f"contract_target_delta={contract_target_delta}, "
+            "this can take a while...",
+        )
+
+        underlying_ticker = await self.ibkr.get_ticker_for_contract(
+            underlying, mode=quote_mode
+        )
+        underlying_price = midpoint_or_market_price(underlying_ticker)
+        chains = await self.ibkr.get_chains_for_contract(underlying)
+        contracts = self.scan_contracts(
+            underlying,
+            chains,
+            right,
+            underlying_price,
+            strike_limit,
+            contract_target_dte,
+            contract_max_dte,
+            exclude_expirations_before,
+        )
+        log.info(
+            f"{underlying.symbol}: Scanning between strikes {contracts[0].strike} and"
+            f" {contracts[-1].strike}, from expirations"
+            f" {contracts[0].lastTradeDateOrContractMonth} to"
+            f" {contracts[-1].lastTradeDateOrContractMonth}"
+        )
         contracts = await self.ibkr.qualify_contracts(*contracts)
         contracts = [c for c in contracts if c is not None]
 
@@ -241,6 +304,7 @@ class OptionChainScanner:
                 TickerField.OPEN_INTEREST,
                 TickerField.MIDPOINT,
             ],
+            mode=quote_mode,
         )
 
         def open_interest_is_valid(ticker: Ticker, minimum_open_interest: int) -> bool:
@@ -358,4 +422,6 @@ class OptionChainScanner:
             f"dte={option_dte(chosen.contract.lastTradeDateOrContractMonth)} "
             f"price={dfmt(midpoint_or_market_price(chosen), 3)}"
         )
+        if self.checkpoint is not None and checkpoint_key is not None:
+            self.checkpoint.save_scan_result(checkpoint_key, chosen.contract)
         return chosen
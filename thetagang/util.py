@@ -114,6 +114,18 @@ def calculate_net_short_positions(positions: List[PortfolioItem], right: str) ->
         )
         for p in get_long_positions(positions, right)
     ]
+    return net_short_contracts(shorts, longs, right)
+
+
+def net_short_contracts(
+    shorts: List[Tuple[int, float, float]],
+    longs: List[Tuple[int, float, float]],
+    right: str,
+) -> int:
+    """Net short contracts after offsetting shorts with covering longs.
+
+    Legs are (dte, strike, position) tuples.
+    """
     shorts = sorted(shorts, key=itemgetter(0, 1), reverse=right.upper().startswith("P"))
     longs = sorted(longs, key=itemgetter(0, 1), reverse=right.upper().startswith("P"))
 
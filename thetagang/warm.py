@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from ib_async import Contract, Stock
+from rich import box
+
+from thetagang import log
+from thetagang.config import Config
+from thetagang.fmt import dfmt, ifmt, pfmt
+from thetagang.ibkr import IBKR
+from thetagang.market_cache import duration_days
+from thetagang.strategies.regime_engine import regime_history_duration
+from thetagang.trading_operations import NoValidContractsError, OptionChainScanner
+
+
+@dataclass
+class WarmResult:
+    symbol: str
+    con_id: Optional[int] = None
+    bars: int = 0
+    last_close: Optional[float] = None
+    realized_vol: Optional[float] = None
+    expirations: int = 0
+    contracts: int = 0
+    error: Optional[str] = None
+
+
+def history_duration(config: Config, symbol: str) -> str:
+    """The longest daily history a trading run requests for ``symbol``."""
+    durations = [config.strategies.wheel.defaults.constants.daily_stddev_window]
+    regime = config.strategies.regime_rebalance
+    if regime.enabled and symbol in regime.symbols:
+        durations.append(
+            regime_history_duration(regime.lookback_days, regime.cooldown_days)
+        )
+    return max(durations, key=lambda duration: duration_days(duration) or 0)
+
+
+def realized_vol(closes: List[float]) -> Optional[float]:
+    if len(closes) < 3 or min(closes) <= 0:
+        return None
+    returns = np.diff(np.log(np.array(closes, dtype=float)))
+    return float(np.std(returns, ddof=1) * math.sqrt(252))
+
+
+async def warm_symbol(
+    config: Config, ibkr: IBKR, scanner: OptionChainScanner, symbol: str
+) -> WarmResult:
+    """Make the reads a trading run starts with for ``symbol`` hit the caches.
+
+    Qualifies the underlying the way the engines build it, stores its daily
+    history and option chains, and qualifies the option contracts both chain
+    scans would request around the last close.
+    """
+    result = WarmResult(symbol)
+    try:
+        stock = Stock(
+            symbol,
+            config.runtime.orders.exchange,
+            currency="USD",
+            primaryExchange=config.portfolio.symbols[symbol].primary_exchange,
+        )
+        qualified = await ibkr.qualify_contracts(stock)
+        if not qualified or not qualified[0].conId:
+            result.error = "not qualified"
+            return result
+        underlying = qualified[0]
+        result.con_id = underlying.conId
+
+        bars = await ibkr.request_historical_data(
+            underlying, history_duration(config, symbol)
+        )
+        closes = [float(bar.close) for bar in bars]
+        result.bars = len(closes)
+        result.last_close = closes[-1] if closes else None
+        result.realized_vol = realized_vol(closes)
+
+        chains = await ibkr.get_chains_for_contract(underlying)
+        if result.last_close is None:
+            return result
+        contracts: List[Contract] = []
+        for right in ("P", "C"):
+            try:
+                contracts += scanner.scan_contracts(
+                    underlying,
+                    chains,
+                    right,
+                    result.last_close,
+                    config.get_strike_limit(symbol, right),
+                    config.get_target_dte(symbol),
+                    config.get_max_dte_for(symbol),
+                )
+            except (NoValidContractsError, StopIteration):
+                continue
+        result.expirations = len(
+            {contract.lastTradeDateOrContractMonth for contract in contracts}
+        )
+        result.contracts = len(await ibkr.qualify_contracts(*contracts))
+    except Exception as exc:
+        result.error = str(exc) or type(exc).__name__
+    return result
+
+
+async def warm_caches(
+    config: Config, ibkr: IBKR, scanner: OptionChainScanner
+) -> List[WarmResult]:
+    symbols = list(config.portfolio.symbols)
+    results = await log.track_async(
+        [warm_symbol(config, ibkr, scanner, symbol) for symbol in symbols],
+        description="Warming market data caches...",
+    )
+    return sorted(results, key=lambda result: symbols.index(result.symbol))
+
+
+def print_warm_results(results: List[WarmResult]) -> None:
+    table = log.table(title="Cache warm-up", box=box.SIMPLE_HEAVY)
+    table.add_column("Symbol")
+    table.add_column("ConId", justify="right")
+    table.add_column("Bars", justify="right")
+    table.add_column("Last close", justify="right")
+    table.add_column("Realized vol", justify="right")
+    table.add_column("Expirations", justify="right")
+    table.add_column("Options", justify="right")
+    table.add_column("Error")
+    for result in results:
+        table.add_row(
+            result.symbol,
+            str(result.con_id or ""),
+            ifmt(result.bars),
+            dfmt(result.last_close),
+            pfmt(result.realized_vol),
+            ifmt(result.expirations),
+            ifmt(result.contracts),
+            f"[red]{result.error}" if result.error else "",
+        )
+    log.print(table)
+    failed = [result.symbol for result in results if result.error]
+    if failed:
+        log.warning(f"Cache warm-up failed for {', '.join(failed)}")
+    else:
+        log.notice(f"Cache warm-up done for {len(results)} symbols")
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from typing import Collection, Dict, Iterable, List, Tuple
+
+from ib_async import Contract, Trade
+from rich import box
+
+from thetagang import log
+
+# Key used for orders whose right can't be read off the contract (stocks, and
+# roll combos whose legs only carry conIds). It matches any right on lookup.
+ANY_RIGHT = ""
+
+REGIME_ORDER_REF_PREFIX = "tg:regime-rebalance"
+
+WorkingOrderKey = Tuple[str, str, str]
+
+
+def order_stages(
+    contract: Contract, action: str, order_ref: str
+) -> List[Tuple[str, str]]:
+    """Return the (right, stage id) pairs that could have placed this order."""
+    if order_ref.startswith(REGIME_ORDER_REF_PREFIX):
+        return [(ANY_RIGHT, "equity_regime_rebalance")]
+    if contract.secType == "BAG":
+        return [(ANY_RIGHT, "options_roll_positions")]
+    if contract.secType == "STK":
+        if action == "BUY":
+            return [(ANY_RIGHT, "equity_buy_rebalance")]
+        return [(ANY_RIGHT, "equity_sell_rebalance")]
+    if contract.secType in ("OPT", "FOP"):
+        right = contract.right[:1]
+        if action == "SELL":
+            if right == "P":
+                return [(right, "options_write_puts")]
+            return [(right, "options_write_calls")]
+        stages = [(right, "options_close_positions")]
+        if contract.symbol == "VIX" and right == "C":
+            stages.append((right, "post_vix_call_hedge"))
+        return stages
+    return []
+
+
+class WorkingOrders:
+    """Index of orders left working at the broker by earlier runs.
+
+    It's only built when ``cancel_orders`` is off. Stages ask it before
+    scanning or planning a symbol, so a symbol that already has a live order
+    for the same stage isn't planned again only for the duplicate to be
+    rejected or stacked on top of the working one.
+    """
+
+    def __init__(self) -> None:
+        self.__index: Dict[WorkingOrderKey, List[Trade]] = {}
+        self.__skipped: Dict[WorkingOrderKey, List[Trade]] = {}
+
+    def rebuild(
+        self, trades: Iterable[Trade], exclude_order_ids: Collection[int] = ()
+    ) -> None:
+        self.__index = {}
+        for trade in trades:
+            if trade.isDone() or trade.order.orderId in exclude_order_ids:
+                continue
+            for right, stage_id in order_stages(
+                trade.contract, trade.order.action, trade.order.orderRef or ""
+            ):
+                key = (trade.contract.symbol, right, stage_id)
+                self.__index.setdefault(key, []).append(trade)
+
+    def working(self, symbol: str, right: str, stage_id: str) -> List[Trade]:
+        right = right[:1]
+        trades = list(self.__index.get((symbol, right, stage_id), []))
+        if right != ANY_RIGHT:
+            trades += self.__index.get((symbol, ANY_RIGHT, stage_id), [])
+        return trades
+
+    def skip(self, symbol: str, right: str, stage_id: str) -> bool:
+        """Whether ``stage_id`` should leave ``symbol`` alone this run."""
+        trades = self.working(symbol, right, stage_id)
+        if not trades:
+            return False
+        key = (symbol, right[:1], stage_id)
+        if key not in self.__skipped:
+            log.info(
+                f"{symbol}: Skipping {stage_id}, order already working "
+                f"(OrderId: {', '.join(str(t.order.orderId) for t in trades)})"
+            )
+        self.__skipped[key] = trades
+        return True
+
+    def skipped(self) -> Dict[WorkingOrderKey, List[Trade]]:
+        return self.__skipped
+
+    def is_empty(self) -> bool:
+        return len(self.__index) == 0
+
+    def print_summary(self) -> None:
+        if not self.__skipped:
+            return
+
+        table = log.table(
+            title="Skipped (orders already working)",
+            show_lines=True,
+            box=box.MINIMAL_HEAVY_HEAD,
+        )
+        table.add_column("Symbol")
+        table.add_column("Right")
+        table.add_column("Stage")
+        table.add_column("Working orders")
+
+        for (symbol, right, stage_id), trades in self.__skipped.items():
+            table.add_row(
+                symbol,
+                right or "-",
+                stage_id,
+                ", ".join(
+                    f"{trade.order.action} {trade.order.totalQuantity:g} "
+                    f"(OrderId: {trade.order.orderId})"
+                    for trade in trades
+                ),
+            )
+
+        log.print(table)